@@ -0,0 +1,28 @@
+"""SHARPy benchmarks
+
+Timings of representative kernels and short simulations for parameterised model sizes, to track the performance of
+SHARPy. The ``tests`` check correctness; the benchmarks are run separately with::
+
+    python -m benchmarks [-b PATTERN] [--quick] [--history FILE] [--tolerance TOL] [--baseline COMMIT] [--accept]
+
+from the root of the repository. Every case is compared with its reference on the same machine, the median of its
+latest valid results or the result of a baseline commit, and the new results are appended to the history file (see
+:mod:`benchmarks.history`). A case that fails is recorded as failed and the rest are run. The command exits with an
+error if any case fails or is slower than its reference by more than the tolerance. Such regressions are not used
+as references unless they are accepted with ``--accept``.
+
+Benchmarks are classes derived from :class:`~benchmarks.benchmark_interface.BaseBenchmark` registered with the
+``@benchmark`` decorator in the ``bench_*.py`` modules of this package.
+"""
+import importlib
+import os
+
+
+def load_benchmarks():
+    """
+    Imports the ``bench_*.py`` modules, which register their benchmarks.
+    """
+    folder = os.path.dirname(os.path.realpath(__file__))
+    for file in sorted(os.listdir(folder)):
+        if file.startswith('bench_') and file.endswith('.py'):
+            importlib.import_module('benchmarks.' + file[:-3])
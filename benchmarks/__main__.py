@@ -0,0 +1,152 @@
+"""Runs the SHARPy benchmarks and tracks their history. See :mod:`benchmarks`."""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import sharpy.utils.cout_utils as cout
+import benchmarks
+import benchmarks.benchmark_interface as benchmark_interface
+import benchmarks.history as history
+import benchmarks.models as models
+
+
+def run_case(benchmark_class, params, repeat=None):
+    """
+    Runs a benchmark case.
+
+    Args:
+        benchmark_class (type): Benchmark
+        params (dict): Parameters of the case
+        repeat (int): Number of repetitions. The ``repeat`` of the benchmark if ``None``
+
+    Returns:
+        tuple: Time per call of each repetition and median of the profiles returned by the benchmark (``None`` if it
+        does not return any)
+    """
+    if repeat is None:
+        repeat = benchmark_class.repeat
+
+    bench = benchmark_class()
+    times = []
+    profiles = []
+    try:
+        bench.setup(**params)
+        for i_repeat in range(repeat):
+            t0 = time.perf_counter()
+            for i_call in range(bench.number):
+                profile = bench.run()
+            times.append((time.perf_counter() - t0)/bench.number)
+            if profile:
+                profiles.append(profile)
+    finally:
+        bench.teardown()
+
+    if not profiles:
+        return times, None
+    names = set().union(*profiles)
+    return times, {name: float(np.median([profile.get(name, 0.) for profile in profiles])) for name in names}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Runs the SHARPy benchmarks')
+    parser.add_argument('-b', '--bench', help='run only the benchmarks whose name contains BENCH', type=str,
+                        default=None)
+    parser.add_argument('-q', '--quick', help='run only the first value of every parameter', action='store_true')
+    parser.add_argument('-r', '--repeat', help='number of repetitions of every case', type=int, default=None)
+    parser.add_argument('--history', help='history file (default: benchmarks/history/<machine>.jsonl)', type=str,
+                        default=None)
+    parser.add_argument('--tolerance', help='relative slowdown considered a regression (default: 0.1)', type=float,
+                        default=0.1)
+    parser.add_argument('--statistic', help='time compared with the history (default: min)', type=str,
+                        default='min', choices=['min', 'median'])
+    parser.add_argument('--last', help='number of latest records of each case whose median is the reference '
+                                       '(default: 5)', type=int, default=5)
+    parser.add_argument('--baseline', help='compare with the records of the commit BASELINE instead', type=str,
+                        default=None)
+    parser.add_argument('--accept', help='accept the regressions, which become valid references',
+                        action='store_true')
+    parser.add_argument('--no-save', help='do not append the results to the history file', action='store_true')
+    parser.add_argument('-l', '--list', help='list the benchmarks and their parameters', action='store_true')
+    args = parser.parse_args(args)
+
+    benchmarks.load_benchmarks()
+    benchmark_classes = benchmark_interface.benchmark_list(args.bench)
+
+    if args.list:
+        for benchmark_class in benchmark_classes:
+            print('%s %s' % (benchmark_class.benchmark_id, benchmark_class.params))
+        return 0
+
+    filename = history.default_filename() if args.history is None else args.history
+    machine = history.machine_info()
+    commit, dirty = history.git_info()
+    references = history.references(history.load(filename), node=machine['node'], last=args.last,
+                                    statistic=args.statistic, baseline=args.baseline)
+
+    # the solvers and kernels are silent
+    cout.cout_wrap.initialise(False, False)
+
+    records = []
+    regressions = []
+    failures = []
+    try:
+        for benchmark_class in benchmark_classes:
+            for params in benchmark_class.param_combinations(quick=args.quick):
+                line = '%-20s %-60s' % (benchmark_class.benchmark_id,
+                                        ' '.join('%s=%s' % (k, v) for k, v in params.items()))
+                try:
+                    times, profile = run_case(benchmark_class, params, args.repeat)
+                except Exception as error:
+                    # the case is recorded as failed and the rest of the cases are run
+                    record = history.new_record(benchmark_class.benchmark_id, params, [], benchmark_class.number,
+                                                commit=commit, dirty=dirty, machine=machine,
+                                                error='%s: %s' % (type(error).__name__, error))
+                    records.append(record)
+                    failures.append(record)
+                    print(line + ' FAILED %s' % record['error'])
+                    sys.stdout.flush()
+                    continue
+
+                record = history.new_record(benchmark_class.benchmark_id, params, times, benchmark_class.number,
+                                            profile=profile, commit=commit, dirty=dirty, machine=machine)
+                records.append(record)
+
+                line += ' %10.4f s' % record[args.statistic]
+                reference = references.get(history.case_key(record))
+                if reference is not None:
+                    ratio, regression, profile_regressions = history.compare(record, reference,
+                                                                             tolerance=args.tolerance,
+                                                                             statistic=args.statistic)
+                    line += ' %+7.1f%%' % (100*(ratio - 1.))
+                    if regression:
+                        line += ' REGRESSION (reference %s)' % reference['commit']
+                        if args.accept:
+                            line += ' accepted'
+                        else:
+                            record['regression'] = True
+                            regressions.append(record)
+                        for name, stage_ratio in sorted(profile_regressions.items()):
+                            line += '\n%22s%+7.1f%% %s' % ('', 100*(stage_ratio - 1.), name)
+                print(line)
+                sys.stdout.flush()
+    finally:
+        models.cleanup()
+        if records and not args.no_save:
+            history.append(filename, records)
+            print('Results appended to %s' % filename)
+
+    if failures:
+        print('%d of %d cases failed' % (len(failures), len(records)))
+    if regressions:
+        print('%d of %d cases are more than %.0f%% slower than their reference' % (len(regressions),
+                                                                                   len(records),
+                                                                                   100*args.tolerance))
+    if failures or regressions:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Aerodynamic kernels on the simple HALE case"""
+import numpy as np
+
+import sharpy.aero.utils.mapping as mapping
+import sharpy.linear.src.assembly as assembly
+import sharpy.linear.src.multisurfaces as multisurfaces
+from benchmarks.benchmark_interface import benchmark, BaseBenchmark
+import benchmarks.models as models
+
+
+@benchmark
+class ForceMapping(BaseBenchmark):
+    """
+    Mapping of the aerodynamic forces to the structural nodes with
+    :func:`~sharpy.aero.utils.mapping.aero2struct_force_mapping`, with and without a precomputed
+    :class:`~sharpy.aero.utils.mapping.ForceMappingIndex`.
+    """
+    benchmark_id = 'ForceMapping'
+    params = {'m': [4, 16],
+              'n_elem_multiplier': [2, 8],
+              'precomputed_index': [False, True]}
+    number = 10
+
+    def setup(self, m, n_elem_multiplier, precomputed_index):
+        self.data = models.load_hale(m, n_elem_multiplier, mstar=1)
+        self.struct_tstep = self.data.structure.timestep_info[-1]
+        self.aero_tstep = self.data.aero.timestep_info[-1]
+
+        rng = np.random.default_rng(0)
+        for forces in self.aero_tstep.forces:
+            forces[:] = rng.standard_normal(forces.shape)
+
+        self.mapping_index = None
+        if precomputed_index:
+            self.mapping_index = mapping.ForceMappingIndex(self.data.aero.struct2aero_mapping,
+                                                           self.data.structure.connectivities,
+                                                           self.data.structure.num_node)
+
+    def run(self):
+        mapping.aero2struct_force_mapping(self.aero_tstep.forces,
+                                          self.data.aero.struct2aero_mapping,
+                                          self.aero_tstep.zeta,
+                                          self.struct_tstep.pos,
+                                          self.struct_tstep.psi,
+                                          None,
+                                          self.data.structure.connectivities,
+                                          self.struct_tstep.cag(),
+                                          mapping_index=self.mapping_index)
+
+
+@benchmark
+class GenerateZeta(BaseBenchmark):
+    """
+    Generation of the bound lattice from the structural time step with
+    :meth:`~sharpy.aero.models.aerogrid.Aerogrid.generate_zeta_timestep_info`.
+    """
+    benchmark_id = 'GenerateZeta'
+    params = {'m': [4, 16],
+              'n_elem_multiplier': [2, 8]}
+    number = 10
+
+    def setup(self, m, n_elem_multiplier):
+        self.data = models.load_hale(m, n_elem_multiplier, mstar=1)
+        self.struct_tstep = self.data.structure.timestep_info[-1]
+        self.aero_tstep = self.data.aero.timestep_info[-1]
+        self.dt = float(self.data.settings['DynamicCoupled']['dt'])
+
+    def run(self):
+        self.data.aero.generate_zeta_timestep_info(self.struct_tstep,
+                                                   self.aero_tstep,
+                                                   self.data.structure,
+                                                   self.data.aero.aero_settings,
+                                                   dt=self.dt)
+
+
+@benchmark
+class AICs(BaseBenchmark):
+    """
+    Assembly of the aerodynamic influence coefficient matrices at the collocation points with
+    :func:`~sharpy.linear.src.assembly.AICs`.
+    """
+    benchmark_id = 'AICs'
+    params = {'m': [4, 8],
+              'n_elem_multiplier': [1, 2],
+              'mstar': [10, 40],
+              'num_workers': [1, 4]}
+    repeat = 3
+
+    def setup(self, m, n_elem_multiplier, mstar, num_workers):
+        self.num_workers = num_workers
+
+        data = models.load_hale(m, n_elem_multiplier, mstar)
+        aero_tstep = data.aero.timestep_info[-1]
+        aero_tstep.rho = 1.225
+        self.multisurfaces = multisurfaces.MultiAeroGridSurfaces(aero_tstep, 1e-6)
+
+    def run(self):
+        assembly.AICs(self.multisurfaces.Surfs,
+                      self.multisurfaces.Surfs_star,
+                      target='collocation',
+                      Project=True,
+                      num_workers=self.num_workers)
@@ -0,0 +1,49 @@
+"""Short time-domain simulations"""
+import sharpy.sharpy_main
+from benchmarks.benchmark_interface import benchmark, BaseBenchmark, profiler_times
+import benchmarks.models as models
+
+
+@benchmark
+class HaleDynamicCoupled(BaseBenchmark):
+    """
+    Short ``DynamicCoupled`` simulation of the simple HALE case of ``sharpy/cases/coupled/simple_HALE`` in free
+    flight, from the ``StaticCoupled`` equilibrium. The time of the whole ``flow`` is stored with the profile of
+    ``DynamicCoupled`` (see :mod:`sharpy.utils.profiling`).
+    """
+    benchmark_id = 'HaleDynamicCoupled'
+    params = {'m': [4, 8],
+              'n_elem_multiplier': [1, 2],
+              'mstar': [20]}
+    repeat = 1
+    n_time_steps = 10
+
+    def setup(self, m, n_elem_multiplier, mstar):
+        self.case_file = models.hale_case(m, n_elem_multiplier, mstar,
+                                          n_time_steps=self.n_time_steps,
+                                          flow=['BeamLoader', 'AerogridLoader', 'StaticCoupled', 'DynamicCoupled'],
+                                          profiler=True)
+
+    def run(self):
+        sharpy.sharpy_main.main(['', self.case_file])
+        return profiler_times('DynamicCoupled.run')
+
+
+@benchmark
+class MultibodyChain(BaseBenchmark):
+    """
+    Short ``DynamicCoupled`` simulation of a chain of ``num_bodies`` hinged flexible pendula with the
+    ``NonLinearDynamicMultibody`` solver. The time of the whole ``flow`` is stored with the profile of
+    ``DynamicCoupled`` (see :mod:`sharpy.utils.profiling`).
+    """
+    benchmark_id = 'MultibodyChain'
+    params = {'num_bodies': [2, 4, 8]}
+    repeat = 1
+    n_time_steps = 10
+
+    def setup(self, num_bodies):
+        self.case_file = models.pendulum_chain(num_bodies, n_time_steps=self.n_time_steps, profiler=True)
+
+    def run(self):
+        sharpy.sharpy_main.main(['', self.case_file])
+        return profiler_times('DynamicCoupled.run')
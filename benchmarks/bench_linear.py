@@ -0,0 +1,69 @@
+"""Linear system and reduced order model kernels"""
+import numpy as np
+
+import sharpy.linear.src.libss as libss
+import sharpy.rom.utils.librom as librom
+import sharpy.rom.krylov as krylov
+from benchmarks.benchmark_interface import benchmark, BaseBenchmark
+import benchmarks.models as models
+
+
+@benchmark
+class FrequencyResponse(BaseBenchmark):
+    """
+    Frequency response of a discrete-time system with :func:`~sharpy.linear.src.libss.freqresp`.
+    """
+    benchmark_id = 'FrequencyResponse'
+    params = {'n_states': [100, 400],
+              'n_freq': [50, 200],
+              'method': ['direct', 'schur']}
+    repeat = 3
+
+    def setup(self, n_states, n_freq, method):
+        self.ss = models.state_space(n_states)
+        self.wv = np.linspace(0.01, np.pi/self.ss.dt, n_freq)
+        self.method = method
+
+    def run(self):
+        libss.freqresp(self.ss, self.wv, method=self.method)
+
+
+@benchmark
+class BalancedRealisation(BaseBenchmark):
+    """
+    Low rank balanced realisation of a discrete-time system with :func:`~sharpy.rom.utils.librom.balreal_iter`.
+    """
+    benchmark_id = 'BalancedRealisation'
+    params = {'n_states': [100, 400]}
+    repeat = 3
+
+    def setup(self, n_states):
+        self.ss = models.state_space(n_states)
+
+    def run(self):
+        librom.balreal_iter(self.ss.A, self.ss.B, self.ss.C, lowrank=True)
+
+
+@benchmark
+class Krylov(BaseBenchmark):
+    """
+    Krylov reduced order model of a discrete-time system with :meth:`~sharpy.rom.krylov.Krylov.run`.
+    """
+    benchmark_id = 'Krylov'
+    params = {'n_states': [200, 800],
+              'algorithm': ['one_sided_arnoldi', 'dual_rational_arnoldi']}
+    repeat = 3
+
+    def setup(self, n_states, algorithm):
+        # single input single output, as required by the one sided Arnoldi algorithm
+        self.ss = models.state_space(n_states, n_inputs=1, n_outputs=1)
+        # for higher orders about a single point W^T V is ill-conditioned in the dual algorithm for these models
+        self.settings = {'algorithm': algorithm,
+                         'r': 8,
+                         'frequency': np.array([1.0j]),
+                         'print_info': False}
+
+    def run(self):
+        rom = krylov.Krylov()
+        rom.initialise(self.settings.copy())
+        rom.run(self.ss)
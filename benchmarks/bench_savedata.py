@@ -0,0 +1,56 @@
+"""Output of the simulation results"""
+from sharpy.postproc.savedata import SaveData
+from benchmarks.benchmark_interface import benchmark, BaseBenchmark
+import benchmarks.models as models
+
+
+@benchmark
+class SaveDataOnline(BaseBenchmark):
+    """
+    Online writes of :class:`~sharpy.postproc.savedata.SaveData` for ``n_time_steps`` time steps of the simple HALE
+    case, as called by ``DynamicCoupled``. The ``mode`` is the layout of the time steps in the file:
+
+        * ``timestep_info``: a group per time step
+
+        * ``time_series``: extendable datasets, written in the simulation thread
+
+        * ``time_series_background``: extendable datasets, written in a background thread
+    """
+    benchmark_id = 'SaveDataOnline'
+    params = {'m': [4, 16],
+              'n_elem_multiplier': [2, 8],
+              'mode': ['timestep_info', 'time_series', 'time_series_background']}
+    repeat = 3
+    n_time_steps = 20
+
+    def setup(self, m, n_elem_multiplier, mode):
+        self.data = models.load_hale(m, n_elem_multiplier, mstar=20)
+        self.settings = {'save_aero': True,
+                         'save_struct': True,
+                         'time_series': mode != 'timestep_info',
+                         'background_writer': mode == 'time_series_background'}
+
+        # the time steps are copied beforehand, such that only the writes are timed
+        self.struct_tstep = self.data.structure.timestep_info[0]
+        self.aero_tstep = self.data.aero.timestep_info[0]
+        self.struct_steps = [self.struct_tstep.copy() for it in range(self.n_time_steps)]
+        self.aero_steps = [self.aero_tstep.copy() for it in range(self.n_time_steps)]
+        self.savedata = None
+
+    def run(self):
+        self.data.ts = 0
+        self.data.structure.timestep_info = [self.struct_tstep]
+        self.data.aero.timestep_info = [self.aero_tstep]
+
+        self.savedata = SaveData()
+        self.savedata.initialise(self.data, self.settings.copy())
+        for it in range(self.n_time_steps):
+            self.data.structure.timestep_info.append(self.struct_steps[it])
+            self.data.aero.timestep_info.append(self.aero_steps[it])
+            self.data.ts += 1
+            self.savedata.run(online=True)
+        self.savedata.shutdown()
+
+    def teardown(self):
+        if self.savedata is not None:
+            self.savedata.shutdown()
@@ -0,0 +1,76 @@
+import itertools
+
+import sharpy.utils.profiling as profiling
+
+dict_of_benchmarks = {}
+
+
+# decorator
+def benchmark(arg):
+    global dict_of_benchmarks
+    try:
+        arg.benchmark_id
+    except AttributeError:
+        raise AttributeError('Class defined as benchmark has no benchmark_id attribute')
+    dict_of_benchmarks[arg.benchmark_id] = arg
+    return arg
+
+
+class BaseBenchmark(object):
+    """
+    Base class of the benchmarks.
+
+    A benchmark is run for every combination of the values in ``params``. For each of them, :meth:`setup` is called
+    once with the parameters as keyword arguments (not timed) and :meth:`run` is then timed ``repeat`` times. The
+    time of each repetition is the average of ``number`` consecutive calls.
+
+    :meth:`run` may return a ``dict`` of additional timings (i.e. the profile of a simulation), which are stored
+    in the history with the total time of the call.
+
+    Attributes:
+        benchmark_id (str): Name of the benchmark in the history
+        params (dict): Values of each parameter. The first one of each list is used in ``--quick`` runs
+        number (int): Number of calls of :meth:`run` per repetition
+        repeat (int): Number of timed repetitions
+    """
+    benchmark_id = None
+    params = dict()
+    number = 1
+    repeat = 5
+
+    def setup(self, **params):
+        pass
+
+    def run(self):
+        raise NotImplementedError
+
+    def teardown(self):
+        pass
+
+    @classmethod
+    def param_combinations(cls, quick=False):
+        """
+        Returns the list of ``dict`` with the parameters of each case.
+        """
+        names = sorted(cls.params.keys())
+        if quick:
+            values = [cls.params[name][:1] for name in names]
+        else:
+            values = [cls.params[name] for name in names]
+        return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def profiler_times(root):
+    """
+    Returns the times recorded by the SHARPy profiler in the last run under the timer ``root``, with the names of
+    the nested timers separated by ``;``.
+    """
+    return {';'.join(path): value for path, value in profiling.profiler.times.items() if path[0] == root}
+
+
+def benchmark_list(pattern=None):
+    """
+    Returns the registered benchmarks whose ``benchmark_id`` contains ``pattern``, sorted by name.
+    """
+    return [dict_of_benchmarks[name] for name in sorted(dict_of_benchmarks.keys())
+            if pattern is None or pattern in name]
@@ -0,0 +1,217 @@
+"""Benchmark history
+
+The results are appended to a JSON lines file, with a record per benchmark case and run::
+
+    {"benchmark": "AICs", "params": {"m": 4, "mstar": 10, "n_elem_multiplier": 1, "num_workers": 1},
+     "date": "2021-06-01T12:00:00", "commit": "0f3c...", "dirty": false,
+     "machine": {"node": "...", "cpu_count": 8, "python": "3.7.10", "numpy": "1.19.2", ...},
+     "number": 1, "repeat": 3, "times": [0.41, 0.40, 0.40], "min": 0.40, "median": 0.40, "regression": false,
+     "profile": {"DynamicCoupled.run;aero_solve": 1.2, ...}}
+
+``times`` are in seconds per call and ``profile`` is only present for the benchmarks that return the timings of
+their stages. A case is identified by the benchmark name and its parameters.
+
+Cases that fail are recorded with an ``error`` instead of their times, and cases slower than their reference are
+recorded with ``"regression": true``. Neither is used as a reference unless the regression is accepted
+(``--accept``), so a slowdown is reported until it is fixed or accepted. The reference of a case is the record with
+the median time of its last ``--last`` valid records on the same machine, which filters out the noise of single runs
+and catches gradual slowdowns, or the latest valid record of a pinned ``--baseline`` commit.
+"""
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+
+import numpy as np
+import scipy
+
+import sharpy.utils.cout_utils as cout
+import sharpy.utils.sharpydir as sharpydir
+
+history_folder = sharpydir.SharpyDir + '/benchmarks/history/'
+
+
+def default_filename():
+    """
+    Returns the default history file of this machine, ``benchmarks/history/<node>.jsonl``, since timings are only
+    comparable on the same machine.
+    """
+    return history_folder + re.sub(r'[^\w.-]', '_', platform.node() or 'unknown') + '.jsonl'
+
+
+def machine_info():
+    return {'node': platform.node(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__}
+
+
+def git_info():
+    """
+    Returns the commit hash of the SHARPy repository and whether it has uncommitted changes, or ``None`` if they
+    cannot be obtained.
+    """
+    try:
+        commit = cout.get_git_revision_hash()
+        status = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                         cwd=sharpydir.SharpyDir)
+    except (subprocess.CalledProcessError, OSError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def new_record(benchmark_id, params, times, number, profile=None, commit=None, dirty=None, machine=None,
+               error=None):
+    """
+    Creates the record of a benchmark case.
+
+    Args:
+        benchmark_id (str): Name of the benchmark
+        params (dict): Parameters of the case
+        times (list): Time per call of each repetition
+        number (int): Calls per repetition
+        profile (dict): Timings of the stages of the benchmark
+        commit (str): Commit hash of the repository
+        dirty (bool): The repository has uncommitted changes
+        machine (dict): Description of the machine. Obtained with :func:`machine_info` if not given
+        error (str): Error raised by the case, if it failed. The record has no times then
+
+    Returns:
+        dict: Record
+    """
+    record = {'benchmark': benchmark_id,
+              'params': params,
+              'date': datetime.datetime.now().isoformat(timespec='seconds'),
+              'commit': commit,
+              'dirty': dirty,
+              'machine': machine_info() if machine is None else machine,
+              'number': number}
+    if error is not None:
+        record['error'] = error
+        return record
+    record.update({'repeat': len(times),
+                   'times': list(times),
+                   'min': float(np.min(times)),
+                   'median': float(np.median(times)),
+                   'regression': False})
+    if profile:
+        record['profile'] = profile
+    return record
+
+
+def is_valid(record):
+    """
+    Whether ``record`` can be used as a reference, i.e. the case did not fail and it is not a regression.
+    """
+    return 'error' not in record and not record.get('regression', False)
+
+
+def case_key(record):
+    return record['benchmark'], json.dumps(record['params'], sort_keys=True)
+
+
+def load(filename):
+    """
+    Returns the list of records in the history file ``filename`` (empty if it does not exist).
+    """
+    records = []
+    if not os.path.isfile(filename):
+        return records
+    with open(filename) as infile:
+        for line in infile:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def append(filename, records):
+    """
+    Appends ``records`` to the history file ``filename``.
+    """
+    folder = os.path.dirname(filename)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(filename, 'a') as outfile:
+        for record in records:
+            outfile.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+def latest(records, node=None, last=1, commit=None):
+    """
+    Returns the latest valid records (see :func:`is_valid`) of each case run on the machine ``node``.
+
+    Args:
+        records (list): Records in chronological order, as loaded by :func:`load`
+        node (str): Name of the machine. All machines if ``None``
+        last (int): Maximum number of records of each case
+        commit (str): Only the records of the commits whose hash starts with ``commit``, if given
+
+    Returns:
+        dict: List of the ``last`` records of each case, oldest first, by :func:`case_key`
+    """
+    cases = dict()
+    for record in records:
+        if not is_valid(record):
+            continue
+        if node is not None and record['machine']['node'] != node:
+            continue
+        if commit is not None and not (record['commit'] or '').startswith(commit):
+            continue
+        cases.setdefault(case_key(record), []).append(record)
+    return {key: case_records[-last:] for key, case_records in cases.items()}
+
+
+def references(records, node=None, last=5, statistic='min', baseline=None):
+    """
+    Returns the reference record of each case run on the machine ``node``.
+
+    The reference is the record with the median ``statistic`` of the ``last`` latest valid records of the case (the
+    lower one for an even number of records), or the latest valid record of the ``baseline`` commit if given.
+
+    Args:
+        records (list): Records in chronological order, as loaded by :func:`load`
+        node (str): Name of the machine. All machines if ``None``
+        last (int): Number of records considered
+        statistic (str): Time compared (``min`` or ``median``)
+        baseline (str): Hash, or its beginning, of the commit used as reference
+
+    Returns:
+        dict: Reference records by :func:`case_key`
+    """
+    if baseline is not None:
+        return {key: case_records[-1] for key, case_records in latest(records, node=node, commit=baseline).items()}
+
+    case_references = dict()
+    for key, case_records in latest(records, node=node, last=last).items():
+        case_records = sorted(case_records, key=lambda record: record[statistic])
+        case_references[key] = case_records[(len(case_records) - 1)//2]
+    return case_references
+
+
+def compare(record, reference, tolerance=0.1, statistic='min'):
+    """
+    Compares a record with a reference record of the same case.
+
+    Args:
+        record (dict): New record
+        reference (dict): Reference record
+        tolerance (float): Relative increase of the time considered a regression
+        statistic (str): Time compared (``min`` or ``median``)
+
+    Returns:
+        tuple: Ratio of the new to the reference time, whether it is a regression, and dictionary of the ratios of the
+        stages of the ``profile`` that are regressions.
+    """
+    ratio = record[statistic]/reference[statistic]
+    profile = record.get('profile', dict())
+    reference_profile = reference.get('profile', dict())
+    profile_regressions = dict()
+    for name, value in profile.items():
+        if reference_profile.get(name, 0.) > 0. and value/reference_profile[name] > 1. + tolerance:
+            profile_regressions[name] = value/reference_profile[name]
+    return ratio, ratio > 1. + tolerance, profile_regressions
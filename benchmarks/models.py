@@ -0,0 +1,295 @@
+"""Benchmark models
+
+Generation of the models used by the benchmarks, with parameterised sizes:
+
+    * The simple HALE case of ``sharpy/cases/coupled/simple_HALE``, generated with its own script in a temporary
+      folder, with the chordwise panels ``m``, the spanwise discretisation ``n_elem_multiplier`` (the spanwise panels
+      are those of the beam elements) and the wake length ``mstar``.
+
+    * A chain of ``num_bodies`` flexible pendula connected by hinges, solved with the multibody solver.
+
+    * Stable discrete-time state-space systems of ``n_states`` states.
+
+The input files are written to a temporary folder removed by :func:`cleanup`.
+"""
+import os
+import re
+import runpy
+import shutil
+import tempfile
+
+import configobj
+import numpy as np
+
+import sharpy.utils.sharpydir as sharpydir
+
+hale_case_name = 'simple_HALE'
+hale_script = sharpydir.SharpyDir + '/sharpy/cases/coupled/simple_HALE/generate_hale.py'
+
+_work_folder = None
+_hale_folders = dict()
+
+
+def work_folder():
+    """
+    Returns the temporary folder where the benchmark cases are written.
+    """
+    global _work_folder
+    if _work_folder is None:
+        _work_folder = tempfile.mkdtemp(prefix='sharpy_benchmarks_')
+    return _work_folder + '/'
+
+
+def cleanup():
+    """
+    Removes the temporary folder of the benchmark cases.
+    """
+    global _work_folder
+    if _work_folder is not None:
+        shutil.rmtree(_work_folder, ignore_errors=True)
+    _work_folder = None
+    _hale_folders.clear()
+
+
+def _set_variable(source, name, value):
+    source, n_subs = re.subn(r'^%s = .*$' % name, '%s = %s' % (name, repr(value)), source, flags=re.MULTILINE)
+    if n_subs != 1:
+        raise ValueError('Variable %s not found in %s' % (name, hale_script))
+    return source
+
+
+def _hale_folder(m, n_elem_multiplier, n_time_steps):
+    key = (m, n_elem_multiplier, n_time_steps)
+    try:
+        return _hale_folders[key]
+    except KeyError:
+        pass
+
+    folder = work_folder() + 'hale_m%d_n%d_ts%d/' % key
+    os.makedirs(folder)
+    with open(hale_script) as script:
+        source = script.read()
+    source = _set_variable(source, 'm', m)
+    source = _set_variable(source, 'n_elem_multiplier', n_elem_multiplier)
+    source = _set_variable(source, 'n_tstep', n_time_steps)
+    with open(folder + 'generate_hale.py', 'w') as script:
+        script.write(source)
+    runpy.run_path(folder + 'generate_hale.py', run_name='generate_hale')
+
+    _hale_folders[key] = folder
+    return folder
+
+
+def hale_case(m=4, n_elem_multiplier=2, mstar=20, n_time_steps=1, flow=('BeamLoader', 'AerogridLoader'),
+              postprocessors=(), postprocessors_settings=None, profiler=False):
+    """
+    Writes the simple HALE case with the given discretisation.
+
+    Args:
+        m (int): Chordwise panels
+        n_elem_multiplier (int): Multiplier of the number of beam elements (and spanwise panels)
+        mstar (int): Chordwise wake panels
+        n_time_steps (int): Time steps of the dynamic simulation
+        flow (list): SHARPy ``flow``
+        postprocessors (list): Postprocessors of ``DynamicCoupled``
+        postprocessors_settings (dict): Settings of the postprocessors of ``DynamicCoupled``
+        profiler (bool): Enable the SHARPy profiler
+
+    Returns:
+        str: ``.sharpy`` file of the case
+    """
+    folder = _hale_folder(m, n_elem_multiplier, n_time_steps)
+
+    config = configobj.ConfigObj(folder + hale_case_name + '.sharpy')
+    config['SHARPy']['flow'] = list(flow)
+    config['SHARPy']['write_screen'] = 'off'
+    config['SHARPy']['write_log'] = 'off'
+    config['SHARPy']['log_folder'] = folder + 'output/'
+    config['SHARPy']['profiler'] = profiler
+    config['AerogridLoader']['mstar'] = mstar
+    config['DynamicCoupled']['postprocessors'] = list(postprocessors)
+    config['DynamicCoupled']['postprocessors_settings'] = dict() if postprocessors_settings is None \
+        else postprocessors_settings
+
+    config.filename = folder + '%s_mstar%d.sharpy' % (hale_case_name, mstar)
+    config.write()
+    return config.filename
+
+
+def load_hale(m=4, n_elem_multiplier=2, mstar=20):
+    """
+    Loads the structure and aerodynamic grid of the simple HALE case.
+
+    Returns:
+        sharpy.presharpy.presharpy.PreSharpy: Data of the case after ``BeamLoader`` and ``AerogridLoader``
+    """
+    import sharpy.sharpy_main
+
+    return sharpy.sharpy_main.main(['', hale_case(m, n_elem_multiplier, mstar)])
+
+
+def pendulum_chain(num_bodies, num_node_body=11, n_time_steps=5, dt=0.01, profiler=False):
+    """
+    Writes a chain of ``num_bodies`` flexible pendula connected by hinges, as the double pendulum of
+    ``tests/coupled/multibody/double_pendulum``, solved with ``NonLinearDynamicMultibody``.
+
+    Args:
+        num_bodies (int): Number of bodies
+        num_node_body (int): Number of nodes of each body
+        n_time_steps (int): Time steps of the simulation
+        dt (float): Time step
+        profiler (bool): Enable the SHARPy profiler
+
+    Returns:
+        str: ``.sharpy`` file of the case
+    """
+    import sharpy.utils.generate_cases as gc
+
+    case_name = 'chain_%d' % num_bodies
+    route = work_folder() + case_name + '/'
+    if not os.path.isdir(route):
+        os.makedirs(route)
+
+    airfoil = np.zeros((1, 20, 2),)
+    airfoil[0, :, 0] = np.linspace(0., 1., 20)
+    length = 1.
+
+    beams = []
+    bodies = []
+    for i_body in range(num_bodies):
+        beam = gc.AeroelasticInformation()
+        node_pos = np.zeros((num_node_body, 3),)
+        node_pos[:, 0] = np.linspace(i_body*length, (i_body + 1)*length, num_node_body)
+        beam.StructuralInformation.generate_uniform_sym_beam(node_pos, 1., 1e-4, 1e9, 1e9, 1e9, 1e9,
+                                                             num_node_elem=3, y_BFoR='y_AFoR', num_lumped_mass=1)
+        beam.StructuralInformation.body_number = np.zeros((beam.StructuralInformation.num_elem,), dtype=int)
+        beam.StructuralInformation.boundary_conditions[0] = 1
+        beam.StructuralInformation.boundary_conditions[-1] = -1
+        beam.StructuralInformation.lumped_mass_nodes = np.array([num_node_body - 1], dtype=int)
+        beam.StructuralInformation.lumped_mass = np.ones((1,))
+        beam.StructuralInformation.lumped_mass_inertia = np.zeros((1, 3, 3))
+        beam.StructuralInformation.lumped_mass_position = np.zeros((1, 3))
+        beam.AerodynamicInformation.create_one_uniform_aerodynamics(beam.StructuralInformation,
+                                                                    chord=1.,
+                                                                    twist=0.,
+                                                                    sweep=0.,
+                                                                    num_chord_panels=4,
+                                                                    m_distribution='uniform',
+                                                                    elastic_axis=0.25,
+                                                                    num_points_camber=20,
+                                                                    airfoil=airfoil)
+        beams.append(beam)
+
+        body = gc.BodyInformation()
+        body.body_number = i_body
+        body.FoR_position = np.array([node_pos[0, 0], node_pos[0, 1], node_pos[0, 2], 0., 0., 0.])
+        body.FoR_velocity = np.zeros((6,),)
+        body.FoR_acceleration = np.zeros((6,),)
+        body.FoR_movement = 'free'
+        body.quat = np.array([1., 0., 0., 0.])
+        bodies.append(body)
+
+    lagrange_constraints = []
+    hinge = gc.LagrangeConstraint()
+    hinge.behaviour = 'hinge_FoR'
+    hinge.body_FoR = 0
+    hinge.rot_axis_AFoR = np.array([0., 1., 0.])
+    hinge.scalingFactor = 1e6
+    hinge.penaltyFactor = 0.
+    lagrange_constraints.append(hinge)
+    for i_body in range(1, num_bodies):
+        hinge = gc.LagrangeConstraint()
+        hinge.behaviour = 'hinge_node_FoR'
+        hinge.node_in_body = num_node_body - 1
+        hinge.body = i_body - 1
+        hinge.body_FoR = i_body
+        hinge.rot_axisB = np.array([0., 1., 0.])
+        hinge.scalingFactor = 1e6
+        hinge.penaltyFactor = 0.
+        lagrange_constraints.append(hinge)
+
+    beam = beams[0]
+    beam.assembly(*beams[1:])
+
+    SimInfo = gc.SimulationInformation()
+    SimInfo.set_default_values()
+    SimInfo.define_uinf(np.array([0.0, 1.0, 0.0]), 1.)
+    SimInfo.solvers['SHARPy']['flow'] = ['BeamLoader', 'AerogridLoader', 'DynamicCoupled']
+    SimInfo.solvers['SHARPy']['case'] = case_name
+    SimInfo.solvers['SHARPy']['route'] = route
+    SimInfo.solvers['SHARPy']['write_screen'] = 'off'
+    SimInfo.solvers['SHARPy']['write_log'] = 'off'
+    SimInfo.solvers['SHARPy']['log_folder'] = route + 'output/'
+    SimInfo.solvers['SHARPy']['profiler'] = profiler
+    SimInfo.set_variable_all_dicts('dt', dt)
+    SimInfo.define_num_steps(n_time_steps)
+    SimInfo.set_variable_all_dicts('rho', 0.0)
+    SimInfo.set_variable_all_dicts('velocity_field_input', SimInfo.solvers['SteadyVelocityField'])
+    SimInfo.set_variable_all_dicts('output', route + 'output/')
+
+    SimInfo.solvers['BeamLoader']['unsteady'] = 'on'
+    SimInfo.solvers['AerogridLoader']['unsteady'] = 'on'
+    SimInfo.solvers['AerogridLoader']['mstar'] = 2
+    SimInfo.solvers['AerogridLoader']['wake_shape_generator'] = 'StraightWake'
+    SimInfo.solvers['AerogridLoader']['wake_shape_generator_input'] = {'u_inf': 1.,
+                                                                       'u_inf_direction': np.array([0., 1., 0.]),
+                                                                       'dt': dt}
+
+    SimInfo.solvers['NonLinearDynamicMultibody']['gravity_on'] = True
+    SimInfo.solvers['NonLinearDynamicMultibody']['time_integrator'] = 'NewmarkBeta'
+    SimInfo.solvers['NonLinearDynamicMultibody']['time_integrator_settings'] = {'newmark_damp': 0.15,
+                                                                                'dt': dt}
+
+    SimInfo.solvers['DynamicCoupled']['structural_solver'] = 'NonLinearDynamicMultibody'
+    SimInfo.solvers['DynamicCoupled']['structural_solver_settings'] = SimInfo.solvers['NonLinearDynamicMultibody']
+    SimInfo.solvers['DynamicCoupled']['aero_solver'] = 'StepUvlm'
+    SimInfo.solvers['DynamicCoupled']['aero_solver_settings'] = SimInfo.solvers['StepUvlm']
+    SimInfo.solvers['DynamicCoupled']['postprocessors'] = []
+    SimInfo.solvers['DynamicCoupled']['postprocessors_settings'] = dict()
+
+    SimInfo.with_forced_vel = False
+    SimInfo.with_dynamic_forces = False
+
+    gc.clean_test_files(route, case_name)
+    SimInfo.generate_solver_file()
+    SimInfo.generate_dyn_file(n_time_steps)
+    beam.generate_h5_files(route, case_name)
+    gc.generate_multibody_file(lagrange_constraints, bodies, route, case_name)
+
+    return route + case_name + '.sharpy'
+
+
+def state_space(n_states, n_inputs=4, n_outputs=4, dt=0.1, seed=0):
+    """
+    Stable discrete-time state-space system with lightly damped oscillatory modes and a dense state matrix,
+    representative of the linearised aeroelastic systems.
+
+    Args:
+        n_states (int): Number of states (even)
+        n_inputs (int): Number of inputs
+        n_outputs (int): Number of outputs
+        dt (float): Time step
+        seed (int): Seed of the random generator, such that the system is the same in every run
+
+    Returns:
+        sharpy.linear.src.libss.StateSpace: State-space system
+    """
+    import sharpy.linear.src.libss as libss
+
+    rng = np.random.default_rng(seed)
+    n_modes = n_states // 2
+    radius = rng.uniform(0.8, 0.99, n_modes)
+    angle = rng.uniform(0.01, 0.5*np.pi, n_modes)
+
+    A = np.zeros((2*n_modes, 2*n_modes))
+    for i_mode in range(n_modes):
+        A[2*i_mode:2*i_mode + 2, 2*i_mode:2*i_mode + 2] = radius[i_mode]*np.array(
+            [[np.cos(angle[i_mode]), -np.sin(angle[i_mode])],
+             [np.sin(angle[i_mode]), np.cos(angle[i_mode])]])
+    Q = np.linalg.qr(rng.standard_normal((2*n_modes, 2*n_modes)))[0]
+    A = Q.dot(A.dot(Q.T))
+    B = rng.standard_normal((2*n_modes, n_inputs))
+    C = rng.standard_normal((n_outputs, 2*n_modes))
+    D = np.zeros((n_outputs, n_inputs))
+
+    return libss.StateSpace(A, B, C, D, dt=dt)
@@ -49,6 +49,8 @@ class Aerogrid(object):
         self.polars = None
         self.wake_shape_generator = None
 
+        self.strip_tables = None
+
     def generate(self, aero_dict, beam, aero_settings, ts):
         self.aero_dict = aero_dict
         self.beam = beam
@@ -76,7 +78,8 @@ class Aerogrid(object):
 
         # allocating initial grid storage
         self.ini_info = AeroTimeStepInfo(self.aero_dimensions,
-                                         self.aero_dimensions_star)
+                                         self.aero_dimensions_star,
+                                         packed=aero_settings.get('packed_storage', False))
 
         # load airfoils db
         # for i_node in range(self.n_node):
@@ -137,6 +140,7 @@ class Aerogrid(object):
 
         self.add_timestep()
         self.generate_mapping()
+        self.generate_strip_tables()
         self.generate_zeta(self.beam, self.aero_settings, ts)
 
         if 'polars' in aero_dict:
@@ -201,6 +205,106 @@ class Aerogrid(object):
             self.timestep_info.append(self.ini_info.copy())
 
     def generate_zeta_timestep_info(self, structure_tstep, aero_tstep, beam, aero_settings, it=None, dt=None):
+        """
+        Generates the bound lattice ``zeta`` and its velocity ``zeta_dot`` for the given structural time step.
+
+        For uniform chordwise distributions, the strips of each surface are transformed at once using the tables
+        precomputed in :meth:`generate_strip_tables`. Other distributions are generated strip by strip with
+        :func:`generate_strip`.
+        """
+        if it is None:
+            it = len(beam.timestep_info) - 1
+
+        self.add_default_geometry()
+        if self.aero_dict['m_distribution'].decode('ascii') != 'uniform':
+            self.generate_zeta_timestep_info_strips(structure_tstep, aero_tstep, beam, aero_settings, it, dt)
+            return
+
+        if getattr(self, 'strip_tables', None) is None:
+            self.generate_strip_tables()
+
+        control_surface_info = self.get_control_surface_info(aero_tstep, it, dt)
+        orientation_in = np.array(aero_settings['freestream_dir'], dtype=float)
+        cga = structure_tstep.cga()
+
+        for i_surf in range(self.n_surf):
+            tables = self.strip_tables[i_surf]
+            m = self.aero_dimensions[i_surf, 0]
+            i_elem = tables['elem']
+            i_local_node = tables['local_node']
+            i_node = tables['node']
+
+            strip_coords = tables['airfoil_coords'].copy()
+            cs_velocity = np.zeros_like(strip_coords)
+
+            # control surface deflection
+            for i_cs in np.unique(tables['control_surface']):
+                if i_cs < 0:
+                    continue
+                info = control_surface_info[i_cs]
+                cs_strips = tables['control_surface'] == i_cs
+                i_hinge = m - info['chord']
+                if info['hinge_coords'] is not None and i_hinge == 0:
+                    hinge_coords = (np.zeros((3,)) + info['hinge_coords'])[None, :, None]
+                else:
+                    hinge_coords = strip_coords[cs_strips, :, i_hinge][:, :, None]
+
+                relative_coords = np.einsum('ij,njm->nim',
+                                            algebra.rotation3d_x(-info['deflection']),
+                                            strip_coords[cs_strips, :, i_hinge:] - hinge_coords)
+                if 'deflection_dot' in info:
+                    cs_velocity[cs_strips, :, i_hinge:] = np.cross(np.array([-info['deflection_dot'], 0.0, 0.0]),
+                                                                   relative_coords,
+                                                                   axisb=1, axisc=1)
+                strip_coords[cs_strips, :, i_hinge:] = relative_coords + hinge_coords
+
+            # chord scaling
+            strip_coords *= tables['chord'][:, None, None]
+
+            # Cab transformation and in-plane rotation to the free stream
+            psi = structure_tstep.psi[i_elem, i_local_node, :]
+            cab = algebra.crv2rotation_vec(psi)
+            y_b = cab[:, :, 1]
+            cross_y = np.cross(orientation_in, y_b)
+            rot_angle = np.arctan2(np.linalg.norm(cross_y, axis=1), y_b.dot(orientation_in))
+            rot_angle[np.einsum('ni,ni->n', cab[:, :, 2], cross_y) < 0] *= -1
+            rot_angle[y_b.dot(orientation_in) < 0] += -2*np.pi
+            crot = np.zeros_like(cab)
+            crot[:, 0, 0] = np.cos(-rot_angle)
+            crot[:, 0, 1] = -np.sin(-rot_angle)
+            crot[:, 1, 0] = np.sin(-rot_angle)
+            crot[:, 1, 1] = np.cos(-rot_angle)
+            crot[:, 2, 2] = 1.0
+
+            # transformation from beam to beam prime (with sweep and twist)
+            if self.aero_dict['first_twist'][i_surf]:
+                transformation = np.matmul(tables['sweep'], np.matmul(crot, tables['twist']))
+            else:
+                transformation = np.matmul(tables['twist'], np.matmul(crot, tables['sweep']))
+            strip_coords = np.matmul(np.matmul(cab, transformation), strip_coords)
+            cs_velocity = np.matmul(cab, cs_velocity)
+
+            # zeta_dot
+            omega_a = np.einsum('nji,nj->ni',
+                                algebra.crv2tan_vec(psi),
+                                structure_tstep.psi_dot[i_elem, i_local_node, :])
+            zeta_dot = (structure_tstep.pos_dot[i_node, :, None]
+                        + np.cross(omega_a[:, :, None], strip_coords, axisa=1, axisb=1, axisc=1)
+                        + cs_velocity)
+
+            # add node coords and quarter-chord disp
+            strip_coords += structure_tstep.pos[i_node, :, None]
+            strip_coords += 0.25*(strip_coords[:, :, -1:] - strip_coords[:, :, :1])/m
+
+            # rotation from a to g
+            aero_tstep.zeta[i_surf][:] = np.einsum('ij,njm->imn', cga, strip_coords)
+            aero_tstep.zeta_dot[i_surf][:] = np.einsum('ij,njm->imn', cga, zeta_dot)
+
+    def generate_zeta_timestep_info_strips(self, structure_tstep, aero_tstep, beam, aero_settings, it=None, dt=None):
+        """
+        Strip by strip version of :meth:`generate_zeta_timestep_info`, required for non-uniform chordwise
+        distributions.
+        """
         if it is None:
             it = len(beam.timestep_info) - 1
         global_node_in_surface = []
@@ -211,19 +315,12 @@ class Aerogrid(object):
         try:
             self.aero_dict['control_surface']
             with_control_surfaces = True
+            control_surface_info = self.get_control_surface_info(aero_tstep, it, dt)
         except KeyError:
             with_control_surfaces = False
 
-        # check that we have sweep information
-        try:
-            self.aero_dict['sweep']
-        except KeyError:
-            self.aero_dict['sweep'] = np.zeros_like(self.aero_dict['twist'])
+        self.add_default_geometry()
 
-        # Define first_twist for backwards compatibility
-        if 'first_twist' not in self.aero_dict:     
-            self.aero_dict['first_twist'] = [True]*self.aero_dict['surface_m'].shape[0]
-        
         # one surface per element
         for i_elem in range(self.n_elem):
             i_surf = self.aero_dict['surface_distribution'][i_elem]
@@ -233,8 +330,6 @@ class Aerogrid(object):
 
             for i_local_node in range(len(self.beam.elements[i_elem].global_connectivities)):
                 i_global_node = self.beam.elements[i_elem].global_connectivities[i_local_node]
-                # i_global_node = self.beam.elements[i_elem].global_connectivities[
-                #     self.beam.elements[i_elem].ordering[i_local_node]]
                 if not self.aero_dict['aero_node'][i_global_node]:
                     continue
                 if i_global_node in global_node_in_surface[i_surf]:
@@ -242,85 +337,15 @@ class Aerogrid(object):
                 else:
                     global_node_in_surface[i_surf].append(i_global_node)
 
-                # master_elem, master_elem_node = beam.master[i_elem, i_local_node, :]
-                # if master_elem < 0:
-                    # master_elem = i_elem
-                    # master_elem_node = i_local_node
-
-                # find the i_surf and i_n data from the mapping
-                i_n = -1
-                ii_surf = -1
-                for i in range(len(self.struct2aero_mapping[i_global_node])):
-                    i_n = self.struct2aero_mapping[i_global_node][i]['i_n']
-                    ii_surf = self.struct2aero_mapping[i_global_node][i]['i_surf']
-                    if ii_surf == i_surf:
-                        break
-                # make sure it found it
-                if i_n == -1 or ii_surf == -1:
-                    raise AssertionError('Error 12958: Something failed with the mapping in aerogrid.py. Check/report!')
+                i_n = self.get_strip_index(i_global_node, i_surf)
 
                 # control surface implementation
-                control_surface_info = None
+                node_control_surface_info = None
                 if with_control_surfaces:
-                # 1) check that this node and elem have a control surface
+                    # check that this node and elem have a control surface
                     if self.aero_dict['control_surface'][i_elem, i_local_node] >= 0:
                         i_control_surface = self.aero_dict['control_surface'][i_elem, i_local_node]
-                        # 2) type of control surface + write info
-                        control_surface_info = dict()
-                        if self.aero_dict['control_surface_type'][i_control_surface] == 0:
-                            control_surface_info['type'] = 'static'
-                            control_surface_info['deflection'] = self.aero_dict['control_surface_deflection'][i_control_surface]
-                            control_surface_info['chord'] = self.aero_dict['control_surface_chord'][i_control_surface]
-                            try:
-                                control_surface_info['hinge_coords'] = self.aero_dict['control_surface_hinge_coords'][i_control_surface]
-                            except KeyError:
-                                control_surface_info['hinge_coords'] = None
-                        elif self.aero_dict['control_surface_type'][i_control_surface] == 1:
-                            control_surface_info['type'] = 'dynamic'
-                            control_surface_info['chord'] = self.aero_dict['control_surface_chord'][i_control_surface]
-                            try:
-                                control_surface_info['hinge_coords'] = self.aero_dict['control_surface_hinge_coords'][i_control_surface]
-                            except KeyError:
-                                control_surface_info['hinge_coords'] = None
-
-                            params = {'it': it}
-                            control_surface_info['deflection'], control_surface_info['deflection_dot'] = \
-                                self.cs_generators[i_control_surface](params)
-
-                        elif self.aero_dict['control_surface_type'][i_control_surface] == 2:
-                            control_surface_info['type'] = 'controlled'
-
-                            try:
-                                old_deflection = self.data.aero.timestep_info[-1].control_surface_deflection[i_control_surface]
-                            except AttributeError:
-                                try:
-                                    old_deflection = aero_tstep.control_surface_deflection[i_control_surface]
-                                except IndexError:
-                                    old_deflection = self.aero_dict['control_surface_deflection'][i_control_surface]
-
-                            try:
-                                control_surface_info['deflection'] = aero_tstep.control_surface_deflection[i_control_surface]
-                            except IndexError:
-                                control_surface_info['deflection'] = self.aero_dict['control_surface_deflection'][i_control_surface]
-
-                            if dt is not None:
-                                control_surface_info['deflection_dot'] = (
-                                        (control_surface_info['deflection'] - old_deflection)/dt)
-                            else:
-                                control_surface_info['deflection_dot'] = 0.0
-
-                            control_surface_info['chord'] = self.aero_dict['control_surface_chord'][i_control_surface]
-
-                            try:
-                                control_surface_info['hinge_coords'] = self.aero_dict['control_surface_hinge_coords'][i_control_surface]
-                            except KeyError:
-                                control_surface_info['hinge_coords'] = None
-
-                        else:
-                            raise NotImplementedError(str(self.aero_dict['control_surface_type'][i_control_surface]) +
-                                ' control surfaces are not yet implemented')
-
-
+                        node_control_surface_info = control_surface_info[i_control_surface].copy()
 
                 node_info = dict()
                 node_info['i_node'] = i_global_node
@@ -332,7 +357,7 @@ class Aerogrid(object):
                 node_info['M'] = self.aero_dimensions[i_surf, 0]
                 node_info['M_distribution'] = self.aero_dict['m_distribution'].decode('ascii')
                 node_info['airfoil'] = self.aero_dict['airfoil_distribution'][i_elem, i_local_node]
-                node_info['control_surface'] = control_surface_info
+                node_info['control_surface'] = node_control_surface_info
                 node_info['beam_coord'] = structure_tstep.pos[i_global_node, :]
                 node_info['pos_dot'] = structure_tstep.pos_dot[i_global_node, :]
                 node_info['beam_psi'] = structure_tstep.psi[i_elem, i_local_node, :]
@@ -353,6 +378,162 @@ class Aerogrid(object):
                                    calculate_zeta_dot=True,
                                    first_twist=self.aero_dict['first_twist'][i_surf]))
 
+    def add_default_geometry(self):
+        """
+        Adds the optional geometric entries of ``aero_dict`` (``sweep`` and ``first_twist``) when they are not
+        defined, for backwards compatibility.
+        """
+        # check that we have sweep information
+        try:
+            self.aero_dict['sweep']
+        except KeyError:
+            self.aero_dict['sweep'] = np.zeros_like(self.aero_dict['twist'])
+
+        # Define first_twist for backwards compatibility
+        if 'first_twist' not in self.aero_dict:
+            self.aero_dict['first_twist'] = [True]*self.aero_dict['surface_m'].shape[0]
+
+    def get_strip_index(self, i_global_node, i_surf):
+        """
+        Returns the spanwise index ``i_n`` of the structural node ``i_global_node`` in the surface ``i_surf``.
+        """
+        i_n = -1
+        ii_surf = -1
+        for i in range(len(self.struct2aero_mapping[i_global_node])):
+            i_n = self.struct2aero_mapping[i_global_node][i]['i_n']
+            ii_surf = self.struct2aero_mapping[i_global_node][i]['i_surf']
+            if ii_surf == i_surf:
+                break
+        # make sure it found it
+        if i_n == -1 or ii_surf == -1:
+            raise AssertionError('Error 12958: Something failed with the mapping in aerogrid.py. Check/report!')
+        return i_n
+
+    def generate_strip_tables(self):
+        """
+        Precomputes, for every surface, the strip information that does not change during the simulation.
+
+        ``self.strip_tables`` is a list with a dictionary per surface containing arrays ordered by the spanwise
+        index ``i_n``:
+
+            * ``elem``, ``local_node`` and ``node``: element, local node and global node of the strip.
+            * ``airfoil_coords``: ``n_strips x 3 x (M + 1)`` airfoil coordinates in the ``B`` frame, normalised
+              by the chord and corrected by the elastic axis position.
+            * ``chord``: strip chord.
+            * ``twist`` and ``sweep``: ``n_strips x 3 x 3`` twist and sweep rotation matrices.
+            * ``control_surface``: control surface index of the strip (``-1`` if none).
+
+        The grid geometry in ``aero_dict`` is not expected to change after :meth:`generate`, the control surface
+        deflections are evaluated every time the grid is generated.
+        """
+        self.add_default_geometry()
+        self.strip_tables = []
+        for i_surf in range(self.n_surf):
+            n_strips = self.aero_dimensions[i_surf, 1] + 1
+            m = self.aero_dimensions[i_surf, 0]
+            self.strip_tables.append({'elem': np.zeros((n_strips,), dtype=int),
+                                      'local_node': np.zeros((n_strips,), dtype=int),
+                                      'node': np.zeros((n_strips,), dtype=int),
+                                      'airfoil_coords': np.zeros((n_strips, 3, m + 1)),
+                                      'chord': np.zeros((n_strips,)),
+                                      'twist': np.zeros((n_strips, 3, 3)),
+                                      'sweep': np.zeros((n_strips, 3, 3)),
+                                      'control_surface': -np.ones((n_strips,), dtype=int)})
+
+        global_node_in_surface = [[] for i_surf in range(self.n_surf)]
+        for i_elem in range(self.n_elem):
+            i_surf = self.aero_dict['surface_distribution'][i_elem]
+            if i_surf == -1:
+                continue
+
+            m = self.aero_dimensions[i_surf, 0]
+            tables = self.strip_tables[i_surf]
+            for i_local_node, i_global_node in enumerate(self.beam.elements[i_elem].global_connectivities):
+                if not self.aero_dict['aero_node'][i_global_node]:
+                    continue
+                if i_global_node in global_node_in_surface[i_surf]:
+                    continue
+                global_node_in_surface[i_surf].append(i_global_node)
+
+                i_n = self.get_strip_index(i_global_node, i_surf)
+                tables['elem'][i_n] = i_elem
+                tables['local_node'][i_n] = i_local_node
+                tables['node'][i_n] = i_global_node
+
+                airfoil_coords = tables['airfoil_coords'][i_n]
+                airfoil_coords[1, :] = np.linspace(0.0, 1.0, m + 1)
+                airfoil_coords[2, :] = self.airfoil_db[self.aero_dict['airfoil_distribution'][i_elem, i_local_node]](
+                    airfoil_coords[1, :])
+                airfoil_coords[1, :] -= self.aero_dict['elastic_axis'][i_elem, i_local_node]
+
+                tables['chord'][i_n] = self.aero_dict['chord'][i_elem, i_local_node]
+
+                twist = self.aero_dict['twist'][i_elem, i_local_node]
+                if np.abs(twist) > 1e-6:
+                    tables['twist'][i_n] = algebra.rotation3d_x(twist)
+                else:
+                    tables['twist'][i_n] = np.eye(3)
+
+                sweep = self.aero_dict['sweep'][i_elem, i_local_node]
+                if np.abs(sweep) > 1e-6:
+                    tables['sweep'][i_n] = algebra.rotation3d_z(sweep)
+                else:
+                    tables['sweep'][i_n] = np.eye(3)
+
+                if 'control_surface' in self.aero_dict:
+                    tables['control_surface'][i_n] = self.aero_dict['control_surface'][i_elem, i_local_node]
+
+    def get_control_surface_info(self, aero_tstep, it, dt=None):
+        """
+        Returns a list with the type, chord, hinge coordinates and current deflection (and deflection rate
+        for non static surfaces) of each control surface.
+        """
+        control_surface_info = []
+        for i_control_surface in range(self.n_control_surfaces):
+            info = dict()
+            if self.aero_dict['control_surface_type'][i_control_surface] == 0:
+                info['type'] = 'static'
+                info['deflection'] = self.aero_dict['control_surface_deflection'][i_control_surface]
+
+            elif self.aero_dict['control_surface_type'][i_control_surface] == 1:
+                info['type'] = 'dynamic'
+                params = {'it': it}
+                info['deflection'], info['deflection_dot'] = self.cs_generators[i_control_surface](params)
+
+            elif self.aero_dict['control_surface_type'][i_control_surface] == 2:
+                info['type'] = 'controlled'
+
+                try:
+                    old_deflection = self.data.aero.timestep_info[-1].control_surface_deflection[i_control_surface]
+                except AttributeError:
+                    try:
+                        old_deflection = aero_tstep.control_surface_deflection[i_control_surface]
+                    except IndexError:
+                        old_deflection = self.aero_dict['control_surface_deflection'][i_control_surface]
+
+                try:
+                    info['deflection'] = aero_tstep.control_surface_deflection[i_control_surface]
+                except IndexError:
+                    info['deflection'] = self.aero_dict['control_surface_deflection'][i_control_surface]
+
+                if dt is not None:
+                    info['deflection_dot'] = (info['deflection'] - old_deflection)/dt
+                else:
+                    info['deflection_dot'] = 0.0
+
+            else:
+                raise NotImplementedError(str(self.aero_dict['control_surface_type'][i_control_surface]) +
+                                          ' control surfaces are not yet implemented')
+
+            info['chord'] = self.aero_dict['control_surface_chord'][i_control_surface]
+            try:
+                info['hinge_coords'] = self.aero_dict['control_surface_hinge_coords'][i_control_surface]
+            except KeyError:
+                info['hinge_coords'] = None
+            control_surface_info.append(info)
+
+        return control_surface_info
+
     def generate_zeta(self, beam, aero_settings, ts=-1, beam_ts=-1):
         self.generate_zeta_timestep_info(beam.timestep_info[beam_ts],
                                          self.timestep_info[ts],
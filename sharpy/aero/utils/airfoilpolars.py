@@ -64,6 +64,20 @@ class Polar:
 
         return cl, cd, cm
 
+    def get_coefs_vec(self, aoa_deg):
+        """
+        Vectorised version of ``get_coefs``: the three coefficients are interpolated from the table with a single
+        lookup for all the angles of attack.
+
+        Args:
+            aoa_deg (np.ndarray): angles of attack
+
+        Returns:
+            np.ndarray: ``n x 3`` array with ``cl``, ``cd`` and ``cm``
+        """
+        coefs_interp = interp1d(self.table[:, 0], self.table[:, 1:4], axis=0)
+        return coefs_interp(aoa_deg)
+
     def get_aoa_deg_from_cl_2pi(self, cl):
 
         return cl/2/np.pi/deg2rad + self.aoa_cl0_deg
@@ -118,7 +132,70 @@ class Polar:
         
         return cd, cm
 
-    
+    def get_cdcm_from_cl_vec(self, cl):
+        """
+        Vectorised version of ``get_cdcm_from_cl``
+
+        Args:
+            cl (np.ndarray): lift coefficients
+
+        Returns:
+            tuple: ``cd`` and ``cm`` arrays
+        """
+        cl = np.asarray(cl, dtype=float)
+        cd = np.zeros_like(cl)
+        cm = np.zeros_like(cl)
+
+        cl_max = np.max(self.table[:, 1])
+        cl_min = np.min(self.table[:, 1])
+        out_of_range = (cl_max < cl) | (cl_min > cl)
+        for value in cl[out_of_range]:
+            print(("cl = %.2f out of range, forces at this point will not be corrected" % value))
+
+        zero = ~out_of_range & (cl == 0.)
+        if zero.any():
+            cl_new, cd[zero], cm[zero] = self.get_coefs(self.aoa_cl0_deg)
+
+        dist = np.abs(self.table[:, 0] - self.aoa_cl0_deg)
+        i_cl0 = np.where(dist == np.min(dist))[0][0]
+        npoints = self.table.shape[0]
+        index = np.arange(npoints)
+
+        # positive cl: first point after the one closest to the zero lift aoa with a larger cl
+        positive = ~out_of_range & (cl > 0.)
+        after = (index[None, :] >= i_cl0) & (self.table[None, :, 1] >= cl[positive, None])
+        i = np.argmax(after, axis=1)
+        cd[positive], cm[positive] = self._interp_segment(cl[positive], i - 1, i)
+
+        # negative cl: first point before the one closest to the zero lift aoa with a smaller cl
+        negative = ~out_of_range & (cl < 0.)
+        before = (index[None, :] <= i_cl0) & (self.table[None, :, 1] <= cl[negative, None])
+        i = npoints - 1 - np.argmax(before[:, ::-1], axis=1)
+        cd[negative], cm[negative] = self._interp_segment(cl[negative], i, i + 1)
+
+        return cd, cm
+
+    def _interp_segment(self, cl, i_lo, i_hi):
+        """
+        Interpolates ``cd`` and ``cm`` between the points ``i_lo`` and ``i_hi`` of the table for the given ``cl``
+        as ``np.interp`` does for a two point table.
+        """
+        cl_lo = self.table[i_lo, 1]
+        cl_hi = self.table[i_hi, 1]
+        coefs = []
+        for icol in [2, 3]:
+            lo = self.table[i_lo, icol]
+            hi = self.table[i_hi, icol]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                value = (hi - lo)/(cl_hi - cl_lo)*(cl - cl_lo) + lo
+            value = np.where(cl == cl_lo, lo, value)
+            value = np.where(cl == cl_hi, hi, value)
+            value = np.where(cl < cl_lo, lo, value)
+            value = np.where(cl > cl_hi, hi, value)
+            coefs.append(value)
+        return coefs
+
+
 def interpolate(polar1, polar2, coef=0.5):
 
     all_aoa = np.sort(np.concatenate((polar1.table[:, 0], polar2.table[:, 0]),))
@@ -3,6 +3,75 @@ import numpy as np
 import sharpy.utils.algebra as algebra
 
 
+class ForceMappingIndex(object):
+    r"""
+    Precomputed index between the aerodynamic lattice vertices and the structural nodes
+
+    The index only depends on the structural connectivities and on the structural to aerodynamic mapping, therefore
+    it can be computed once and reused in every call to :func:`aero2struct_force_mapping`.
+
+    For every structural node, the element and local node from which the nodal rotation is taken is stored
+    (the first element in the connectivities in which the node appears, as in the original loop-based mapping).
+    For every surface, the spanwise lattice indices and the structural node they are mapped to are stored.
+
+    Args:
+        struct2aero_mapping (list): Structural to aerodynamic node mapping
+        conn (np.ndarray): Connectivities matrix
+        n_node (int): Number of structural nodes
+
+    Attributes:
+        n_node (int): Number of structural nodes
+        node_elem (np.ndarray): Element used to evaluate the nodal rotation (``-1`` for nodes not in ``conn``)
+        node_local (np.ndarray): Local node within ``node_elem``
+        surf_span_index (list(np.ndarray)): For each surface, spanwise indices of the mapped lattice vertices
+        surf_node_index (list(np.ndarray)): For each surface, structural node of each mapped lattice vertex
+    """
+    def __init__(self, struct2aero_mapping, conn, n_node):
+        self.n_node = n_node
+        self.node_elem = -np.ones((n_node,), dtype=int)
+        self.node_local = np.zeros((n_node,), dtype=int)
+
+        n_elem, n_node_elem = conn.shape
+        for i_elem in range(n_elem - 1, -1, -1):
+            for i_local_node in range(n_node_elem - 1, -1, -1):
+                i_global_node = conn[i_elem, i_local_node]
+                self.node_elem[i_global_node] = i_elem
+                self.node_local[i_global_node] = i_local_node
+
+        surf_entries = dict()
+        for i_global_node in range(n_node):
+            if self.node_elem[i_global_node] == -1:
+                continue
+            for mapping in struct2aero_mapping[i_global_node]:
+                surf_entries.setdefault(mapping['i_surf'], []).append((mapping['i_n'], i_global_node))
+
+        n_surf = max(surf_entries.keys()) + 1 if surf_entries else 0
+        self.surf_span_index = []
+        self.surf_node_index = []
+        for i_surf in range(n_surf):
+            entries = np.array(surf_entries.get(i_surf, []), dtype=int).reshape((-1, 2))
+            self.surf_span_index.append(entries[:, 0])
+            self.surf_node_index.append(entries[:, 1])
+
+    def nodal_rotations(self, psi_def, cag=np.eye(3)):
+        r"""
+        Computes the rotation matrices :math:`C^{BG}` at all the structural nodes at once.
+
+        Args:
+            psi_def (np.ndarray): Vector of structural node rotations (CRVs)
+            cag (np.ndarray): Transformation matrix between inertial and body-attached reference ``A``
+
+        Returns:
+            np.ndarray: ``n_node x 3 x 3`` array of :math:`C^{BG}` matrices. Nodes not in the connectivities
+            are given a zero matrix.
+        """
+        mapped = self.node_elem != -1
+        cbg = np.zeros((self.n_node, 3, 3))
+        cab = algebra.crv2rotation_vec(psi_def[self.node_elem[mapped], self.node_local[mapped], :])
+        cbg[mapped] = np.matmul(cab.transpose((0, 2, 1)), cag)
+        return cbg
+
+
 def aero2struct_force_mapping(aero_forces,
                               struct2aero_mapping,
                               zeta,
@@ -11,7 +80,8 @@ def aero2struct_force_mapping(aero_forces,
                               master,
                               conn,
                               cag=np.eye(3),
-                              aero_dict=None):
+                              aero_dict=None,
+                              mapping_index=None):
     r"""
     Maps the aerodynamic forces at the lattice to the structural nodes
 
@@ -30,6 +100,8 @@ def aero2struct_force_mapping(aero_forces,
     where :math:`\tilde{\boldsymbol{\zeta}}^G` is the skew-symmetric matrix of the vector between the lattice
     grid vertex and the structural node.
 
+    The mapping is evaluated with the batched kernel :func:`aero2struct_force_mapping_multiple`.
+
     Args:
         aero_forces (list): Aerodynamic forces from the UVLM in inertial frame of reference
         struct2aero_mapping (dict): Structural to aerodynamic node mapping
@@ -40,41 +112,87 @@ def aero2struct_force_mapping(aero_forces,
         conn (np.ndarray): Connectivities matrix
         cag (np.ndarray): Transformation matrix between inertial and body-attached reference ``A``
         aero_dict (dict): Dictionary containing the grid's information.
+        mapping_index (ForceMappingIndex (optional)): Precomputed mapping index. It is computed on the fly if not
+            provided.
 
     Returns:
         np.ndarray: structural forces in an ``n_node x 6`` vector
     """
+    return aero2struct_force_mapping_multiple([aero_forces],
+                                              struct2aero_mapping,
+                                              zeta,
+                                              pos_def,
+                                              psi_def,
+                                              conn,
+                                              cag=cag,
+                                              mapping_index=mapping_index)[0]
+
+
+def aero2struct_force_mapping_multiple(aero_forces_list,
+                                       struct2aero_mapping,
+                                       zeta,
+                                       pos_def,
+                                       psi_def,
+                                       conn,
+                                       cag=np.eye(3),
+                                       mapping_index=None):
+    r"""
+    Maps several sets of aerodynamic forces defined on the same lattice to the structural nodes in a single pass.
 
-    n_node, _ = pos_def.shape
-    n_elem, _, _ = psi_def.shape
-    struct_forces = np.zeros((n_node, 6))
-
-    nodes = []
-
-    for i_elem in range(n_elem):
-        for i_local_node in range(3):
-
-            i_global_node = conn[i_elem, i_local_node]
-            if i_global_node in nodes:
-                continue
+    This is the batched counterpart of :func:`aero2struct_force_mapping`, useful to map, for instance, the steady
+    and the unsteady aerodynamic forces at once. The moment contribution of each lattice vertex is split as
 
-            nodes.append(i_global_node)
-            for mapping in struct2aero_mapping[i_global_node]:
-                i_surf = mapping['i_surf']
-                i_n = mapping['i_n']
-                _, n_m, _ = aero_forces[i_surf].shape
+    .. math:: \tilde{\boldsymbol{\chi}}^G\mathbf{f}^G = \tilde{\boldsymbol{\zeta}}^G\mathbf{f}^G -
+        \widetilde{(C^{GA}\mathbf{r}^A)}\mathbf{f}^G
 
-                crv = psi_def[i_elem, i_local_node, :]
-                cab = algebra.crv2rotation(crv)
-                cbg = np.dot(cab.T, cag)
+    such that the chordwise summation is carried out for all surfaces before the nodal terms are added.
 
-                for i_m in range(n_m):
-                    chi_g = zeta[i_surf][:, i_m, i_n] - np.dot(cag.T, pos_def[i_global_node, :])
-                    struct_forces[i_global_node, 0:3] += np.dot(cbg, aero_forces[i_surf][0:3, i_m, i_n])
-                    struct_forces[i_global_node, 3:6] += np.dot(cbg, aero_forces[i_surf][3:6, i_m, i_n])
-                    struct_forces[i_global_node, 3:6] += np.dot(cbg, algebra.cross3(chi_g, aero_forces[i_surf][0:3, i_m, i_n]))
+    Args:
+        aero_forces_list (list): List of aerodynamic force sets, each of them as in :func:`aero2struct_force_mapping`
+        struct2aero_mapping (dict): Structural to aerodynamic node mapping
+        zeta (list): Aerodynamic grid coordinates
+        pos_def (np.ndarray): Vector of structural node displacements
+        psi_def (np.ndarray): Vector of structural node rotations (CRVs)
+        conn (np.ndarray): Connectivities matrix
+        cag (np.ndarray): Transformation matrix between inertial and body-attached reference ``A``
+        mapping_index (ForceMappingIndex (optional)): Precomputed mapping index. It is computed on the fly if not
+            provided.
 
-    return struct_forces
+    Returns:
+        list(np.ndarray): structural forces in an ``n_node x 6`` vector for each of the input force sets
+    """
+    n_node, _ = pos_def.shape
+    if mapping_index is None:
+        mapping_index = ForceMappingIndex(struct2aero_mapping, conn, n_node)
+
+    n_sets = len(aero_forces_list)
+    # forces and moments about the G origin accumulated at each structural node
+    nodal_forces_g = np.zeros((n_sets, n_node, 6))
+    for i_surf, span_index in enumerate(mapping_index.surf_span_index):
+        if span_index.size == 0:
+            continue
+        node_index = mapping_index.surf_node_index[i_surf]
+        # (n_sets, 6, M+1, n_strips) and (3, M+1, n_strips)
+        forces = np.stack([aero_forces[i_surf][:, :, span_index] for aero_forces in aero_forces_list])
+        zeta_strips = zeta[i_surf][:, :, span_index]
+
+        strip_forces = np.zeros((n_sets, span_index.size, 6))
+        strip_forces[:, :, 0:3] = forces[:, 0:3, :, :].sum(axis=2).transpose((0, 2, 1))
+        strip_forces[:, :, 3:6] = forces[:, 3:6, :, :].sum(axis=2).transpose((0, 2, 1))
+        strip_forces[:, :, 3:6] += np.cross(zeta_strips[None, :, :, :],
+                                            forces[:, 0:3, :, :], axis=1).sum(axis=2).transpose((0, 2, 1))
+        np.add.at(nodal_forces_g, (slice(None), node_index), strip_forces)
+
+    # move the moments to the structural node
+    pos_g = np.dot(pos_def, cag)
+    nodal_forces_g[:, :, 3:6] -= np.cross(pos_g[None, :, :], nodal_forces_g[:, :, 0:3])
+
+    cbg = mapping_index.nodal_rotations(psi_def, cag)
+    struct_forces = np.zeros((n_sets, n_node, 6))
+    struct_forces[:, :, 0:3] = np.einsum('nij,snj->sni', cbg, nodal_forces_g[:, :, 0:3])
+    struct_forces[:, :, 3:6] = np.einsum('nij,snj->sni', cbg, nodal_forces_g[:, :, 3:6])
+
+    return [struct_forces[i_set] for i_set in range(n_sets)]
 
 
 def total_forces_moments(forces_nodes_a,
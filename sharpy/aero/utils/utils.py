@@ -92,6 +92,66 @@ def local_stability_axes(dir_urel, dir_chord):
     return algebra.triad2rotation(xs, ys, zs)
 
 
+def local_stability_axes_vec(dir_urel, dir_chord):
+    """
+    Vectorised version of :func:`local_stability_axes` for a collection of sections.
+
+    Args:
+        dir_urel (np.ndarray): ``n x 3`` unit vectors in the direction of the free stream velocity expressed in B frame.
+        dir_chord (np.ndarray): ``n x 3`` unit vectors in the direction of the local chord expressed in B frame.
+
+    Returns:
+        np.ndarray: ``n x 3 x 3`` rotation matrices from B to S.
+    """
+    xs = dir_urel
+
+    zb = np.array([0, 0, 1.])
+    zs = np.cross(np.cross(dir_chord, zb), dir_urel)
+
+    ys = -np.cross(xs, zs)
+
+    return np.stack((xs, ys, zs), axis=2)
+
+
+def span_chord_vec(i_node_surf, zeta):
+    """
+    Vectorised version of :func:`span_chord` for a collection of nodes of the same aerodynamic surface.
+
+    Args:
+        i_node_surf (np.ndarray): Node indices in aerodynamic surface
+        zeta (np.array): Aerodynamic surface coordinates ``(3 x n_chord x m_span)``
+
+    Returns:
+        tuple: ``dir_span``, ``span``, ``dir_chord``, ``chord``, with the directions as ``n x 3`` arrays
+    """
+    N = zeta.shape[2] - 1 # spanwise vertices in surface (-1 for index)
+
+    # Deal with the extremes
+    node_p = np.minimum(i_node_surf + 1, N)
+    node_m = np.maximum(i_node_surf - 1, 0)
+
+    # Define the span and the span direction
+    dir_span = 0.5 * (zeta[:, 0, node_p] - zeta[:, 0, node_m]).T
+    span = np.linalg.norm(dir_span, axis=1)
+    dir_span = unit_vector_vec(dir_span)
+
+    # Define the chord and the chord direction
+    dir_chord = (zeta[:, -1, i_node_surf] - zeta[:, 0, i_node_surf]).T
+    chord = np.linalg.norm(dir_chord, axis=1)
+    dir_chord = unit_vector_vec(dir_chord)
+
+    return dir_span, span, dir_chord, chord
+
+
+def unit_vector_vec(vector):
+    """
+    Vectorised version of :func:`sharpy.utils.algebra.unit_vector` for ``n x 3`` arrays
+    """
+    norm = np.linalg.norm(vector, axis=1)
+    small = norm < 1e-6
+    return np.where(small[:, None], 0., vector/np.where(small, 1., norm)[:, None])
+
+
 def span_chord(i_node_surf, zeta):
     """
     Retrieve the local span and local chord
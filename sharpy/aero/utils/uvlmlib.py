@@ -143,49 +143,237 @@ class FlightConditions(ct.Structure):
 t_2int = ct.POINTER(ct.c_int)*2
 
 
-def vlm_solver(ts_info, options):
-    run_VLM = UvlmLib.run_VLM
-    run_VLM.restype = None
+class UvlmSession(object):
+    """
+    Persistent ctypes state for the calls to the UVLM library made by an aerodynamic solver.
 
-    vmopts = VMopts()
-    vmopts.Steady = ct.c_bool(True)
-    vmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
-    vmopts.horseshoe = ct.c_bool(options['horseshoe'])
-    vmopts.dt = ct.c_double(options["rollup_dt"])
-    vmopts.n_rollup = ct.c_uint(options["n_rollup"])
-    vmopts.rollup_tolerance = ct.c_double(options["rollup_tolerance"])
-    vmopts.rollup_aic_refresh = ct.c_uint(options['rollup_aic_refresh'])
-    vmopts.NumCores = ct.c_uint(options['num_cores'])
-    vmopts.iterative_solver = ct.c_bool(options['iterative_solver'])
-    vmopts.iterative_tol = ct.c_double(options['iterative_tol'])
-    vmopts.iterative_precond = ct.c_bool(options['iterative_precond'])
-    vmopts.cfl1 = ct.c_bool(options['cfl1'])
-    vmopts.vortex_radius = ct.c_double(options['vortex_radius'])
-    vmopts.vortex_radius_wake_ind = ct.c_double(options['vortex_radius_wake_ind'])
+    The option structures (``VMopts`` for steady solvers, ``UVMopts`` for unsteady ones), the flight conditions,
+    the rigid body velocity buffer and the library function handles are created once, when the solver is
+    initialised. Each call then only updates the fields that change between time steps: time step,
+    wake convection, free stream velocity, density and rigid body velocity.
 
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
+    The rest of the solver settings are read in :meth:`update_settings`, which is called on construction and
+    needs to be called again if those settings are modified afterwards.
 
-    p_rbm_vel_g = options['rbm_vel_g'].ctypes.data_as(ct.POINTER(ct.c_double))
-    p_centre_rot_g = options['centre_rot_g'].ctypes.data_as(ct.POINTER(ct.c_double))
+    Args:
+        options (dict): Settings of the aerodynamic solver.
+        steady (bool): Create the session for the steady VLM solver instead of the unsteady UVLM.
+    """
+    def __init__(self, options, steady=False):
+        self.options = options
+        self.steady = steady
+
+        self.vmopts = None
+        self.uvmopts = None
+        self.uvmopts_unsteady_forces = None
+
+        self.flightconditions = FlightConditions()
+        self.uinf_direction = np.ctypeslib.as_array(self.flightconditions.uinf_direction)
+
+        self.rbm_vel = np.zeros((6,), dtype=ct.c_double)
+        self.p_rbm_vel = self.rbm_vel.ctypes.data_as(ct.POINTER(ct.c_double))
+        self.i_iter = ct.c_uint(0)
+        self.settings_pointers = dict()
+
+        if self.steady:
+            self.run_VLM = UvlmLib.run_VLM
+            self.run_VLM.restype = None
+        else:
+            self.run_UVLM = UvlmLib.run_UVLM
+            self.run_UVLM.restype = None
+            self.calculate_unsteady_forces_function = UvlmLib.calculate_unsteady_forces
+            self.calculate_unsteady_forces_function.restype = None
+
+        self.update_settings()
+
+    def __getstate__(self):
+        # ctypes pointers and library handles cannot be pickled, they are regenerated when loading
+        return {'options': self.options,
+                'steady': self.steady}
+
+    def __setstate__(self, state):
+        self.__init__(state['options'], steady=state['steady'])
+
+    def update_settings(self):
+        """
+        Fills the option structures with the current solver settings.
+        """
+        options = self.options
+        if self.steady:
+            self.vmopts = VMopts()
+            self.vmopts.Steady = ct.c_bool(True)
+            self.vmopts.horseshoe = ct.c_bool(options['horseshoe'])
+            self.vmopts.dt = ct.c_double(options["rollup_dt"])
+            self.vmopts.n_rollup = ct.c_uint(options["n_rollup"])
+            self.vmopts.rollup_tolerance = ct.c_double(options["rollup_tolerance"])
+            self.vmopts.rollup_aic_refresh = ct.c_uint(options['rollup_aic_refresh'])
+            self.vmopts.NumCores = ct.c_uint(options['num_cores'])
+            self.vmopts.iterative_solver = ct.c_bool(options['iterative_solver'])
+            self.vmopts.iterative_tol = ct.c_double(options['iterative_tol'])
+            self.vmopts.iterative_precond = ct.c_bool(options['iterative_precond'])
+            self.vmopts.cfl1 = ct.c_bool(options['cfl1'])
+            self.vmopts.vortex_radius = ct.c_double(options['vortex_radius'])
+            self.vmopts.vortex_radius_wake_ind = ct.c_double(options['vortex_radius_wake_ind'])
+        else:
+            self.uvmopts = UVMopts()
+            self.uvmopts.dt = ct.c_double(options["dt"])
+            self.uvmopts.NumCores = ct.c_uint(options["num_cores"])
+            self.uvmopts.ImageMethod = ct.c_bool(False)
+            self.uvmopts.convection_scheme = ct.c_uint(options["convection_scheme"])
+            self.uvmopts.iterative_solver = ct.c_bool(options['iterative_solver'])
+            self.uvmopts.iterative_tol = ct.c_double(options['iterative_tol'])
+            self.uvmopts.iterative_precond = ct.c_bool(options['iterative_precond'])
+            self.uvmopts.cfl1 = ct.c_bool(options['cfl1'])
+            self.uvmopts.vortex_radius = ct.c_double(options['vortex_radius'])
+            self.uvmopts.vortex_radius_wake_ind = ct.c_double(options['vortex_radius_wake_ind'])
+            self.uvmopts.interp_coords = ct.c_uint(options["interp_coords"])
+            self.uvmopts.filter_method = ct.c_uint(options["filter_method"])
+            self.uvmopts.interp_method = ct.c_uint(options["interp_method"])
+            self.uvmopts.yaw_slerp = ct.c_double(options["yaw_slerp"])
+            self.uvmopts.quasi_steady = ct.c_bool(options['quasi_steady'])
+
+            # the unsteady forces have historically been computed with the default values of the rest of fields
+            self.uvmopts_unsteady_forces = UVMopts()
+            self.uvmopts_unsteady_forces.dt = ct.c_double(options["dt"])
+            self.uvmopts_unsteady_forces.NumCores = ct.c_uint(options["num_cores"])
+            self.uvmopts_unsteady_forces.ImageMethod = ct.c_bool(False)
+            self.uvmopts_unsteady_forces.convection_scheme = ct.c_uint(options["convection_scheme"])
+            self.uvmopts_unsteady_forces.iterative_solver = ct.c_bool(options['iterative_solver'])
+            self.uvmopts_unsteady_forces.iterative_tol = ct.c_double(options['iterative_tol'])
+            self.uvmopts_unsteady_forces.iterative_precond = ct.c_bool(options['iterative_precond'])
+            self.uvmopts_unsteady_forces.vortex_radius = ct.c_double(options['vortex_radius'])
+
+    def get_settings_pointer(self, name):
+        """
+        Returns a pointer to the data of the array setting ``name``. The pointer is only regenerated if the
+        setting has been replaced by a different array.
+        """
+        array = self.options[name]
+        try:
+            cached_array, pointer = self.settings_pointers[name]
+            if cached_array is array:
+                return pointer
+        except KeyError:
+            pass
+        pointer = array.ctypes.data_as(ct.POINTER(ct.c_double))
+        self.settings_pointers[name] = (array, pointer)
+        return pointer
+
+    def update_flight_conditions(self, ts_info):
+        self.flightconditions.rho = self.options['rho']
+        uinf_vector = ts_info.u_ext[0][:, 0, 0]
+        uinf = np.linalg.norm(uinf_vector)
+        self.flightconditions.uinf = uinf
+        self.uinf_direction[:] = uinf_vector/uinf
+
+    def update_rbm_vel(self, struct_ts_info):
+        cga = struct_ts_info.cga()
+        np.dot(cga, struct_ts_info.for_vel[0:3], out=self.rbm_vel[0:3])
+        np.dot(cga, struct_ts_info.for_vel[3:6], out=self.rbm_vel[3:6])
+
+    def vlm_solver(self, ts_info):
+        """
+        Steady solution of the aerodynamic time step ``ts_info``. See :func:`vlm_solver`.
+        """
+        self.vmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
+        self.update_flight_conditions(ts_info)
+
+        ts_info.generate_ctypes_pointers()
+        self.run_VLM(ct.byref(self.vmopts),
+                     ct.byref(self.flightconditions),
+                     ts_info.ct_p_dimensions,
+                     ts_info.ct_p_dimensions_star,
+                     ts_info.ct_p_zeta,
+                     ts_info.ct_p_zeta_star,
+                     ts_info.ct_p_zeta_dot,
+                     ts_info.ct_p_u_ext,
+                     ts_info.ct_p_gamma,
+                     ts_info.ct_p_gamma_star,
+                     ts_info.ct_p_forces,
+                     self.get_settings_pointer('rbm_vel_g'),
+                     self.get_settings_pointer('centre_rot_g'))
+        ts_info.remove_ctypes_pointers()
+
+    def uvlm_solver(self, i_iter, ts_info, struct_ts_info, convect_wake=True, dt=None):
+        """
+        Unsteady solution of the aerodynamic time step ``ts_info``. See :func:`uvlm_solver`.
+        """
+        if dt is None:
+            self.uvmopts.dt = ct.c_double(self.options["dt"])
+        else:
+            self.uvmopts.dt = ct.c_double(dt)
+        self.uvmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
+        self.uvmopts.convect_wake = ct.c_bool(convect_wake)
+        self.update_flight_conditions(ts_info)
+        self.update_rbm_vel(struct_ts_info)
+        self.i_iter.value = int(i_iter)
+
+        ts_info.generate_ctypes_pointers()
+        self.run_UVLM(ct.byref(self.uvmopts),
+                      ct.byref(self.flightconditions),
+                      ts_info.ct_p_dimensions,
+                      ts_info.ct_p_dimensions_star,
+                      ct.byref(self.i_iter),
+                      ts_info.ct_p_u_ext,
+                      ts_info.ct_p_u_ext_star,
+                      ts_info.ct_p_zeta,
+                      ts_info.ct_p_zeta_star,
+                      ts_info.ct_p_zeta_dot,
+                      self.p_rbm_vel,
+                      self.get_settings_pointer('centre_rot'),
+                      ts_info.ct_p_gamma,
+                      ts_info.ct_p_gamma_star,
+                      ts_info.ct_p_dist_to_orig,
+                      ts_info.ct_p_normals,
+                      ts_info.ct_p_forces,
+                      ts_info.ct_p_dynamic_forces)
+        ts_info.remove_ctypes_pointers()
+
+    def calculate_unsteady_forces(self, ts_info, struct_ts_info, convect_wake=True, dt=None):
+        """
+        Unsteady (added mass) forces of the aerodynamic time step ``ts_info``.
+        See :func:`uvlm_calculate_unsteady_forces`.
+        """
+        if dt is None:
+            self.uvmopts_unsteady_forces.dt = ct.c_double(self.options["dt"])
+        else:
+            self.uvmopts_unsteady_forces.dt = ct.c_double(dt)
+        self.uvmopts_unsteady_forces.NumSurfaces = ct.c_uint(ts_info.n_surf)
+        self.uvmopts_unsteady_forces.convect_wake = ct.c_bool(convect_wake)
+        self.update_flight_conditions(ts_info)
+        self.update_rbm_vel(struct_ts_info)
+
+        for i_surf in range(ts_info.n_surf):
+            ts_info.dynamic_forces[i_surf].fill(0.0)
+
+        ts_info.generate_ctypes_pointers()
+        self.calculate_unsteady_forces_function(ct.byref(self.uvmopts_unsteady_forces),
+                                                ct.byref(self.flightconditions),
+                                                ts_info.ct_p_dimensions,
+                                                ts_info.ct_p_dimensions_star,
+                                                ts_info.ct_p_zeta,
+                                                ts_info.ct_p_zeta_star,
+                                                self.p_rbm_vel,
+                                                ts_info.ct_p_gamma,
+                                                ts_info.ct_p_gamma_star,
+                                                ts_info.ct_p_gamma_dot,
+                                                ts_info.ct_p_normals,
+                                                ts_info.ct_p_dynamic_forces)
+        ts_info.remove_ctypes_pointers()
+
+
+def vlm_solver(ts_info, options, session=None):
+    """
+    Steady VLM solution of the aerodynamic time step ``ts_info``.
 
-    ts_info.generate_ctypes_pointers()
-    run_VLM(ct.byref(vmopts),
-            ct.byref(flightconditions),
-            ts_info.ct_p_dimensions,
-            ts_info.ct_p_dimensions_star,
-            ts_info.ct_p_zeta,
-            ts_info.ct_p_zeta_star,
-            ts_info.ct_p_zeta_dot,
-            ts_info.ct_p_u_ext,
-            ts_info.ct_p_gamma,
-            ts_info.ct_p_gamma_star,
-            ts_info.ct_p_forces,
-            p_rbm_vel_g,
-            p_centre_rot_g)
-    ts_info.remove_ctypes_pointers()
+    Args:
+        ts_info (AeroTimeStepInfo): Aerodynamic time step.
+        options (dict): Settings of the aerodynamic solver.
+        session (UvlmSession): Persistent state of the calling solver. A temporary one is created if not given.
+    """
+    if session is None:
+        session = UvlmSession(options, steady=True)
+    session.vlm_solver(ts_info)
 
 
 def uvlm_init(ts_info, options):
@@ -236,121 +424,45 @@ def uvlm_init(ts_info, options):
     ts_info.remove_ctypes_pointers()
 
 
-def uvlm_solver(i_iter, ts_info, struct_ts_info, options, convect_wake=True, dt=None):
-    run_UVLM = UvlmLib.run_UVLM
-    run_UVLM.restype = None
-
-    uvmopts = UVMopts()
-    if dt is None:
-        uvmopts.dt = ct.c_double(options["dt"])
-    else:
-        uvmopts.dt = ct.c_double(dt)
-    uvmopts.NumCores = ct.c_uint(options["num_cores"])
-    uvmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
-    uvmopts.ImageMethod = ct.c_bool(False)
-    uvmopts.convection_scheme = ct.c_uint(options["convection_scheme"])
-    uvmopts.iterative_solver = ct.c_bool(options['iterative_solver'])
-    uvmopts.iterative_tol = ct.c_double(options['iterative_tol'])
-    uvmopts.iterative_precond = ct.c_bool(options['iterative_precond'])
-    uvmopts.convect_wake = ct.c_bool(convect_wake)
-    uvmopts.cfl1 = ct.c_bool(options['cfl1'])
-    uvmopts.vortex_radius = ct.c_double(options['vortex_radius'])
-    uvmopts.vortex_radius_wake_ind = ct.c_double(options['vortex_radius_wake_ind'])
-    uvmopts.interp_coords = ct.c_uint(options["interp_coords"])
-    uvmopts.filter_method = ct.c_uint(options["filter_method"])
-    uvmopts.interp_method = ct.c_uint(options["interp_method"])
-    uvmopts.yaw_slerp = ct.c_double(options["yaw_slerp"])
-    uvmopts.quasi_steady = ct.c_bool(options['quasi_steady'])
-
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    # direction = np.array([1.0, 0, 0])
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
-    # flightconditions.uinf_direction = np.ctypeslib.as_ctypes(direction)
-
-    rbm_vel = struct_ts_info.for_vel.copy()
-    rbm_vel[0:3] = np.dot(struct_ts_info.cga(), rbm_vel[0:3])
-    rbm_vel[3:6] = np.dot(struct_ts_info.cga(), rbm_vel[3:6])
-    p_rbm_vel = rbm_vel.ctypes.data_as(ct.POINTER(ct.c_double))
-    p_centre_rot = options['centre_rot'].ctypes.data_as(ct.POINTER(ct.c_double))
+def uvlm_solver(i_iter, ts_info, struct_ts_info, options, convect_wake=True, dt=None, session=None):
+    """
+    Unsteady UVLM solution of the aerodynamic time step ``ts_info``.
 
-    i = ct.c_uint(i_iter)
-    ts_info.generate_ctypes_pointers()
-    # previous_ts_info.generate_ctypes_pointers()
-    run_UVLM(ct.byref(uvmopts),
-             ct.byref(flightconditions),
-             ts_info.ct_p_dimensions,
-             ts_info.ct_p_dimensions_star,
-             ct.byref(i),
-             ts_info.ct_p_u_ext,
-             ts_info.ct_p_u_ext_star,
-             ts_info.ct_p_zeta,
-             ts_info.ct_p_zeta_star,
-             ts_info.ct_p_zeta_dot,
-             p_rbm_vel,
-             p_centre_rot,
-             ts_info.ct_p_gamma,
-             ts_info.ct_p_gamma_star,
-             ts_info.ct_p_dist_to_orig,
-             # previous_ts_info.ct_p_gamma,
-             ts_info.ct_p_normals,
-             ts_info.ct_p_forces,
-             ts_info.ct_p_dynamic_forces)
-    ts_info.remove_ctypes_pointers()
-    # previous_ts_info.remove_ctypes_pointers()
+    Args:
+        i_iter (int): Time step number.
+        ts_info (AeroTimeStepInfo): Aerodynamic time step.
+        struct_ts_info (StructTimeStepInfo): Structural time step, for the rigid body velocity.
+        options (dict): Settings of the aerodynamic solver.
+        convect_wake (bool): Convect the wake.
+        dt (float): Time step. If ``None``, ``options['dt']`` is used.
+        session (UvlmSession): Persistent state of the calling solver. A temporary one is created if not given.
+    """
+    if session is None:
+        session = UvlmSession(options)
+    session.uvlm_solver(i_iter, ts_info, struct_ts_info, convect_wake=convect_wake, dt=dt)
 
 
 def uvlm_calculate_unsteady_forces(ts_info,
                                    struct_ts_info,
                                    options,
                                    convect_wake=True,
-                                   dt=None):
-    calculate_unsteady_forces = UvlmLib.calculate_unsteady_forces
-    calculate_unsteady_forces.restype = None
-
-    uvmopts = UVMopts()
-    if dt is None:
-        uvmopts.dt = ct.c_double(options["dt"])
-    else:
-        uvmopts.dt = ct.c_double(dt)
-    uvmopts.NumCores = ct.c_uint(options["num_cores"])
-    uvmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
-    uvmopts.ImageMethod = ct.c_bool(False)
-    uvmopts.convection_scheme = ct.c_uint(options["convection_scheme"])
-    uvmopts.iterative_solver = ct.c_bool(options['iterative_solver'])
-    uvmopts.iterative_tol = ct.c_double(options['iterative_tol'])
-    uvmopts.iterative_precond = ct.c_bool(options['iterative_precond'])
-    uvmopts.convect_wake = ct.c_bool(convect_wake)
-    uvmopts.vortex_radius = ct.c_double(options['vortex_radius'])
-
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
-
-    rbm_vel = struct_ts_info.for_vel.copy()
-    rbm_vel[0:3] = np.dot(struct_ts_info.cga(), rbm_vel[0:3])
-    rbm_vel[3:6] = np.dot(struct_ts_info.cga(), rbm_vel[3:6])
-    p_rbm_vel = rbm_vel.ctypes.data_as(ct.POINTER(ct.c_double))
-
-    for i_surf in range(ts_info.n_surf):
-        ts_info.dynamic_forces[i_surf].fill(0.0)
+                                   dt=None,
+                                   session=None):
+    """
+    Computes the unsteady (added mass) contribution to the aerodynamic forces, stored in
+    ``ts_info.dynamic_forces``.
 
-    ts_info.generate_ctypes_pointers()
-    calculate_unsteady_forces(ct.byref(uvmopts),
-                              ct.byref(flightconditions),
-                              ts_info.ct_p_dimensions,
-                              ts_info.ct_p_dimensions_star,
-                              ts_info.ct_p_zeta,
-                              ts_info.ct_p_zeta_star,
-                              p_rbm_vel,
-                              ts_info.ct_p_gamma,
-                              ts_info.ct_p_gamma_star,
-                              ts_info.ct_p_gamma_dot,
-                              ts_info.ct_p_normals,
-                              ts_info.ct_p_dynamic_forces)
-    ts_info.remove_ctypes_pointers()
+    Args:
+        ts_info (AeroTimeStepInfo): Aerodynamic time step.
+        struct_ts_info (StructTimeStepInfo): Structural time step, for the rigid body velocity.
+        options (dict): Settings of the aerodynamic solver.
+        convect_wake (bool): Convect the wake.
+        dt (float): Time step. If ``None``, ``options['dt']`` is used.
+        session (UvlmSession): Persistent state of the calling solver. A temporary one is created if not given.
+    """
+    if session is None:
+        session = UvlmSession(options)
+    session.calculate_unsteady_forces(ts_info, struct_ts_info, convect_wake=convect_wake, dt=dt)
 
 
 def uvlm_calculate_incidence_angle(ts_info,
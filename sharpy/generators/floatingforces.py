@@ -4,7 +4,8 @@ import ctypes as ct
 import os
 from scipy import fft, ifft
 from scipy.interpolate import interp1d
-from control import forced_response, TransferFunction
+from scipy.linalg import expm
+from control import TransferFunction, tf2ss
 
 import sharpy.utils.cout_utils as cout
 import sharpy.utils.generator_interface as generator_interface
@@ -167,6 +168,26 @@ def wave_radiation_damping(K, qdot, it, dt):
     return np.dot(K, qdot_int)
 
 
+def discretise_first_order_hold(A, B, dt):
+    """
+    Discretise the continuous system x' = Ax + Bu assuming that the input varies linearly
+    along the time step (first order hold), as done by ``control.forced_response``:
+    x[n+1] = Ad x[n] + Bd [u[n], u[n+1]]
+    """
+    nstates = A.shape[0]
+    ninputs = B.shape[1]
+    M = np.zeros((nstates + 2*ninputs, nstates + 2*ninputs))
+    M[:nstates, :nstates] = A*dt
+    M[:nstates, nstates:nstates + ninputs] = B*dt
+    M[nstates:nstates + ninputs, nstates + ninputs:] = np.eye(ninputs)
+    expM = expm(M)
+
+    Ad = expM[:nstates, :nstates]
+    Bd1 = expM[:nstates, nstates + ninputs:]
+    Bd0 = expM[:nstates, nstates:nstates + ninputs] - Bd1
+    return Ad, np.concatenate((Bd0, Bd1), axis=1)
+
+
 def change_of_to_sharpy(matrix_of):
     """
     Change between frame of reference of OpenFAST and the
@@ -205,43 +226,91 @@ def matrix_from_rf(dict_rf, w):
     return H
 
 
-def response_freq_dep_matrix(H, omega_H, q, it_, dt):
+def freq_dep_matrix_values(H, omega_H, omega):
     """
-    Compute the frequency response of a system with a transfer function depending on the frequency
-    F(t) = H(omega) * q(t)
-    """
-    it = it_ + 1
-    omega_fft = np.linspace(0, 1/(2*dt), it//2)[:it//2]
-    fourier_q = fft(q[:it, :], axis=0)
-    fourier_f = np.zeros_like(fourier_q)
-
-    ndof = q.shape[1]
-    f = np.zeros((ndof))
+    Evaluate a frequency-dependent matrix at the frequencies omega
 
-    # Compute the constant component
+    H is either an array of matrices at the frequencies omega_H or a dictionary of rational functions
+    """
     if type(H) is np.ndarray:
-        interp_H = interp1d(omega_H, H, axis=0)
-        H_omega = interp_H(omega_fft[0])
-    elif type(H) is tuple:
-        H_omega = matrix_from_rf(H, omega_fft[0])
+        interp_H = interp1d(omega_H, H, axis=0, bounds_error=False, fill_value=(H[0, ...], H[-1, ...]))
+        return interp_H(omega)
+    elif type(H) is dict:
+        H_omega = np.zeros((len(omega), 6, 6))
+        for i in range(6):
+            for j in range(6):
+                pos = "%d_%d" % (i, j)
+                H_omega[:, i, j] = rfval(H[pos]['num'], H[pos]['den'], omega)
+        return H_omega
     else:
         cout.cout_wrap(("ERROR: Not implemented response_freq_dep_matrix for type(H) %s" % type(H)), 4)
-    fourier_f[0, :] = np.dot(H_omega, fourier_q[0, :])
 
-    # Compute the rest of the terms
-    for iomega in range(1, omega_fft.shape[0]):
-        # Interpolate H at omega
-        if type(H) is np.ndarray:
-            H_omega = interp_H(omega_fft[iomega])
-        elif type(H) is dict:
-            H_omega = matrix_from_rf(H, omega_fft[iomega])
-        fourier_f[iomega, :] = np.dot(H_omega, fourier_q[iomega, :])
-        fourier_f[-iomega, :] = np.dot(H_omega, fourier_q[-iomega, :])
 
-    # Compute the inverse Fourier tranform
-    f[:] = np.real(ifft(fourier_f, axis=0)[it_, :])
+def impulse_response_freq_dep_matrix(H, omega_H, n, dt, kernel_length=None, tol=0.):
+    """
+    Compute the discrete impulse response of a transfer function depending on the frequency
+    for a history of n time steps
+
+    The response at time step it is then:
+    F[it] = sum_k h[k] * q[it - k]
+
+    The impulse response is truncated to ``kernel_length`` samples or, if ``tol`` is given, to the length
+    computed by ``impulse_response_length``. The truncated kernel gives a cost per time step that does not
+    depend on n.
+    """
+    omega_fft = np.linspace(0, 1/(2*dt), n//2)[:n//2]
+
+    H_omega = freq_dep_matrix_values(H, omega_H, omega_fft)
+    H_fft = np.zeros((n,) + H_omega.shape[1:])
+    H_fft[:n//2, :, :] = H_omega
+    # Negative frequencies
+    H_fft[n - np.arange(1, n//2), :, :] = H_omega[1:, :, :]
+
+    h = np.real(ifft(H_fft, axis=0))
+    if kernel_length is None and tol:
+        kernel_length = impulse_response_length(h, tol)
+    if kernel_length is not None:
+        h = h[:kernel_length, :, :]
+    return h
+
+
+def impulse_response_length(h, tol):
+    """
+    Number of samples of the impulse response h to keep such that the samples dropped from the first half of h
+    add up to at most ``tol`` times the sum of that half, with the magnitude of each sample given by its largest
+    entry. The second half of h corresponds to negative times and is always dropped, it only couples with the
+    beginning of the history
+    """
+    magnitude = np.max(np.abs(h[:(h.shape[0] + 1)//2, ...]), axis=(1, 2))
+    # tail[k] = sum of the magnitudes from k to the end
+    tail = np.cumsum(magnitude[::-1])[::-1]
+    return max(1, int(np.count_nonzero(tail > tol*tail[0])))
+
+
+def response_impulse_response(h, q, it):
+    """
+    Compute the response at time step it of a system with discrete impulse response h
+    to the history q. The impulse response is truncated to its length, so the cost
+    does not depend on the length of the history
+    F[it] = sum_k h[k] * q[it - k]
+    """
+    nk = min(it + 1, h.shape[0])
+    return np.tensordot(h[:nk, :, :], q[it - nk + 1:it + 1, :][::-1, :], axes=([0, 2], [0, 1]))
+
+
+def response_freq_dep_matrix(H, omega_H, q, it_, dt, h=None):
+    """
+    Compute the frequency response of a system with a transfer function depending on the frequency
+    F(t) = H(omega) * q(t)
 
-    return f
+    If the impulse response h is not given, it is computed from the whole history of q, so the cost of each call
+    grows with the time step. For long simulations, compute h once with ``impulse_response_freq_dep_matrix`` for
+    the total number of time steps and a truncation tolerance, as ``FloatingForces`` does with
+    ``method_matrices_freq = impulse_response``
+    """
+    if h is None:
+        h = impulse_response_freq_dep_matrix(H, omega_H, it_ + 1, dt)
+    return response_impulse_response(h, q, it_)
 
 
 def compute_equiv_hd_added_mass(f, q):
@@ -402,8 +471,18 @@ class FloatingForces(generator_interface.BaseGenerator):
 
     settings_types['method_matrices_freq'] = 'str'
     settings_default['method_matrices_freq'] = 'constant'
-    settings_description['method_matrices_freq'] = 'Method to compute frequency-dependent matrices'
-    settings_options['method_matrices_freq'] = ['constant', 'rational_function']
+    settings_description['method_matrices_freq'] = 'Method to compute frequency-dependent matrices. ' \
+                                                   '``impulse_response`` convolves the platform velocities and ' \
+                                                   'accelerations with the impulse responses of the damping and ' \
+                                                   'added mass matrices, computed at initialisation'
+    settings_options['method_matrices_freq'] = ['constant', 'rational_function', 'impulse_response']
+
+    settings_types['impulse_response_tol'] = 'float'
+    settings_default['impulse_response_tol'] = 1e-3
+    settings_description['impulse_response_tol'] = 'Relative tolerance to truncate the impulse responses with ' \
+                                                   '``method_matrices_freq``=``impulse_response``. The cost of ' \
+                                                   'each time step is proportional to the length of the ' \
+                                                   'truncated impulse responses'
 
     settings_types['matrices_freq'] = 'float'
     settings_default['matrices_freq'] = 4.8 # Close to the upper limit defined in the oc3 report
@@ -490,6 +569,14 @@ class FloatingForces(generator_interface.BaseGenerator):
         self.log_filename = None
         self.added_mass_in_mass_matrix = None
 
+        self.hd_K_Ad = None
+        self.hd_K_Bd = None
+        self.hd_K_C = None
+        self.hd_K_D = None
+
+        self.hd_damping_h = None
+        self.hd_added_mass_h = None
+
 
     def initialise(self, in_dict=None, data=None, restart=False):
         self.in_dict = in_dict
@@ -560,7 +647,7 @@ class FloatingForces(generator_interface.BaseGenerator):
                                axis=0)
             self.hd_damping_const = interp_d(self.settings['matrices_freq'])
 
-        elif self.settings['method_matrices_freq'] == 'rational_function':
+        elif self.settings['method_matrices_freq'] in ['rational_function', 'impulse_response']:
             self.hd_added_mass_const = self.floating_data['hydrodynamics']['added_mass_matrix'][-1, :, :]
             self.hd_damping_const = self.floating_data['hydrodynamics']['damping_matrix'][-1, :, :]
 
@@ -594,12 +681,35 @@ class FloatingForces(generator_interface.BaseGenerator):
             self.hd_K = TransferFunction(hd_K_num, hd_K_den)
             self.ab_freq_rads = self.floating_data['hydrodynamics']['ab_freq_rads']
 
+            # Discrete-time state space realisation to advance the states one time step
+            hd_K_ss = tf2ss(self.hd_K)
+            self.hd_K_Ad, self.hd_K_Bd = discretise_first_order_hold(hd_K_ss.A, hd_K_ss.B, self.settings['dt'])
+            self.hd_K_C = hd_K_ss.C
+            self.hd_K_D = hd_K_ss.D
+
             if restart:
                 self.x0_K.extend([None]*increase_ts)
             else:
                 self.x0_K = [None]*(self.settings['n_time_steps'] + 1)
                 self.x0_K[0] = 0.
 
+        elif self.settings['method_matrices_freq'] == 'impulse_response':
+            # Truncated impulse responses for the whole simulation, the added mass at the highest frequency is
+            # included in hd_added_mass_const
+            hydrodynamics = self.floating_data['hydrodynamics']
+            n_steps = self.settings['n_time_steps'] + 1
+            self.hd_damping_h = impulse_response_freq_dep_matrix(hydrodynamics['damping_matrix'],
+                                                                 hydrodynamics['ab_freq_rads'],
+                                                                 n_steps,
+                                                                 self.settings['dt'],
+                                                                 tol=self.settings['impulse_response_tol'])
+            self.hd_added_mass_h = impulse_response_freq_dep_matrix(hydrodynamics['added_mass_matrix'] -
+                                                                    self.hd_added_mass_const,
+                                                                    hydrodynamics['ab_freq_rads'],
+                                                                    n_steps,
+                                                                    self.settings['dt'],
+                                                                    tol=self.settings['impulse_response_tol'])
+
 
         # Wave forces
         self.wave_forces_node = self.floating_data['wave_forces']['node']
@@ -848,15 +958,18 @@ class FloatingForces(generator_interface.BaseGenerator):
 
         elif self.settings['method_matrices_freq'] == 'rational_function':
             # Damping
-            (T, yout, xout) = forced_response(self.hd_K,
-                                              T=[0, self.settings['dt']],
-                                              U=self.qdot[data.ts-1:data.ts+1, :].T,
-                                              X0=self.x0_K[data.ts-1])
-                                              # transpose=True)
-            self.x0_K[data.ts] = xout[:, 1]
-            hd_f_qdot_g -= yout[:, 1]
+            x0 = self.x0_K[data.ts-1]
+            if x0 is None or np.isscalar(x0):
+                x0 = np.zeros((self.hd_K_Ad.shape[0]))
+            x = np.dot(self.hd_K_Ad, x0) + np.dot(self.hd_K_Bd, self.qdot[data.ts-1:data.ts+1, :].reshape(-1))
+            self.x0_K[data.ts] = x
+            hd_f_qdot_g -= np.dot(self.hd_K_C, x) + np.dot(self.hd_K_D, self.qdot[data.ts, :])
             hd_f_qdotdot_g = np.zeros((6))
 
+        elif self.settings['method_matrices_freq'] == 'impulse_response':
+            hd_f_qdot_g -= response_impulse_response(self.hd_damping_h, self.qdot, data.ts)
+            hd_f_qdotdot_g = -response_impulse_response(self.hd_added_mass_h, self.qdotdot, data.ts)
+
         else:
             cout.cout_wrap(("ERROR: Unknown method_matrices_freq %s" % self.settings['method_matrices_freq']), 4)
 
@@ -3,7 +3,9 @@
 These generators are used to create a gust velocity field. :class:`.GustVelocityField` is the main class that should be
 parsed as the ``velocity_field_input`` to the desired aerodynamic solver.
 
-The remaining classes are the specific gust profiles and parsed as ``gust_shape``.
+The remaining classes are the specific gust profiles and parsed as ``gust_shape``. Their ``gust_shape`` method takes
+the coordinates ``x``, ``y`` and ``z`` either as scalars or as arrays of the same shape, and returns the gust velocity
+with shape ``(3,) + np.shape(x)``.
 
 Examples:
     The typical input to the aerodynamic solver settings would therefore read similar to:
@@ -105,11 +107,13 @@ class one_minus_cos(BaseGust):
         gust_length = self.settings['gust_length']
         gust_intensity = self.settings['gust_intensity']
 
-        vel = np.zeros((3,))
-        if x > 0.0 or x < -gust_length:
-            return vel
-
-        vel[self.settings['gust_component']] = (1.0 - np.cos(2.0 * np.pi * x / gust_length)) * gust_intensity * 0.5
+        x = np.asarray(x, dtype=float)
+        vel = np.zeros((3,) + x.shape)
+        in_gust = (x <= 0.0) & (x >= -gust_length)
+        vel[self.settings['gust_component']] = np.where(
+            in_gust,
+            (1.0 - np.cos(2.0 * np.pi * x / gust_length)) * gust_intensity * 0.5,
+            0.)
         return vel
 
 
@@ -157,12 +161,14 @@ class DARPA(BaseGust):
         gust_intensity = self.settings['gust_intensity']
         span = self.settings['span']
 
-        vel = np.zeros((3,))
-        if x > 0.0 or x < -gust_length:
-            return vel
-
-        vel[self.settings['gust_component']] = (1.0 - np.cos(2.0 * np.pi * x / gust_length)) * gust_intensity * 0.5
-        vel[self.settings['gust_component']] *= -np.cos(y / span * np.pi)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        vel = np.zeros((3,) + x.shape)
+        in_gust = (x <= 0.0) & (x >= -gust_length)
+        vel[self.settings['gust_component']] = np.where(
+            in_gust,
+            (1.0 - np.cos(2.0 * np.pi * x / gust_length)) * gust_intensity * 0.5 * -np.cos(y / span * np.pi),
+            0.)
         return vel
 
 
@@ -205,11 +211,11 @@ class continuous_sin(BaseGust):
         gust_length = self.settings['gust_length']
         gust_intensity = self.settings['gust_intensity']
 
-        vel = np.zeros((3,))
-        if x > 0.0:
-            return vel
-
-        vel[self.settings['gust_component']] = 0.5 * gust_intensity * np.sin(2 * np.pi * x / gust_length)
+        x = np.asarray(x, dtype=float)
+        vel = np.zeros((3,) + x.shape)
+        vel[self.settings['gust_component']] = np.where(x <= 0.0,
+                                                        0.5 * gust_intensity * np.sin(2 * np.pi * x / gust_length),
+                                                        0.)
         return vel
 
 
@@ -257,7 +263,7 @@ class time_varying_global(BaseGust):
                                                                             bounds_error=False,fill_value="extrapolate"))
 
     def gust_shape(self, x, y, z, time=0):
-        vel = np.zeros((3,))
+        vel = np.zeros((3,) + np.shape(x))
         for counter, idim in enumerate(self.settings['gust_component']):
             vel[idim] = self.list_interpolated_velocity_field_functions[counter](time)
         return vel
@@ -280,11 +286,13 @@ class time_varying(time_varying_global):
                                                                             bounds_error=False,fill_value="extrapolate"))
 
     def gust_shape(self, x, y, z, time=0):
-        vel = np.zeros((3,))
-        d = np.dot(np.array([x, y, z]), self.u_inf_direction)
-        if d <= 0.0:       
-            for counter, idim in enumerate(self.settings['gust_component']):
-                vel[idim] = self.list_interpolated_velocity_field_functions[counter](d)
+        d = (np.multiply(x, self.u_inf_direction[0])
+             + np.multiply(y, self.u_inf_direction[1])
+             + np.multiply(z, self.u_inf_direction[2]))
+        vel = np.zeros((3,) + d.shape)
+        in_gust = d <= 0.0
+        for counter, idim in enumerate(self.settings['gust_component']):
+            vel[idim] = np.where(in_gust, self.list_interpolated_velocity_field_functions[counter](d), 0.)
         return vel
        
 @gust
@@ -334,14 +342,14 @@ class span_sine(BaseGust):
             self.settings['span_with_gust'] = self.settings['span']
 
     def gust_shape(self, x, y, z, time=0):
-        d = np.dot(np.array([x, y, z]), self.settings['span_dir'])
-        if np.abs(d) <= self.settings['span_with_gust'] / 2:
-            vel = 0.5 * self.settings['gust_intensity'] * np.sin(
-                d * 2. * np.pi / (self.settings['span'] / self.settings['periods_per_span']))
-        else:
-            vel = np.zeros((3,))
+        span_dir = self.settings['span_dir']
+        d = np.multiply(x, span_dir[0]) + np.multiply(y, span_dir[1]) + np.multiply(z, span_dir[2])
+        vel = np.where(np.abs(d) <= self.settings['span_with_gust'] / 2,
+                       0.5 * self.settings['gust_intensity'] * np.sin(
+                           d * 2. * np.pi / (self.settings['span'] / self.settings['periods_per_span'])),
+                       0.)
 
-        return vel * self.settings['perturbation_dir']
+        return np.multiply.outer(self.settings['perturbation_dir'], vel)
 
 
 @generator_interface.generator
@@ -441,21 +449,26 @@ class GustVelocityField(generator_interface.BaseGenerator):
 
         for_pos = params['for_pos'][0:3]
 
+        total_offset_val = self.settings['offset']
+        if self.settings['relative_motion']:
+            total_offset_val -= self.settings['u_inf'] * t
+        total_offset = total_offset_val * self.settings['u_inf_direction'] + for_pos
+
+        # the gust shape is evaluated at the vertices of all the surfaces at once
+        n_vertices = [zeta[i_surf][0].size for i_surf in range(len(zeta))]
+        coords = np.concatenate([zeta[i_surf].reshape(3, -1) for i_surf in range(len(zeta))], axis=1)
+        vel = self.gust.gust_shape(coords[0] + total_offset[0],
+                                   coords[1] + total_offset[1],
+                                   coords[2] + total_offset[2],
+                                   t)
+
+        i_vertex = 0
         for i_surf in range(len(zeta)):
             if override:
                 uext[i_surf].fill(0.0)
 
-            for i in range(zeta[i_surf].shape[1]):
-                for j in range(zeta[i_surf].shape[2]):
-                    total_offset_val = self.settings['offset']
-                    if self.settings['relative_motion']:
-                        uext[i_surf][:, i, j] += self.settings['u_inf'] * self.settings['u_inf_direction']
-                        total_offset_val -= self.settings['u_inf'] * t
-
-                    total_offset = total_offset_val * self.settings['u_inf_direction'] + for_pos
-                    uext[i_surf][:, i, j] += self.gust.gust_shape(
-                        zeta[i_surf][0, i, j] + total_offset[0],
-                        zeta[i_surf][1, i, j] + total_offset[1],
-                        zeta[i_surf][2, i, j] + total_offset[2],
-                        t
-                    )
+            if self.settings['relative_motion']:
+                uext[i_surf] += (self.settings['u_inf'] * self.settings['u_inf_direction'])[:, None, None]
+
+            uext[i_surf] += vel[:, i_vertex:i_vertex + n_vertices[i_surf]].reshape(zeta[i_surf].shape)
+            i_vertex += n_vertices[i_surf]
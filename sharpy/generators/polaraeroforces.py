@@ -3,7 +3,7 @@ import os
 import sharpy.utils.generator_interface as generator_interface
 import sharpy.utils.settings as settings
 import sharpy.utils.algebra as algebra
-from sharpy.aero.utils.utils import magnitude_and_direction_of_relative_velocity, local_stability_axes, span_chord
+from sharpy.aero.utils.utils import local_stability_axes_vec, span_chord, span_chord_vec, unit_vector_vec
 from sharpy.utils.generate_cases import get_aoacl0_from_camber
 
 
@@ -111,6 +111,16 @@ class PolarCorrection(generator_interface.BaseGenerator):
         self.n_node = None
         self.flag_node_shared_by_multiple_surfaces = None
 
+        # structural nodes whose forces are corrected and their element, airfoil and aerodynamic surface and node
+        self.corrected_nodes = None
+        self.corrected_elem = None
+        self.corrected_node_in_elem = None
+        self.corrected_airfoil = None
+        self.corrected_surf = None
+        self.corrected_i_n = None
+        # other surfaces sharing the corrected nodes: index in corrected_nodes, surface and node
+        self.shared_surf_entries = None
+
     def initialise(self, in_dict, **kwargs):
         self.settings = in_dict
         settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
@@ -129,6 +139,7 @@ class PolarCorrection(generator_interface.BaseGenerator):
             self.compute_aoa_cl0_from_airfoil_data(self.aero)
 
         self.check_for_special_cases(self.aero)
+        self.get_corrected_nodes(self.aero)
 
 
     def generate(self, **params):
@@ -148,132 +159,136 @@ class PolarCorrection(generator_interface.BaseGenerator):
         ts = params['ts']
 
         aerogrid = self.aero
-        structure = self.structure
         rho = self.rho
         correct_lift = self.settings['correct_lift']
         moment_from_polar = self.settings['moment_from_polar']
         
         list_aoa_induced = []
 
-        aero_dict = aerogrid.aero_dict
         if aerogrid.polars is None:
             return struct_forces
-        new_struct_forces = np.zeros_like(struct_forces)
+        new_struct_forces = struct_forces.copy()
 
-        nnode = struct_forces.shape[0]
+        nodes = self.corrected_nodes
+        n_corr = len(nodes)
+        if n_corr == 0:
+            return new_struct_forces
 
-        # Compute induced velocities at the structural points
         cga = algebra.quat2rotation(structural_kstep.quat)
-        pos_g = np.array([cga.dot(structural_kstep.pos[inode]) + np.array([0, 0, 0]) for inode in range(nnode)])
-
-        for inode in range(nnode):
-            new_struct_forces[inode, :] = struct_forces[inode, :].copy()
-            if aero_dict['aero_node'][inode]:
-                ielem, inode_in_elem = structure.node_master_elem[inode]
-                iairfoil = aero_dict['airfoil_distribution'][ielem, inode_in_elem]
-                isurf = aerogrid.struct2aero_mapping[inode][0]['i_surf']
-                if isurf not in self.settings['skip_surfaces']:
-                    i_n = aerogrid.struct2aero_mapping[inode][0]['i_n']
-                    polar = aerogrid.polars[iairfoil]
-                    cab = algebra.crv2rotation(structural_kstep.psi[ielem, inode_in_elem, :])
-                    cgb = np.dot(cga, cab)
-
-                    if not self.cd_from_cl:
-                        airfoil = str(aero_dict['airfoil_distribution'][ielem, inode_in_elem])
-                        aoa_0cl = self.list_aoa_cl0[int(airfoil)]
-
-                    # computing surface area of panels contributing to force
-                    dir_span, span, dir_chord, chord = span_chord(i_n, aero_kstep.zeta[isurf])
-                    area = span * chord
-                    area = self.correct_surface_area(inode, aerogrid.struct2aero_mapping, aero_kstep.zeta, area)
-               
-                    # Define the relative velocity and its direction
-                    urel, dir_urel = magnitude_and_direction_of_relative_velocity(structural_kstep.pos[inode, :],
-                                                                                structural_kstep.pos_dot[inode, :],
-                                                                                structural_kstep.for_vel[:],
-                                                                                cga,
-                                                                                aero_kstep.u_ext[isurf][:, :, i_n],
-                                                                                self.settings['add_rotation'],
-                                                                                self.settings['rot_vel_g'],
-                                                                                self.settings['centre_rot_g'],)
-                    # Coefficient to change from aerodynamic coefficients to forces (and viceversa)
-                    coef = 0.5 * rho * np.linalg.norm(urel) ** 2 * area
-                    # Stability axes - projects forces in B onto S
-                    c_bs = local_stability_axes(cgb.T.dot(dir_urel), cgb.T.dot(dir_chord))
-                    forces_s = c_bs.T.dot(struct_forces[inode, :3])
-                    moment_s = c_bs.T.dot(struct_forces[inode, 3:])
-                    drag_force = forces_s[0]
-                    lift_force = forces_s[2]
-                    # Compute the associated lift
-                    cl = np.sign(lift_force) * np.linalg.norm(lift_force) / coef
-                    cd_sharpy = np.linalg.norm(drag_force) / coef
-
-                    if self.cd_from_cl:
-                        # Compute the drag from the UVLM computed lift
-                        cd, cm = polar.get_cdcm_from_cl(cl)
-
-                    else:
-                        """
-                        Compute L, D, M from polar depending on:
-                        ii) Compute the effective angle of attack from potential flow theory or specified it as setting
-                        input. The local lift curve slope is 2pi and the zero-lift angle of attack is given by thin 
-                        airfoil theory or specified it as setting input. From this, the effective angle of attack is 
-                        computed for the section and includes 3D effects.
-                        """
-                        aoa = cl / 2 / np.pi + aoa_0cl 
-                        list_aoa_induced.append(aoa)
-                        # Compute the coefficients associated to that angle of attack
-                        cl_polar, cd, cm = polar.get_coefs(aoa)
-                        
-                        if correct_lift:
-                            # Use polar generated CL rather than UVLM computed CL
-                            cl = cl_polar
-
-                    # Recompute the forces based on the coefficients (side force is uncorrected)
-                    forces_s[0] += cd * coef  # add viscous drag to induced drag from UVLM
-                    forces_s[2] = cl * coef
-
-                    new_struct_forces[inode, 0:3] = c_bs.dot(forces_s)
-
-                    # Pitching moment
-                    # The panels are shifted by 0.25 of a panel aft from the leading edge
-                    panel_shift = 0.25 * (aero_kstep.zeta[isurf][:, 1, i_n] - aero_kstep.zeta[isurf][:, 0, i_n])
-                    ref_point = aero_kstep.zeta[isurf][:, 0, i_n] + 0.25 * chord * dir_chord - panel_shift
-
-                    # viscous contribution (pure moment)
-                    moment_s[1] += cm * coef * chord
-
-                    # moment due to drag
-                    arm = cgb.T.dot(ref_point - pos_g[inode])  # in B frame
-                    moment_polar_drag = algebra.cross3(c_bs.T.dot(arm), cd * dir_urel * coef)  # in S frame
-                    moment_s += moment_polar_drag
-
-                    # Pitching moment
-                    if moment_from_polar:
-                        # The panels are shifted by 0.25 of a panel aft from the leading edge
-                        panel_shift = 0.25 * (aero_kstep.zeta[isurf][:, 1, i_n] - aero_kstep.zeta[isurf][:, 0, i_n])
-                        ref_point = aero_kstep.zeta[isurf][:, 0, i_n] + 0.25 * chord * dir_chord - panel_shift
-                        new_struct_forces[inode, 3:6] = c_bs.dot(moment_s)
-
-                        # viscous contribution (pure moment)
-                        moment_s[1] += cm * coef * chord
-
-
-                        # moment due to drag
-                        arm = cgb.T.dot(ref_point - pos_g[inode])  # in B frame
-                        moment_polar_drag = algebra.cross3(c_bs.T.dot(arm), cd * dir_urel * coef)  # in S frame
-                        moment_s += moment_polar_drag
-
-                    # moment due to lift (if corrected)
-                    if correct_lift and moment_from_polar:
-                        # add moment from scratch: cm_polar + cm_drag_polar + cl_lift_polar
-                        moment_s = np.zeros(3)
-                        moment_s[1] = cm * coef * chord
-                        moment_s += moment_polar_drag
-                        moment_polar_lift = algebra.cross3(c_bs.T.dot(arm), forces_s[2] * np.array([0, 0, 1]))
-                        moment_s += moment_polar_lift
-
-                    new_struct_forces[inode, 3:6] = c_bs.dot(moment_s)
+        pos = structural_kstep.pos[nodes, :]
+        pos_g = np.dot(pos, cga.T)
+        cab = algebra.crv2rotation_vec(structural_kstep.psi[self.corrected_elem, self.corrected_node_in_elem, :])
+        cgb = np.matmul(cga, cab)
+
+        # Aerodynamic grid data of each section
+        span = np.zeros((n_corr,))
+        chord = np.zeros((n_corr,))
+        dir_chord = np.zeros((n_corr, 3))
+        uext = np.zeros((n_corr, 3))
+        leading_edge = np.zeros((n_corr, 3))
+        second_vertex = np.zeros((n_corr, 3))
+        for isurf in np.unique(self.corrected_surf):
+            in_surf = self.corrected_surf == isurf
+            i_n = self.corrected_i_n[in_surf]
+            _, span[in_surf], dir_chord[in_surf, :], chord[in_surf] = span_chord_vec(i_n, aero_kstep.zeta[isurf])
+            uext[in_surf, :] = np.average(aero_kstep.u_ext[isurf][:, :, i_n], axis=1).T
+            leading_edge[in_surf, :] = aero_kstep.zeta[isurf][:, 0, i_n].T
+            second_vertex[in_surf, :] = aero_kstep.zeta[isurf][:, 1, i_n].T
+
+        # computing surface area of panels contributing to force
+        area = span * chord
+        self.correct_surface_area_vec(aero_kstep.zeta, area)
+
+        # Define the relative velocity and its direction
+        urel = (structural_kstep.pos_dot[nodes, :] +
+                structural_kstep.for_vel[0:3] +
+                np.cross(structural_kstep.for_vel[3:6], pos))
+        urel = -np.dot(urel, cga.T)
+        urel += uext
+        if self.settings['add_rotation']:
+            urel -= np.cross(self.settings['rot_vel_g'], pos_g - self.settings['centre_rot_g'])
+        dir_urel = unit_vector_vec(urel)
+
+        # Coefficient to change from aerodynamic coefficients to forces (and viceversa)
+        coef = 0.5 * rho * np.linalg.norm(urel, axis=1) ** 2 * area
+        # Stability axes - projects forces in B onto S
+        c_bs = local_stability_axes_vec(np.einsum('nji,nj->ni', cgb, dir_urel),
+                                        np.einsum('nji,nj->ni', cgb, dir_chord))
+        forces_s = np.einsum('nji,nj->ni', c_bs, struct_forces[nodes, :3])
+        moment_s = np.einsum('nji,nj->ni', c_bs, struct_forces[nodes, 3:])
+        # Compute the associated lift
+        cl = forces_s[:, 2] / coef
+
+        # Polar lookup for all the sections with the same airfoil at once
+        cd = np.zeros((n_corr,))
+        cm = np.zeros((n_corr,))
+        if not self.cd_from_cl:
+            """
+            Compute L, D, M from polar depending on:
+            ii) Compute the effective angle of attack from potential flow theory or specified it as setting
+            input. The local lift curve slope is 2pi and the zero-lift angle of attack is given by thin
+            airfoil theory or specified it as setting input. From this, the effective angle of attack is
+            computed for the section and includes 3D effects.
+            """
+            aoa_0cl = np.ravel(self.list_aoa_cl0)[self.corrected_airfoil]
+            aoa = cl / 2 / np.pi + aoa_0cl
+            list_aoa_induced = list(aoa)
+            cl_polar = np.zeros((n_corr,))
+        for iairfoil in np.unique(self.corrected_airfoil):
+            with_airfoil = self.corrected_airfoil == iairfoil
+            polar = aerogrid.polars[iairfoil]
+            if self.cd_from_cl:
+                # Compute the drag from the UVLM computed lift
+                cd[with_airfoil], cm[with_airfoil] = polar.get_cdcm_from_cl_vec(cl[with_airfoil])
+            else:
+                # Compute the coefficients associated to that angle of attack
+                coefs = polar.get_coefs_vec(aoa[with_airfoil])
+                cl_polar[with_airfoil] = coefs[:, 0]
+                cd[with_airfoil] = coefs[:, 1]
+                cm[with_airfoil] = coefs[:, 2]
+
+        if correct_lift and not self.cd_from_cl:
+            # Use polar generated CL rather than UVLM computed CL
+            cl = cl_polar
+
+        # Recompute the forces based on the coefficients (side force is uncorrected)
+        forces_s[:, 0] += cd * coef  # add viscous drag to induced drag from UVLM
+        forces_s[:, 2] = cl * coef
+
+        new_struct_forces[nodes, 0:3] = np.einsum('nij,nj->ni', c_bs, forces_s)
+
+        # Pitching moment
+        # The panels are shifted by 0.25 of a panel aft from the leading edge
+        panel_shift = 0.25 * (second_vertex - leading_edge)
+        ref_point = leading_edge + 0.25 * chord[:, None] * dir_chord - panel_shift
+
+        # viscous contribution (pure moment)
+        moment_s[:, 1] += cm * coef * chord
+
+        # moment due to drag
+        arm = np.einsum('nji,nj->ni', cgb, ref_point - pos_g)  # in B frame
+        arm_s = np.einsum('nji,nj->ni', c_bs, arm)
+        moment_polar_drag = np.cross(arm_s, (cd * coef)[:, None] * dir_urel)  # in S frame
+        moment_s += moment_polar_drag
+
+        # Pitching moment
+        if moment_from_polar:
+            # viscous contribution (pure moment)
+            moment_s[:, 1] += cm * coef * chord
+
+            # moment due to drag
+            moment_s += moment_polar_drag
+
+        # moment due to lift (if corrected)
+        if correct_lift and moment_from_polar:
+            # add moment from scratch: cm_polar + cm_drag_polar + cl_lift_polar
+            moment_s = np.zeros((n_corr, 3))
+            moment_s[:, 1] = cm * coef * chord
+            moment_s += moment_polar_drag
+            moment_polar_lift = np.cross(arm_s, forces_s[:, 2, None] * np.array([0, 0, 1]))
+            moment_s += moment_polar_lift
+
+        new_struct_forces[nodes, 3:6] = np.einsum('nij,nj->ni', c_bs, moment_s)
 
         if self.settings['write_induced_aoa']:
             self.write_induced_aoa_of_each_node(ts, list_aoa_induced)
@@ -281,32 +296,55 @@ class PolarCorrection(generator_interface.BaseGenerator):
         return new_struct_forces
     
 
-    def correct_surface_area(self, inode, struct2aero_mapping, zeta_ts, area):
+    def correct_surface_area_vec(self, zeta_ts, area):
         '''
-        Corrects the surface area if the structural node is shared  by multiple surfaces. 
+        Corrects the surface area of the corrected nodes shared by multiple surfaces, adding in place to ``area`` the
+        area of the other surfaces sharing each node.
 
         For example, when the wing is split into right and left wing both surfaces share the center node.
-        Necessary for cl calculation as the force on the node is already the sum of the forces generated 
+        Necessary for cl calculation as the force on the node is already the sum of the forces generated
         at the adjacent panels of each surface.
-        
+
         Args:
-            inode (int): global node id
-            struct2aero_mapping (list of dicts): maps the structural (global) nodes to aero surfaces and nodes
             zeta_ts (array): zeta of current aero timestep
+            area (np.ndarray): surface area of the corrected nodes
+        '''
+        for i_corr, shared_surf, i_n_shared_surf in self.shared_surf_entries:
+            _, span_shared_surf, _, chord_shared_surf = span_chord(i_n_shared_surf, zeta_ts[shared_surf])
+            area[i_corr] += span_shared_surf * chord_shared_surf
 
-        Returns:
-            float: corrected surface area of other surfaces
+    def get_corrected_nodes(self, aerogrid):
         '''
-        if self.flag_shared_node_by_surfaces[inode]:
-            n_surfaces_shared_by_node = len(struct2aero_mapping[inode])
-            # add area for all other surfaces connected to this node
-            for isurf in range(1,n_surfaces_shared_by_node):
-                shared_surf = struct2aero_mapping[inode][isurf]['i_surf']
-                i_n_shared_surf = struct2aero_mapping[inode][isurf]['i_n']
-                _, span_shared_surf, _, chord_shared_surf = span_chord(i_n_shared_surf, zeta_ts[shared_surf])
-                area += span_shared_surf * chord_shared_surf
-        return area
-        
+        Finds the structural nodes whose forces are corrected, i.e. aerodynamic nodes that do not belong to the
+        ``skip_surfaces``, and their element, airfoil and location in the aerodynamic grid.
+
+        Args:
+            aerogrid :class:`~sharpy.aero.models.AerogridLoader
+        '''
+        aero_dict = aerogrid.aero_dict
+        nodes = []
+        self.shared_surf_entries = []
+        for inode in range(self.n_node):
+            if aero_dict['aero_node'][inode]:
+                if aerogrid.struct2aero_mapping[inode][0]['i_surf'] not in self.settings['skip_surfaces']:
+                    if self.flag_shared_node_by_surfaces[inode]:
+                        # add area for all other surfaces connected to this node
+                        for isurf in range(1, len(aerogrid.struct2aero_mapping[inode])):
+                            self.shared_surf_entries.append((len(nodes),
+                                                             aerogrid.struct2aero_mapping[inode][isurf]['i_surf'],
+                                                             aerogrid.struct2aero_mapping[inode][isurf]['i_n']))
+                    nodes.append(inode)
+
+        self.corrected_nodes = np.array(nodes, dtype=int)
+        self.corrected_elem = np.array([self.structure.node_master_elem[inode][0] for inode in nodes], dtype=int)
+        self.corrected_node_in_elem = np.array([self.structure.node_master_elem[inode][1] for inode in nodes],
+                                               dtype=int)
+        self.corrected_airfoil = np.array(aero_dict['airfoil_distribution'][self.corrected_elem,
+                                                                            self.corrected_node_in_elem], dtype=int)
+        self.corrected_surf = np.array([aerogrid.struct2aero_mapping[inode][0]['i_surf'] for inode in nodes],
+                                       dtype=int)
+        self.corrected_i_n = np.array([aerogrid.struct2aero_mapping[inode][0]['i_n'] for inode in nodes], dtype=int)
+
     def check_for_special_cases(self, aerogrid):
         '''
         Checks if the outboard node is shared by multiple surfaces. 
@@ -1,3 +1,6 @@
+import copy
+import itertools
+import threading
 import numpy as np
 import scipy.interpolate as interpolate
 import h5py as h5
@@ -9,6 +12,155 @@ import sharpy.utils.settings as settings
 import sharpy.utils.cout_utils as cout
 
 
+def trilinear_weights(grid, points):
+    """
+    Cell indices and weights for the trilinear interpolation of a batch of points in a rectilinear grid.
+
+    The interpolated value is then obtained with :func:`trilinear_interpolation`. Since the weights only depend on
+    the coordinates, they can be shared between several fields defined on the same grid.
+
+    Args:
+        grid (tuple): Ascending coordinates of the grid points in each of the three directions
+        points (np.ndarray): Coordinates of the points ``(3, n_points)``
+
+    Returns:
+        tuple: Indices of the lower corner of the cell containing each point ``(3, n_points)``, relative position of
+        the points in the cell ``(3, n_points)`` and mask of the points inside the grid ``(n_points)``.
+    """
+    n_points = points.shape[1]
+    indices = np.zeros((3, n_points), dtype=int)
+    weights = np.zeros((3, n_points))
+    inside = np.ones((n_points,), dtype=bool)
+    for i_dim in range(3):
+        grid_dim = np.asarray(grid[i_dim])
+        coord = points[i_dim]
+        inside &= (coord >= grid_dim[0]) & (coord <= grid_dim[-1])
+        if len(grid_dim) == 1:
+            continue
+        i_cell = np.clip(np.searchsorted(grid_dim, coord) - 1, 0, len(grid_dim) - 2)
+        indices[i_dim] = i_cell
+        weights[i_dim] = (coord - grid_dim[i_cell])/(grid_dim[i_cell + 1] - grid_dim[i_cell])
+    return indices, weights, inside
+
+
+def trilinear_interpolation(fields, indices, weights, inside, fill_value=0.):
+    """
+    Trilinear interpolation of several fields defined in the same rectilinear grid.
+
+    Args:
+        fields (list(np.ndarray)): Values of the fields at the grid points ``(n_x, n_y, n_z)``. Memory mapped arrays
+          are only read at the corners of the cells containing the points.
+        indices (np.ndarray): Cell indices given by :func:`trilinear_weights`
+        weights (np.ndarray): Cell weights given by :func:`trilinear_weights`
+        inside (np.ndarray): Mask of points inside the grid given by :func:`trilinear_weights`
+        fill_value (float): Value of the fields outside the grid
+
+    Returns:
+        np.ndarray: Interpolated fields ``(n_fields, n_points)``
+    """
+    output = np.full((len(fields), indices.shape[1]), fill_value, dtype=float)
+    indices = indices[:, inside]
+    weights = weights[:, inside]
+    values = np.zeros((len(fields), indices.shape[1]))
+    for corner in itertools.product((0, 1), repeat=3):
+        corner_weight = np.ones((indices.shape[1],))
+        corner_indices = []
+        for i_dim in range(3):
+            if corner[i_dim]:
+                corner_weight *= weights[i_dim]
+            else:
+                corner_weight *= 1. - weights[i_dim]
+            corner_indices.append(np.minimum(indices[i_dim] + corner[i_dim], fields[0].shape[i_dim] - 1))
+        corner_indices = tuple(corner_indices)
+        for i_field, field in enumerate(fields):
+            values[i_field] += corner_weight*field[corner_indices]
+    output[:, inside] = values
+    return output
+
+
+class FieldSnapshot:
+    """
+    Velocity snapshot of a turbulent field that keeps in memory only the sub-box of the grid around the points where
+    it is interpolated.
+
+    The velocity components are read from memory mapped files. The sub-box grows whenever a point falls outside of
+    it, and it is padded by ``margin`` times its extent on each side to account for the motion of the lattice.
+
+    Args:
+        files (list(str)): Binary files of the three velocity components
+        dtypes (list(np.dtype)): Precision of each file
+        shape (tuple): Number of grid points in each direction
+        margin (float): Padding of the sub-box relative to the extent of the interpolated points
+        box (tuple (optional)): Lower and upper (exclusive) grid indices of the sub-box to load initially
+    """
+    def __init__(self, files, dtypes, shape, margin=0.25, box=None):
+        self.shape = np.array(shape, dtype=int)
+        self.margin = margin
+        self.memmaps = [np.memmap(files[i_dim], dtype=dtypes[i_dim], mode='r', shape=tuple(shape), order='F')
+                        for i_dim in range(3)]
+
+        self.box = None
+        self.values = None
+        # index range of the interpolated points since the snapshot was created
+        self.required = None
+        if box is not None:
+            self.load_box(*box)
+
+    def load_box(self, lower, upper):
+        """
+        Copies the sub-box ``[lower, upper)`` of the velocity components to memory.
+        """
+        slices = tuple(slice(lower[i_dim], upper[i_dim]) for i_dim in range(3))
+        self.values = [np.array(self.memmaps[i_dim][slices]) for i_dim in range(3)]
+        self.box = (np.array(lower, dtype=int), np.array(upper, dtype=int))
+
+    def padded_box(self):
+        """
+        Sub-box around the interpolated points, padded with the margin. ``None`` if no points have been interpolated.
+        """
+        if self.required is None:
+            return None
+        lower, upper = self.required
+        padding = np.ceil(self.margin*(upper - lower)).astype(int)
+        return np.maximum(lower - padding, 0), np.minimum(upper + padding, self.shape)
+
+    def interpolate(self, indices, weights, inside, fill_value=0.):
+        """
+        Trilinear interpolation of the velocity components with the cell weights of the whole grid given by
+        :func:`trilinear_weights`.
+        """
+        if not inside.any():
+            return np.full((3, indices.shape[1]), fill_value)
+
+        lower = indices[:, inside].min(axis=1)
+        upper = np.minimum(indices[:, inside].max(axis=1) + 2, self.shape)
+        if self.required is None:
+            self.required = (lower, upper)
+        else:
+            self.required = (np.minimum(lower, self.required[0]), np.maximum(upper, self.required[1]))
+
+        if self.box is None or np.any(lower < self.box[0]) or np.any(upper > self.box[1]):
+            self.load_box(*self.padded_box())
+
+        return trilinear_interpolation(self.values, indices - self.box[0][:, None], weights, inside,
+                                       fill_value=fill_value)
+
+    def copy(self):
+        """
+        Returns a snapshot of the same field that keeps track of its own interpolated points. The memory mapped files
+        and the loaded sub-box are shared, since they are never modified in place.
+        """
+        snapshot = copy.copy(self)
+        snapshot.memmaps = list(self.memmaps)
+        if self.values is not None:
+            snapshot.values = list(self.values)
+        if self.box is not None:
+            snapshot.box = (self.box[0].copy(), self.box[1].copy())
+        if self.required is not None:
+            snapshot.required = (self.required[0].copy(), self.required[1].copy())
+        return snapshot
+
+
 @generator_interface.generator
 class TurbVelocityField(generator_interface.BaseGenerator):
     r"""
@@ -33,6 +185,10 @@ class TurbVelocityField(generator_interface.BaseGenerator):
     (which will be much more common with time-domain simulations) is faster by a factor of 1e4.
     Also, memory savings are quite substantial: from 6Gb for a typical field to a handful of megabytes for the whole program.
 
+    With ``paged_field``, each snapshot only keeps in memory the sub-box of the grid around the lattice (see
+    :class:`FieldSnapshot`), which avoids the scattered reads of the memory mapped files. With ``prefetch``, the next
+    snapshot of an unfrozen field is read in a background thread while the current one is in use.
+
     Args:
         in_dict (dict): Input data in the form of dictionary. See acceptable entries below:
 
@@ -77,6 +233,21 @@ class TurbVelocityField(generator_interface.BaseGenerator):
     settings_default['store_field'] = False
     settings_description['store_field'] = 'If ``True``, the xdmf snapshots are stored in memory. Only two at a time for the linear interpolation'
 
+    settings_types['paged_field'] = 'bool'
+    settings_default['paged_field'] = False
+    settings_description['paged_field'] = 'If ``True``, only the sub-box of the snapshots around the lattice is ' \
+                                          'loaded in memory from the memory mapped files. Overrides ``store_field``'
+
+    settings_types['paging_margin'] = 'float'
+    settings_default['paging_margin'] = 0.25
+    settings_description['paging_margin'] = 'Padding of the sub-box loaded with ``paged_field`` on each side, ' \
+                                            'relative to the extent of the lattice'
+
+    settings_types['prefetch'] = 'bool'
+    settings_default['prefetch'] = False
+    settings_description['prefetch'] = 'With ``paged_field``, read the next snapshot of unfrozen fields in a ' \
+                                       'background thread'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -90,11 +261,10 @@ class TurbVelocityField(generator_interface.BaseGenerator):
 
         self.grid_data = dict()
 
-        self.interpolator = 3*[None]
         self.x_periodicity = False
         self.y_periodicity = False
 
-        # variables for interpolator wrapper
+        # snapshots blended in time
         self._t0 = -1
         self._t1 = -1
         self._it0 = -1
@@ -106,6 +276,10 @@ class TurbVelocityField(generator_interface.BaseGenerator):
         self.vel_holder0 = 3*[None]
         self.vel_holder1 = 3*[None]
 
+        # next snapshot read in the background: (i_grid, thread, [snapshot]). The thread is None until the sub-box
+        # to read is known, i.e. until the first interpolation
+        self._prefetch = None
+
     def initialise(self, in_dict, restart=False):
         self.in_dict = in_dict
         settings.to_custom_types(self.in_dict, self.settings_types, self.settings_default)
@@ -126,30 +300,6 @@ class TurbVelocityField(generator_interface.BaseGenerator):
         if 'y' in self.settings['periodicity']:
             self.y_periodicity = True
 
-    # ADC: VERY VERY UGLY. NEED A BETTER WAY
-    def interpolator_wrapper0(self, coords, i_dim=0):
-        coeff = self.get_coeff()
-        return (1.0 - self.coeff)*self._interpolator0[i_dim](coords) + self.coeff*self._interpolator1[i_dim](coords)
-    def interpolator_wrapper1(self, coords, i_dim=1):
-        coeff = self.get_coeff()
-        return (1.0 - self.coeff)*self._interpolator0[i_dim](coords) + self.coeff*self._interpolator1[i_dim](coords)
-    def interpolator_wrapper2(self, coords, i_dim=2):
-        coeff = self.get_coeff()
-        return (1.0 - self.coeff)*self._interpolator0[i_dim](coords) + self.coeff*self._interpolator1[i_dim](coords)
-
-    def get_coeff(self):
-        return self.coeff
-
-    def init_interpolator(self):
-        if self.settings['frozen']:
-            self.interpolator = self._interpolator0
-            return
-
-        # continuing the ugliness
-        self.interpolator[0] = self.interpolator_wrapper0
-        self.interpolator[1] = self.interpolator_wrapper1
-        self.interpolator[2] = self.interpolator_wrapper2
-
     # these functions need to define the interpolators
     def read_btl(self, in_file):
         """
@@ -267,7 +417,6 @@ class TurbVelocityField(generator_interface.BaseGenerator):
 
         self.update_coeff(t)
 
-        self.init_interpolator()
         self.interpolate_zeta(zeta,
                               for_pos,
                               uext)
@@ -349,31 +498,61 @@ class TurbVelocityField(generator_interface.BaseGenerator):
         return interpolator
 
 
-    def interpolate_zeta(self, zeta, for_pos, u_ext, interpolator=None, offset=np.zeros((3))):
-        if interpolator is None:
-            interpolator = self.interpolator
+    def interpolate_zeta(self, zeta, for_pos, u_ext, offset=np.zeros((3))):
+        """
+        Interpolates the velocity field at all the lattice points of all the surfaces at once.
+
+        The cell weights are computed once and shared between the three velocity components and, in unfrozen
+        fields, between the two snapshots that are blended in time.
+        """
+        n_points = [zeta[isurf][0].size for isurf in range(len(zeta))]
+        coords = np.concatenate([zeta[isurf].reshape((3, -1)) for isurf in range(len(zeta))], axis=1)
+        coords = self.g_2_gstar(self.apply_periodicity(coords + (for_pos[0:3] + offset)[:, None]))
+
+        velocities = self.interpolate_points(coords)
+        velocities = self.gstar_2_g(velocities)
 
+        i_point = 0
         for isurf in range(len(zeta)):
-            _, n_m, n_n = zeta[isurf].shape
-            for i_m in range(n_m):
-                for i_n in range(n_n):
-                    coord = self.g_2_gstar(self.apply_periodicity(zeta[isurf][:, i_m, i_n] + for_pos[0:3] + offset))
-                    for i_dim in range(3):
-                        try:
-                            u_ext[isurf][i_dim, i_m, i_n] = self.interpolator[i_dim](coord)
-                        except ValueError:
-                            print(coord)
-                            raise ValueError()
-                    u_ext[isurf][:, i_m, i_n] = self.gstar_2_g(u_ext[isurf][:, i_m, i_n])
+            u_ext[isurf][:] = velocities[:, i_point:i_point + n_points[isurf]].reshape(zeta[isurf].shape)
+            i_point += n_points[isurf]
+
+    def interpolate_points(self, coords):
+        """
+        Velocity of the (time blended) turbulent field at a batch of points.
+
+        Args:
+            coords (np.ndarray): Coordinates of the points in the field frame ``(3, n_points)``
+
+        Returns:
+            np.ndarray: Velocities in the field frame ``(3, n_points)``
+        """
+        grid = (self.grid_data['initial_x_grid'], self.grid_data['initial_y_grid'], self.grid_data['initial_z_grid'])
+        indices, weights, inside = trilinear_weights(grid, coords)
+
+        velocities = self.interpolate_snapshot(self._interpolator0, indices, weights, inside)
+        if not self.settings['frozen'] and self.coeff != 0.:
+            velocities *= 1.0 - self.coeff
+            velocities += self.coeff*self.interpolate_snapshot(self._interpolator1, indices, weights, inside)
+
+        if self._prefetch is not None and self._prefetch[1] is None:
+            box = self.paged_box()
+            if box is not None:
+                self.start_prefetch(self._prefetch[0], box)
+        return velocities
+
+    @staticmethod
+    def interpolate_snapshot(snapshot, indices, weights, inside):
+        if isinstance(snapshot, FieldSnapshot):
+            return snapshot.interpolate(indices, weights, inside)
+        return trilinear_interpolation([snapshot[i_dim].values for i_dim in range(3)], indices, weights, inside)
 
 
     @staticmethod
     def periodicity(x, bbox):
-        try:
-            new_x = bbox[0] + divmod(x - bbox[0], bbox[1] - bbox[0])[1]
-        except ZeroDivisionError:
-            new_x = x
-        return new_x
+        if bbox[1] == bbox[0]:
+            return x
+        return bbox[0] + np.mod(x - bbox[0], bbox[1] - bbox[0])
 
 
     def apply_periodicity(self, coord):
@@ -445,8 +624,11 @@ class TurbVelocityField(generator_interface.BaseGenerator):
     def read_grid(self, i_grid, i_cache=0):
         """
         This function returns an interpolator list of size 3 made of `scipy.interpolate.RegularGridInterpolator`
-        objects.
+        objects, or a :class:`FieldSnapshot` if ``paged_field``.
         """
+        if self.settings['paged_field']:
+            return self.read_paged_grid(i_grid)
+
         velocities = ['ux', 'uy', 'uz']
         interpolator = list()
         for i_dim in range(3):
@@ -503,6 +685,99 @@ class TurbVelocityField(generator_interface.BaseGenerator):
                 raise Error('i_cache has to be 0 or 1')
         return interpolator
 
+    def create_snapshot(self, i_grid, box=None):
+        velocities = ['ux', 'uy', 'uz']
+        grid = self.grid_data['grid'][i_grid]
+        return FieldSnapshot([self.route + '/' + grid[velocities[i_dim]]['file'] for i_dim in range(3)],
+                             [grid[velocities[i_dim]]['Precision'] for i_dim in range(3)],
+                             (self.grid_data['dimensions'][2],
+                              self.grid_data['dimensions'][1],
+                              self.grid_data['dimensions'][0]),
+                             margin=self.settings['paging_margin'],
+                             box=box)
+
+    def read_paged_grid(self, i_grid):
+        """
+        Returns the :class:`FieldSnapshot` of ``i_grid``, which covers the same sub-box as the latest snapshot.
+
+        With ``prefetch``, the snapshot is taken from the background thread if already requested and the reading of
+        the following one is started. Before the first interpolation, when the sub-box is not known yet, the reading
+        is started by :meth:`interpolate_points` instead.
+        """
+        box = self.paged_box()
+
+        snapshot = None
+        if self._prefetch is not None and self._prefetch[0] == i_grid:
+            snapshot = self.join_prefetch()
+        else:
+            self.join_prefetch(discard=True)
+        if snapshot is None:
+            snapshot = self.create_snapshot(i_grid, box)
+
+        if self.settings['prefetch'] and not self.settings['frozen'] and i_grid + 1 < self.grid_data['n_grid']:
+            if box is None:
+                # started by the first interpolation, which sets the sub-box
+                self._prefetch = (i_grid + 1, None, [None, None])
+            else:
+                self.start_prefetch(i_grid + 1, box)
+
+        return snapshot
+
+    def paged_box(self):
+        """
+        Padded sub-box of the latest snapshot in use that has been interpolated, ``None`` if there is none.
+        """
+        for snapshot in (self._interpolator1, self._interpolator0):
+            if isinstance(snapshot, FieldSnapshot) and snapshot.padded_box() is not None:
+                return snapshot.padded_box()
+        return None
+
+    def start_prefetch(self, i_grid, box):
+        """
+        Starts reading the sub-box ``box`` of the snapshot ``i_grid`` in a background thread.
+
+        The snapshot, or the exception raised while reading it, is stored in ``prefetched`` and returned or raised by
+        :meth:`join_prefetch`.
+        """
+        prefetched = [None, None]
+
+        def prefetch():
+            try:
+                prefetched[0] = self.create_snapshot(i_grid, box)
+            except Exception as error:
+                prefetched[1] = error
+
+        thread = threading.Thread(target=prefetch, daemon=True)
+        thread.start()
+        self._prefetch = (i_grid, thread, prefetched)
+
+    def join_prefetch(self, discard=False):
+        """
+        Waits for the pending prefetch, if any, and clears it.
+
+        Args:
+            discard (bool): Drop the prefetched snapshot, and any error raised while reading it, instead of returning it.
+
+        Returns:
+            FieldSnapshot: The prefetched snapshot, ``None`` if there is none or it has not been started.
+        """
+        if self._prefetch is None:
+            return None
+        _, thread, prefetched = self._prefetch
+        self._prefetch = None
+        if thread is None:
+            return None
+
+        thread.join()
+        if discard:
+            return None
+        if prefetched[1] is not None:
+            raise prefetched[1]
+        return prefetched[0]
+
+    def teardown(self):
+        self.join_prefetch(discard=True)
+
     @staticmethod
     def g_2_gstar(coord_g):
         return np.array([coord_g[0], coord_g[2], -coord_g[1]])
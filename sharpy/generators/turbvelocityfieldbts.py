@@ -1,3 +1,5 @@
+import os
+
 import numpy as np
 import scipy.interpolate as interpolate
 
@@ -145,6 +147,16 @@ class TurbVelocityFieldBts(generator_interface.BaseGenerator):
     settings_default['use_3_4_interpolation'] = False
     settings_description['use_3_4_interpolation'] = 'Use the farfield velocity at 3/4 chord for all the points along the chord'
 
+    settings_types['cache_field'] = 'bool'
+    settings_default['cache_field'] = False
+    settings_description['cache_field'] = 'Store the processed velocity field in a sidecar file that is loaded instead of ' \
+                                          'the BTS file in later runs with the same inflow'
+
+    settings_types['cache_file'] = 'str'
+    settings_default['cache_file'] = ''
+    settings_description['cache_file'] = 'Sidecar file of the processed velocity field. If empty, ``.npz`` is appended ' \
+                                         'to the BTS file path'
+
     setting_table = settings.SettingsTable()
     __doc__ += setting_table.generate(settings_types, settings_default, settings_description)
 
@@ -167,10 +179,7 @@ class TurbVelocityFieldBts(generator_interface.BaseGenerator):
         settings.to_custom_types(self.in_dict, self.settings_types, self.settings_default, no_ctype=True)
         self.settings = self.in_dict
 
-        self.x_grid, self.y_grid, self.z_grid, self.vel = self.read_turbsim_bts(self.settings['turbulent_field'], self.settings['case_with_tower'])
-        if not self.settings['new_orientation'] == 'xyz':
-            # self.settings['new_orientation'] = 'zyx'
-            self.x_grid, self.y_grid, self.z_grid, self.vel = self.change_orientation(self.x_grid, self.y_grid, self.z_grid, self.vel, self.settings['new_orientation'])
+        self.x_grid, self.y_grid, self.z_grid, self.vel = self.read_field()
 
         self.bbox = self.get_field_bbox(self.x_grid, self.y_grid, self.z_grid)
         if self.settings['print_info']:
@@ -188,6 +197,46 @@ class TurbVelocityFieldBts(generator_interface.BaseGenerator):
 
         # self.init_interpolator(x_grid, y_grid, z_grid, vel)
 
+    def read_field(self):
+        """
+        Reads the BTS file and changes the orientation of the field.
+
+        If ``cache_field``, the processed field is loaded from the sidecar file when it was generated from the same
+        BTS file (same size and modification time) with the same settings. Otherwise, it is written to it.
+
+        Returns:
+            tuple: ``x_grid``, ``y_grid``, ``z_grid`` and ``vel``
+        """
+        fname = self.settings['turbulent_field']
+        if self.settings['cache_field']:
+            cache_file = self.settings['cache_file']
+            if cache_file == '':
+                cache_file = fname + '.npz'
+            source_stat = os.stat(fname)
+            key = np.array([str(source_stat.st_size),
+                            str(source_stat.st_mtime_ns),
+                            str(self.settings['case_with_tower']),
+                            self.settings['new_orientation']])
+            if os.path.isfile(cache_file):
+                with np.load(cache_file) as cache:
+                    if np.array_equal(cache['key'], key):
+                        if self.settings['print_info']:
+                            cout.cout_wrap('Loading the velocity field from ' + cache_file, 1)
+                        return cache['x_grid'], cache['y_grid'], cache['z_grid'], cache['vel']
+
+        x_grid, y_grid, z_grid, vel = self.read_turbsim_bts(fname, self.settings['case_with_tower'])
+        if not self.settings['new_orientation'] == 'xyz':
+            x_grid, y_grid, z_grid, vel = self.change_orientation(x_grid, y_grid, z_grid, vel,
+                                                                  self.settings['new_orientation'])
+
+        if self.settings['cache_field']:
+            # written under a temporary name so that an interrupted run does not leave a corrupt cache
+            with open(cache_file + '.tmp', 'wb') as f:
+                np.savez(f, key=key, x_grid=x_grid, y_grid=y_grid, z_grid=z_grid, vel=vel)
+            os.replace(cache_file + '.tmp', cache_file)
+
+        return x_grid, y_grid, z_grid, vel
+
     def init_interpolator(self, x_grid, y_grid, z_grid, vel):
 
         pass
@@ -309,38 +358,13 @@ class TurbVelocityFieldBts(generator_interface.BaseGenerator):
             ("w_slope_scaling", np.float32),
             ("w_offset_scaling", np.float32),
             ("n_char_description", np.int32),
-            ("description", np.dtype((bytes, 73))),
-            # ("data", np.dtype((bytes, 12865632)))
-            ("data", np.dtype((bytes, 2)))
         ])
 
-        fileContent = np.fromfile(fname, dtype=dtype)
-        n_char_description = fileContent[0][17]
-        nbytes_data = 2*3*fileContent[0][4]*fileContent[0][1]*fileContent[0][2]
-        dtype = np.dtype([
-            ("id", np.int16),
-            ("nz", np.int32),
-            ("ny", np.int32),
-            ("tower_points", np.int32),
-            ("ntime_steps", np.int32),
-            ("dz", np.float32),
-            ("dy", np.float32),
-            ("dt", np.float32),
-            ("u_mean", np.float32),
-            ("HubHt", np.float32),
-            ("Zbottom", np.float32),
-            ("u_slope_scaling", np.float32),
-            ("u_offset_scaling", np.float32),
-            ("v_slope_scaling", np.float32),
-            ("v_offset_scaling", np.float32),
-            ("w_slope_scaling", np.float32),
-            ("w_offset_scaling", np.float32),
-            ("n_char_description", np.int32),
-            ("description", np.dtype((bytes, n_char_description))),
-            ("data", np.dtype((bytes, nbytes_data)))
-        ])
+        fileContent = np.fromfile(fname, dtype=dtype, count=1)
+        n_char_description = fileContent[0]['n_char_description']
+        dtype = np.dtype(dtype.descr + [("description", np.dtype((bytes, n_char_description)))])
 
-        fileContent = np.fromfile(fname, dtype=dtype)
+        fileContent = np.fromfile(fname, dtype=dtype, count=1)
 
         dictionary = {}
         for i in range(len(fileContent.dtype.names)):
@@ -355,17 +379,15 @@ class TurbVelocityFieldBts(generator_interface.BaseGenerator):
             cout.cout_wrap(("WARNING: I think there is something wrong with the case description. The length is not %d characters" %  n_char_description), 3)
             # print("Input", dictionary['n_char_description'], "as the number of characters of the case description")
 
-        # vel_aux = np.fromstring(dictionary['data'], dtype='>i2')
-        vel_aux = np.fromstring(dictionary['data'], dtype=np.int16)
-        vel = np.zeros((3,dictionary['ntime_steps'],dictionary['ny'],dictionary['nz']))
+        # the data is stored as [time, z, y, velocity component]
+        ntime_steps = dictionary['ntime_steps']
+        vel_aux = np.fromfile(fname, dtype=np.int16,
+                              count=3*ntime_steps*dictionary['nz']*dictionary['ny'],
+                              offset=dtype.itemsize).reshape((ntime_steps, dictionary['nz'], dictionary['ny'], 3))
 
-        counter = -1
-        for ix in range(dictionary['ntime_steps']):
-            for iz in range(dictionary['nz']):
-                for iy in range(dictionary['ny']):
-                    for ivel in range(3):
-                        counter += 1
-                        vel[ivel,-ix,iy,iz] = (vel_aux[counter] - offset[ivel])/scaling[ivel]
+        # reordered as [velocity component, time, y, z], with the time steps from the last one backwards
+        vel = ((vel_aux - offset)/scaling).transpose((3, 0, 2, 1)).astype(float)
+        vel = vel[:, (-np.arange(ntime_steps)) % ntime_steps, :, :]
 
         # Generate the grid
         height = dictionary['dz']*(dictionary['nz'] - 1)
@@ -433,32 +455,20 @@ class TurbVelocityFieldBts(generator_interface.BaseGenerator):
 
         # Output variables
         new_grid = [None]*3
-        new_dim = old_dim[position_in_old]
 
         for ivel in range(3):
             new_grid[ivel] = old_grid[position_in_old[ivel]]*sign[ivel]
             if sign[ivel] == -1:
                 new_grid[ivel] = new_grid[ivel][::-1]
 
-        new_vel = np.zeros((3,new_dim[0],new_dim[1],new_dim[2]))
-        # print("old_dim:", old_dim)
-        # print("new_dim:", new_dim)
-        # print("old_vel.shape:", old_vel.shape)
-        # print("new_vel.shape:", new_vel.shape)
-
-        # These loops will index variables associated with the new grid
-        for ix in range(new_dim[0]):
-            for iy in range(new_dim[1]):
-                for iz in range(new_dim[2]):
-                    new_i = np.array([ix, iy, iz])
-                    # old_i = np.array([new_i[position_in_old[0]]*sign[0], new_i[position_in_old[1]]*sign[1], new_i[position_in_old[2]]*sign[2]])
-                    old_i = np.array([new_i[position_in_old[0]], new_i[position_in_old[1]], new_i[position_in_old[2]]])
-                    for icoord in range(3):
-                        if sign[icoord] == -1:
-                            old_i[icoord] = -1*old_i[icoord] - 1
-                    for ivel in range(3):
-                        # print("moving: ", position_in_old[ivel], ix, iy, iz, "to: ", ivel,new_i[0],new_i[1],new_i[2])
-                        new_vel[ivel,new_i[0],new_i[1],new_i[2]] = old_vel[position_in_old[ivel], old_i[0], old_i[1], old_i[2]]*sign[ivel]
+        # Velocity components are permuted and their sign changed
+        new_vel = old_vel[position_in_old, :, :, :]*sign[:, None, None, None]
+        # The new axis i is the old axis position_in_old[i], reversed like its grid if sign[i] == -1
+        new_vel = new_vel.transpose([0] + list(position_in_old + 1))
+        for icoord in range(3):
+            if sign[icoord] == -1:
+                new_vel = np.flip(new_vel, axis=icoord + 1)
+        new_vel = np.ascontiguousarray(new_vel)
 
         return new_grid[0], new_grid[1], new_grid[2], new_vel
 
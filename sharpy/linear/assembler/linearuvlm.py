@@ -143,6 +143,21 @@ class LinearUVLM(ss_interface.BaseElement):
     settings_default['cfl1'] = True
     settings_description['cfl1'] = 'If it is ``True``, it assumes that the discretisation complies with CFL=1'
 
+    settings_types['aic_num_workers'] = 'int'
+    settings_default['aic_num_workers'] = 1
+    settings_description['aic_num_workers'] = 'Number of workers over which the AIC blocks of each pair of surfaces ' \
+                                              'are computed'
+
+    settings_types['aic_executor'] = 'str'
+    settings_default['aic_executor'] = 'thread'
+    settings_description['aic_executor'] = 'Pool used to compute the AIC blocks when ``aic_num_workers > 1``'
+    settings_options['aic_executor'] = ['thread', 'process']
+
+    settings_types['aic_cache'] = 'bool'
+    settings_default['aic_cache'] = False
+    settings_description['aic_cache'] = 'Cache the AIC matrices on the geometry of the linearisation point, such ' \
+                                        'that repeated linearisations about the same geometry do not reassemble them'
+
     settings_types['convert_to_ct'] = 'bool'
     settings_default['convert_to_ct'] = False
     settings_description['convert_to_ct'] = 'Convert system to Continuous Time. Note: features above the original ' \
@@ -15,9 +15,12 @@ Includes:
           points
 """
 
+import collections
+import concurrent.futures
+import hashlib
+import itertools
 import numpy as np
 import scipy.sparse as sparse
-import itertools
 
 from sharpy.aero.utils.uvlmlib import dvinddzeta_cpp, eval_panel_cpp
 import sharpy.linear.src.libsparse as libsp
@@ -33,8 +36,12 @@ svec = [0, 1, 2, 3]  # seg. no.
 avec = [0, 1, 2, 3]  # 1st vertex no.
 bvec = [1, 2, 3, 0]  # 2nd vertex no.
 
+# AIC matrices cached by AICs, keyed on geometry hash
+aic_cache_size = 2
+_aic_cache = collections.OrderedDict()
 
-def AICs(Surfs, Surfs_star, target='collocation', Project=True):
+
+def AICs(Surfs, Surfs_star, target='collocation', Project=True, num_workers=1, executor='thread', use_cache=False):
     """
     Given a list of bound (Surfs) and wake (Surfs_star) instances of
     surface.AeroGridSurface, returns the list of AIC matrices in the format:
@@ -42,35 +49,97 @@ def AICs(Surfs, Surfs_star, target='collocation', Project=True):
         Surfs[ii].
         - AIC_star_list[ii][jj] contains the AIC from the wake surface Surfs[jj]
         to Surfs[ii].
-    """
 
-    AIC_list = []
-    AIC_star_list = []
+    The blocks of each pair of surfaces are independent and can be computed over
+    ``num_workers`` workers of a ``thread`` or ``process`` pool (``executor``).
+
+    If ``use_cache`` is ``True``, the matrices are stored in a cache keyed on the
+    geometry of the surfaces (see :func:`aic_geometry_hash`), such that repeated
+    assemblies about the same linearisation point are not recomputed. The cache
+    keeps the last ``aic_cache_size`` geometries.
+    """
 
     n_surf = len(Surfs)
     assert len(Surfs_star) == n_surf, \
         'Number of bound and wake surfaces much be equal'
 
+    # target geometry shared by all blocks
+    if target == 'collocation':
+        for Surf_out in Surfs:
+            if not hasattr(Surf_out, 'zetac'):
+                Surf_out.generate_collocations()
+            if Project and not hasattr(Surf_out, 'normals'):
+                Surf_out.generate_normals()
+
+    if use_cache:
+        key = aic_geometry_hash(Surfs, Surfs_star, target, Project)
+        try:
+            AIC_list, AIC_star_list = _aic_cache[key]
+            _aic_cache.move_to_end(key)
+            cout.cout_wrap('\tAIC matrices retrieved from cache', 1)
+            return [[aic.copy() for aic in aic_row] for aic_row in AIC_list], \
+                   [[aic.copy() for aic in aic_row] for aic_row in AIC_star_list]
+        except KeyError:
+            pass
+
+    blocks = [(Surf_in, Surfs[ss_out]) for ss_out in range(n_surf)
+              for Surf_in in itertools.chain.from_iterable(zip(Surfs, Surfs_star))]
+    if num_workers > 1:
+        if executor == 'thread':
+            pool_type = concurrent.futures.ThreadPoolExecutor
+        elif executor == 'process':
+            pool_type = concurrent.futures.ProcessPoolExecutor
+        else:
+            raise NameError('Unrecognised executor %s. Use thread or process' % executor)
+        with pool_type(max_workers=num_workers) as pool:
+            futures = [pool.submit(_aic_block, Surf_in, Surf_out, target, Project)
+                       for Surf_in, Surf_out in blocks]
+            AIC_blocks = [future.result() for future in futures]
+    else:
+        AIC_blocks = [_aic_block(Surf_in, Surf_out, target, Project) for Surf_in, Surf_out in blocks]
+
+    AIC_list = []
+    AIC_star_list = []
     for ss_out in range(n_surf):
-        AIC_list_here = []
-        AIC_star_list_here = []
-        Surf_out = Surfs[ss_out]
+        blocks_here = AIC_blocks[2 * n_surf * ss_out: 2 * n_surf * (ss_out + 1)]
+        AIC_list.append(blocks_here[0::2])
+        AIC_star_list.append(blocks_here[1::2])
 
-        for ss_in in range(n_surf):
-            # Bound surface
-            Surf_in = Surfs[ss_in]
-            AIC_list_here.append(Surf_in.get_aic_over_surface(
-                Surf_out, target=target, Project=Project))
-            # Wakes
-            Surf_in = Surfs_star[ss_in]
-            AIC_star_list_here.append(Surf_in.get_aic_over_surface(
-                Surf_out, target=target, Project=Project))
-        AIC_list.append(AIC_list_here)
-        AIC_star_list.append(AIC_star_list_here)
+    if use_cache:
+        _aic_cache[key] = ([[aic.copy() for aic in aic_row] for aic_row in AIC_list],
+                           [[aic.copy() for aic in aic_row] for aic_row in AIC_star_list])
+        while len(_aic_cache) > aic_cache_size:
+            _aic_cache.popitem(last=False)
 
     return AIC_list, AIC_star_list
 
 
+def _aic_block(Surf_in, Surf_out, target, Project):
+    return Surf_in.get_aic_over_surface(Surf_out, target=target, Project=Project)
+
+
+def aic_geometry_hash(Surfs, Surfs_star, *args):
+    """
+    Hash of the geometry of a set of bound and wake surfaces (vertices coordinates,
+    collocation point location and vortex radius) and any additional arguments.
+    """
+
+    sha = hashlib.sha1()
+    for Surf in itertools.chain(Surfs, Surfs_star):
+        sha.update(str(Surf.zeta.shape).encode())
+        sha.update(np.ascontiguousarray(Surf.zeta, dtype=float).tobytes())
+        vortex_radius = getattr(Surf.vortex_radius, 'value', Surf.vortex_radius)
+        sha.update(repr((float(vortex_radius), Surf.aM, Surf.aN)).encode())
+    sha.update(repr(args).encode())
+
+    return sha.hexdigest()
+
+
+def clear_aic_cache():
+    """ Removes all the AIC matrices stored by :func:`AICs`. """
+    _aic_cache.clear()
+
+
 def nc_dqcdzeta_Sin_to_Sout(Surf_in, Surf_out, Der_coll, Der_vert, Surf_in_bound):
     """
     Computes derivative matrix of
@@ -54,9 +54,12 @@ to do:
 
 import copy
 import warnings
+import multiprocessing as mpr
 import numpy as np
 import scipy.signal as scsig
 import scipy.linalg as scalg
+import scipy.sparse as sparse
+import scipy.sparse.linalg as scsplin
 from sharpy.linear.utils.ss_interface import LinearVector, StateVariable, InputVariable, OutputVariable
 import scipy.interpolate as scint
 import h5py
@@ -225,16 +228,16 @@ class StateSpace:
     def get_mats(self):
         return self.A, self.B, self.C, self.D
 
-    def freqresp(self, wv):
+    def freqresp(self, wv, method='direct', num_processes=1):
         """
         Calculate frequency response over frequencies wv
 
-        Note: this wraps frequency response function.
+        Note: this wraps frequency response function. See :func:`freqresp` for the available ``method`` options.
         """
         dlti = True
         if self.dt is None:
             dlti = False
-        return freqresp(self, wv, dlti=dlti)
+        return freqresp(self, wv, dlti=dlti, method=method, num_processes=num_processes)
 
     def addGain(self, K, where):
         """
@@ -1229,7 +1232,7 @@ def retain_inout_channels(sys, retain_channels, where):
     return sys
 
 
-def freqresp(SS, wv, dlti=True):
+def freqresp(SS, wv, dlti=True, method='direct', num_processes=1):
     """
     In-house frequency response function supporting dense/sparse types
 
@@ -1237,14 +1240,21 @@ def freqresp(SS, wv, dlti=True):
     - SS: instance of StateSpace class, or scipy.signal.StateSpace*
     - wv: frequency range
     - dlti: True if discrete-time system is considered.
+    - method: strategy for the solution of ``(zI - A) x = B`` at each frequency:
+        - ``direct``: ``zI - A`` is factorised at each frequency (dense or sparse, as ``A``).
+        - ``schur``: ``A`` is reduced once to its complex Schur form, ``A = Q T Q^H``, so that
+        each frequency only requires a triangular solve. Sparse ``A`` are converted to dense.
+        - ``sparse_lu``: the sparsity pattern of ``zI - A`` and its fill-reducing column
+        ordering are computed once and reused in the sparse LU factorisation of all the frequencies.
+    - num_processes: number of processes over which chunks of frequencies are distributed.
 
     Outputs:
     - Yfreq[outputs,inputs,len(wv)]: frequency response over wv
 
     Warnings:
-    -  This function may not be very efficient for dense matrices (as A is not
-    reduced to upper Hessenberg form), but can exploit sparsity in the state-space
-    matrices.
+    -  The ``direct`` method may not be very efficient for dense matrices, as A is not
+    reduced to upper Hessenberg/Schur form. Use ``schur`` for large dense systems evaluated
+    at many frequencies.
     """
 
     assert type(SS) == StateSpace, \
@@ -1259,24 +1269,138 @@ def freqresp(SS, wv, dlti=True):
         # print('Assuming a continuous time system')
         zv = 1.j * wv
 
-    Nx = SS.A.shape[0]
-    Ny = SS.D.shape[0]
-    try:
-        Nu = SS.B.shape[1]
-    except IndexError:
-        Nu = 1
-
     Nw = len(wv)
+    kernel = FreqrespKernel(SS, method=method)
 
-    Yfreq = np.empty((Ny, Nu, Nw,), dtype=np.complex_)
-    Eye = libsp.eye_as(SS.A)
-    for ii in range(Nw):
-        sol_cplx = libsp.solve(zv[ii] * Eye - SS.A, SS.B)
-        Yfreq[:, :, ii] = libsp.dot(SS.C, sol_cplx, type_out=np.ndarray) + SS.D
+    if num_processes > 1 and Nw > 1:
+        chunks = np.array_split(np.arange(Nw), min(num_processes, Nw))
+        with mpr.Pool(len(chunks), initializer=_freqresp_init_worker, initargs=(kernel,)) as pool:
+            results = pool.map(_freqresp_worker, [zv[chunk] for chunk in chunks])
+        Yfreq = np.concatenate(results, axis=2)
+    else:
+        Yfreq = kernel.evaluate(zv)
 
     return Yfreq
 
 
+class FreqrespKernel:
+    """
+    Evaluates the transfer function ``C (zI - A)^{-1} B + D`` of a state-space system at a given set of
+    complex frequencies ``z``, precomputing at construction the data that is shared by all of them.
+
+    See :func:`freqresp` for a description of the available methods.
+
+    Args:
+        SS (StateSpace): State-space system.
+        method (str): ``direct``, ``schur`` or ``sparse_lu``.
+    """
+    methods = ['direct', 'schur', 'sparse_lu']
+
+    def __init__(self, SS, method='direct'):
+        if method not in self.methods:
+            raise NotImplementedError('Frequency response method %s not recognised. Use one of %s'
+                                      % (method, self.methods))
+        self.method = method
+
+        self.Nx = SS.A.shape[0]
+        self.Ny = SS.D.shape[0]
+        try:
+            self.Nu = SS.B.shape[1]
+        except IndexError:
+            self.Nu = 1
+        self.D = libsp.dense(SS.D)
+
+        if method == 'direct':
+            self.A = SS.A
+            self.B = SS.B
+            self.C = SS.C
+            self.Eye = libsp.eye_as(SS.A)
+
+        elif method == 'schur':
+            T, Q = scalg.schur(libsp.dense(SS.A), output='complex')
+            self.minus_T = -T
+            self.diag_T = np.diag(T).copy()
+            self.CQ = libsp.dot(SS.C, Q, type_out=np.ndarray)
+            self.QhB = np.dot(Q.conj().T, libsp.dense(SS.B))
+
+        elif method == 'sparse_lu':
+            A = sparse.csc_matrix(SS.A).tocoo()
+            # pattern of zI - A, keeping explicit entries on the diagonal even if they cancel out
+            pattern = sparse.coo_matrix((np.concatenate((-A.data, np.zeros(self.Nx))),
+                                         (np.concatenate((A.row, np.arange(self.Nx))),
+                                          np.concatenate((A.col, np.arange(self.Nx))))),
+                                        shape=A.shape).tocsc()
+            pattern.sum_duplicates()
+
+            # fill reducing ordering, computed with the pattern that will be factorised
+            pattern_ini = pattern.astype(complex)
+            pattern_ini.data[self.diagonal_index(pattern, np.arange(self.Nx))] += 1.
+            self.column_order = np.argsort(scsplin.splu(pattern_ini, permc_spec='COLAMD').perm_c)
+
+            pattern = pattern[:, self.column_order]
+            pattern.sort_indices()
+            self.indices = pattern.indices
+            self.indptr = pattern.indptr
+            self.minus_A_data = pattern.data
+            self.diagonal = self.diagonal_index(pattern, self.column_order)
+            self.B = libsp.dense(SS.B)
+            self.C = SS.C
+
+    @staticmethod
+    def diagonal_index(matrix, column_order):
+        """
+        Positions in ``matrix.data`` of the entries of the (reordered) diagonal of a CSC matrix.
+        """
+        columns = np.repeat(column_order, np.diff(matrix.indptr))
+        return np.flatnonzero(matrix.indices == columns)
+
+    def evaluate(self, zv):
+        """
+        Returns the frequency response ``Yfreq[outputs, inputs, len(zv)]`` at the complex frequencies ``zv``.
+        """
+        Nw = len(zv)
+        Yfreq = np.empty((self.Ny, self.Nu, Nw,), dtype=complex)
+
+        if self.method == 'direct':
+            for ii in range(Nw):
+                sol_cplx = libsp.solve(zv[ii] * self.Eye - self.A, self.B)
+                Yfreq[:, :, ii] = libsp.dot(self.C, sol_cplx, type_out=np.ndarray) + self.D
+
+        elif self.method == 'schur':
+            shifted_T = np.empty_like(self.minus_T)
+            for ii in range(Nw):
+                shifted_T[:] = self.minus_T
+                np.fill_diagonal(shifted_T, zv[ii] - self.diag_T)
+                sol_cplx = scalg.solve_triangular(shifted_T, self.QhB, check_finite=False)
+                Yfreq[:, :, ii] = np.dot(self.CQ, sol_cplx).reshape((self.Ny, self.Nu)) + self.D
+
+        elif self.method == 'sparse_lu':
+            data = self.minus_A_data.astype(complex)
+            sol_cplx = np.empty((self.Nx,) + self.B.shape[1:], dtype=complex)
+            for ii in range(Nw):
+                data[:] = self.minus_A_data
+                data[self.diagonal] += zv[ii]
+                shifted_A = sparse.csc_matrix((data, self.indices, self.indptr), shape=(self.Nx, self.Nx))
+                sol_cplx[self.column_order] = scsplin.splu(shifted_A, permc_spec='NATURAL').solve(self.B)
+                Yfreq[:, :, ii] = libsp.dot(self.C, sol_cplx, type_out=np.ndarray).reshape((self.Ny, self.Nu)) \
+                                  + self.D
+
+        return Yfreq
+
+
+# kernel of the frequency response in each worker process of freqresp, set by the pool initialiser
+_freqresp_kernel = None
+
+
+def _freqresp_init_worker(kernel):
+    global _freqresp_kernel
+    _freqresp_kernel = kernel
+
+
+def _freqresp_worker(zv):
+    return _freqresp_kernel.evaluate(zv)
+
+
 def series(SS01, SS02):
     r"""
     Connects two state-space blocks in series. If these are instances of DLTI
@@ -46,6 +46,15 @@ settings_default_static['vortex_radius'] = vortex_radius_def
 settings_types_static['cfl1'] = 'bool'
 settings_default_static['cfl1'] = True
 
+settings_types_static['aic_num_workers'] = 'int'
+settings_default_static['aic_num_workers'] = 1
+
+settings_types_static['aic_executor'] = 'str'
+settings_default_static['aic_executor'] = 'thread'
+
+settings_types_static['aic_cache'] = 'bool'
+settings_default_static['aic_cache'] = False
+
 settings_types_dynamic = dict()
 settings_default_dynamic = dict()
 
@@ -75,6 +84,15 @@ settings_default_dynamic['vortex_radius'] = vortex_radius_def
 settings_types_dynamic['cfl1'] = 'bool'
 settings_default_dynamic['cfl1'] = True
 
+settings_types_dynamic['aic_num_workers'] = 'int'
+settings_default_dynamic['aic_num_workers'] = 1
+
+settings_types_dynamic['aic_executor'] = 'str'
+settings_default_dynamic['aic_executor'] = 'thread'
+
+settings_types_dynamic['aic_cache'] = 'bool'
+settings_default_dynamic['aic_cache'] = False
+
 
 class Static():
     """	Static linear solver """
@@ -96,6 +114,10 @@ class Static():
 
         self.vortex_radius = settings_here['vortex_radius']
         self.cfl1 = settings_here['cfl1']
+        # AIC assembly options, see assembly.AICs
+        self.aic_settings = {'num_workers': settings_here['aic_num_workers'],
+                             'executor': settings_here['aic_executor'],
+                             'use_cache': settings_here['aic_cache']}
         MS = multisurfaces.MultiAeroGridSurfaces(tsdata,
                                                  self.vortex_radius,
                                                  for_vel=for_vel)
@@ -157,7 +179,8 @@ class Static():
         List_nc_dqcdzeta_coll, List_nc_dqcdzeta_vert = \
             ass.nc_dqcdzeta(MS.Surfs, MS.Surfs_star)
         List_AICs, List_AICs_star = ass.AICs(MS.Surfs, MS.Surfs_star,
-                                             target='collocation', Project=True)
+                                             target='collocation', Project=True,
+                                             **self.aic_settings)
         List_Wnv = []
         for ss in range(MS.n_surf):
             List_Wnv.append(
@@ -594,7 +617,10 @@ class Dynamic(Static):
             self.settings['ScalingDict'] = ScalingDict
 
         static_dict = {'vortex_radius': self.settings['vortex_radius'],
-                       'cfl1': self.settings['cfl1']}
+                       'cfl1': self.settings['cfl1'],
+                       'aic_num_workers': self.settings['aic_num_workers'],
+                       'aic_executor': self.settings['aic_executor'],
+                       'aic_cache': self.settings['aic_cache']}
         super().__init__(tsdata, custom_settings=static_dict, for_vel=for_vel)
 
         self.dt = self.settings['dt']
@@ -809,7 +835,8 @@ class Dynamic(Static):
 
         # Aero influence coeffs
         List_AICs, List_AICs_star = ass.AICs(MS.Surfs, MS.Surfs_star,
-                                             target='collocation', Project=True)
+                                             target='collocation', Project=True,
+                                             **self.aic_settings)
         A0 = np.block(List_AICs)
         A0W = np.block(List_AICs_star)
         List_AICs, List_AICs_star = None, None
@@ -1922,7 +1949,8 @@ class DynamicBlock(Dynamic):
 
         # Aero influence coeffs
         List_AICs, List_AICs_star = ass.AICs(MS.Surfs, MS.Surfs_star,
-                                             target='collocation', Project=True)
+                                             target='collocation', Project=True,
+                                             **self.aic_settings)
         A0 = np.block(List_AICs)
         A0W = np.block(List_AICs_star)
         List_AICs, List_AICs_star = None, None
@@ -2748,7 +2776,8 @@ class Frequency(Static):
 
         # Aero influence coeffs
         List_AICs, List_AICs_star = ass.AICs(MS.Surfs, MS.Surfs_star,
-                                             target='collocation', Project=True)
+                                             target='collocation', Project=True,
+                                             **self.aic_settings)
         A0 = np.block(List_AICs)
         A0W = np.block(List_AICs_star)
         List_AICs, List_AICs_star = None, None
@@ -15,6 +15,9 @@ import sharpy.utils.cout_utils as cout
 dmver = np.array([0, 1, 1, 0])  # delta to go from (m,n) panel to (m,n) vertices
 dnver = np.array([0, 0, 1, 1])
 
+# number of (target, panel) pairs evaluated at once in the vectorised AIC kernel
+aic_chunk_entries = 2 ** 18
+
 
 class AeroGridGeo():
     r"""
@@ -491,6 +494,41 @@ class AeroGridSurface(AeroGridGeo):
 
         return aic3
 
+    def get_panels_vertices_coords(self):
+        """
+        Retrieves the coordinates of the vertices of all panels, with shape ``(K, 4, 3)`` and the panels ordered as
+        in ``self.maps.ind_2d_pan_scal``. See :meth:`get_panel_vertices_coords`.
+        """
+        M, N = self.maps.M, self.maps.N
+        zetav = np.array([self.zeta[:, dm:dm + M, dn:dn + N] for dm, dn in zip(dmver, dnver)])
+
+        return zetav.transpose((2, 3, 0, 1)).reshape((M * N, 4, 3))
+
+    def get_aic3_vec(self, zeta_target, chunk_size=None):
+        """
+        Vectorised version of :meth:`get_aic3` over a set of target points, ``zeta_target.shape=(P,3)``.
+        Returns the influence coefficient matrices in an array of shape ``(3,P,K)``.
+
+        The targets are processed in chunks of ``chunk_size`` points, by default chosen such that the temporary
+        arrays hold about ``aic_chunk_entries`` (target, panel) pairs.
+        """
+
+        K = self.maps.K
+        n_target = zeta_target.shape[0]
+        if chunk_size is None:
+            chunk_size = max(1, aic_chunk_entries // max(K, 1))
+
+        zetav = self.get_panels_vertices_coords()
+        aic3 = np.empty((3, n_target, K))
+        for i_start in range(0, n_target, chunk_size):
+            i_end = min(i_start + chunk_size, n_target)
+            aic3[:, i_start:i_end, :] = uvlmutils.biot_panel_vec(zeta_target[i_start:i_end],
+                                                                  zetav,
+                                                                  self.vortex_radius,
+                                                                  gamma=1.0)
+
+        return aic3
+
     def get_induced_velocity_over_surface(self, Surf_target,
                                           target='collocation', Project=False):
         """
@@ -637,28 +675,13 @@ class AeroGridSurface(AeroGridGeo):
                 Surf_target.generate_collocations()
             ZetaTarget = Surf_target.zetac
 
+            # all target points at once, ordered as in ind_2d_pan_scal
+            AIC = self.get_aic3_vec(ZetaTarget.reshape((3, K_out)).T)
+
             if Project:
                 if not hasattr(Surf_target, 'normals'):
                     Surf_target.generate_normals()
-                AIC = np.empty((K_out, K_in))
-            else:
-                AIC = np.empty((3, K_out, K_in))
-
-            # loop target points
-            for cc in range(K_out):
-                # retrieve panel coords
-                mm = Surf_target.maps.ind_2d_pan_scal[0][cc]
-                nn = Surf_target.maps.ind_2d_pan_scal[1][cc]
-                # retrieve influence coefficients
-                # ref_aic3=self.get_aic3(ZetaTarget[:,mm,nn])
-                aic3 = get_aic3_cpp(self.maps, self.zeta, ZetaTarget[:, mm, nn],
-                                    self.vortex_radius)
-                # assert np.max(np.abs(aic3-ref_aic3))<1e-13, embed()
-
-                if Project:
-                    AIC[cc, :] = np.dot(Surf_target.normals[:, mm, nn], aic3)
-                else:
-                    AIC[:, cc, :] = aic3
+                AIC = np.einsum('ic,icj->cj', Surf_target.normals.reshape((3, K_out)), AIC)
 
         if target == 'segments':
             if Project:
@@ -94,6 +94,47 @@ def biot_panel_fast(zetaC, ZetaPanel, vortex_radius, gamma=1.0):
     return q
 
 
+def biot_panel_vec(zetaC, ZetaPanel, vortex_radius, gamma=1.0):
+    """
+    Vectorised version of :func:`biot_panel` over a set of target points and panels.
+
+    Args:
+        zetaC (np.ndarray): Target points coordinates, ``zetaC.shape=(P,3)``.
+        ZetaPanel (np.ndarray): Panels vertices coordinates, ``ZetaPanel.shape=(K,4,3)``, where each panel follows
+            the vertex ordering of :func:`biot_panel`.
+        vortex_radius (float): Distance below which induction is not computed.
+        gamma (float or np.ndarray): Circulation of all panels or ``(K,)`` array of panel circulations.
+
+    Returns:
+        np.ndarray: Induced velocity of each panel over each point, ``q.shape=(3,P,K)``.
+    """
+
+    vortex_radius_sq = vortex_radius*vortex_radius
+    Cfact = cfact_biot * np.asarray(gamma)
+
+    R = zetaC[:, None, None, :] - ZetaPanel[None, :, :, :]
+    R_norm = np.sqrt(np.sum(R * R, axis=-1))
+
+    q = np.zeros((3,) + R.shape[:2])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for aa, bb in LoopPanel:
+            RAB = ZetaPanel[:, bb, :] - ZetaPanel[:, aa, :]
+            Ra = R[:, :, aa, :]
+            Rb = R[:, :, bb, :]
+            Vcr = np.cross(Ra, Rb)
+            vcr2 = np.sum(Vcr * Vcr, axis=-1)
+
+            # numerical radius
+            induced = vcr2 >= vortex_radius_sq * np.sum(RAB * RAB, axis=-1)
+
+            fact = (Cfact / vcr2) * (np.sum(RAB * Ra, axis=-1) / R_norm[:, :, aa] -
+                                     np.sum(RAB * Rb, axis=-1) / R_norm[:, :, bb])
+            fact[~induced] = 0.
+            q += np.moveaxis(fact[:, :, None] * Vcr, -1, 0)
+
+    return q
+
+
 def panel_normal(ZetaPanel):
     """
     return normal of panel with vertex coordinates ZetaPanel, where:
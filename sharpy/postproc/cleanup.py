@@ -11,6 +11,9 @@ import sharpy.utils.settings as settings_utils
 class Cleanup(BaseSolver):
     """
     Clean-up old timesteps to save RAM memory
+
+    See also the ``history_retention`` and ``history_spill`` settings of
+    :class:`~sharpy.solvers.dynamiccoupled.DynamicCoupled`, which bound the history as it is generated.
     """
     solver_id = 'Cleanup'
     solver_classification = 'post-processor'
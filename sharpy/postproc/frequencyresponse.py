@@ -92,6 +92,18 @@ class FrequencyResponse(solver_interface.BaseSolver):
     settings_default['quick_plot'] = False
     settings_description['quick_plot'] = 'Produce array of ``.png`` plots showing response. Requires matplotlib.'
 
+    settings_types['method'] = 'str'
+    settings_default['method'] = 'direct'
+    settings_description['method'] = 'Solution strategy at each frequency. ``direct`` factorises the system at every ' \
+                                     'frequency, ``schur`` reduces the state matrix once to Schur form (dense) and ' \
+                                     '``sparse_lu`` reuses the sparsity pattern and ordering of the sparse ' \
+                                     'factorisation. See :func:`sharpy.linear.src.libss.freqresp`.'
+    settings_options['method'] = ['direct', 'schur', 'sparse_lu']
+
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes over which the frequencies are distributed.'
+
     settings_table = settings_utils.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
@@ -192,7 +204,9 @@ class FrequencyResponse(solver_interface.BaseSolver):
                 system_name = None  # For the case where the state-space is parsed in run().
 
             t0fom = time.time()
-            y_freq_fom = system.freqresp(self.wv)
+            y_freq_fom = system.freqresp(self.wv,
+                                         method=self.settings['method'],
+                                         num_processes=self.settings['num_processes'])
             tfom = time.time() - t0fom
 
             if self.settings['compute_hinf']:
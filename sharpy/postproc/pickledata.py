@@ -6,6 +6,7 @@ import h5py
 import sharpy
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings_utils
+import sharpy.utils.checkpoint as checkpoint
 
 
 # Define basic numerical types
@@ -21,6 +22,11 @@ class PickleData(BaseSolver):
 
     This solver does not have settings, yet it still needs to be included in the `.sharpy` file as an
     empty dictionary.
+
+    When run online with the ``incremental`` setting, the checkpoints are appended to a ``.ckpt`` file in which
+    each time step and the model data are written only once (see :mod:`sharpy.utils.checkpoint`), rather than
+    pickling the whole ``data`` structure at every call. Both files can be used to restart a simulation with
+    ``sharpy -r``.
     """
     solver_id = 'PickleData'
     solver_classification = 'post-processor'
@@ -33,6 +39,11 @@ class PickleData(BaseSolver):
     settings_default['stride'] = 1
     settings_description['stride'] = 'Number of steps between the execution calls when run online'
 
+    settings_types['incremental'] = 'bool'
+    settings_default['incremental'] = False
+    settings_description['incremental'] = 'Write incremental checkpoints to ``<case>.ckpt`` instead of pickling ' \
+                                          'the whole ``data`` structure to ``<case>.pkl``'
+
     settings_table = settings_utils.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -43,6 +54,7 @@ class PickleData(BaseSolver):
         self.filename = None
         self.folder = None
         self.caller = None
+        self.checkpoint_writer = None
 
     def initialise(self, data, custom_settings=None, caller=None, restart=False):
         self.data = data
@@ -59,6 +71,12 @@ class PickleData(BaseSolver):
         self.filename = self.folder + self.data.settings['SHARPy']['case']+'.pkl'
         self.caller = caller
 
+        if self.settings['incremental']:
+            self.filename = self.folder + self.data.settings['SHARPy']['case'] + '.ckpt'
+            self.checkpoint_writer = checkpoint.CheckpointWriter(self.filename, self.data)
+        else:
+            self.checkpoint_writer = None
+
 
     def run(self, **kwargs):
         
@@ -66,8 +84,16 @@ class PickleData(BaseSolver):
         solvers = settings_utils.set_value_or_default(kwargs, 'solvers', None)
         
         if ((online and (self.data.ts % self.settings['stride'] == 0)) or (not online)):
-            with open(self.filename, 'wb') as f:
-                pickle.dump(self.data, f, protocol=pickle.HIGHEST_PROTOCOL)
-                pickle.dump(solvers, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.checkpoint_writer is not None:
+                self.checkpoint_writer.write(self.data, solvers)
+            else:
+                with open(self.filename, 'wb') as f:
+                    pickle.dump(self.data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(solvers, f, protocol=pickle.HIGHEST_PROTOCOL)
 
         return self.data
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['checkpoint_writer'] = None
+        return state
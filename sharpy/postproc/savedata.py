@@ -27,6 +27,11 @@ class SaveData(BaseSolver):
         This method saves simply the data. If you would like to preserve the SHARPy methods of the relevant classes
         see also :class:`sharpy.solvers.pickledata.PickleData`.
 
+        When run online, the file is kept open until the end of the simulation. With ``time_series`` the time step
+        information is written through a :class:`~sharpy.utils.h5utils.TimeSeriesWriter`, which buffers the
+        time steps in memory and writes them in chunks; they are only guaranteed to be in the file once the
+        simulation finishes.
+
     """
     solver_id = 'SaveData'
     solver_classification = 'post-processor'
@@ -94,6 +99,24 @@ class SaveData(BaseSolver):
     settings_default['stride'] = 1
     settings_description['stride'] = 'Number of steps between the execution calls when run online'
 
+    settings_types['time_series'] = 'bool'
+    settings_default['time_series'] = False
+    settings_description['time_series'] = 'Save the time step information as chunked, extendable datasets of ' \
+                                          '``(n_time_steps, ...)`` shape in the ``time_series`` group of the ' \
+                                          'aero and structure classes, rather than as a ``timestep_info`` group ' \
+                                          'for every time step.'
+
+    settings_types['compression'] = 'str'
+    settings_default['compression'] = ''
+    settings_description['compression'] = 'HDF5 compression filter of the ``time_series`` datasets. No ' \
+                                          'compression if empty.'
+    settings_options['compression'] = ['gzip', 'lzf']
+
+    settings_types['background_writer'] = 'bool'
+    settings_default['background_writer'] = False
+    settings_description['background_writer'] = 'Write the ``time_series`` datasets in a background thread, such ' \
+                                                'that the simulation does not wait for the file to be written.'
+
     settings_table = settings_utils.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description,
                                        settings_options=settings_options)
@@ -109,6 +132,9 @@ class SaveData(BaseSolver):
         self.ts_max = 0
         self.caller = None
 
+        self.hdfile = None
+        self.time_series_writer = None
+
         ### specify which classes are saved as hdf5 group
         # see initialise and add_as_grp
         self.ClassesToSave = (PreSharpy,)
@@ -141,10 +167,18 @@ class SaveData(BaseSolver):
                                             'ct_zeta_dot_list',
                                             'ct_zeta_list',
                                             'ct_zeta_star_list',
-                                            'dynamic_input'])
+                                            'dynamic_input',
+                                            'packed_storage',
+                                            'packed_offsets',
+                                            '_packed_views',
+                                            '_ct_pointers',
+                                            'strip_tables'])
 
         self.ts_max = self.data.ts + 1
 
+        # files of previous executions are closed before being replaced
+        self.close_file()
+
         # create folder for containing files if necessary
         self.folder = data.output_folder + '/savedata/'
         if not os.path.exists(self.folder):
@@ -205,12 +239,11 @@ class SaveData(BaseSolver):
 
         if ((online and (self.data.ts % self.settings['stride'] == 0)) or (not online)):
             if self.settings['format'] == 'h5':
-                file_exists = os.path.isfile(self.filename)
-                hdfile = h5py.File(self.filename, 'a')
-
-                if (online and file_exists):
-                    self.save_timestep(self.data, self.settings, self.data.ts, hdfile)
+                if online and self.hdfile is not None:
+                    self.save_timestep(self.data, self.settings, self.data.ts, self.hdfile,
+                                       time_series_writer=self.time_series_writer)
                 else:
+                    hdfile = self.open_file()
                     skip_attr_init = copy.deepcopy(self.settings['skip_attr'])
                     skip_attr_init.append('timestep_info')
 
@@ -218,21 +251,28 @@ class SaveData(BaseSolver):
                                        ClassesToSave=self.ClassesToSave, SkipAttr=skip_attr_init,
                                        compress_float=self.settings['compress_float'])
 
-                    if self.settings['save_struct']:
-                        h5utils.add_as_grp(list(),
-                                   hdfile['data']['structure'],
-                                   grpname='timestep_info')
-                    if self.settings['save_aero']:
-                        h5utils.add_as_grp(list(),
-                                   hdfile['data']['aero'],
-                                   grpname='timestep_info')
+                    if not self.settings['time_series']:
+                        if self.settings['save_struct']:
+                            h5utils.add_as_grp(list(),
+                                       hdfile['data']['structure'],
+                                       grpname='timestep_info')
+                        if self.settings['save_aero']:
+                            h5utils.add_as_grp(list(),
+                                       hdfile['data']['aero'],
+                                       grpname='timestep_info')
 
                     for it in range(len(self.data.structure.timestep_info)):
                         tstep_p = self.data.structure.timestep_info[it]
                         if tstep_p is not None:
-                            self.save_timestep(self.data, self.settings, it, hdfile)
+                            self.save_timestep(self.data, self.settings, it, hdfile,
+                                               time_series_writer=self.time_series_writer)
 
-                hdfile.close()
+                if online:
+                    # the file is kept open for the next time steps
+                    if self.time_series_writer is None:
+                        self.hdfile.flush()
+                else:
+                    self.close_file()
 
                 if self.settings['save_linear_uvlm']:
                     linhdffile = h5py.File(self.filename.replace('.data.h5', '.uvlmss.h5'), 'a')
@@ -298,8 +338,51 @@ class SaveData(BaseSolver):
 
         return self.data
 
+    def open_file(self):
+        """
+        Opens the ``.data.h5`` file, if not already open, and the writer of the ``time_series`` datasets.
+
+        Returns:
+            h5py.File: Open file
+        """
+        if self.hdfile is None:
+            self.hdfile = h5py.File(self.filename, 'a')
+            if self.settings['time_series']:
+                self.time_series_writer = h5utils.TimeSeriesWriter(self.hdfile,
+                                                                   compression=self.settings['compression'],
+                                                                   compress_float=self.settings['compress_float'],
+                                                                   background=self.settings['background_writer'])
+        return self.hdfile
+
+    def close_file(self):
+        """
+        Finishes writing the queued time steps and closes the ``.data.h5`` file.
+        """
+        if self.time_series_writer is not None:
+            self.time_series_writer.close()
+            self.time_series_writer = None
+        if self.hdfile is not None:
+            self.hdfile.close()
+            self.hdfile = None
+
+    def shutdown(self):
+        self.close_file()
+
+    def teardown(self):
+        self.close_file()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['hdfile'] = None
+        state['time_series_writer'] = None
+        return state
+
     @staticmethod
-    def save_timestep(data, settings, ts, hdfile):
+    def save_timestep(data, settings, ts, hdfile, time_series_writer=None):
+        if time_series_writer is not None:
+            SaveData.save_timestep_series(data, settings, ts, time_series_writer)
+            return
+
         if settings['save_aero']:
             h5utils.add_as_grp(data.aero.timestep_info[ts],
                                hdfile['data']['aero']['timestep_info'],
@@ -316,3 +399,20 @@ class SaveData(BaseSolver):
                                ClassesToSave=(sharpy.utils.datastructures.StructTimeStepInfo,),
                                SkipAttr=settings['skip_attr'],
                                compress_float=settings['compress_float'])
+
+    @staticmethod
+    def save_timestep_series(data, settings, ts, time_series_writer):
+        """
+        Appends the time step ``ts`` to the ``data/aero/time_series`` and ``data/structure/time_series`` groups.
+        The time step number of each row is saved in their ``ts`` dataset.
+        """
+        values = dict()
+        if settings['save_aero']:
+            values['data/aero/time_series'] = h5utils.time_series_values(data.aero.timestep_info[ts],
+                                                                         SkipAttr=settings['skip_attr'])
+        if settings['save_struct']:
+            values['data/structure/time_series'] = h5utils.time_series_values(data.structure.timestep_info[ts],
+                                                                              SkipAttr=settings['skip_attr'])
+        for grp_values in values.values():
+            grp_values['ts'] = ts
+        time_series_writer.append(values)
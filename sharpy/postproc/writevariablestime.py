@@ -1,7 +1,10 @@
+import io
 import os
+import h5py
 import numpy as np
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings_utils
+import sharpy.utils.h5utils as h5utils
 
 
 @solver
@@ -92,6 +95,23 @@ class WriteVariablesTime(BaseSolver):
     settings_default['vel_field_points'] = np.array([0., 0., 0.])
     settings_description['vel_field_points'] = 'List of coordinates of the control points as x1, y1, z1, x2, y2, z2 ...'
 
+    settings_types['text_output'] = 'bool'
+    settings_default['text_output'] = True
+    settings_description['text_output'] = 'Write the variables to ``.dat`` text files, one per variable and node, ' \
+                                          'panel or point'
+
+    settings_types['h5_output'] = 'bool'
+    settings_default['h5_output'] = False
+    settings_description['h5_output'] = 'Write the variables to ``variables.h5``, with a ``(n_time_steps, ...)`` ' \
+                                        'dataset named as each of the text files and the time steps in ``ts``. ' \
+                                        'The file is overwritten at initialisation.'
+
+    settings_types['flush_stride'] = 'int'
+    settings_default['flush_stride'] = 100
+    settings_description['flush_stride'] = 'Number of time steps kept in memory before being written to the ' \
+                                           'output files. The remaining steps are written at the end of the run ' \
+                                           'or at teardown. Use ``1`` to update the files every time step'
+
     settings_table = settings_utils.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -105,6 +125,12 @@ class WriteVariablesTime(BaseSolver):
         self.caller = None
         self.velocity_generator = None
 
+        self.text_buffers = dict()
+        self.h5_file = None
+        self.h5_writer = None
+        self.h5_values = dict()
+        self.n_buffered_steps = 0
+
     def initialise(self, data, custom_settings=None, caller=None, restart=False):
         self.data = data
         if custom_settings is None:
@@ -117,6 +143,13 @@ class WriteVariablesTime(BaseSolver):
         if not os.path.isdir(self.folder):
             os.makedirs(self.folder)
 
+        # previous buffers are written before being replaced
+        self.close()
+        self.text_buffers = dict()
+        if self.settings['h5_output']:
+            self.h5_file = h5py.File(self.folder + 'variables.h5', 'w')
+            self.h5_writer = h5utils.TimeSeriesWriter(self.h5_file)
+
         # Check inputs
         if not ((len(self.settings['aero_panels_isurf']) == len(self.settings['aero_panels_im'])) and (len(self.settings['aero_panels_isurf']) == len(self.settings['aero_panels_in']))):
             raise RuntimeError("aero_panels should be defined as [i_surf,i_m,i_n]")
@@ -178,7 +211,7 @@ class WriteVariablesTime(BaseSolver):
                 if self.settings['cleanup_old_solution']:
                     if os.path.isfile(filename):
                         os.remove(filename)
-                if not os.path.isfile(filename):
+                if not os.path.isfile(filename) and self.settings['text_output']:
                     fid = open(filename, 'w')
                     fid.write(("#t[s]%suext_x[m/s]%suext_y[m/s]%suext_z[m/s]\n" % ((self.settings['delimiter'],)*3)))
                     fid.close()
@@ -203,6 +236,7 @@ class WriteVariablesTime(BaseSolver):
             for it in range(len(self.data.structure.timestep_info)):
                 if self.data.structure.timestep_info[it] is not None:
                     self.data = self.write(it)
+            self.flush()
 
         return self.data
 
@@ -222,17 +256,16 @@ class WriteVariablesTime(BaseSolver):
             for ifor in range(len(self.settings['FoR_number'])):
                 filename = self.folder + "FoR_" + '%02d' % self.settings['FoR_number'][ifor] + "_" + self.settings['FoR_variables'][ivariable] + ".dat"
 
-                with open(filename, 'a') as fid:
-                    var = np.atleast_2d(getattr(tstep, self.settings['FoR_variables'][ivariable]))
-                    rows, cols = var.shape
-                    if ((cols == 1) and (rows == 1)):
-                        self.write_value_to_file(fid, self.data.ts, var, self.settings['delimiter'])
-                    elif ((cols > 1) and (rows == 1)):
-                        self.write_nparray_to_file(fid, self.data.ts, var, self.settings['delimiter'])
-                    elif ((cols == 1) and (rows >= 1)):
-                        self.write_value_to_file(fid, self.data.ts, var[ifor], self.settings['delimiter'])
-                    else:
-                        self.write_nparray_to_file(fid, self.data.ts, var[ifor,:], self.settings['delimiter'])
+                var = np.atleast_2d(getattr(tstep, self.settings['FoR_variables'][ivariable]))
+                rows, cols = var.shape
+                if ((cols == 1) and (rows == 1)):
+                    self.add_row(filename, var, value=True)
+                elif ((cols > 1) and (rows == 1)):
+                    self.add_row(filename, var)
+                elif ((cols == 1) and (rows >= 1)):
+                    self.add_row(filename, var[ifor], value=True)
+                else:
+                    self.add_row(filename, var[ifor,:])
 
         # Structure variables at nodes
         for ivariable in range(len(self.settings['structure_variables'])):
@@ -243,19 +276,17 @@ class WriteVariablesTime(BaseSolver):
             if num_indices == 1:
                 # Beam global variables (i.e. not node dependant)
                 filename = self.folder + "struct_" + self.settings['structure_variables'][ivariable] + ".dat"
-                with open(filename, 'a') as fid:
-                    self.write_nparray_to_file(fid, self.data.ts, var, self.settings['delimiter'])
+                self.add_row(filename, var)
 
             else:  # These variables have nodal values (i.e the number of indices is either 2 or 3)
                 for inode in range(len(self.settings['structure_nodes'])):
                     node = self.settings['structure_nodes'][inode]
                     filename = self.folder + "struct_" + self.settings['structure_variables'][ivariable] + "_node" + str(node) + ".dat"
-                    with open(filename, 'a') as fid:
-                        if num_indices == 2:
-                            self.write_nparray_to_file(fid, self.data.ts, var[node,:], self.settings['delimiter'])
-                        elif num_indices == 3:
-                            ielem, inode_in_elem = self.data.structure.node_master_elem[node]
-                            self.write_nparray_to_file(fid, self.data.ts, var[ielem,inode_in_elem,:], self.settings['delimiter'])
+                    if num_indices == 2:
+                        self.add_row(filename, var[node,:])
+                    elif num_indices == 3:
+                        ielem, inode_in_elem = self.data.structure.node_master_elem[node]
+                        self.add_row(filename, var[ielem,inode_in_elem,:])
 
 
         # Aerodynamic variables at panels
@@ -269,9 +300,8 @@ class WriteVariablesTime(BaseSolver):
 
                 filename = self.folder + "aero_" + self.settings['aero_panels_variables'][ivariable] + "_panel" + "_isurf" + str(i_surf) + "_im"+ str(i_m) + "_in"+ str(i_n) + ".dat"
 
-                with open(filename, 'a') as fid:
-                    var = getattr(self.data.aero.timestep_info[it], self.settings['aero_panels_variables'][ivariable])
-                    self.write_value_to_file(fid, self.data.ts, var.gamma[i_surf][i_m,i_n], self.settings['delimiter'])
+                var = getattr(self.data.aero.timestep_info[it], self.settings['aero_panels_variables'][ivariable])
+                self.add_row(filename, var.gamma[i_surf][i_m,i_n], value=True)
 
 
         # Aerodynamic variables at nodes
@@ -285,9 +315,8 @@ class WriteVariablesTime(BaseSolver):
 
                 filename = self.folder + "aero_" + self.settings['aero_nodes_variables'][ivariable] + "_node" + "_isurf" + str(i_surf) + "_im"+ str(i_m) + "_in"+ str(i_n) + ".dat"
 
-                with open(filename, 'a') as fid:
-                    var = getattr(self.data.aero.timestep_info[it], self.settings['aero_nodes_variables'][ivariable])
-                    self.write_nparray_to_file(fid, self.data.ts, var[i_surf][:,i_m,i_n], self.settings['delimiter'])
+                var = getattr(self.data.aero.timestep_info[it], self.settings['aero_nodes_variables'][ivariable])
+                self.add_row(filename, var[i_surf][:,i_m,i_n])
 
         # Velocity field variables at points
         for ivariable in range(len(self.settings['vel_field_variables'])):
@@ -301,11 +330,80 @@ class WriteVariablesTime(BaseSolver):
                                     uext)
                 for ipoint in range(self.n_vel_field_points):
                     filename = self.folder + "vel_field_" + self.settings['vel_field_variables'][ivariable] + "_point" + str(ipoint) + ".dat"
-                    with open(filename, 'a') as fid:
-                        self.write_nparray_to_file(fid, self.data.ts, uext[0][:,ipoint,0], self.settings['delimiter'])
+                    self.add_row(filename, uext[0][:,ipoint,0])
+
+        if self.h5_writer is not None:
+            self.h5_values['ts'] = self.data.ts
+            self.h5_writer.append(self.h5_values)
+            self.h5_values = dict()
+
+        self.n_buffered_steps += 1
+        if self.n_buffered_steps >= self.settings['flush_stride']:
+            self.flush()
 
         return self.data
 
+    def add_row(self, filename, var, value=False):
+        """
+        Adds the current time step row of ``var`` to the output buffers.
+
+        Args:
+            filename (str): Text file of the variable. Its base name is the name of the dataset in ``variables.h5``.
+            var (np.ndarray): Variable
+            value (bool): Write ``var`` as a single value
+        """
+        if self.settings['text_output']:
+            try:
+                fid = self.text_buffers[filename]
+            except KeyError:
+                fid = io.StringIO()
+                self.text_buffers[filename] = fid
+            if value:
+                self.write_value_to_file(fid, self.data.ts, var, self.settings['delimiter'])
+            else:
+                self.write_nparray_to_file(fid, self.data.ts, var, self.settings['delimiter'])
+
+        if self.h5_writer is not None:
+            name = os.path.splitext(os.path.basename(filename))[0]
+            self.h5_values[name] = np.array(var, dtype=float)
+
+    def flush(self):
+        """
+        Writes the buffered time steps to the output files.
+        """
+        for filename, fid in self.text_buffers.items():
+            if fid.tell() > 0:
+                with open(filename, 'a') as out_fid:
+                    out_fid.write(fid.getvalue())
+                fid.seek(0)
+                fid.truncate()
+        if self.h5_writer is not None:
+            self.h5_writer.flush()
+        self.n_buffered_steps = 0
+
+    def close(self):
+        """
+        Writes the buffered time steps and closes the ``variables.h5`` file.
+        """
+        self.flush()
+        if self.h5_writer is not None:
+            self.h5_writer.close()
+            self.h5_writer = None
+            self.h5_file.close()
+            self.h5_file = None
+
+    def shutdown(self):
+        self.close()
+
+    def teardown(self):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['h5_file'] = None
+        state['h5_writer'] = None
+        return state
+
     def write_nparray_to_file(self, fid, ts, nparray, delimiter):
 
         fid.write("%d%s" % (ts,delimiter))
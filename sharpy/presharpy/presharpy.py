@@ -71,8 +71,22 @@ class PreSharpy(object):
     settings_description['save_settings'] = 'Save a copy of the settings to a ``.sharpy`` file in the output ' \
                                             'directory specified in ``log_folder``'
 
+    settings_types['profiler'] = 'bool'
+    settings_default['profiler'] = False
+    settings_description['profiler'] = 'Time the solvers in the ``flow``, the solvers, generators and controllers ' \
+                                       'they run and the stages of the time loop. A per time step table and a ' \
+                                       'summary report are written to the ``profiling`` folder in the output ' \
+                                       'directory. See :mod:`sharpy.utils.profiling`'
+
+    settings_types['profiler_step_formats'] = 'list(str)'
+    settings_default['profiler_step_formats'] = ['csv']
+    settings_description['profiler_step_formats'] = 'Formats of the per time step table of the ``profiler``'
+
+    settings_options = dict()
+    settings_options['profiler_step_formats'] = ['csv', 'h5']
+
     settings_table = settings.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description,
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options,
                                        header_line='The following are the settings that the PreSharpy class takes:')
 
     def __init__(self, in_settings=None):
@@ -87,7 +101,8 @@ class PreSharpy(object):
             self.settings = in_settings
             self.settings['SHARPy']['flow'] = self.settings['SHARPy']['flow']
 
-            settings.to_custom_types(self.settings['SHARPy'], self.settings_types, self.settings_default)
+            settings.to_custom_types(self.settings['SHARPy'], self.settings_types, self.settings_default,
+                                     self.settings_options)
             self.output_folder = self.settings['SHARPy']['log_folder'] + '/' + self.settings['SHARPy']['case'] + '/'
             if not os.path.isdir(self.output_folder):
                 os.makedirs(self.output_folder)
@@ -117,7 +132,8 @@ class PreSharpy(object):
     def update_settings(self, new_settings):
         self.settings = new_settings
         self.settings['SHARPy']['flow'] = self.settings['SHARPy']['flow']
-        settings.to_custom_types(self.settings['SHARPy'], self.settings_types, self.settings_default)
+        settings.to_custom_types(self.settings['SHARPy'], self.settings_types, self.settings_default,
+                                 self.settings_options)
 
         self.output_folder = self.settings['SHARPy']['log_folder'] + '/' + self.settings['SHARPy']['case'] + '/'
         if not os.path.isdir(self.output_folder):
@@ -265,7 +265,7 @@ class Krylov(rom_interface.BaseRom):
         if self.frequency.dtype == complex:
             cout.cout_wrap(self.nfreq * '\t\tsigma = %4f + %4fj [rad/s]\n' %tuple(self.frequency.view(float)), 1)
         else:
-            cout.cout_wrap(self.nfreq * '\t\tsigma = %4f [rad/s]\n' % self.frequency, 1)
+            cout.cout_wrap(self.nfreq * '\t\tsigma = %4f [rad/s]\n' % tuple(self.frequency), 1)
         cout.cout_wrap('\tKrylov order:')
         cout.cout_wrap('\t\tr = %d' % self.r, 1)
 
@@ -161,7 +161,7 @@ def construct_krylov(r, lu_A, B, approx_type='Pade', side='b'):
     # Initial assembly
     f[:, :1] = w - v.dot(alpha)
     V[:, :1] = v
-    H[0, 0] = alpha
+    H[0, 0] = alpha[0, 0]
 
     for j in range(0, r-1):
 
@@ -38,6 +38,8 @@ def main(args=None, sharpy_input_dict=None):
 
     import h5py
     import sharpy.utils.h5utils as h5utils
+    import sharpy.utils.checkpoint as checkpoint
+    import sharpy.utils.profiling as profiling
 
     # Loading solvers and postprocessors
     import sharpy.solvers
@@ -92,19 +94,27 @@ def main(args=None, sharpy_input_dict=None):
             restart = False
         else:
             try:
-                with open(args.restart, 'rb') as restart_file:
-                    data = pickle.load(restart_file)
-                    try:
-                        solvers = pickle.load(restart_file)
-                    except EOFError:
-                        # For backwards compatibility
-                        missing_solvers = True
-                        solvers = dict()
-                        cout.cout_wrap('Solvers not found in Pickle file. Using the settings in *.sharpy file.')
-                    if "UpdatePickle" in solvers.keys():
-                        # For backwards compatibility
+                if checkpoint.is_checkpoint(args.restart):
+                    # incremental checkpoint, the time steps are read when needed
+                    data, solvers = checkpoint.load_checkpoint(args.restart)
+                    if solvers is None:
                         missing_solvers = True
                         solvers = dict()
+                        cout.cout_wrap('Solvers not found in checkpoint file. Using the settings in *.sharpy file.')
+                else:
+                    with open(args.restart, 'rb') as restart_file:
+                        data = pickle.load(restart_file)
+                        try:
+                            solvers = pickle.load(restart_file)
+                        except EOFError:
+                            # For backwards compatibility
+                            missing_solvers = True
+                            solvers = dict()
+                            cout.cout_wrap('Solvers not found in Pickle file. Using the settings in *.sharpy file.')
+                        if "UpdatePickle" in solvers.keys():
+                            # For backwards compatibility
+                            missing_solvers = True
+                            solvers = dict()
             except FileNotFoundError:
                 raise FileNotFoundError('The file specified for the snapshot \
                     restart (-r) does not exist. Please check.')
@@ -128,6 +138,11 @@ def main(args=None, sharpy_input_dict=None):
                 if old_solver_name not in settings['SHARPy']['flow']:
                     del solvers[old_solver_name] 
 
+        if data.settings['SHARPy']['profiler']:
+            profiling.profiler.start(data.output_folder + 'profiling/',
+                                     data.case_name,
+                                     data.settings['SHARPy']['profiler_step_formats'])
+
         # Loop for the solvers specified in *.sharpy['SHARPy']['flow']
         for solver_name in settings['SHARPy']['flow']:
             if (args.restart is None) or (solver_name not in solvers.keys()) or (missing_solvers):
@@ -139,6 +154,8 @@ def main(args=None, sharpy_input_dict=None):
             data = solvers[solver_name].run(solvers=solvers)
             solvers[solver_name].teardown()
 
+        profiling.profiler.finish()
+
         cpu_time = time.process_time() - t
         wall_time = time.perf_counter() - t0_wall
         cout.cout_wrap('FINISHED - Elapsed time = %f6 seconds' % wall_time, 2)
@@ -146,6 +163,7 @@ def main(args=None, sharpy_input_dict=None):
         finish_writer()
 
     except Exception as e:
+        profiling.profiler.stop()
         try:
             logdir = settings['SHARPy']['log_folder'] + '/' + settings['SHARPy']['case']
         except KeyError:
@@ -84,6 +84,12 @@ class AerogridLoader(BaseSolver):
     settings_default['wake_shape_generator_input'] = dict()
     settings_description['wake_shape_generator_input'] = 'Dictionary of inputs needed by the wake shape generator'
 
+    settings_types['packed_storage'] = 'bool'
+    settings_default['packed_storage'] = False
+    settings_description['packed_storage'] = 'Store each aerodynamic time step variable in a single contiguous buffer ' \
+                                             'for all surfaces. See ' \
+                                             ':meth:`~sharpy.utils.datastructures.AeroTimeStepInfo.pack`'
+
     settings_table = settings_utils.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description,
                                        settings_options=settings_options)
@@ -1,4 +1,5 @@
 import ctypes as ct
+import os
 import time
 import copy
 import threading
@@ -18,6 +19,8 @@ import sharpy.utils.algebra as algebra
 import sharpy.utils.exceptions as exc
 import sharpy.io.network_interface as network_interface
 import sharpy.utils.generator_interface as gen_interface
+import sharpy.utils.datastructures as datastructures
+import sharpy.utils.profiling as profiling
 
 
 @solver
@@ -178,6 +181,25 @@ class DynamicCoupled(BaseSolver):
                                                  'The dictionary values are dictionaries with the settings ' \
                                                  'needed by each generator.'
 
+    settings_types['preallocated_workspace'] = 'bool'
+    settings_default['preallocated_workspace'] = False
+    settings_description['preallocated_workspace'] = 'Reuse preallocated (double buffered) time step objects within ' \
+                                                     'the time loop. Intermediate copies are done in place and ' \
+                                                     'time steps are only deep copied when stored in ' \
+                                                     '``timestep_info``'
+
+    settings_types['history_retention'] = 'int'
+    settings_default['history_retention'] = 0
+    settings_description['history_retention'] = 'Number of latest time steps kept in memory in ``timestep_info``. ' \
+                                                'Older time steps (except the initial one) are replaced by ``None``. ' \
+                                                '``0`` keeps the whole history. It should be large enough for the ' \
+                                                'postprocessors in use'
+
+    settings_types['history_spill'] = 'bool'
+    settings_default['history_spill'] = False
+    settings_description['history_spill'] = 'Write the time steps dropped from memory with ``history_retention`` ' \
+                                            'to ``history/<case>.<structure|aero>_history.h5`` in the output folder'
+
     settings_table = settings_utils.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
@@ -210,6 +232,11 @@ class DynamicCoupled(BaseSolver):
         self.correct_forces = False
         self.correct_forces_generator = None
 
+        self.force_mapping_index = None
+
+        # preallocated time step objects used with ``preallocated_workspace``
+        self.workspace = dict()
+
         self.logger = logging.getLogger(__name__)  # used with the network interface
 
         # variables to send and receive
@@ -285,6 +312,14 @@ class DynamicCoupled(BaseSolver):
                                     restart=restart)
         self.data = self.aero_solver.data
 
+        if self.settings['history_retention'] > 0:
+            self.set_history_retention()
+
+        # lattice to structural nodes index used in the force mapping
+        self.force_mapping_index = mapping.ForceMappingIndex(self.data.aero.struct2aero_mapping,
+                                                             self.data.structure.connectivities,
+                                                             self.data.structure.num_node)
+
         # initialise postprocessors
         if self.settings['postprocessors']:
             self.with_postprocessors = True
@@ -363,6 +398,27 @@ class DynamicCoupled(BaseSolver):
                 self.runtime_generators[rg_id] = gen()
             self.runtime_generators[rg_id].initialise(param, data=self.data, restart=restart)
 
+    def set_history_retention(self):
+        """
+        Replaces the ``timestep_info`` of the structure and aerodynamic grid by a
+        :class:`~sharpy.utils.datastructures.TimeStepHistory` with the ``history_retention`` window.
+        """
+        retention = max(self.settings['history_retention'], 3)  # gamma_dot needs the last three steps
+        if self.settings['history_spill']:
+            folder = self.data.output_folder + '/history/'
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+        for name, model in (('structure', self.data.structure), ('aero', self.data.aero)):
+            if isinstance(model.timestep_info, datastructures.TimeStepHistory):
+                model.timestep_info.close()
+            spill_filename = None
+            if self.settings['history_spill']:
+                spill_filename = folder + self.data.settings['SHARPy']['case'] + '.%s_history.h5' % name
+            model.timestep_info = datastructures.TimeStepHistory(model.timestep_info,
+                                                                 retention=retention,
+                                                                 spill_filename=spill_filename)
+
     def cleanup_timestep_info(self):
         if max(len(self.data.aero.timestep_info), len(self.data.structure.timestep_info)) > 1:
             # copy last info to first
@@ -514,6 +570,7 @@ class DynamicCoupled(BaseSolver):
                 len(self.data.structure.timestep_info),
                 self.settings['n_time_steps'] + 1):
             initial_time = time.perf_counter()
+            profiling.begin_step()
 
             # network only
             # get input from the other thread
@@ -523,39 +580,41 @@ class DynamicCoupled(BaseSolver):
                 self.logger.debug('Time loop - received {}'.format(values))
                 self.set_of_variables.update_timestep(self.data, values)
 
-            structural_kstep = self.data.structure.timestep_info[-1].copy()
-            aero_kstep = self.data.aero.timestep_info[-1].copy()
+            structural_kstep = self.step_copy(self.data.structure.timestep_info[-1], 'structural')
+            aero_kstep = self.step_copy(self.data.aero.timestep_info[-1], 'aero')
             self.logger.debug('Time step {}'.format(self.data.ts))
 
             # Add the controller here
             if self.with_controllers:
-                state = {'structural': structural_kstep,
-                         'aero': aero_kstep}
-                for k, v in self.controllers.items():
-                    state = v.control(self.data, state)
-                    # this takes care of the changes in options for the solver
-                    structural_kstep, aero_kstep = self.process_controller_output(
-                        state)
+                with profiling.timer('controllers'):
+                    state = {'structural': structural_kstep,
+                             'aero': aero_kstep}
+                    for k, v in self.controllers.items():
+                        state = v.control(self.data, state)
+                        # this takes care of the changes in options for the solver
+                        structural_kstep, aero_kstep = self.process_controller_output(
+                            state)
 
             # Add external forces
             if self.with_runtime_generators:
-                structural_kstep.runtime_steady_forces.fill(0.)
-                structural_kstep.runtime_unsteady_forces.fill(0.)
-                params = dict()
-                params['data'] = self.data
-                params['struct_tstep'] = structural_kstep
-                params['aero_tstep'] = aero_kstep
-                params['fsi_substep'] = -1
-                for id, runtime_generator in self.runtime_generators.items():
-                    runtime_generator.generate(params)
+                with profiling.timer('runtime_generators'):
+                    structural_kstep.runtime_steady_forces.fill(0.)
+                    structural_kstep.runtime_unsteady_forces.fill(0.)
+                    params = dict()
+                    params['data'] = self.data
+                    params['struct_tstep'] = structural_kstep
+                    params['aero_tstep'] = aero_kstep
+                    params['fsi_substep'] = -1
+                    for id, runtime_generator in self.runtime_generators.items():
+                        runtime_generator.generate(params)
 
             self.time_aero = 0.0
             self.time_struc = 0.0
 
             # Copy the controlled states so that the interpolation does not
             # destroy the previous information
-            controlled_structural_kstep = structural_kstep.copy()
-            controlled_aero_kstep = aero_kstep.copy()
+            controlled_structural_kstep = self.step_copy(structural_kstep, 'controlled_structural')
+            controlled_aero_kstep = self.step_copy(aero_kstep, 'controlled_aero')
 
             for k in range(self.settings['fsi_substeps'] + 1):
                 if (k == self.settings['fsi_substeps'] and
@@ -567,9 +626,10 @@ class DynamicCoupled(BaseSolver):
                         structural_kstep,
                         aero_kstep)
                     break
+                profiling.count('fsi_iterations')
 
                 # generate new grid (already rotated)
-                aero_kstep = controlled_aero_kstep.copy()
+                aero_kstep = self.step_copy(controlled_aero_kstep, 'aero')
                 self.aero_solver.update_custom_grid(
                     structural_kstep,
                     aero_kstep)
@@ -589,38 +649,41 @@ class DynamicCoupled(BaseSolver):
                 previous_runtime_unsteady_forces = structural_kstep.runtime_unsteady_forces.astype(dtype=ct.c_double, order='F', copy=True)
                 # Add external forces
                 if self.with_runtime_generators:
-                    structural_kstep.runtime_steady_forces.fill(0.)
-                    structural_kstep.runtime_unsteady_forces.fill(0.)
-                    params = dict()
-                    params['data'] = self.data
-                    params['struct_tstep'] = structural_kstep
-                    params['aero_tstep'] = aero_kstep
-                    params['fsi_substep'] = k
-                    for id, runtime_generator in self.runtime_generators.items():
-                        runtime_generator.generate(params)
+                    with profiling.timer('runtime_generators'):
+                        structural_kstep.runtime_steady_forces.fill(0.)
+                        structural_kstep.runtime_unsteady_forces.fill(0.)
+                        params = dict()
+                        params['data'] = self.data
+                        params['struct_tstep'] = structural_kstep
+                        params['aero_tstep'] = aero_kstep
+                        params['fsi_substep'] = k
+                        for id, runtime_generator in self.runtime_generators.items():
+                            runtime_generator.generate(params)
 
                 # run the solver
                 ini_time_aero = time.perf_counter()
-                self.data = self.aero_solver.run(aero_step=aero_kstep,
-                                                 structural_step=structural_kstep,
-                                                 convect_wake=True,
-                                                 unsteady_contribution=unsteady_contribution)
+                with profiling.timer('aero_solve'):
+                    self.data = self.aero_solver.run(aero_step=aero_kstep,
+                                                     structural_step=structural_kstep,
+                                                     convect_wake=True,
+                                                     unsteady_contribution=unsteady_contribution)
                 self.time_aero += time.perf_counter() - ini_time_aero
 
-                previous_kstep = structural_kstep.copy()
-                structural_kstep = controlled_structural_kstep.copy()
-                structural_kstep.runtime_steady_forces = previous_kstep.runtime_steady_forces.astype(dtype=ct.c_double, order='F', copy=True)
-                structural_kstep.runtime_unsteady_forces = previous_kstep.runtime_unsteady_forces.astype(dtype=ct.c_double, order='F', copy=True)
-                previous_kstep.runtime_steady_forces = previous_runtime_steady_forces.astype(dtype=ct.c_double, order='F', copy=True)
-                previous_kstep.runtime_unsteady_forces = previous_runtime_unsteady_forces.astype(dtype=ct.c_double, order='F', copy=True)
+                previous_kstep, structural_kstep = self.swap_structural_steps(structural_kstep,
+                                                                              controlled_structural_kstep)
+                np.copyto(structural_kstep.runtime_steady_forces, previous_kstep.runtime_steady_forces)
+                np.copyto(structural_kstep.runtime_unsteady_forces, previous_kstep.runtime_unsteady_forces)
+                np.copyto(previous_kstep.runtime_steady_forces, previous_runtime_steady_forces)
+                np.copyto(previous_kstep.runtime_unsteady_forces, previous_runtime_unsteady_forces)
 
                 # move the aerodynamic surface according the the structural one
                 self.aero_solver.update_custom_grid(structural_kstep,
                                                     aero_kstep)
 
-                self.map_forces(aero_kstep,
-                                structural_kstep,
-                                force_coeff)
+                with profiling.timer('force_mapping'):
+                    self.map_forces(aero_kstep,
+                                    structural_kstep,
+                                    force_coeff)
 
                 # relaxation
                 relax_factor = self.relaxation_factor(k)
@@ -636,7 +699,7 @@ class DynamicCoupled(BaseSolver):
                 if np.isnan(structural_kstep.unsteady_applied_forces).any():
                     raise exc.NotConvergedSolver('NaN found in unsteady_applied_forces!')
 
-                copy_structural_kstep = structural_kstep.copy()
+                copy_structural_kstep = self.step_copy(structural_kstep, 'interpolation_structural')
                 ini_time_struc = time.perf_counter()
                 for i_substep in range(
                         self.settings['structural_substeps'] + 1):
@@ -650,9 +713,10 @@ class DynamicCoupled(BaseSolver):
                         out_step=structural_kstep,
                         coeff=coeff)
 
-                    self.data = self.structural_solver.run(
-                        structural_step=structural_kstep,
-                        dt=self.substep_dt)
+                    with profiling.timer('structural_solve'):
+                        self.data = self.structural_solver.run(
+                            structural_step=structural_kstep,
+                            dt=self.substep_dt)
 
                 self.time_struc += time.perf_counter() - ini_time_struc
 
@@ -696,8 +760,11 @@ class DynamicCoupled(BaseSolver):
                         self.structural_solver.extract_resultants(self.data.structure.timestep_info[self.data.ts]))
             # run postprocessors
             if self.with_postprocessors:
-                for postproc in self.postprocessors:
-                    self.data = self.postprocessors[postproc].run(online=True, solvers=solvers)
+                with profiling.timer('postprocessors'):
+                    for postproc in self.postprocessors:
+                        self.data = self.postprocessors[postproc].run(online=True, solvers=solvers)
+
+            profiling.end_step(self.data.ts)
 
             # network only
             # put result back in queue
@@ -714,6 +781,57 @@ class DynamicCoupled(BaseSolver):
             finish_event.set()
             self.logger.info('Time loop - Complete')
 
+    def step_copy(self, tstep, buffer_id):
+        """
+        Returns a copy of the time step ``tstep``.
+
+        If ``preallocated_workspace`` is on, the information is copied in place into the workspace time step
+        ``buffer_id``, which is only allocated the first time it is requested.
+
+        Args:
+            tstep (AeroTimeStepInfo or StructTimeStepInfo): time step to copy
+            buffer_id (str): name of the workspace buffer
+
+        Returns:
+            AeroTimeStepInfo or StructTimeStepInfo: copy of ``tstep``
+        """
+        if not self.settings['preallocated_workspace']:
+            return tstep.copy()
+
+        try:
+            buffer = self.workspace[buffer_id]
+        except KeyError:
+            self.workspace[buffer_id] = tstep.copy()
+            return self.workspace[buffer_id]
+
+        return tstep.copy(out=buffer)
+
+    def swap_structural_steps(self, structural_kstep, controlled_structural_kstep):
+        """
+        Keeps the current structural step as the previous FSI iteration and resets the current one to the controlled
+        state.
+
+        With ``preallocated_workspace`` on, the current and previous structural steps are two buffers that are
+        swapped, such that no time step is allocated or deep copied.
+
+        Returns:
+            tuple: previous and current structural time steps
+        """
+        if not self.settings['preallocated_workspace']:
+            return structural_kstep.copy(), controlled_structural_kstep.copy()
+
+        if structural_kstep is self.workspace.get('structural', None):
+            previous_kstep = structural_kstep
+            try:
+                self.workspace['structural'] = self.workspace['previous_structural']
+            except KeyError:
+                del self.workspace['structural']
+            self.workspace['previous_structural'] = previous_kstep
+        else:
+            previous_kstep = self.step_copy(structural_kstep, 'previous_structural')
+
+        return previous_kstep, self.step_copy(controlled_structural_kstep, 'structural')
+
     def convergence(self, k, tstep, previous_tstep,
                     struct_solver, aero_solver, with_runtime_generators):
         r"""
@@ -792,27 +910,16 @@ class DynamicCoupled(BaseSolver):
         structural_kstep.steady_applied_forces.fill(0.0)
         structural_kstep.unsteady_applied_forces.fill(0.0)
 
-        # aero forces to structural forces
-        struct_forces = mapping.aero2struct_force_mapping(
-            aero_kstep.forces,
-            self.data.aero.struct2aero_mapping,
-            aero_kstep.zeta,
-            structural_kstep.pos,
-            structural_kstep.psi,
-            self.data.structure.node_master_elem,
-            self.data.structure.connectivities,
-            structural_kstep.cag(),
-            self.data.aero.aero_dict)
-        dynamic_struct_forces = mapping.aero2struct_force_mapping(
-            aero_kstep.dynamic_forces,
+        # aero forces to structural forces (steady and unsteady in a single pass)
+        struct_forces, dynamic_struct_forces = mapping.aero2struct_force_mapping_multiple(
+            [aero_kstep.forces, aero_kstep.dynamic_forces],
             self.data.aero.struct2aero_mapping,
             aero_kstep.zeta,
             structural_kstep.pos,
             structural_kstep.psi,
-            self.data.structure.node_master_elem,
             self.data.structure.connectivities,
             structural_kstep.cag(),
-            self.data.aero.aero_dict)
+            mapping_index=self.force_mapping_index)
 
         if self.correct_forces:
             struct_forces = \
@@ -889,6 +996,9 @@ class DynamicCoupled(BaseSolver):
 
     def teardown(self):
         
+        for model in (self.data.structure, self.data.aero):
+            if isinstance(model.timestep_info, datastructures.TimeStepHistory):
+                model.timestep_info.close()
         self.structural_solver.teardown()
         self.aero_solver.teardown()
         if self.with_postprocessors:
@@ -1,6 +1,9 @@
 import ctypes as ct
 import numpy as np
 import os
+import scipy.linalg
+import scipy.sparse as sparse
+import scipy.sparse.linalg as sparse_linalg
 
 from sharpy.utils.solver_interface import solver, BaseSolver, solver_from_string
 import sharpy.utils.settings as settings_utils
@@ -62,8 +65,17 @@ class NonLinearDynamicMultibody(_BaseStructural):
     settings_default['zero_ini_dot_ddot'] = False
     settings_description['zero_ini_dot_ddot'] = 'Set to zero the position and crv derivatives at the first time step'
 
+    settings_types['linear_solver'] = 'str'
+    settings_default['linear_solver'] = 'dense'
+    settings_description['linear_solver'] = 'Method to solve the linear system of each iteration. ``dense``: dense ' \
+                                            'matrices and ``np.linalg.solve``. ``sparse_lu``: sparse block assembly ' \
+                                            'and sparse LU factorisation, reusing the fill reducing ordering while ' \
+                                            'the sparsity pattern does not change. The condition numbers written ' \
+                                            'with ``write_lm`` are then 1-norm estimates'
+    settings_options['linear_solver'] = ['dense', 'sparse_lu']
+
     settings_table = settings_utils.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
     def __init__(self):
         self.data = None
@@ -84,6 +96,17 @@ class NonLinearDynamicMultibody(_BaseStructural):
 
         self.prev_Dq = None
 
+        # Fill reducing ordering of the sparse LU factorisation and the sparsity pattern it was computed for
+        self.column_order = None
+        self.lu_pattern = None
+        # Solver of the system of equations with the last factorised iteration matrix
+        self.linear_solve = None
+        self.cond_num = None
+        self.cond_num_lm = None
+
+        # Persistent bodies of the structure
+        self.mb_views = None
+
         self.out_files = None  # dict: containing output_variable:file_path if desired to write output
 
     def initialise(self, data, custom_settings=None, restart=False):
@@ -129,6 +152,8 @@ class NonLinearDynamicMultibody(_BaseStructural):
         self.define_sys_size()
 
         self.prev_Dq = np.zeros((self.sys_size + self.num_LM_eq))
+        self.linear_solve = None
+        self.mb_views = mb.MultibodyViews(self.data.structure)
 
         self.settings['time_integrator_settings']['sys_size'] = self.sys_size
         self.settings['time_integrator_settings']['num_LM_eq'] = self.num_LM_eq
@@ -192,10 +217,15 @@ class NonLinearDynamicMultibody(_BaseStructural):
             Lambda_dot (np.ndarray): Time derivarive of ``Lambda``
             MBdict (dict): Dictionary including the multibody information
 
+        If the ``linear_solver`` is ``sparse_lu``, the mass, damping and stiffness matrices are assembled as sparse
+        matrices: block diagonal with the matrices of each body plus the coupling introduced by the constraints.
+
         Returns:
             MB_Asys (np.ndarray): Matrix of the systems of equations
             MB_Q (np.ndarray): Vector of the systems of equations
         """
+        if self.settings['linear_solver'] == 'sparse_lu':
+            return self.assembly_MB_eq_system_sparse(MB_beam, MB_tstep, ts, dt, Lambda, Lambda_dot, MBdict)
 
         MB_M = np.zeros((self.sys_size, self.sys_size), dtype=ct.c_double, order='F')
         MB_C = np.zeros((self.sys_size, self.sys_size), dtype=ct.c_double, order='F')
@@ -259,6 +289,167 @@ class NonLinearDynamicMultibody(_BaseStructural):
 
         return MB_M, MB_C, MB_K, MB_Q, kBnh, strict_LM_Q
 
+    def assembly_MB_eq_system_sparse(self, MB_beam, MB_tstep, ts, dt, Lambda, Lambda_dot, MBdict):
+        """
+        Sparse version of :meth:`assembly_MB_eq_system`. The arguments are the same.
+
+        Returns:
+            tuple: ``scipy.sparse.csc_matrix`` mass, damping and stiffness matrices, ``np.ndarray`` forcing vector,
+            ``scipy.sparse.csr_matrix`` constraint matrix ``kBnh`` and ``np.ndarray`` constraint equations vector
+        """
+        M_blocks = []
+        C_blocks = []
+        K_blocks = []
+        Q_blocks = []
+        for ibody in range(len(MB_beam)):
+            if MB_beam[ibody].FoR_movement == 'prescribed':
+                M, C, K, Q = xbeamlib.cbeam3_asbly_dynamic(MB_beam[ibody], MB_tstep[ibody], self.settings)
+            elif MB_beam[ibody].FoR_movement == 'free':
+                M, C, K, Q = xbeamlib.xbeam3_asbly_dynamic(MB_beam[ibody], MB_tstep[ibody], self.settings)
+            M_blocks.append(sparse.csc_matrix(M))
+            C_blocks.append(sparse.csc_matrix(C))
+            K_blocks.append(sparse.csc_matrix(K))
+            Q_blocks.append(Q)
+
+        LM_C, LM_K, LM_Q = lagrangeconstraints.generate_lagrange_matrix(
+            self.lc_list,
+            MB_beam,
+            MB_tstep,
+            ts,
+            self.num_LM_eq,
+            self.sys_size,
+            dt,
+            Lambda,
+            Lambda_dot,
+            "dynamic",
+            output_format='sparse')
+
+        MB_M = sparse.block_diag(M_blocks, format='csc')
+        MB_C = sparse.block_diag(C_blocks, format='csc') + LM_C[:self.sys_size, :self.sys_size]
+        MB_K = sparse.block_diag(K_blocks, format='csc') + LM_K[:self.sys_size, :self.sys_size]
+        MB_Q = np.concatenate(Q_blocks) + LM_Q[:self.sys_size]
+
+        # Only working for non-holonomic constratints
+        kBnh = LM_C[self.sys_size:, :self.sys_size].tocsr()
+        strict_LM_Q = LM_Q[self.sys_size:]
+
+        return MB_M, MB_C, MB_K, MB_Q, kBnh, strict_LM_Q
+
+    def sparse_lu(self, Asys):
+        """
+        LU factorisation of the sparse matrix ``Asys``.
+
+        The fill reducing (``COLAMD``) ordering of the columns is computed once and reused in the following
+        factorisations, as long as the sparsity pattern of the matrix does not change.
+
+        Args:
+            Asys (scipy.sparse.csc_matrix): Matrix of the system of equations
+
+        Returns:
+            tuple: ``scipy.sparse.linalg.SuperLU`` factorisation of ``Asys[:, column_order]`` and ``column_order``
+        """
+        Asys = sparse.csc_matrix(Asys)
+        Asys.sort_indices()
+        if (self.lu_pattern is None or
+                not np.array_equal(self.lu_pattern[0], Asys.indptr) or
+                not np.array_equal(self.lu_pattern[1], Asys.indices)):
+            self.column_order = np.argsort(sparse_linalg.splu(Asys, permc_spec='COLAMD').perm_c)
+            self.lu_pattern = (Asys.indptr.copy(), Asys.indices.copy())
+
+        return sparse_linalg.splu(Asys[:, self.column_order], permc_spec='NATURAL'), self.column_order
+
+    @staticmethod
+    def sparse_lu_solve(lu, column_order, b):
+        """
+        Solves the system of equations factorised with :meth:`sparse_lu`
+        """
+        x = np.zeros_like(b)
+        x[column_order] = lu.solve(b)
+        return x
+
+    @staticmethod
+    def sparse_inverse_operator(lu, column_order):
+        """
+        Inverse of the matrix factorised with :meth:`sparse_lu` as a ``scipy.sparse.linalg.LinearOperator``. The
+        adjoint product solves the transposed system, undoing the permutation of the columns.
+        """
+        n = len(column_order)
+
+        def matvec(b):
+            return NonLinearDynamicMultibody.sparse_lu_solve(lu, column_order, np.asarray(b, dtype=float).ravel())
+
+        def rmatvec(b):
+            return lu.solve(np.asarray(b, dtype=float).ravel()[column_order], trans='T')
+
+        return sparse_linalg.LinearOperator((n, n), matvec=matvec, rmatvec=rmatvec, dtype=float)
+
+    @staticmethod
+    def sparse_cond_estimate(A, lu=None, column_order=None):
+        """
+        Estimate of the 1-norm condition number of the sparse matrix ``A``, without computing its inverse.
+
+        The factorisation of ``A`` returned by :meth:`sparse_lu` can be provided in ``lu`` and ``column_order``,
+        otherwise ``A`` is factorised here.
+        """
+        if lu is None:
+            lu = sparse_linalg.splu(sparse.csc_matrix(A))
+            column_order = np.arange(A.shape[1])
+        inv_A = NonLinearDynamicMultibody.sparse_inverse_operator(lu, column_order)
+        return sparse_linalg.onenormest(A)*sparse_linalg.onenormest(inv_A)
+
+    def condition_numbers(self, Asys):
+        """
+        Condition numbers of the system of equations without and with the constraint equations. They are 1-norm
+        estimates if ``Asys`` is sparse.
+        """
+        if sparse.issparse(Asys):
+            return (self.sparse_cond_estimate(Asys[:self.sys_size, :self.sys_size]),
+                    self.sparse_cond_estimate(Asys, *self.sparse_lu(Asys)))
+        return np.linalg.cond(Asys[:self.sys_size, :self.sys_size]), np.linalg.cond(Asys)
+
+    def factorise(self, Asys):
+        """
+        Factorises the matrix of the system of equations
+
+        Args:
+            Asys (np.ndarray or scipy.sparse.csc_matrix): Matrix of the system of equations
+
+        Returns:
+            function: solves the system of equations for a given right hand side with the factorised matrix. If
+            ``rigid_bodies`` is set, only the rigid and constraint degrees of freedom are solved for.
+        """
+        if self.settings['rigid_bodies']:
+            rigid_LM_dofs = np.array(self.rigid_dofs, dtype=int)
+            rigid_LM_dofs = np.concatenate((rigid_LM_dofs, np.arange(self.num_LM_eq, dtype=int) + self.sys_size))
+            if sparse.issparse(Asys):
+                rigid_lu = sparse_linalg.splu(sparse.csc_matrix(Asys[rigid_LM_dofs, :][:, rigid_LM_dofs]))
+                rigid_solve = rigid_lu.solve
+            else:
+                rigid_lu = scipy.linalg.lu_factor(Asys[np.ix_(rigid_LM_dofs, rigid_LM_dofs)], check_finite=False)
+                rigid_solve = lambda b: scipy.linalg.lu_solve(rigid_lu, b, check_finite=False)
+
+            def solve(b):
+                x = np.zeros((self.sys_size + self.num_LM_eq))
+                x[rigid_LM_dofs] = rigid_solve(b[rigid_LM_dofs])
+                return x
+
+        elif sparse.issparse(Asys):
+            lu, column_order = self.sparse_lu(Asys)
+            solve = lambda b: self.sparse_lu_solve(lu, column_order, b)
+
+        else:
+            lu = scipy.linalg.lu_factor(Asys, check_finite=False)
+            solve = lambda b: scipy.linalg.lu_solve(lu, b, check_finite=False)
+
+        return solve
+
+    def __getstate__(self):
+        # factorisations and bodies are not pickled, they are regenerated in the next time step
+        state = self.__dict__.copy()
+        state['linear_solve'] = None
+        state['mb_views'] = None
+        return state
+
     def integrate_position(self, MB_beam, MB_tstep, dt):
         """
         This function integrates the position of each local A FoR after the
@@ -307,8 +498,8 @@ class NonLinearDynamicMultibody(_BaseStructural):
             return
 
         # TODO the output of this routine is wrong. check at some point.
-        LM_C, LM_K, LM_Q = lagrangeconstraints.generate_lagrange_matrix(self.lc_list, MB_beam, MB_tstep, ts, self.num_LM_eq, self.sys_size, dt, Lambda, Lambda_dot, "dynamic")
-        F = -np.dot(LM_C[:, -self.num_LM_eq:], Lambda_dot) - np.dot(LM_K[:, -self.num_LM_eq:], Lambda)
+        LM_C, LM_K, LM_Q = lagrangeconstraints.generate_lagrange_matrix(self.lc_list, MB_beam, MB_tstep, ts, self.num_LM_eq, self.sys_size, dt, Lambda, Lambda_dot, "dynamic", output_format='sparse')
+        F = -LM_C[:, -self.num_LM_eq:] @ Lambda_dot - LM_K[:, -self.num_LM_eq:] @ Lambda
 
         first_dof = 0
         for ibody in range(len(MB_beam)):
@@ -358,11 +549,15 @@ class NonLinearDynamicMultibody(_BaseStructural):
         else:
             MBdict = self.data.structure.ini_mb_dict
 
+        if self.mb_views is None:
+            self.mb_views = mb.MultibodyViews(self.data.structure)
+
         MB_beam, MB_tstep = mb.split_multibody(
             self.data.structure,
             structural_step,
             MBdict,
-            self.data.ts)
+            self.data.ts,
+            views=self.mb_views)
 
         self.define_rigid_dofs(MB_beam)
         num_LM_eq = self.num_LM_eq
@@ -399,6 +594,10 @@ class NonLinearDynamicMultibody(_BaseStructural):
         old_Dq = 1.0
         LM_old_Dq = 1.0
 
+        # Ratio between the corrections of the last two iterations for the Jacobian refresh policy
+        reduction = None
+        prev_max_Dq = None
+
         skip_step = False
         for iteration in range(self.settings['max_iterations']):
             # Check if the maximum of iterations has been reached
@@ -411,7 +610,7 @@ class NonLinearDynamicMultibody(_BaseStructural):
             Lambda, Lambda_dot = mb.state2disp_and_accel(q, dqdt, dqddt, MB_beam, MB_tstep, num_LM_eq)
 
             if self.settings['write_lm'] and iteration:
-                self.write_lm_cond_num(iteration, Lambda, Lambda_dot, Lambda_ddot, cond_num, cond_num_lm)
+                self.write_lm_cond_num(iteration, Lambda, Lambda_dot, Lambda_ddot, self.cond_num, self.cond_num_lm)
 
             MB_M, MB_C, MB_K, MB_Q, kBnh, LM_Q = self.assembly_MB_eq_system(MB_beam,
                                                                 MB_tstep,
@@ -421,24 +620,19 @@ class NonLinearDynamicMultibody(_BaseStructural):
                                                                 Lambda_dot,
                                                                 MBdict)
 
-            Asys, Q = self.time_integrator.build_matrix(MB_M, MB_C, MB_K, MB_Q,
-                                                        kBnh, LM_Q)
-
-            if self.settings['write_lm']:
-                cond_num = np.linalg.cond(Asys[:self.sys_size, :self.sys_size])
-                cond_num_lm = np.linalg.cond(Asys)
-
-            if self.settings['rigid_bodies']:
-                rigid_LM_dofs = self.rigid_dofs + (np.arange(self.num_LM_eq, dtype=int) + self.sys_size).tolist()
-
-                rigid_Asys = Asys[np.ix_(rigid_LM_dofs, rigid_LM_dofs)].copy()
-                rigid_Q = Q[rigid_LM_dofs].copy()
-                rigid_Dq = np.linalg.solve(rigid_Asys, -rigid_Q)
-                Dq = np.zeros((self.sys_size + self.num_LM_eq))
-                Dq[rigid_LM_dofs] = rigid_Dq.copy()
+            if self.linear_solve is None:
+                self.time_integrator.reset_jacobian()
+            if self.time_integrator.update_jacobian(reduction):
+                Asys, Q = self.time_integrator.build_matrix(MB_M, MB_C, MB_K, MB_Q,
+                                                            kBnh, LM_Q)
+                self.linear_solve = self.factorise(Asys)
 
+                if self.settings['write_lm']:
+                    self.cond_num, self.cond_num_lm = self.condition_numbers(Asys)
             else:
-                Dq = np.linalg.solve(Asys, -Q)
+                Q = self.time_integrator.build_vector(MB_Q, LM_Q)
+
+            Dq = self.linear_solve(-Q)
 
             # Relaxation
             relax_Dq = np.zeros_like(Dq)
@@ -464,10 +658,15 @@ class NonLinearDynamicMultibody(_BaseStructural):
                     LM_old_Dq = 1.
 
             # Evaluate convergence
-            res = np.max(np.abs(Dq[0:self.sys_size]))/old_Dq
+            max_Dq = np.max(np.abs(Dq[0:self.sys_size]))
+            if prev_max_Dq:
+                reduction = max_Dq/prev_max_Dq
+            prev_max_Dq = max_Dq
+            res = max_Dq/old_Dq
             if np.isnan(res):
                 if self.settings['allow_skip_step']:
                     skip_step = True
+                    self.linear_solve = None
                     cout.cout_wrap("Skipping step", 3)
                     break
                 else:
@@ -482,7 +681,7 @@ class NonLinearDynamicMultibody(_BaseStructural):
 
         Lambda, Lambda_dot = mb.state2disp_and_accel(q, dqdt, dqddt, MB_beam, MB_tstep, num_LM_eq)
         if self.settings['write_lm']:
-            self.write_lm_cond_num(iteration, Lambda, Lambda_dot, Lambda_ddot, cond_num, cond_num_lm)
+            self.write_lm_cond_num(iteration, Lambda, Lambda_dot, Lambda_ddot, self.cond_num, self.cond_num_lm)
         # end: comment time stepping
 
         if skip_step:
@@ -491,7 +690,8 @@ class NonLinearDynamicMultibody(_BaseStructural):
                 self.data.structure,
                 structural_step,
                 MBdict,
-                self.data.ts)
+                self.data.ts,
+                views=self.mb_views)
             # Perform rigid body motions
             self.integrate_position(MB_beam, MB_tstep, dt)
             for ibody in range(0, len(MB_tstep)):
@@ -505,7 +705,7 @@ class NonLinearDynamicMultibody(_BaseStructural):
         if self.settings['gravity_on']:
             for ibody in range(len(MB_beam)):
                 xbeamlib.cbeam3_correct_gravity_forces(MB_beam[ibody], MB_tstep[ibody], self.settings)
-        mb.merge_multibody(MB_tstep, MB_beam, self.data.structure, structural_step, MBdict, dt)
+        mb.merge_multibody(MB_tstep, MB_beam, self.data.structure, structural_step, MBdict, dt, views=self.mb_views)
 
         self.Lambda = Lambda.astype(dtype=ct.c_double, copy=True, order='F')
         self.Lambda_dot = Lambda_dot.astype(dtype=ct.c_double, copy=True, order='F')
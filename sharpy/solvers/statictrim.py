@@ -1,3 +1,4 @@
+import multiprocessing as mpr
 import numpy as np
 
 import sharpy.utils.cout_utils as cout
@@ -25,6 +26,7 @@ class StaticTrim(BaseSolver):
     settings_types = dict()
     settings_default = dict()
     settings_description = dict()
+    settings_options = dict()
 
     settings_types['print_info'] = 'bool'
     settings_default['print_info'] = True
@@ -90,8 +92,27 @@ class StaticTrim(BaseSolver):
     settings_default['save_info'] = False
     settings_description['save_info'] = 'Save trim results to text file'
 
+    settings_types['jacobian_update'] = 'str'
+    settings_default['jacobian_update'] = 'secant'
+    settings_description['jacobian_update'] = 'Update of the derivatives of the forces with respect to the trim ' \
+                                              'variables between iterations. ``secant`` updates each diagonal ' \
+                                              'term with the last step and ``broyden`` performs a Broyden rank-one ' \
+                                              'update of the full Jacobian computed by finite differences in the ' \
+                                              'first iteration.'
+    settings_options['jacobian_update'] = ['secant', 'broyden']
+
+    settings_types['parallel_gradients'] = 'bool'
+    settings_default['parallel_gradients'] = False
+    settings_description['parallel_gradients'] = 'Solve the finite difference perturbations of the first iteration ' \
+                                                 'in parallel worker processes, forked from the converged initial ' \
+                                                 'state. Requires the ``fork`` start method to be available. ' \
+                                                 'Forking a process in which the OpenMP runtime of the UVLM and ' \
+                                                 'xbeam libraries has already started its threads can deadlock ' \
+                                                 'the workers: only use it with the libraries built without ' \
+                                                 'OpenMP or with ``OMP_NUM_THREADS=1``.'
+
     settings_table = settings_utils.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
     def __init__(self):
         self.data = None
@@ -110,6 +131,7 @@ class StaticTrim(BaseSolver):
         self.output_history = []
         self.gradient_history = []
         self.trimmed_values = np.zeros((3,))
+        self.jacobian = None
 
         self.table = None
         self.folder = None
@@ -117,11 +139,16 @@ class StaticTrim(BaseSolver):
     def initialise(self, data, restart=False):
         self.data = data
         self.settings = data.settings[self.solver_id]
-        settings_utils.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        settings_utils.to_custom_types(self.settings, self.settings_types, self.settings_default,
+                                       options=self.settings_options)
 
         self.solver = solver_interface.initialise_solver(self.settings['solver'])
         self.solver.initialise(self.data, self.settings['solver_settings'], restart=restart)
 
+        if self.settings['parallel_gradients'] and os.environ.get('OMP_NUM_THREADS') != '1':
+            cout.cout_wrap('Warning: parallel_gradients forks the process after the OpenMP libraries are loaded, '
+                           'which can deadlock the workers unless OMP_NUM_THREADS=1', 3)
+
         self.folder = data.output_folder + '/statictrim/'
         if not os.path.exists(self.folder):
             os.makedirs(self.folder)
@@ -213,31 +240,17 @@ class StaticTrim(BaseSolver):
                     return
 
                 # compute gradients
-                # dfz/dalpha
-                (l, m, d) = self.evaluate(self.input_history[self.i_iter][0] + self.settings['initial_angle_eps'],
-                                          self.input_history[self.i_iter][1],
-                                          self.input_history[self.i_iter][2])
-
-                self.gradient_history[self.i_iter][0] = ((l - self.output_history[self.i_iter][0]) /
-                                                         self.settings['initial_angle_eps'])
-
-                # dm/dgamma
-                (l, m, d) = self.evaluate(self.input_history[self.i_iter][0],
-                                          self.input_history[self.i_iter][1] + self.settings['initial_angle_eps'],
-                                          self.input_history[self.i_iter][2])
-
-                self.gradient_history[self.i_iter][1] = ((m - self.output_history[self.i_iter][1]) /
-                                                         self.settings['initial_angle_eps'])
+                self.jacobian = self.finite_difference_jacobian(self.input_history[self.i_iter],
+                                                                self.output_history[self.i_iter])
+                # dfz/dalpha, dm/dgamma and dfx/dthrust
+                for i_input in range(self.n_input):
+                    self.gradient_history[self.i_iter][i_input] = self.jacobian[i_input, i_input]
 
-                # dfx/dthrust
-                (l, m, d) = self.evaluate(self.input_history[self.i_iter][0],
-                                          self.input_history[self.i_iter][1],
-                                          self.input_history[self.i_iter][2] +
-                                          self.settings['initial_thrust_eps'])
-
-                self.gradient_history[self.i_iter][2] = ((d - self.output_history[self.i_iter][2]) /
-                                                         self.settings['initial_thrust_eps'])
+                continue
 
+            if self.settings['jacobian_update'] == 'broyden':
+                if self.broyden_iteration():
+                    return
                 continue
 
             # if not all(np.isfinite(self.gradient_history[self.i_iter - 1]))
@@ -315,6 +328,97 @@ class StaticTrim(BaseSolver):
                 self.table.close_file()
                 return
 
+    def finite_difference_jacobian(self, inputs, outputs):
+        """
+        Jacobian of the trim outputs with respect to the trim inputs by forward finite differences.
+
+        Args:
+            inputs (list): ``[alpha, deflection_gamma, thrust]`` about which the derivatives are computed.
+            outputs (list): ``[fz, m, fx]`` at ``inputs``.
+
+        Returns:
+            np.ndarray: ``jacobian[i_output, i_input]``, with outputs ``[fz, m, fx]`` and inputs
+            ``[alpha, gamma, thrust]``.
+        """
+        eps = np.array([self.settings['initial_angle_eps'],
+                        self.settings['initial_angle_eps'],
+                        self.settings['initial_thrust_eps']])
+        perturbed_inputs = []
+        for i_input in range(self.n_input):
+            perturbed_inputs.append(list(inputs))
+            perturbed_inputs[i_input][i_input] += eps[i_input]
+        perturbed_outputs = self.evaluate_perturbations(perturbed_inputs)
+
+        return (np.array(perturbed_outputs).T - np.array(outputs)[:, None])/eps[None, :]
+
+    def broyden_iteration(self):
+        """
+        Quasi-Newton iteration of the trim variables with the current Jacobian, which is then corrected with a
+        Broyden rank-one update.
+
+        As in the secant iteration, the inputs of the outputs that are already converged are not modified and the
+        step is relaxed with ``relaxation_factor``. If the Jacobian becomes singular, it is computed again by finite
+        differences about the previous inputs.
+
+        Returns:
+            bool: ``True`` if the trim condition has been achieved.
+        """
+        previous_input = np.array(self.input_history[self.i_iter - 1])
+        previous_output = np.array(self.output_history[self.i_iter - 1])
+
+        # fz, m and fx are driven by alpha, gamma and thrust, respectively
+        active = ~self.convergence(*previous_output)
+        delta_input = np.zeros((self.n_input,))
+        try:
+            delta_input[active] = -np.linalg.solve(self.jacobian[np.ix_(active, active)], previous_output[active])
+        except np.linalg.LinAlgError:
+            cout.cout_wrap('Singular trim Jacobian, computing it again by finite differences', 3)
+            self.jacobian = self.finite_difference_jacobian(previous_input, previous_output)
+            delta_input[active] = -np.linalg.solve(self.jacobian[np.ix_(active, active)], previous_output[active])
+        delta_input *= 1. - self.settings['relaxation_factor']
+        self.input_history[self.i_iter] = list(previous_input + delta_input)
+
+        # evaluate
+        self.output_history[self.i_iter] = list(self.evaluate(*self.input_history[self.i_iter]))
+
+        delta_output = np.array(self.output_history[self.i_iter]) - previous_output
+        self.jacobian += (np.outer(delta_output - self.jacobian.dot(delta_input), delta_input) /
+                          delta_input.dot(delta_input))
+        self.gradient_history[self.i_iter] = list(np.diag(self.jacobian))
+
+        # check convergence
+        if all(self.convergence(*self.output_history[self.i_iter])):
+            self.trimmed_values = self.input_history[self.i_iter]
+            self.table.close_file()
+            return True
+
+        return False
+
+    def evaluate_perturbations(self, perturbed_inputs):
+        """
+        Evaluates the trim outputs for a list of independent inputs ``[alpha, deflection_gamma, thrust]``.
+
+        If ``parallel_gradients`` is set, each input is solved in a worker process forked from the current process,
+        such that all of them start from the current state of ``data`` and the solver. Otherwise, they are evaluated
+        one after another.
+
+        Returns:
+            list: ``(fz, m, fx)`` tuples for each of the inputs.
+        """
+        if not self.settings['parallel_gradients'] or 'fork' not in mpr.get_all_start_methods():
+            return [self.evaluate(*inputs) for inputs in perturbed_inputs]
+
+        global _trim_solver
+        _trim_solver = self
+        try:
+            with mpr.get_context('fork').Pool(len(perturbed_inputs)) as pool:
+                resultants = pool.map(_solve_trim_worker, perturbed_inputs)
+        finally:
+            _trim_solver = None
+
+        return [self.process_resultants(*inputs, *resultants_here)
+                for inputs, resultants_here in zip(perturbed_inputs, resultants)]
+
     def evaluate(self, alpha, deflection_gamma, thrust):
         if not np.isfinite(alpha):
             import pdb; pdb.set_trace()
@@ -328,6 +432,14 @@ class StaticTrim(BaseSolver):
         # cout.cout_wrap('Alpha: ' + str(alpha*180/np.pi), 2)
         # cout.cout_wrap('CS deflection: ' + str((deflection_gamma - alpha)*180/np.pi), 2)
         # cout.cout_wrap('Thrust: ' + str(thrust), 2)
+        forces, moments = self.solve_trim(alpha, deflection_gamma, thrust)
+
+        return self.process_resultants(alpha, deflection_gamma, thrust, forces, moments)
+
+    def solve_trim(self, alpha, deflection_gamma, thrust):
+        """
+        Runs the wrapped solver for the given trim variables and returns the resultant forces and moments.
+        """
         # modify the trim in the static_coupled solver
         self.solver.change_trim(alpha,
                                 thrust,
@@ -337,8 +449,9 @@ class StaticTrim(BaseSolver):
         # run the solver
         self.solver.run()
         # extract resultants
-        forces, moments = self.solver.extract_resultants()
+        return self.solver.extract_resultants()
 
+    def process_resultants(self, alpha, deflection_gamma, thrust, forces, moments):
         forcez = forces[2]
         forcex = forces[0]
         moment = moments[1]
@@ -359,3 +472,11 @@ class StaticTrim(BaseSolver):
                                moments[2]])
 
         return forcez, moment, forcex
+
+
+# trim solver inherited by the forked workers of StaticTrim.evaluate_perturbations
+_trim_solver = None
+
+
+def _solve_trim_worker(inputs):
+    return _trim_solver.solve_trim(*inputs)
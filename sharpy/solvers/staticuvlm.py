@@ -119,6 +119,7 @@ class StaticUvlm(BaseSolver):
         self.data = None
         self.settings = None
         self.velocity_generator = None
+        self.uvlm_session = None
 
     def initialise(self, data, custom_settings=None, restart=False):
         self.data = data
@@ -136,6 +137,9 @@ class StaticUvlm(BaseSolver):
         self.velocity_generator = velocity_generator_type()
         self.velocity_generator.initialise(self.settings['velocity_field_input'], restart=restart)
 
+        # persistent state for the calls to the UVLM library
+        self.uvlm_session = uvlmlib.UvlmSession(self.settings, steady=True)
+
     def add_step(self):
         self.data.aero.add_timestep()
 
@@ -179,7 +183,8 @@ class StaticUvlm(BaseSolver):
                                           aero_tstep.u_ext)
         # grid orientation
         uvlmlib.vlm_solver(aero_tstep,
-                           self.settings)
+                           self.settings,
+                           session=self.uvlm_session)
 
         if self.settings['map_forces_on_struct']:
             structure_tstep.steady_applied_forces[:] = mapping.aero2struct_force_mapping(
@@ -195,6 +200,9 @@ class StaticUvlm(BaseSolver):
 
         return self.data
 
+    def teardown(self):
+        self.velocity_generator.teardown()
+
     def next_step(self):
         """ Updates de aerogrid based on the info of the step, and increases
         the self.ts counter """
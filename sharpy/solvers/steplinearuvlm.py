@@ -397,6 +397,9 @@ class StepLinearUVLM(BaseSolver):
     def update_custom_grid(self, structure_tstep, aero_tstep):
         self.data.aero.generate_zeta_timestep_info(structure_tstep, aero_tstep, self.data.structure, self.data.aero.aero_settings)
 
+    def teardown(self):
+        self.velocity_generator.teardown()
+
     def unpack_ss_vectors(self, y_n, x_n, u_n, aero_tstep):
         r"""
         Transform column vectors used in the state space formulation into SHARPy format
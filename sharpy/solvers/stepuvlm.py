@@ -138,6 +138,7 @@ class StepUvlm(BaseSolver):
         self.data = None
         self.settings = None
         self.velocity_generator = None
+        self.uvlm_session = None
 
     def initialise(self, data, custom_settings=None, restart=False):
         """
@@ -182,6 +183,9 @@ class StepUvlm(BaseSolver):
             self.settings['velocity_field_input'],
             restart=restart)
 
+        # persistent state for the calls to the UVLM library
+        self.uvlm_session = uvlmlib.UvlmSession(self.settings)
+
     def run(self, **kwargs):
         """
         Runs a step of the aerodynamics as implemented in UVLM.
@@ -224,7 +228,8 @@ class StepUvlm(BaseSolver):
                             structure_tstep,
                             self.settings,
                             convect_wake=convect_wake,
-                            dt=dt)
+                            dt=dt,
+                            session=self.uvlm_session)
 
         if unsteady_contribution and not self.settings['quasi_steady']:
             # calculate unsteady (added mass) forces:
@@ -244,7 +249,8 @@ class StepUvlm(BaseSolver):
                                                    structure_tstep,
                                                    self.settings,
                                                    convect_wake=convect_wake,
-                                                   dt=dt)
+                                                   dt=dt,
+                                                   session=self.uvlm_session)
         else:
             for i_surf in range(len(aero_tstep.gamma)):
                 aero_tstep.gamma_dot[i_surf][:] = 0.0
@@ -267,6 +273,9 @@ class StepUvlm(BaseSolver):
                                                    self.data.aero.aero_settings,
                                                    dt=self.settings['dt'])
 
+    def teardown(self):
+        self.velocity_generator.teardown()
+
     @staticmethod
     def filter_gamma_dot(tstep, history, filter_param):
         clean_history = [x for x in history if x is not None]
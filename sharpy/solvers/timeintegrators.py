@@ -1,5 +1,6 @@
 import numpy as np
 import ctypes as ct
+import scipy.sparse as sparse
 
 import sharpy.utils.settings as settings_utils
 from sharpy.utils.solver_interface import solver
@@ -19,6 +20,26 @@ class _BaseTimeIntegrator():
     settings_description = dict()
     settings_options = dict()
 
+    settings_types['jacobian_update'] = 'str'
+    settings_default['jacobian_update'] = 'every_iteration'
+    settings_description['jacobian_update'] = 'Policy to refresh the iteration matrix. ``every_iteration``: ' \
+                                              'Newton-Raphson, the matrix is factorised at every iteration. ' \
+                                              '``modified_newton``: the factorised matrix is reused across ' \
+                                              'iterations and time steps and only refreshed when the reduction of ' \
+                                              'the correction stalls or it gets older than ``jacobian_max_age``'
+    settings_options['jacobian_update'] = ['every_iteration', 'modified_newton']
+
+    settings_types['jacobian_max_age'] = 'int'
+    settings_default['jacobian_max_age'] = 20
+    settings_description['jacobian_max_age'] = 'Maximum number of iterations the iteration matrix is reused for ' \
+                                               'with ``modified_newton``'
+
+    settings_types['jacobian_stall_ratio'] = 'float'
+    settings_default['jacobian_stall_ratio'] = 0.5
+    settings_description['jacobian_stall_ratio'] = 'The iteration matrix is refreshed with ``modified_newton`` when ' \
+                                                   'the ratio between the corrections of two consecutive ' \
+                                                   'iterations is larger than this value'
+
     def __init__(self):
         pass
 
@@ -35,10 +56,77 @@ class _BaseTimeIntegrator():
         pass
 
 
+    def assemble_matrix(self, A, kBnh, coef_kBnh, Q, LM_Q):
+        """
+        Assembles the system matrix including the constraint equations: ``A`` is the structural iteration matrix,
+        ``kBnh.T`` couples the Lagrange multipliers to the structural equations and ``coef_kBnh*kBnh`` the structural
+        degrees of freedom to the constraint equations.
+
+        The system matrix is a ``scipy.sparse.csc_matrix`` if ``A`` is sparse and a ``np.ndarray`` otherwise.
+        """
+        sys_size = self.sys_size
+        num_LM_eq = self.num_LM_eq
+
+        Qout = self.build_vector(Q, LM_Q)
+
+        if sparse.issparse(A):
+            if num_LM_eq:
+                kBnh = sparse.csr_matrix(kBnh)
+                Asys = sparse.bmat([[A, kBnh.T], [coef_kBnh*kBnh, None]], format='csc')
+            else:
+                Asys = sparse.csc_matrix(A)
+            return Asys, Qout
+
+        Asys = np.zeros((sys_size + num_LM_eq, sys_size + num_LM_eq),
+                         dtype=ct.c_double, order='F')
+        Asys[:sys_size, :sys_size] = A
+        Asys[sys_size:, :sys_size] = coef_kBnh*kBnh
+        Asys[:sys_size, sys_size:] = kBnh.T
+
+        return Asys, Qout
+
+
     def corrector(self, q, dqdt, dqddt, Dq):
         pass
 
 
+    def reset_jacobian(self):
+        """
+        Forces the iteration matrix to be refreshed in the next iteration
+        """
+        self.jacobian_age = None
+
+
+    def update_jacobian(self, reduction=None):
+        """
+        Jacobian refresh policy. It is called once per iteration before solving the system of equations.
+
+        Args:
+            reduction (float): Ratio between the corrections of the last two iterations of the current time step
+                (``None`` if not available)
+
+        Returns:
+            bool: ``True`` if the iteration matrix has to be built and factorised, ``False`` if the previous one can
+            be reused
+        """
+        if (self.settings['jacobian_update'] == 'every_iteration' or
+                self.jacobian_age is None or
+                self.jacobian_age >= self.settings['jacobian_max_age'] or
+                (reduction is not None and reduction > self.settings['jacobian_stall_ratio'])):
+            self.jacobian_age = 0
+            return True
+
+        self.jacobian_age += 1
+        return False
+
+
+    def build_vector(self, Q, LM_Q):
+        """
+        Vector of the system of equations, i.e. the one returned by ``build_matrix``
+        """
+        return np.concatenate((Q, LM_Q)).astype(dtype=ct.c_double, order='F')
+
+
 @solver
 class NewmarkBeta(_BaseTimeIntegrator):
     """
@@ -75,6 +163,8 @@ class NewmarkBeta(_BaseTimeIntegrator):
         self.beta = None
         self.gamma = None
 
+        self.jacobian_age = None
+
     def initialise(self, data, custom_settings=None, restart=False):
 
         if custom_settings is None:
@@ -84,6 +174,7 @@ class NewmarkBeta(_BaseTimeIntegrator):
         settings_utils.to_custom_types(self.settings,
                            self.settings_types,
                            self.settings_default,
+                           self.settings_options,
                            no_ctype=True)
 
         self.dt = self.settings['dt']
@@ -93,6 +184,8 @@ class NewmarkBeta(_BaseTimeIntegrator):
         self.sys_size = self.settings['sys_size']
         self.num_LM_eq = self.settings['num_LM_eq']
 
+        self.reset_jacobian()
+
     def predictor(self, q, dqdt, dqddt):
 
         sys_size = self.sys_size
@@ -105,21 +198,8 @@ class NewmarkBeta(_BaseTimeIntegrator):
 
     def build_matrix(self, M, C, K, Q, kBnh, LM_Q):
 
-        sys_size = self.sys_size
-        num_LM_eq = self.num_LM_eq
-
-        Asys = np.zeros((sys_size + num_LM_eq, sys_size + num_LM_eq),
-                         dtype=ct.c_double, order='F')
-        Qout = np.zeros((sys_size + num_LM_eq), dtype=ct.c_double, order='F')
-
-        Asys[:sys_size, :sys_size] = K + C*self.gamma/(self.beta*self.dt) + M/(self.beta*self.dt*self.dt)
-        Qout[:sys_size] = Q.copy()
-
-        Asys[sys_size:, :sys_size] = (self.gamma/self.beta/self.dt)*kBnh
-        Asys[:sys_size, sys_size:] = kBnh.T
-        Qout[sys_size:] = LM_Q.copy()
-
-        return Asys, Qout
+        return self.assemble_matrix(K + C*self.gamma/(self.beta*self.dt) + M/(self.beta*self.dt*self.dt),
+                                    kBnh, self.gamma/self.beta/self.dt, Q, LM_Q)
 
     def corrector(self, q, dqdt, dqddt, Dq):
 
@@ -174,6 +254,8 @@ class GeneralisedAlpha(_BaseTimeIntegrator):
         self.gamma = None
         self.beta = None
 
+        self.jacobian_age = None
+
     def initialise(self, data, custom_settings=None, restart=False):
 
         if custom_settings is None:
@@ -183,6 +265,7 @@ class GeneralisedAlpha(_BaseTimeIntegrator):
         settings_utils.to_custom_types(self.settings,
                                  self.settings_types,
                                  self.settings_default,
+                                 self.settings_options,
                                  no_ctype=True)
 
         self.dt = self.settings['dt']
@@ -198,6 +281,8 @@ class GeneralisedAlpha(_BaseTimeIntegrator):
         self.sys_size = self.settings['sys_size']
         self.num_LM_eq = self.settings['num_LM_eq']
 
+        self.reset_jacobian()
+
     def predictor(self, q, dqdt, dqddt):
 
         sys_size = self.sys_size
@@ -209,24 +294,10 @@ class GeneralisedAlpha(_BaseTimeIntegrator):
 
     def build_matrix(self, M, C, K, Q, kBnh, LM_Q):
 
-        sys_size = self.sys_size
-        num_LM_eq = self.num_LM_eq
-
-        Asys = np.zeros((sys_size + num_LM_eq, sys_size + num_LM_eq),
-                         dtype=ct.c_double, order='F')
-        Qout = np.zeros((sys_size + num_LM_eq), dtype=ct.c_double, order='F')
-
-        Asys[:sys_size, :sys_size] = (self.om_af*K +
-                                      self.gamma*self.om_af/self.beta/self.dt*C +
-                                      self.om_am/(self.beta*self.dt*self.dt)*M)
-
-        Qout[:sys_size] = Q.copy()
-
-        Asys[sys_size:, :sys_size] = (self.gamma*self.om_af/self.beta/self.dt)*kBnh
-        Asys[:sys_size, sys_size:] = kBnh.T
-        Qout[sys_size:] = LM_Q.copy()
-
-        return Asys, Qout
+        return self.assemble_matrix(self.om_af*K +
+                                    self.gamma*self.om_af/self.beta/self.dt*C +
+                                    self.om_am/(self.beta*self.dt*self.dt)*M,
+                                    kBnh, self.gamma*self.om_af/self.beta/self.dt, Q, LM_Q)
 
     def corrector(self, q, dqdt, dqddt, Dq):
 
@@ -30,8 +30,8 @@ Args:
     Lambda (np.ndarray): list of Lagrange multipliers values
     Lambda_dot (np.ndarray): list of the first derivative of the Lagrange multipliers values
     dynamic_or_static (str): string defining if the computation is dynamic or static
-    LM_C (np.ndarray): Damping matrix associated to the Lagrange Multipliers equations
-    LM_K (np.ndarray): Stiffness matrix associated to the Lagrange Multipliers equations
+    LM_C (LagrangeMatrixCOO): Damping matrix associated to the Lagrange Multipliers equations
+    LM_K (LagrangeMatrixCOO): Stiffness matrix associated to the Lagrange Multipliers equations
     LM_Q (np.ndarray): Vector of independent terms associated to the Lagrange Multipliers equations
 """
 from abc import ABCMeta, abstractmethod
@@ -39,6 +39,7 @@ import sharpy.utils.cout_utils as cout
 import os
 import ctypes as ct
 import numpy as np
+import scipy.sparse as sparse
 import sharpy.utils.algebra as ag
 from sharpy.utils.settings import set_value_or_default
 
@@ -104,6 +105,97 @@ def initialise_lc(lc_name, print_info=True):
     return lc
 
 
+class LagrangeMatrixCOO(object):
+    """
+    Matrix associated to the Lagrange Multipliers equations stored as COO triplets ``(rows, cols, values)``
+
+    The constraints write their contributions with the same block syntax as in a dense array
+    (``LM_C[i0:i1, j0:j1] += block`` or ``-=``), which appends all the entries of ``block`` to the triplets.
+    Index arrays select the block at their outer product (``LM_C[np.ix_(rows, cols)]``), and ``block`` can also be a
+    ``scipy.sparse`` matrix, of which the stored entries are appended. Zeros are kept so that the sparsity pattern
+    only depends on the blocks written and not on their values. The matrix is assembled in bulk by :meth:`tocsc`
+    or :meth:`toarray`, where repeated entries are summed.
+
+    Args:
+        shape (tuple): Shape of the matrix
+    """
+    def __init__(self, shape):
+        self.shape = shape
+        self.rows = []
+        self.cols = []
+        self.values = []
+
+    def add(self, rows, cols, values):
+        """
+        Appends the triplets ``(rows, cols, values)``, given as 1D arrays of the same length
+        """
+        self.rows.append(np.asarray(rows, dtype=int))
+        self.cols.append(np.asarray(cols, dtype=int))
+        self.values.append(np.asarray(values, dtype=ct.c_double))
+
+    def add_block(self, rows, cols, block):
+        """
+        Appends the entries of ``block`` located at the ``rows`` and ``cols`` (1D index arrays) of the matrix
+        """
+        if sparse.issparse(block):
+            block = block.tocoo()
+            self.add(rows[block.row], cols[block.col], block.data)
+        else:
+            block = np.broadcast_to(block, (len(rows), len(cols)))
+            self.add(np.repeat(rows, len(cols)), np.tile(cols, len(rows)), block.reshape(-1))
+
+    def _indices(self, index, size):
+        if isinstance(index, slice):
+            return np.arange(*index.indices(size))
+        return np.arange(size)[index].reshape(-1)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        return _LagrangeMatrixBlock(self,
+                                    self._indices(key[0], self.shape[0]),
+                                    self._indices(key[1], self.shape[1]))
+
+    def __setitem__(self, key, value):
+        # ``LM_C[key] += block`` ends with the assignment of the block already added
+        if not (isinstance(value, _LagrangeMatrixBlock) and value.matrix is self):
+            raise NotImplementedError('Only += and -= contributions can be added to a LagrangeMatrixCOO')
+
+    def tocoo(self):
+        if self.values:
+            rows = np.concatenate(self.rows)
+            cols = np.concatenate(self.cols)
+            values = np.concatenate(self.values)
+        else:
+            rows = cols = np.zeros((0,), dtype=int)
+            values = np.zeros((0,), dtype=ct.c_double)
+        return sparse.coo_matrix((values, (rows, cols)), shape=self.shape)
+
+    def tocsc(self):
+        return self.tocoo().tocsc()
+
+    def toarray(self):
+        return self.tocoo().toarray(order='F')
+
+
+class _LagrangeMatrixBlock(object):
+    """
+    Block of a :class:`LagrangeMatrixCOO` that records the ``+=`` and ``-=`` operations on it
+    """
+    def __init__(self, matrix, rows, cols):
+        self.matrix = matrix
+        self.rows = rows
+        self.cols = cols
+
+    def __iadd__(self, block):
+        self.matrix.add_block(self.rows, self.cols, block)
+        return self
+
+    def __isub__(self, block):
+        self.matrix.add_block(self.rows, self.cols, -block)
+        return self
+
+
 class BaseLagrangeConstraint(metaclass=ABCMeta):
     __doc__ = """
     BaseLagrangeConstraint
@@ -114,6 +206,7 @@ class BaseLagrangeConstraint(metaclass=ABCMeta):
     Attributes:
         _n_eq (int): Number of equations required by a LagrangeConstraint
         _ieq (int): Number of the first equation associated to the Lagrange Constraint in the whole set of Lagrange equations
+        _scaled_constant_Bnh (tuple): Key and ``scalingFactor*Bnh`` cached by ``scaled_constant_Bnh``
     """
     _lc_id = 'BaseLagrangeConstraint'
 
@@ -123,6 +216,7 @@ class BaseLagrangeConstraint(metaclass=ABCMeta):
         """
         self._n_eq = None
         self._ieq = None
+        self._scaled_constant_Bnh = None
 
     @abstractmethod
     def get_n_eq(self):
@@ -176,6 +270,18 @@ class BaseLagrangeConstraint(metaclass=ABCMeta):
         """
         return
 
+    def scaled_constant_Bnh(self, key, define_Bnh):
+        """
+        Returns ``scalingFactor*Bnh`` as a ``scipy.sparse.csr_matrix`` for constraints whose ``Bnh`` does not depend
+        on the state of the system.
+
+        ``define_Bnh()`` is only called when ``key`` (i.e. the size of the system and the degrees of freedom of the
+        FoR) changes, so the same matrix is reused at every iteration.
+        """
+        if self._scaled_constant_Bnh is None or self._scaled_constant_Bnh[0] != key:
+            self._scaled_constant_Bnh = (key, sparse.csr_matrix(self.scalingFactor*define_Bnh()))
+        return self._scaled_constant_Bnh[1]
+
 
 ################################################################################
 # Auxiliar functions
@@ -225,6 +331,43 @@ def define_FoR_dof(MB_beam, FoR_body):
     return FoR_dof
 
 
+def define_block_cols(sys_size, *blocks):
+    """
+    define_block_cols
+
+    Define the columns of a constraint matrix (``B`` or ``Bnh``) where an equation writes its blocks
+
+    Args:
+        sys_size(int): total number of degrees of freedom of the multibody system
+        blocks(tuple): first degree of freedom and number of degrees of freedom of each block
+
+    Returns:
+        cols(np.ndarray): sorted columns of the blocks, without repetitions
+    """
+    cols = np.unique(np.concatenate([np.arange(first_dof, first_dof + num_dof) for first_dof, num_dof in blocks]))
+    return cols[cols < sys_size]
+
+
+def add_constraint_matrix(LM, B, cols, sys_size, ieq, scalingFactor):
+    """
+    add_constraint_matrix
+
+    Adds the constraint matrix ``scalingFactor*B`` and its transpose to the rows and columns of the Lagrange
+    Multipliers equations of ``LM``. Only the columns ``cols`` of ``B`` are added, so the sparsity pattern of
+    ``LM`` does not depend on the values of ``B``
+
+    Args:
+        LM(LagrangeMatrixCOO or np.ndarray): damping or stiffness matrix associated to the Lagrange Multipliers equations
+        B(np.ndarray): constraint matrix of the equations
+        cols(np.ndarray): columns of ``B`` where the equations write their blocks (see ``define_block_cols``)
+        ieq(int): number of the first equation
+    """
+    rows = np.arange(sys_size + ieq, sys_size + ieq + B.shape[0])
+    scaled_B = scalingFactor*B[:, cols]
+    LM[np.ix_(rows, cols)] += scaled_B
+    LM[np.ix_(cols, rows)] += scaled_B.T
+
+
 ################################################################################
 # Equations
 ################################################################################
@@ -259,9 +402,9 @@ def equal_pos_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, inode_in_body, no
     B[:, node_FoR_dof:node_FoR_dof+3] = np.eye(3)
     B[:, node_dof:node_dof+3] = node_cga
     B[:, FoR_dof:FoR_dof+3] = -np.eye(3)
+    cols = define_block_cols(sys_size, (node_FoR_dof, 3), (node_dof, 3), (FoR_dof, 3))
 
-    LM_K[sys_size + ieq : sys_size + ieq + num_LM_eq_specific, :sys_size] += scalingFactor*B
-    LM_K[:sys_size, sys_size + ieq : sys_size + ieq + num_LM_eq_specific] += scalingFactor*np.transpose(B)
+    add_constraint_matrix(LM_K, B, cols, sys_size, ieq, scalingFactor)
 
     LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(B), Lambda[ieq:ieq+num_LM_eq_specific])
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*(node_FoR_pos +
@@ -337,9 +480,11 @@ def equal_lin_vel_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, node_number,
     if MB_beam[node_body].FoR_movement == 'free':
         Bnh[:, node_FoR_dof:node_FoR_dof+3] = -1.0*node_cga
         Bnh[:, node_FoR_dof+3:node_FoR_dof+6] = np.dot(node_cga,ag.skew(node_Ra))
+        cols = define_block_cols(sys_size, (FoR_dof, 3), (node_dof, 3), (node_FoR_dof, 6))
+    else:
+        cols = define_block_cols(sys_size, (FoR_dof, 3), (node_dof, 3))
 
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, scalingFactor)
 
     LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*(np.dot(FoR_cga, FoR_va) +
@@ -371,7 +516,7 @@ def equal_lin_vel_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, node_number,
 
         LM_Q[:sys_size] += penaltyFactor*np.dot(np.dot(Bnh.T, Bnh), q)
 
-        LM_C[:sys_size, :sys_size] += penaltyFactor*np.dot(Bnh.T, Bnh)
+        LM_C[np.ix_(cols, cols)] += penaltyFactor*np.dot(Bnh[:, cols].T, Bnh[:, cols])
 
         # Derivatives wrt the FoR quaterion
         LM_C[FoR_dof:FoR_dof+3, FoR_dof+6:FoR_dof+10] -= penaltyFactor*ag.der_CquatT_by_v(MB_tstep[FoR_body].quat,
@@ -447,9 +592,11 @@ def rel_rot_vel_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, node_number, no
     Bnh[:, FoR_dof+3:FoR_dof+6] -= ag.multiply_matrices(cab.T, node_cga.T, FoR_cga)
     if MB_beam[node_body].FoR_movement == 'free':
         Bnh[:, node_FoR_dof+3:node_FoR_dof+6] += cab.T
+        cols = define_block_cols(sys_size, (node_dof+3, 3), (FoR_dof+3, 3), (node_FoR_dof+3, 3))
+    else:
+        cols = define_block_cols(sys_size, (node_dof+3, 3), (FoR_dof+3, 3))
 
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, scalingFactor)
 
     LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*(np.dot(tan, MB_tstep[node_body].psi_dot[ielem, inode_in_elem, :]) +
@@ -530,6 +677,7 @@ def def_rot_axis_FoR_wrt_node_general(MB_tstep, MB_beam, FoR_body, node_body, no
                                                        cab.T,
                                                        node_cga.T,
                                                        FoR_cga)[indep,:]
+    cols = define_block_cols(sys_size, (FoR_dof+3, 3))
 
     # Constrain angular velocities
     LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
@@ -539,8 +687,7 @@ def def_rot_axis_FoR_wrt_node_general(MB_tstep, MB_beam, FoR_body, node_body, no
                                                   FoR_cga,
                                                   FoR_wa)[indep]
 
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, scalingFactor)
 
     if MB_beam[node_body].FoR_movement == 'free':
         LM_C[FoR_dof+3:FoR_dof+6,node_FoR_dof+6:node_FoR_dof+10] += scalingFactor*np.dot(FoR_cga.T,
@@ -567,7 +714,7 @@ def def_rot_axis_FoR_wrt_node_general(MB_tstep, MB_beam, FoR_body, node_body, no
 
         LM_Q[:sys_size] += penaltyFactor*np.dot(Bnh.T, np.dot(Bnh, q))
 
-        LM_C[:sys_size, :sys_size] += penaltyFactor*np.dot(Bnh.T, Bnh)
+        LM_C[np.ix_(cols, cols)] += penaltyFactor*np.dot(Bnh[:, cols].T, Bnh[:, cols])
 
         sq_rot_axisB = np.dot(ag.skew(rot_axisB).T, ag.skew(rot_axisB))
 
@@ -669,6 +816,7 @@ def def_rot_axis_FoR_wrt_node_xyz(MB_tstep, MB_beam, FoR_body, node_body, node_n
     Bnh[:, FoR_dof+3:FoR_dof+6] += ag.multiply_matrices(Z, cab.T, node_cga.T, FoR_cga)
     Bnh[:, node_dof+3:node_dof+6] -= ag.multiply_matrices(Z, ag.crv2tan(psi))
     Bnh[:, node_FoR_dof+3:node_FoR_dof+6] -= ag.multiply_matrices(Z, cab.T)
+    cols = define_block_cols(sys_size, (FoR_dof+3, 3), (node_dof+3, 3), (node_FoR_dof+3, 3))
 
     # Constrain angular velocities
     LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
@@ -676,8 +824,7 @@ def def_rot_axis_FoR_wrt_node_xyz(MB_tstep, MB_beam, FoR_body, node_body, node_n
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] -= scalingFactor*ag.multiply_matrices(Z, ag.crv2tan(psi), psi_dot)
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] -= scalingFactor*ag.multiply_matrices(Z, cab.T, MB_tstep[node_body].for_vel[3:6])
 
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, scalingFactor)
 
     vec = ag.multiply_matrices(node_cga, cab, Z.T, Lambda_dot[ieq:ieq+num_LM_eq_specific])
     LM_C[FoR_dof+3:FoR_dof+6, FoR_dof+6:FoR_dof+10] += scalingFactor*ag.der_CquatT_by_v(MB_tstep[FoR_body].quat, vec)
@@ -698,7 +845,7 @@ def def_rot_axis_FoR_wrt_node_xyz(MB_tstep, MB_beam, FoR_body, node_body, node_n
 
         LM_Q[:sys_size] += penaltyFactor*np.dot(Bnh.T, np.dot(Bnh, q))
 
-        LM_C[:sys_size, :sys_size] += penaltyFactor*np.dot(Bnh.T, Bnh)
+        LM_C[np.ix_(cols, cols)] += penaltyFactor*np.dot(Bnh[:, cols].T, Bnh[:, cols])
 
         ZTZ = np.dot(Z.T, Z)
 
@@ -795,14 +942,14 @@ def def_rot_vel_mod_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_nu
     Znon[:, nonzero_comp] = 1
 
     Bnh[:, FoR_dof+3:FoR_dof+6] += ag.multiply_matrices(Znon, cab.T, node_cga.T, FoR_cga)
+    cols = define_block_cols(sys_size, (FoR_dof+3, 3))
 
     # Constrain angular velocities
     LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*ag.multiply_matrices(Znon, cab.T, node_cga.T, FoR_cga, FoR_wa)
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] -= scalingFactor*rot_vel
 
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, scalingFactor)
 
     vec = ag.multiply_matrices(node_cga, cab, Znon.T, Lambda_dot[ieq:ieq+num_LM_eq_specific])
     LM_C[FoR_dof+3:FoR_dof+6, FoR_dof+6:FoR_dof+10] += scalingFactor*ag.der_CquatT_by_v(MB_tstep[FoR_body].quat, vec)
@@ -836,14 +983,14 @@ def def_rot_vect_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_numbe
     Bnh[:, FoR_dof+3:FoR_dof+6] = ag.multiply_matrices(cab.T,
                                                        node_cga.T,
                                                        FoR_cga)
+    cols = define_block_cols(sys_size, (FoR_dof+3, 3))
 
     # Constrain angular velocities
     LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
     LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*(np.dot(Bnh[:, FoR_dof+3:FoR_dof+6], FoR_wa) -
                                                                          rot_vect)
 
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, scalingFactor)
 
     if MB_beam[node_body].FoR_movement == 'free':
         LM_C[FoR_dof+3:FoR_dof+6,node_FoR_dof+6:node_FoR_dof+10] += scalingFactor*np.dot(FoR_cga.T,
@@ -1255,6 +1402,7 @@ class spherical_FoR(BaseLagrangeConstraint):
     def __init__(self):
         self.required_parameters = ['body_FoR']
         self._n_eq = 3
+        self._scaled_constant_Bnh = None
 
     def get_n_eq(self):
         return self._n_eq
@@ -1275,19 +1423,22 @@ class spherical_FoR(BaseLagrangeConstraint):
     def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot):
         num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.body_FoR)
         ieq = self._ieq
 
-        Bnh[:3, FoR_dof:FoR_dof+3] = 1.0*np.eye(3)
+        def define_Bnh():
+            Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+            Bnh[:3, FoR_dof:FoR_dof+3] = 1.0*np.eye(3)
+            return Bnh
 
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += self.scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += self.scalingFactor*np.transpose(Bnh)
+        scaled_Bnh = self.scaled_constant_Bnh((sys_size, FoR_dof), define_Bnh)
 
-        LM_Q[:sys_size] += self.scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scaled_Bnh
+        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scaled_Bnh.T
+
+        LM_Q[:sys_size] += scaled_Bnh.T @ Lambda_dot[ieq:ieq+num_LM_eq_specific]
 
         LM_Q[sys_size+ieq:sys_size+ieq+3] += self.scalingFactor*MB_tstep[self.body_FoR].for_vel[0:3].astype(dtype=ct.c_double, copy=True, order='F')
 
@@ -1319,6 +1470,7 @@ class hinge_FoR(BaseLagrangeConstraint):
     def __init__(self):
         self.required_parameters = ['body_FoR', 'rot_axis_AFoR']
         self._n_eq = 5
+        self._scaled_constant_Bnh = None
 
     def get_n_eq(self):
         return self._n_eq
@@ -1352,15 +1504,11 @@ class hinge_FoR(BaseLagrangeConstraint):
     def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot):
         num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.body_FoR)
         ieq = self._ieq
 
-        Bnh[:3, FoR_dof:FoR_dof+3] = 1.0*np.eye(3)
-
         if self.rot_dir == 'general':
             # Only two of these equations are linearly independent
             skew_rot_axis = ag.skew(self.rot_axis)
@@ -1376,14 +1524,22 @@ class hinge_FoR(BaseLagrangeConstraint):
             elif ((n2 < n0) and (n2 < n1)):
                 row0 = 0
                 row1 = 1
-            Bnh[3:5, FoR_dof+3:FoR_dof+6] = skew_rot_axis[[row0,row1],:]
-        else:
-            Bnh[3:5, FoR_dof+3+self.zero_comp] = np.eye(2)
 
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += self.scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += self.scalingFactor*np.transpose(Bnh)
+        def define_Bnh():
+            Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+            Bnh[:3, FoR_dof:FoR_dof+3] = 1.0*np.eye(3)
+            if self.rot_dir == 'general':
+                Bnh[3:5, FoR_dof+3:FoR_dof+6] = skew_rot_axis[[row0,row1],:]
+            else:
+                Bnh[3:5, FoR_dof+3+self.zero_comp] = np.eye(2)
+            return Bnh
 
-        LM_Q[:sys_size] += self.scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        scaled_Bnh = self.scaled_constant_Bnh((sys_size, FoR_dof), define_Bnh)
+
+        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scaled_Bnh
+        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scaled_Bnh.T
+
+        LM_Q[:sys_size] += scaled_Bnh.T @ Lambda_dot[ieq:ieq+num_LM_eq_specific]
 
         LM_Q[sys_size+ieq:sys_size+ieq+3] += self.scalingFactor*MB_tstep[self.body_FoR].for_vel[0:3].astype(dtype=ct.c_double, copy=True, order='F')
         if self.rot_dir == 'general':
@@ -1477,9 +1633,9 @@ class hinge_FoR_wrtG(BaseLagrangeConstraint):
             row1 = 1
 
         Bnh[3:5, FoR_dof+3:FoR_dof+6] = skew_rot_axis[[row0,row1],:]
+        cols = define_block_cols(sys_size, (FoR_dof, 6))
 
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += self.scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += self.scalingFactor*np.transpose(Bnh)
+        add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, self.scalingFactor)
 
         LM_C[FoR_dof:FoR_dof+3,FoR_dof+6:FoR_dof+10] += self.scalingFactor*ag.der_CquatT_by_v(MB_tstep[self.body_FoR].quat,Lambda_dot[ieq:ieq+3])
 
@@ -1585,6 +1741,7 @@ class constant_rot_vel_FoR(BaseLagrangeConstraint):
     def __init__(self):
         self.required_parameters = ['FoR_body', 'rot_vel']
         self._n_eq = 3
+        self._scaled_constant_Bnh = None
 
     def get_n_eq(self):
         return self._n_eq
@@ -1606,19 +1763,22 @@ class constant_rot_vel_FoR(BaseLagrangeConstraint):
     def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot):
         num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
         ieq = self._ieq
 
-        Bnh[:3,FoR_dof+3:FoR_dof+6] = np.eye(3)
+        def define_Bnh():
+            Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+            Bnh[:3,FoR_dof+3:FoR_dof+6] = np.eye(3)
+            return Bnh
 
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += self.scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += self.scalingFactor*np.transpose(Bnh)
+        scaled_Bnh = self.scaled_constant_Bnh((sys_size, FoR_dof), define_Bnh)
 
-        LM_Q[:sys_size] += self.scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scaled_Bnh
+        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scaled_Bnh.T
+
+        LM_Q[:sys_size] += scaled_Bnh.T @ Lambda_dot[ieq:ieq+num_LM_eq_specific]
         LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += self.scalingFactor*(MB_tstep[self.FoR_body].for_vel[3:6] - self.rot_vel)
 
         ieq += 3
@@ -1648,6 +1808,7 @@ class constant_vel_FoR(BaseLagrangeConstraint):
     def __init__(self):
         self.required_parameters = ['FoR_body', 'vel']
         self._n_eq = 6
+        self._scaled_constant_Bnh = None
 
     def get_n_eq(self):
         return self._n_eq
@@ -1669,19 +1830,22 @@ class constant_vel_FoR(BaseLagrangeConstraint):
     def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot):
         num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
         ieq = self._ieq
 
-        Bnh[:num_LM_eq_specific, FoR_dof:FoR_dof+6] = np.eye(6)
+        def define_Bnh():
+            Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
+            Bnh[:num_LM_eq_specific, FoR_dof:FoR_dof+6] = np.eye(6)
+            return Bnh
 
-        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += self.scalingFactor * Bnh
-        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor * np.transpose(Bnh)
+        scaled_Bnh = self.scaled_constant_Bnh((sys_size, FoR_dof), define_Bnh)
 
-        LM_Q[:sys_size] += self.scalingFactor * np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq + num_LM_eq_specific])
+        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += scaled_Bnh
+        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += scaled_Bnh.T
+
+        LM_Q[:sys_size] += scaled_Bnh.T @ Lambda_dot[ieq:ieq + num_LM_eq_specific]
         LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor*(MB_tstep[self.FoR_body].for_vel - self.vel)
 
         ieq += 6
@@ -1714,6 +1878,7 @@ class zero_lin_vel_sine_rot_vel_FoR(BaseLagrangeConstraint):
     def __init__(self):
         self.required_parameters = ['FoR_body', 'vel_amp', 'omega', 'xyz']
         self._n_eq = 6
+        self._scaled_constant_Bnh = None
 
     def get_n_eq(self):
         return self._n_eq
@@ -1744,8 +1909,6 @@ class zero_lin_vel_sine_rot_vel_FoR(BaseLagrangeConstraint):
     def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot):
         num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
@@ -1754,12 +1917,17 @@ class zero_lin_vel_sine_rot_vel_FoR(BaseLagrangeConstraint):
         vel = np.zeros((6))
         vel[3 + self.xyz_index] = self.vel_amp*np.sin(self.omega*ts*dt)
 
-        Bnh[:num_LM_eq_specific, FoR_dof:FoR_dof+6] = np.eye(6)
+        def define_Bnh():
+            Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
+            Bnh[:num_LM_eq_specific, FoR_dof:FoR_dof+6] = np.eye(6)
+            return Bnh
 
-        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += self.scalingFactor * Bnh
-        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor * np.transpose(Bnh)
+        scaled_Bnh = self.scaled_constant_Bnh((sys_size, FoR_dof), define_Bnh)
 
-        LM_Q[:sys_size] += self.scalingFactor * np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq + num_LM_eq_specific])
+        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += scaled_Bnh
+        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += scaled_Bnh.T
+
+        LM_Q[:sys_size] += scaled_Bnh.T @ Lambda_dot[ieq:ieq + num_LM_eq_specific]
         LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor*(MB_tstep[self.FoR_body].for_vel - vel)
 
         ieq += 6
@@ -1818,9 +1986,9 @@ class lin_vel_node_wrtA(BaseLagrangeConstraint):
         ieq = self._ieq
 
         B[:num_LM_eq_specific, node_dof:node_dof+3] = np.eye(3)
+        cols = define_block_cols(sys_size, (node_dof, 3))
 
-        LM_K[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += self.scalingFactor * B
-        LM_K[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor * np.transpose(B)
+        add_constraint_matrix(LM_K, B, cols, sys_size, ieq, self.scalingFactor)
 
         LM_Q[:sys_size] += self.scalingFactor * np.dot(np.transpose(B), Lambda[ieq:ieq + num_LM_eq_specific])
         LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor*(MB_tstep[self.body_number].pos[self.node_number,:] -
@@ -1847,9 +2015,9 @@ class lin_vel_node_wrtA(BaseLagrangeConstraint):
         ieq = self._ieq
 
         Bnh[:num_LM_eq_specific, node_dof:node_dof+3] = np.eye(3)
+        cols = define_block_cols(sys_size, (node_dof, 3))
 
-        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += self.scalingFactor * Bnh
-        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor * np.transpose(Bnh)
+        add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, self.scalingFactor)
 
         LM_Q[:sys_size] += self.scalingFactor * np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq + num_LM_eq_specific])
         LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor*(MB_tstep[self.body_number].pos_dot[self.node_number,:] - current_vel)
@@ -1909,9 +2077,9 @@ class lin_vel_node_wrtG(BaseLagrangeConstraint):
         ieq = self._ieq
 
         B[:num_LM_eq_specific, node_dof:node_dof+3] = MB_tstep[self.body_number].cga()
+        cols = define_block_cols(sys_size, (node_dof, 3))
 
-        LM_K[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += self.scalingFactor * B
-        LM_K[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor * np.transpose(B)
+        add_constraint_matrix(LM_K, B, cols, sys_size, ieq, self.scalingFactor)
 
         LM_Q[:sys_size] += self.scalingFactor * np.dot(np.transpose(B), Lambda[ieq:ieq + num_LM_eq_specific])
         LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor*(np.dot(MB_tstep[self.body_number].cga(), MB_tstep[self.body_number].pos[self.node_number,:]) +
@@ -1943,9 +2111,12 @@ class lin_vel_node_wrtG(BaseLagrangeConstraint):
             Bnh[:num_LM_eq_specific, FoR_dof:FoR_dof+3] = MB_tstep[self.body_number].cga()
             Bnh[:num_LM_eq_specific, FoR_dof+3:FoR_dof+6] = -np.dot(MB_tstep[self.body_number].cga(), ag.skew(MB_tstep[self.body_number].pos[self.node_number,:]))
         Bnh[:num_LM_eq_specific, node_dof:node_dof+3] = MB_tstep[self.body_number].cga()
+        if MB_beam[self.body_number].FoR_movement == 'free':
+            cols = define_block_cols(sys_size, (FoR_dof, 6), (node_dof, 3))
+        else:
+            cols = define_block_cols(sys_size, (node_dof, 3))
 
-        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += self.scalingFactor * Bnh
-        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += self.scalingFactor * np.transpose(Bnh)
+        add_constraint_matrix(LM_C, Bnh, cols, sys_size, ieq, self.scalingFactor)
 
         if MB_beam[self.body_number].FoR_movement == 'free':
             LM_C[FoR_dof:FoR_dof+3, FoR_dof+6:FoR_dof+10] += self.scalingFactor*ag.der_CquatT_by_v(MB_tstep[self.body_number].quat,Lambda_dot[ieq:ieq + num_LM_eq_specific])
@@ -2018,12 +2189,16 @@ def define_num_LM_eq(lc_list):
     return num_LM_eq
 
 
-def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size, dt, Lambda, Lambda_dot, dynamic_or_static):
+def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size, dt, Lambda, Lambda_dot, dynamic_or_static,
+                             output_format='dense'):
     """
     generate_lagrange_matrix
 
     Generates the matrices associated to the Lagrange multipliers boundary conditions
 
+    The constraints add their contributions as COO triplets to a :class:`LagrangeMatrixCOO`, which is assembled
+    in bulk at the end.
+
     Args:
         lc_list(): list of all the defined contraints
         MBdict(dict): dictionary with the MultiBody and LagrangeMultipliers information
@@ -2035,15 +2210,19 @@ def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size
         Lambda(np.ndarray): list of Lagrange multipliers values
         Lambda_dot(np.ndarray): list of the first derivative of the Lagrange multipliers values
         dynamic_or_static (str): string defining if the computation is dynamic or static
+        output_format (str): ``dense`` for ``np.ndarray`` matrices or ``sparse`` for ``scipy.sparse.csc_matrix``
 
     Returns:
         LM_C (np.ndarray): Damping matrix associated to the Lagrange Multipliers equations
         LM_K (np.ndarray): Stiffness matrix associated to the Lagrange Multipliers equations
         LM_Q (np.ndarray): Vector of independent terms associated to the Lagrange Multipliers equations
     """
+    if output_format not in ['sparse', 'dense']:
+        raise ValueError('Unknown output format %s. Use sparse or dense' % output_format)
+
     # Initialize matrices
-    LM_C = np.zeros((sys_size + num_LM_eq,sys_size + num_LM_eq), dtype=ct.c_double, order = 'F')
-    LM_K = np.zeros((sys_size + num_LM_eq,sys_size + num_LM_eq), dtype=ct.c_double, order = 'F')
+    LM_C = LagrangeMatrixCOO((sys_size + num_LM_eq, sys_size + num_LM_eq))
+    LM_K = LagrangeMatrixCOO((sys_size + num_LM_eq, sys_size + num_LM_eq))
     LM_Q = np.zeros((sys_size + num_LM_eq,),dtype=ct.c_double, order = 'F')
 
     # Define the matrices associated to the constratints
@@ -2076,7 +2255,9 @@ def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size
                         Lambda=Lambda,
                         Lambda_dot=Lambda_dot)
 
-    return LM_C, LM_K, LM_Q
+    if output_format == 'sparse':
+        return LM_C.tocsc(), LM_K.tocsc(), LM_Q
+    return LM_C.toarray(), LM_K.toarray(), LM_Q
 
 
 def postprocess(lc_list, MB_beam, MB_tstep, dynamic_or_static):
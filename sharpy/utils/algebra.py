@@ -568,6 +568,51 @@ def crv2rotation(psi):
     return rot_matrix
 
 
+def crv2rotation_vec(crv_vec):
+    r"""
+    Vectorised version of :func:`crv2rotation` for a collection of Cartesian rotation vectors.
+
+    The same expansion as in :func:`crv2rotation` is used for the vectors with vanishing norm.
+
+    Args:
+        crv_vec (np.ndarray): ``n x 3`` array of Cartesian rotation vectors.
+
+    Returns:
+        np.ndarray: ``n x 3 x 3`` array with the equivalent rotation matrices.
+    """
+    crv_vec = np.atleast_2d(crv_vec)
+    n_crv = crv_vec.shape[0]
+
+    skew_psi = _skew_vec(crv_vec)
+
+    norm_psi = np.linalg.norm(crv_vec, axis=1)
+    small = norm_psi < 1e-15
+    safe_norm = np.where(small, 1.0, norm_psi)
+    coef_1 = np.where(small, 1.0, np.sin(norm_psi)/safe_norm)
+    coef_2 = np.where(small, 0.5, (1.0 - np.cos(norm_psi))/safe_norm**2)
+
+    rot_matrix = np.zeros((n_crv, 3, 3))
+    rot_matrix[:] = np.eye(3)
+    rot_matrix += coef_1[:, None, None]*skew_psi
+    rot_matrix += coef_2[:, None, None]*np.matmul(skew_psi, skew_psi)
+
+    return rot_matrix
+
+
+def _skew_vec(vec):
+    """
+    Skew-symmetric matrices of a collection of ``n x 3`` vectors, stacked as ``n x 3 x 3``.
+    """
+    skew_mat = np.zeros((vec.shape[0], 3, 3))
+    skew_mat[:, 1, 2] = -vec[:, 0]
+    skew_mat[:, 2, 0] = -vec[:, 1]
+    skew_mat[:, 0, 1] = -vec[:, 2]
+    skew_mat[:, 2, 1] = vec[:, 0]
+    skew_mat[:, 0, 2] = vec[:, 1]
+    skew_mat[:, 1, 0] = vec[:, 2]
+    return skew_mat
+
+
 def rotation2crv(Cab):
     r"""
     Given a rotation matrix :math:`C^{AB}` rotating the frame A onto B, the function returns
@@ -648,6 +693,35 @@ def crv2tan(psi):
         return np.eye(3) + k1*psi_skew + k2*np.dot(psi_skew, psi_skew)
 
 
+def crv2tan_vec(psi_vec):
+    r"""
+    Vectorised version of :func:`crv2tan` for a collection of Cartesian rotation vectors.
+
+    Args:
+        psi_vec (np.ndarray): ``n x 3`` array of Cartesian rotation vectors.
+
+    Returns:
+        np.ndarray: ``n x 3 x 3`` array with the tangential operators.
+    """
+    psi_vec = np.atleast_2d(psi_vec)
+    n_psi = psi_vec.shape[0]
+
+    psi_skew = _skew_vec(psi_vec)
+
+    norm_psi = np.linalg.norm(psi_vec, axis=1)
+    small = norm_psi < 1e-8
+    safe_norm = np.where(small, 1.0, norm_psi)
+    k1 = np.where(small, -0.5, (np.cos(norm_psi) - 1.0)/safe_norm**2)
+    k2 = np.where(small, 1.0/6.0, (1.0 - np.sin(norm_psi)/safe_norm)/safe_norm**2)
+
+    tan = np.zeros((n_psi, 3, 3))
+    tan[:] = np.eye(3)
+    tan += k1[:, None, None]*psi_skew
+    tan += k2[:, None, None]*np.matmul(psi_skew, psi_skew)
+
+    return tan
+
+
 def crv2invtant(psi):
     tan = crv2tan(psi).T
     return np.linalg.inv(tan)
@@ -0,0 +1,411 @@
+"""Incremental checkpoints
+
+Append-only checkpoint files of the SHARPy ``data`` structure and solvers, used by
+:class:`~sharpy.postproc.pickledata.PickleData` and read by ``sharpy -r``.
+
+The file starts with a ``MAGIC`` header and is followed by records, each of them made of a one byte kind, the
+length of its payload as an unsigned 64-bit integer and the pickled payload:
+
+    * ``T``: a time step of the ``timestep_info`` of the structure or the aerodynamics, written once.
+
+    * ``A``: a large array of the model (i.e. the structural and aerodynamic inputs), written once per content.
+
+    * ``S``: the state at a checkpoint: ``(data, solvers)`` with the time steps and large arrays replaced by
+      references to their records. Only the last one is used when loading.
+
+Therefore, the cost of each checkpoint is proportional to the number of new time steps, rather than to the length
+of the simulation. The time steps from the latest one of the previous checkpoint onwards are written at every
+checkpoint, since they may still be modified after it (i.e. by the solvers and the postprocessors that run after
+:class:`~sharpy.postproc.pickledata.PickleData` in the same time step).
+
+Besides plain lists, ``timestep_info`` may be any subclass of ``list`` (i.e.
+:class:`~sharpy.utils.datastructures.TimeStepHistory`), which is restored with its class and attributes.
+"""
+import hashlib
+import io
+import os
+import pickle
+import struct
+import weakref
+
+import numpy as np
+
+MAGIC = b'SHARPy checkpoint 1\n'
+_record_header = struct.Struct('<cQ')
+_timestep_models = ('structure', 'aero')
+
+
+def is_checkpoint(filename):
+    """
+    Returns ``True`` if ``filename`` is an incremental checkpoint file.
+    """
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class CheckpointWriter:
+    """
+    Writes incremental checkpoints of ``data`` and the solvers to ``filename``.
+
+    If the time steps of ``data`` have been loaded from ``filename`` (i.e. in a restarted simulation), the checkpoints
+    are appended to it and the time steps already in the file are not written again. Otherwise, any existing file
+    is replaced.
+
+    Args:
+        filename (str): Checkpoint file
+        data (sharpy.presharpy.presharpy.PreSharpy): Data to be checkpointed
+        array_min_size (int): Arrays of at least this number of bytes are only written once per content
+    """
+    def __init__(self, filename, data, array_min_size=4096):
+        self.filename = filename
+        self.array_min_size = array_min_size
+
+        # (model, index): (weakref to time step, record offset)
+        self.timestep_records = dict()
+        # model: index of the latest time step of the previous checkpoint, from which time steps are rewritten
+        self.rewrite_from = dict()
+        # array hash: record offset
+        self.array_records = dict()
+
+        reader = None
+        for model in _timestep_models:
+            timestep_info = getattr(getattr(data, model, None), 'timestep_info', None)
+            if isinstance(timestep_info, LazyTimeStepList) and timestep_info.is_source(filename):
+                reader = timestep_info.reader
+                self.rewrite_from[model] = len(timestep_info) - 1
+        if reader is None:
+            with open(filename, 'wb') as f:
+                f.write(MAGIC)
+        else:
+            # discard any incomplete record of an interrupted checkpoint before appending
+            with open(filename, 'r+b') as f:
+                f.truncate(reader.scan()[1])
+
+    def write(self, data, solvers=None):
+        """
+        Appends a checkpoint with the new time steps and the current state of ``data`` and ``solvers``.
+        """
+        with open(self.filename, 'ab') as f:
+            timestep_ids = dict()
+            timestep_info_offsets = dict()
+            for model in _timestep_models:
+                try:
+                    timestep_info = getattr(data, model).timestep_info
+                except AttributeError:
+                    continue
+                if not isinstance(timestep_info, list):
+                    continue
+                offsets, model_timestep_ids = self._write_timesteps(f, model, timestep_info)
+                timestep_ids.update(model_timestep_ids)
+                timestep_info_offsets[id(timestep_info)] = offsets
+
+            buffer = io.BytesIO()
+            pickler = _StatePickler(buffer, self, f, timestep_ids, timestep_info_offsets)
+            pickler.dump((data, solvers))
+            self._write_record(f, b'S', buffer.getvalue())
+
+    def _write_timesteps(self, f, model, timestep_info):
+        """
+        Writes the time steps not yet in the file.
+
+        Returns:
+            tuple: Record offsets of the time steps and dictionary of the ids of the time steps in memory to their
+            record offsets.
+        """
+        offsets = []
+        timestep_ids = dict()
+        from_file = isinstance(timestep_info, LazyTimeStepList) and timestep_info.is_source(self.filename)
+        n_steps = len(timestep_info)
+        rewrite_from = min(self.rewrite_from.get(model, n_steps - 1), n_steps - 1)
+        for index in range(n_steps):
+            if from_file and index < rewrite_from:
+                offset = timestep_info.stored_offset(index)
+                if offset is not None:
+                    offsets.append(offset)
+                    if timestep_info.is_loaded(index):
+                        timestep_ids[id(timestep_info[index])] = offset
+                    continue
+
+            tstep = timestep_info[index]
+            if tstep is None:
+                offsets.append(None)
+                continue
+
+            ref, offset = self.timestep_records.get((model, index), (None, None))
+            if ref is None or ref() is not tstep or index >= rewrite_from:
+                offset = self._write_record(f, b'T', pickle.dumps(tstep, protocol=pickle.HIGHEST_PROTOCOL))
+                self.timestep_records[(model, index)] = (weakref.ref(tstep), offset)
+            offsets.append(offset)
+            timestep_ids[id(tstep)] = offset
+
+        self.rewrite_from[model] = n_steps - 1
+        return offsets, timestep_ids
+
+    def _write_array(self, f, array):
+        contiguous = np.ascontiguousarray(array)
+        array_hash = hashlib.sha1(contiguous.view(np.uint8).reshape(-1))
+        array_hash.update(str((array.dtype.str, array.shape)).encode())
+        array_hash = array_hash.hexdigest()
+        try:
+            return self.array_records[array_hash]
+        except KeyError:
+            offset = self._write_record(f, b'A', pickle.dumps(array, protocol=pickle.HIGHEST_PROTOCOL))
+            self.array_records[array_hash] = offset
+            return offset
+
+    @staticmethod
+    def _write_record(f, kind, payload):
+        offset = f.tell()
+        f.write(_record_header.pack(kind, len(payload)))
+        f.write(payload)
+        return offset
+
+
+class _StatePickler(pickle.Pickler):
+    """
+    Pickler of the checkpoint state, which replaces time steps and large arrays by references to their records.
+    """
+    def __init__(self, file, writer, f, timestep_ids, timestep_info_offsets):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.writer = writer
+        self.f = f
+        self.timestep_ids = timestep_ids
+        self.timestep_info_offsets = timestep_info_offsets
+
+    def persistent_id(self, obj):
+        if isinstance(obj, list):
+            try:
+                offsets = self.timestep_info_offsets[id(obj)]
+            except KeyError:
+                return None
+            if type(obj) in (list, LazyTimeStepList):
+                return 'timestep_info', offsets
+            # subclasses of list are restored with their class and attributes
+            state = obj.__getstate__() if hasattr(obj, '__getstate__') else obj.__dict__.copy()
+            return 'timestep_list', offsets, type(obj), state
+        if isinstance(obj, np.ndarray):
+            if obj.dtype.hasobject or obj.nbytes < self.writer.array_min_size:
+                return None
+            # arrays shared within the state are identified by their id
+            return 'array', self.writer._write_array(self.f, obj), id(obj)
+        try:
+            return 'tstep', self.timestep_ids[id(obj)]
+        except KeyError:
+            return None
+
+
+class CheckpointReader:
+    """
+    Reads the records of an incremental checkpoint file, which is kept open for the time steps to be loaded lazily.
+
+    Args:
+        filename (str): Checkpoint file
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        if self.file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('%s is not a SHARPy checkpoint file' % filename)
+
+        # time steps are shared between the lists and any other reference to them in the state
+        self.timesteps = weakref.WeakValueDictionary()
+        self.arrays = dict()
+
+    def scan(self):
+        """
+        Scans the record headers of the file.
+
+        Returns:
+            tuple: Offset of the last complete state record (``None`` if there are none) and end of the last complete
+            record in the file.
+        """
+        file_size = os.fstat(self.file.fileno()).st_size
+        offset = len(MAGIC)
+        state_offset = None
+        while offset + _record_header.size <= file_size:
+            self.file.seek(offset)
+            kind, length = _record_header.unpack(self.file.read(_record_header.size))
+            next_offset = offset + _record_header.size + length
+            if next_offset > file_size:
+                # incomplete record of an interrupted checkpoint
+                break
+            if kind == b'S':
+                state_offset = offset
+            offset = next_offset
+        return state_offset, offset
+
+    def read_record(self, offset):
+        self.file.seek(offset)
+        kind, length = _record_header.unpack(self.file.read(_record_header.size))
+        return kind, self.file.read(length)
+
+    def load_timestep(self, offset):
+        try:
+            return self.timesteps[offset]
+        except KeyError:
+            tstep = pickle.loads(self.read_record(offset)[1])
+            self.timesteps[offset] = tstep
+            return tstep
+
+    def load_array(self, offset):
+        try:
+            return self.arrays[offset]
+        except KeyError:
+            array = pickle.loads(self.read_record(offset)[1])
+            self.arrays[offset] = array
+            return array
+
+    def close(self):
+        self.file.close()
+
+
+class _StateUnpickler(pickle.Unpickler):
+    def __init__(self, file, reader):
+        super().__init__(file)
+        self.reader = reader
+        self.arrays = dict()
+
+    def persistent_load(self, pid):
+        if pid[0] == 'timestep_info':
+            return LazyTimeStepList(self.reader, pid[1])
+        elif pid[0] == 'timestep_list':
+            offsets, cls, state = pid[1:]
+            timestep_list = cls.__new__(cls)
+            list.extend(timestep_list, [self.reader.load_timestep(offset) if offset is not None else None
+                                        for offset in offsets])
+            if state is not None:
+                if hasattr(timestep_list, '__setstate__'):
+                    timestep_list.__setstate__(state)
+                else:
+                    timestep_list.__dict__.update(state)
+            return timestep_list
+        elif pid[0] == 'tstep':
+            return self.reader.load_timestep(pid[1])
+        elif pid[0] == 'array':
+            key = pid[1:]
+            try:
+                return self.arrays[key]
+            except KeyError:
+                # each of the original arrays is restored as an independent copy
+                array = self.reader.load_array(pid[1]).copy()
+                self.arrays[key] = array
+                return array
+        raise pickle.UnpicklingError('Unknown checkpoint reference %s' % str(pid[0]))
+
+
+class LazyTimeStepList(list):
+    """
+    ``timestep_info`` list whose time steps are read from a checkpoint file when accessed for the first time.
+
+    It behaves as a plain ``list`` and is pickled (or copied) as such, after loading all its time steps.
+
+    Args:
+        reader (CheckpointReader): Reader of the checkpoint file
+        offsets (list): Record offsets of the time steps (``None`` for time steps that were not stored).
+    """
+    _not_loaded = object()
+
+    def __init__(self, reader, offsets):
+        super().__init__([self._not_loaded if offset is not None else None for offset in offsets])
+        self.reader = reader
+        self.offsets = list(offsets)
+
+    def _load(self, index):
+        tstep = list.__getitem__(self, index)
+        if tstep is self._not_loaded:
+            tstep = self.reader.load_timestep(self.offsets[index])
+            list.__setitem__(self, index, tstep)
+        return tstep
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._load(i) for i in range(*index.indices(len(self)))]
+        return self._load(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._load(index)
+
+    def __reversed__(self):
+        for index in reversed(range(len(self))):
+            yield self._load(index)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        if not isinstance(index, slice):
+            self._forget(index)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+        else:
+            indices = [index + len(self) if index < 0 else index]
+        super().__delitem__(index)
+        for i_offset in sorted(indices, reverse=True):
+            if i_offset < len(self.offsets):
+                del self.offsets[i_offset]
+
+    def pop(self, index=-1):
+        tstep = self._load(index)
+        del self[index]
+        return tstep
+
+    def _forget(self, index):
+        if index < 0:
+            index += len(self)
+        if index < len(self.offsets):
+            self.offsets[index] = None
+
+    def is_loaded(self, index):
+        """
+        Returns ``True`` if the time step ``index`` is in memory.
+        """
+        return list.__getitem__(self, index) is not self._not_loaded
+
+    def is_source(self, filename):
+        """
+        Returns ``True`` if the time steps are read from ``filename``.
+        """
+        return os.path.abspath(self.reader.filename) == os.path.abspath(filename)
+
+    def stored_offset(self, index):
+        """
+        Returns the record offset of the time step ``index`` if it has not been replaced since it was read.
+        """
+        if index < len(self.offsets):
+            return self.offsets[index]
+        return None
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        import copy
+        return copy.deepcopy(list(self), memo)
+
+
+def load_checkpoint(filename):
+    """
+    Loads the last checkpoint of an incremental checkpoint file.
+
+    The ``timestep_info`` of the structure and aerodynamics are returned as :class:`LazyTimeStepList`, such that their
+    time steps are only read when accessed.
+
+    Args:
+        filename (str): Checkpoint file
+
+    Returns:
+        tuple: ``data`` and the dictionary of solvers
+    """
+    reader = CheckpointReader(filename)
+    state_offset, end_offset = reader.scan()
+    if state_offset is None:
+        raise ValueError('No complete checkpoint found in %s' % filename)
+    kind, payload = reader.read_record(state_offset)
+    data, solvers = _StateUnpickler(io.BytesIO(payload), reader).load()
+    # arrays are only shared during the load of the state
+    reader.arrays.clear()
+    return data, solvers
@@ -1,5 +1,6 @@
 from abc import ABCMeta, abstractmethod
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 import os
 
 dict_of_controllers = {}
@@ -15,6 +16,7 @@ def controller(arg):
     except AttributeError:
         raise AttributeError('Class defined as controller has no controller_id attribute')
     dict_of_controllers[arg.controller_id] = arg
+    profiling.register(arg, arg.controller_id, ['initialise', 'control'])
     return arg
 
 
@@ -5,9 +5,11 @@ These classes are responsible for storing the aerodynamic and structural time st
 """
 import copy
 import ctypes as ct
+import h5py
 import numpy as np
 
 import sharpy.utils.algebra as algebra
+import sharpy.utils.h5utils as h5utils
 import sharpy.utils.multibody as mb
 
 
@@ -64,13 +66,28 @@ class AeroTimeStepInfo(object):
 
         control_surface_deflection (np.ndarray): Deflection of the control surfaces, in `rad` and if fitted.
 
+        packed (bool): ``True`` if the per-surface variables are views into contiguous buffers (see :meth:`pack`).
+        packed_storage (dict): Contiguous buffer of each packed variable (i.e. ``packed_storage['gamma']`` holds the
+          bound circulation of all surfaces). Only populated if ``packed``.
+        packed_offsets (dict): Offsets of each surface in the ``packed_storage`` buffers ``[n_surf + 1]``.
+
     Args:
         dimensions (np.ndarray): Matrix defining the dimensions of the vortex grid on solid surfaces
           ``[num_surf x chordwise panels x spanwise panels]``
         dimensions_star (np.ndarray): Matrix defining the dimensions of the vortex grid on wakes
           ``[num_surf x streamwise panels x spanwise panels]``
+        packed (bool (optional)): Store the per-surface variables in contiguous buffers.
     """
-    def __init__(self, dimensions, dimensions_star):
+    _array_attributes = ('zeta', 'zeta_dot', 'normals', 'forces', 'dynamic_forces', 'zeta_star', 'u_ext',
+                         'u_ext_star', 'gamma', 'gamma_star', 'gamma_dot', 'dist_to_orig',
+                         'inertial_steady_forces', 'body_steady_forces', 'inertial_unsteady_forces',
+                         'body_unsteady_forces', 'control_surface_deflection')
+
+    # per-surface variables that are stored contiguously in the packed layout
+    _packed_attributes = ('zeta', 'zeta_dot', 'normals', 'forces', 'dynamic_forces', 'zeta_star', 'u_ext',
+                          'u_ext_star', 'gamma', 'gamma_star', 'gamma_dot', 'dist_to_orig')
+
+    def __init__(self, dimensions, dimensions_star, packed=False):
         self.ct_dimensions = None
         self.ct_dimensions_star = None
 
@@ -177,10 +194,96 @@ class AeroTimeStepInfo(object):
 
         self.control_surface_deflection = np.array([])
 
-    def copy(self):
+        # Packed layout
+        self.packed = False
+        self.packed_storage = dict()
+        self.packed_offsets = dict()
+        self._packed_views = dict()
+        self._ct_pointers = None
+        if packed:
+            self.pack()
+
+    def pack(self):
+        """
+        Stores the per-surface variables in a single contiguous buffer per variable.
+
+        The per-surface arrays (i.e. ``zeta[i_surf]``) become views into ``packed_storage``, such that operations can be
+        done over the whole lattice at once and the ``ctypes`` pointer tables generated in
+        :meth:`generate_ctypes_pointers` remain valid across calls.
+
+        If a per-surface array has been replaced since the last call, its content is copied back into the buffer and
+        the view restored. The buffers are only (re)allocated the first time or if the dimensions change.
+
+        Returns:
+            bool: ``True`` if the buffers have been (re)allocated.
+        """
+        self.packed = True
+        reallocated = False
+        for name in self._packed_attributes:
+            arrays = getattr(self, name)
+            views = self._packed_views.get(name, None)
+            buffer = self.packed_storage.get(name, None)
+            if (views is None or buffer is None or len(views) != len(arrays) or
+                    any([arrays[i_surf].shape != views[i_surf].shape for i_surf in range(len(arrays))])):
+                offsets = np.zeros((len(arrays) + 1,), dtype=int)
+                offsets[1:] = np.cumsum([array.size for array in arrays])
+                buffer = np.zeros((offsets[-1],), dtype=ct.c_double)
+                views = [buffer[offsets[i_surf]:offsets[i_surf + 1]].reshape(arrays[i_surf].shape)
+                         for i_surf in range(len(arrays))]
+                self.packed_storage[name] = buffer
+                self.packed_offsets[name] = offsets
+                self._packed_views[name] = views
+                reallocated = True
+
+            for i_surf in range(len(arrays)):
+                if arrays[i_surf] is not views[i_surf]:
+                    np.copyto(views[i_surf], arrays[i_surf])
+                    arrays[i_surf] = views[i_surf]
+
+        if reallocated:
+            self._ct_pointers = None
+        return reallocated
+
+    def __getstate__(self):
+        # ctypes pointers cannot be pickled and the packed storage is rebuilt on demand
+        state = {k: v for k, v in self.__dict__.items() if not k.startswith('ct_')}
+        state['packed_storage'] = dict()
+        state['packed_offsets'] = dict()
+        state['_packed_views'] = dict()
+        state['_ct_pointers'] = None
+        return state
+
+    def __setstate__(self, state):
+        # defaults for time steps pickled before the packed layout was introduced
+        self.ct_dimensions = None
+        self.ct_dimensions_star = None
+        self.packed = False
+        self.packed_storage = dict()
+        self.packed_offsets = dict()
+        self._packed_views = dict()
+        self._ct_pointers = None
+
+        self.__dict__.update(state)
+        if self.packed:
+            self.pack()
+
+    def copy(self, out=None):
         """
         Returns a copy of a deepcopy of a :class:`~sharpy.utils.datastructures.AeroTimeStepInfo`
+
+        Args:
+            out (AeroTimeStepInfo (optional)): Preallocated time step into which the information is copied in place,
+              without allocating new arrays when the dimensions match.
+
+        Returns:
+            AeroTimeStepInfo: copied time step (``out`` if provided)
         """
+        if out is not None:
+            return self._copy_inplace(out)
+
+        if self.packed:
+            return self._copy_inplace(AeroTimeStepInfo(self.dimensions, self.dimensions_star, packed=True))
+
         copied = AeroTimeStepInfo(self.dimensions, self.dimensions_star)
         # generate placeholder for aero grid zeta coordinates
         for i_surf in range(copied.n_surf):
@@ -238,10 +341,50 @@ class AeroTimeStepInfo(object):
 
         return copied
 
+    def _copy_inplace(self, out):
+        out.dimensions = copy_inplace(self.dimensions, out.dimensions)
+        out.dimensions_star = copy_inplace(self.dimensions_star, out.dimensions_star)
+        out.n_surf = self.n_surf
+
+        for attr in self._array_attributes:
+            setattr(out, attr, copy_inplace(getattr(self, attr), getattr(out, attr)))
+
+        out.postproc_cell = copy_inplace(self.postproc_cell, out.postproc_cell)
+        out.postproc_node = copy_inplace(self.postproc_node, out.postproc_node)
+
+        out.in_global_AFoR = self.in_global_AFoR
+
+        return out
+
     def generate_ctypes_pointers(self):
         """
         Generates the pointers to aerodynamic variables used to interface the C++ library ``uvlmlib``
+
+        With the packed layout, the pointer tables are only generated once and reused in later calls.
         """
+        if self.packed and not self.pack() and self._ct_pointers is not None:
+            self.__dict__.update(self._ct_pointers)
+        else:
+            self._generate_ctypes_pointer_tables()
+            if self.packed:
+                self._ct_pointers = {k: v for k, v in self.__dict__.items()
+                                     if k.startswith('ct_') and k != 'ct_incidence_list'}
+
+        try:
+            self.postproc_cell['incidence_angle']
+        except KeyError:
+            with_incidence_angle = False
+        else:
+            with_incidence_angle = True
+
+        if with_incidence_angle:
+            self.ct_incidence_list = []
+            for i_surf in range(self.n_surf):
+                self.ct_incidence_list.append(self.postproc_cell['incidence_angle'][i_surf][:, :].reshape(-1))
+            self.postproc_cell['incidence_angle_ct_pointer'] = ((ct.POINTER(ct.c_double)*len(self.ct_incidence_list))
+                            (* [np.ctypeslib.as_ctypes(array) for array in self.ct_incidence_list]))
+
+    def _generate_ctypes_pointer_tables(self):
         self.ct_dimensions = self.dimensions.astype(dtype=ct.c_uint, copy=True)
         self.ct_dimensions_star = self.dimensions_star.astype(dtype=ct.c_uint, copy=True)
 
@@ -305,18 +448,6 @@ class AeroTimeStepInfo(object):
         for i_surf in range(self.n_surf):
             self.ct_dist_to_orig_list.append(self.dist_to_orig[i_surf][:, :].reshape(-1))
 
-        try:
-            self.postproc_cell['incidence_angle']
-        except KeyError:
-            with_incidence_angle = False
-        else:
-            with_incidence_angle = True
-
-        if with_incidence_angle:
-            self.ct_incidence_list = []
-            for i_surf in range(self.n_surf):
-                self.ct_incidence_list.append(self.postproc_cell['incidence_angle'][i_surf][:, :].reshape(-1))
-
         self.ct_p_dimensions = ((ct.POINTER(ct.c_uint)*n_surf)
                                 (* np.ctypeslib.as_ctypes(self.ct_dimensions)))
         self.ct_p_dimensions_star = ((ct.POINTER(ct.c_uint)*n_surf)
@@ -346,14 +477,16 @@ class AeroTimeStepInfo(object):
         self.ct_p_dist_to_orig = ((ct.POINTER(ct.c_double)*len(self.ct_dist_to_orig_list))
                            (* [np.ctypeslib.as_ctypes(array) for array in self.ct_dist_to_orig_list]))
 
-        if with_incidence_angle:
-            self.postproc_cell['incidence_angle_ct_pointer'] = ((ct.POINTER(ct.c_double)*len(self.ct_incidence_list))
-                            (* [np.ctypeslib.as_ctypes(array) for array in self.ct_incidence_list]))
-
     def remove_ctypes_pointers(self):
         """
         Removes the pointers to aerodynamic variables used to interface the C++ library ``uvlmlib``
+
+        With the packed layout, the pointer tables into the packed storage are kept for later calls.
         """
+        if self.packed and self._ct_pointers is not None:
+            self._remove_postproc_ctypes_pointers()
+            return
+
         try:
             del self.ct_p_dimensions
         except AttributeError:
@@ -424,6 +557,9 @@ class AeroTimeStepInfo(object):
         except AttributeError:
             pass
 
+        self._remove_postproc_ctypes_pointers()
+
+    def _remove_postproc_ctypes_pointers(self):
         for k in list(self.postproc_cell.keys()):
             if 'ct_list' in k:
                 del self.postproc_cell[k]
@@ -431,6 +567,151 @@ class AeroTimeStepInfo(object):
                 del self.postproc_cell[k]
 
 
+def copy_inplace(source, target):
+    """
+    Copies ``source`` into ``target`` reusing the memory already allocated in ``target``.
+
+    Arrays are copied with ``np.copyto`` when ``target`` is an array of the same shape and type. Dictionaries and lists
+    are traversed recursively, such that nested arrays (i.e. ``postproc_cell`` entries or lists of per-surface arrays)
+    are also copied in place. Anything else, or any mismatch between ``source`` and ``target``, falls back to a deep copy.
+
+    Args:
+        source: Object to copy
+        target: Object whose memory is reused, if possible
+
+    Returns:
+        The copied object (``target`` itself when the copy was done in place)
+    """
+    if target is source:
+        return target
+
+    if isinstance(source, np.ndarray):
+        if (isinstance(target, np.ndarray) and
+                target.shape == source.shape and target.dtype == source.dtype):
+            np.copyto(target, source)
+            return target
+        return copy.deepcopy(source)
+
+    if isinstance(source, dict) and isinstance(target, dict):
+        for k in list(target.keys()):
+            if k not in source:
+                del target[k]
+        for k, v in source.items():
+            target[k] = copy_inplace(v, target.get(k, None))
+        return target
+
+    if isinstance(source, list) and isinstance(target, list) and len(source) == len(target):
+        for i_item in range(len(source)):
+            target[i_item] = copy_inplace(source[i_item], target[i_item])
+        return target
+
+    return copy.deepcopy(source)
+
+
+class TimeStepHistory(list):
+    """
+    Time step history that keeps a bounded number of time steps in memory.
+
+    It replaces the plain ``list`` used for the ``timestep_info`` of the aerodynamic and structural classes and
+    behaves as such: indices refer to the absolute time step and its length is the total number of time steps.
+    Only the initial time step ``[0]`` and the latest ``retention`` time steps are kept in memory. Older ones are
+    replaced by ``None``, as done by the :class:`~sharpy.postproc.cleanup.Cleanup` postprocessor, after being
+    written to an HDF5 file if ``spill_filename`` is provided.
+
+    Args:
+        iterable (list): Initial time steps
+        retention (int): Number of latest time steps retained in memory. ``None`` retains all of them.
+        spill_filename (str (optional)): HDF5 file where the evicted time steps are written to.
+        skip_attr (list(str) (optional)): Attributes of the time steps that are not written to ``spill_filename``.
+    """
+    def __init__(self, iterable=(), retention=None, spill_filename=None, skip_attr=None):
+        super().__init__(iterable)
+        if retention is not None and retention < 1:
+            raise ValueError('The retention window of the time step history must be at least one time step')
+        self.retention = retention
+        self.spill_filename = spill_filename
+        if skip_attr is None:
+            skip_attr = ['ct_dynamic_forces_list', 'ct_forces_list', 'ct_gamma_dot_list', 'ct_gamma_list',
+                         'ct_gamma_star_list', 'ct_normals_list', 'ct_u_ext_list', 'ct_u_ext_star_list',
+                         'ct_zeta_dot_list', 'ct_zeta_list', 'ct_zeta_star_list', 'ct_dist_to_orig_list',
+                         'packed_storage', 'packed_offsets', '_packed_views', '_ct_pointers']
+        self.skip_attr = skip_attr
+        self._h5file = None
+        self.evict()
+
+    def append(self, tstep):
+        super().append(tstep)
+        self.evict()
+
+    def evict(self):
+        """
+        Drops the time steps outside the retention window, spilling them to disk if required.
+        """
+        if self.retention is None:
+            return
+
+        # older steps have already been evicted
+        i_step = len(self) - self.retention - 1
+        while i_step > 0:
+            tstep = list.__getitem__(self, i_step)
+            if tstep is None:
+                break
+            if self.spill_filename is not None:
+                self.spill(i_step, tstep)
+            list.__setitem__(self, i_step, None)
+            i_step -= 1
+
+    def spill(self, i_step, tstep):
+        """
+        Writes the time step ``i_step`` to the ``spill_filename`` HDF5 file, as a group named ``%05d % i_step``.
+        """
+        if self._h5file is None:
+            self._h5file = h5py.File(self.spill_filename, 'a')
+        try:
+            tstep.remove_ctypes_pointers()
+        except AttributeError:
+            pass
+        h5utils.add_as_grp(tstep, self._h5file, grpname=('%05d' % i_step),
+                           ClassesToSave=(tstep.__class__,), SkipAttr=self.skip_attr, overwrite=True)
+        self._h5file.flush()
+
+    def load(self, i_step):
+        """
+        Returns the time step ``i_step``, either from memory or, if already evicted, read from the spill file.
+
+        Note:
+            Time steps read from the spill file are returned as :class:`~sharpy.utils.h5utils.ReadInto` instances.
+        """
+        tstep = self[i_step]
+        if tstep is not None or self.spill_filename is None:
+            return tstep
+
+        if i_step < 0:
+            i_step += len(self)
+        if self._h5file is None:
+            self._h5file = h5py.File(self.spill_filename, 'a')
+        try:
+            return h5utils.read_group(self._h5file['%05d' % i_step])
+        except KeyError:
+            return None
+
+    def close(self):
+        """
+        Closes the spill file, if open.
+        """
+        if self._h5file is not None:
+            self._h5file.close()
+            self._h5file = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_h5file'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
 def init_matrix_structure(dimensions, with_dim_dimension, added_size=0):
     matrix = []
     for i_surf in range(len(dimensions)):
@@ -531,6 +812,14 @@ class StructTimeStepInfo(object):
 
         mb_dict (np.ndarray): Dictionary with the multibody information. It comes from the file ``case.mb.h5``
     """
+    _array_attributes = ('pos', 'pos_dot', 'pos_ddot', 'psi', 'psi_dot', 'psi_ddot',
+                         'quat', 'for_pos', 'for_vel', 'for_acc',
+                         'steady_applied_forces', 'unsteady_applied_forces', 'runtime_steady_forces',
+                         'runtime_unsteady_forces', 'gravity_forces', 'total_gravity_forces', 'total_forces',
+                         'q', 'dqdt', 'dqddt',
+                         'psi_local', 'psi_dot_local', 'mb_FoR_pos', 'mb_FoR_vel', 'mb_FoR_acc', 'mb_quat',
+                         'mb_dquatdt', 'forces_constraints_nodes', 'forces_constraints_FoR')
+
     def __init__(self, num_node, num_elem, num_node_elem=3, num_dof=None, num_bodies=1):
         self.in_global_AFoR = True
         self.num_node = num_node
@@ -582,10 +871,20 @@ class StructTimeStepInfo(object):
         self.forces_constraints_FoR = np.zeros((num_bodies, 10), dtype=ct.c_double, order='F')
         self.mb_dict = None
 
-    def copy(self):
+    def copy(self, out=None):
         """
         Returns a copy of a deepcopy of a :class:`~sharpy.utils.datastructures.StructTimeStepInfo`
+
+        Args:
+            out (StructTimeStepInfo (optional)): Preallocated time step into which the information is copied in place,
+              without allocating new arrays when the dimensions match.
+
+        Returns:
+            StructTimeStepInfo: copied time step (``out`` if provided)
         """
+        if out is not None:
+            return self._copy_inplace(out)
+
         copied = StructTimeStepInfo(self.num_node, self.num_elem, self.num_node_elem, ct.c_int(len(self.q)-10),
                                     self.mb_quat.shape[0])
 
@@ -639,6 +938,22 @@ class StructTimeStepInfo(object):
 
         return copied
 
+    def _copy_inplace(self, out):
+        out.in_global_AFoR = self.in_global_AFoR
+        out.num_node = self.num_node
+        out.num_elem = self.num_elem
+        out.num_node_elem = self.num_node_elem
+
+        for attr in self._array_attributes:
+            setattr(out, attr, copy_inplace(getattr(self, attr), getattr(out, attr)))
+
+        out.postproc_cell = copy_inplace(self.postproc_cell, out.postproc_cell)
+        out.postproc_node = copy_inplace(self.postproc_node, out.postproc_node)
+
+        out.mb_dict = copy_inplace(self.mb_dict, out.mb_dict)
+
+        return out
+
     def glob_pos(self, include_rbm=True):
         """
         Returns the position of the nodes in ``G`` FoR
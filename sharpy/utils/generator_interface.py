@@ -2,6 +2,7 @@
 """
 from abc import ABCMeta, abstractmethod
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 import os
 import shutil
 
@@ -18,6 +19,7 @@ def generator(arg):
     except AttributeError:
         raise AttributeError('Class defined as generator has no generator_id attribute')
     dict_of_generators[arg.generator_id] = arg
+    profiling.register(arg, arg.generator_id, ['initialise', 'generate'])
     return arg
 
 
@@ -9,6 +9,8 @@ Set of utilities for opening/reading files
 import h5py as h5
 import os
 import errno
+import queue
+import threading
 
 import numpy as np
 import warnings
@@ -146,6 +148,8 @@ def read_group(Grp):
     read_as = 'class'
     if '_read_as' in MainLev:
         read_as = Grp['_read_as'][()]
+        if isinstance(read_as, bytes):
+            read_as = read_as.decode()
 
     ### initialise output
     if read_as == 'class':
@@ -163,7 +167,7 @@ def read_group(Grp):
             N = len(MainLev) - 1
             list_ts = MainLev.copy()
             list_ts.remove('_read_as')
-            list_ts = np.sort(np.unique(np.array(list_ts, dtype=np.int)))
+            list_ts = np.sort(np.unique(np.array(list_ts, dtype=int)))
             if len(list_ts > 0):
                 for nn in range(list_ts[0] - 1):
                     Hinst.append('NoneType')
@@ -419,3 +423,259 @@ def save_list_as_array(list_obj, grp_target, compress_float=False):
 
                 return True
     return False
+
+
+# ---------------------------------------------------------------- Time series
+
+
+def time_series_values(obj, SkipAttr=(), ClassesToSave=()):
+    """
+    Extracts a snapshot of the numerical content of ``obj`` to be appended to a :class:`TimeSeriesWriter`.
+
+    Classes and dictionaries are returned as dictionaries and lists or tuples as lists, traversed recursively as in
+    :func:`add_as_grp`: nested classes are only included if they are instances of ``ClassesToSave``. Arrays are copied
+    and ``ctypes`` numbers converted to scalars. Any other content (strings, ``None``, pointers...) and the attributes
+    in ``SkipAttr`` are not included.
+
+    Args:
+        obj: Class, dictionary, list or tuple instance
+        SkipAttr (list(str)): Attributes to skip
+        ClassesToSave (tuple): Nested classes to include
+
+    Returns:
+        dict or list: Snapshot of the numerical content. ``None`` if there is nothing to save.
+    """
+    if isinstance(obj, (list, tuple, dict, ndarray) + BasicNumTypes):
+        return _time_series_values(obj, SkipAttr, ClassesToSave)
+    return _time_series_values(obj.__dict__, SkipAttr, ClassesToSave)
+
+
+def _time_series_values(obj, SkipAttr, ClassesToSave):
+    if isinstance(obj, (list, tuple)):
+        items = [_time_series_values(value, SkipAttr, ClassesToSave) for value in obj]
+        if all([item is None for item in items]):
+            return None
+        return items
+
+    if isinstance(obj, dict):
+        dictname = obj
+    elif isinstance(obj, ndarray):
+        if obj.dtype.kind in 'biuf' and obj.size > 0:
+            return obj.copy()
+        return None
+    elif isinstance(obj, (bool,) + BasicNumTypes) and not isinstance(obj, complex):
+        return obj
+    elif isinstance(obj, (ct.c_bool, ct.c_double, ct.c_int)):
+        return obj.value
+    elif len(ClassesToSave) > 0 and isinstance(obj, ClassesToSave):
+        dictname = obj.__dict__
+    else:
+        return None
+
+    values = dict()
+    for attr, value in dictname.items():
+        if attr in SkipAttr:
+            continue
+        value = _time_series_values(value, SkipAttr, ClassesToSave)
+        if value is not None:
+            values[attr] = value
+    if len(values) == 0:
+        return None
+    return values
+
+
+class TimeSeriesWriter:
+    """
+    Appends time step data to chunked, extendable datasets of an open HDF5 group.
+
+    Each call to :meth:`append` adds a row to the datasets. A dictionary of values such as the one given by
+    :func:`time_series_values` is stored as a group, lists as groups of ``%05d`` numbered items (read as lists by
+    :func:`read_group`) and arrays or scalars of shape ``s`` as datasets of shape ``(n_rows,) + s``. Values missing
+    in some of the rows, for instance those appearing for the first time after some rows have been written, are
+    padded with ``NaN`` (or zero for integer types).
+
+    The rows are buffered in memory and written one chunk at a time. The buffered rows are written to the file
+    by :meth:`flush` and :meth:`close`.
+
+    If ``background`` is ``True`` the writing takes place in a separate thread and :meth:`append` only queues the
+    values. Therefore, the values must not be modified after being appended, which is guaranteed if they have been
+    obtained with :func:`time_series_values`.
+
+    Args:
+        grp (h5py.Group): Parent group of the time series
+        compression (str (optional)): HDF5 compression filter of the datasets, ie ``gzip`` or ``lzf``
+        compress_float (bool): Save the 64-bit float arrays in single precision
+        chunk_rows (int): Maximum number of rows per chunk. It is reduced for large arrays such that each chunk
+          remains around ``chunk_bytes``.
+        chunk_bytes (int): Target size of the chunks in bytes
+        background (bool): Write in a background thread
+    """
+    def __init__(self, grp, compression=None, compress_float=False, chunk_rows=64, chunk_bytes=2**20,
+                 background=False):
+        self.grp = grp
+        self.compression = compression if compression else None
+        self.compress_float = compress_float
+        self.chunk_rows = chunk_rows
+        self.chunk_bytes = chunk_bytes
+        self.n_rows = 0
+
+        # dataset path: [dataset, list of buffered (row, value)]
+        self._series = dict()
+        self._groups = set()
+        self._rows_written = 0
+
+        self._queue = None
+        self._thread = None
+        self._exception = None
+        if background:
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+
+    def append(self, values):
+        """
+        Appends a row of values.
+
+        Args:
+            values (dict): Dictionary of group paths, relative to ``grp``, to their values.
+        """
+        self._raise_background_exception()
+        row = self.n_rows
+        self.n_rows += 1
+        if self._queue is None:
+            self._write_row(row, values)
+        else:
+            self._queue.put((row, values))
+
+    def flush(self):
+        """
+        Writes the buffered rows and flushes the file.
+        """
+        if self._queue is None:
+            self._write_buffers()
+        else:
+            self._queue.put('flush')
+            self._queue.join()
+        self._raise_background_exception()
+        self.grp.file.flush()
+
+    def close(self):
+        """
+        Writes the buffered rows and stops the background thread. The file itself is not closed.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._queue = None
+        else:
+            self._write_buffers()
+        self._raise_background_exception()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if self._exception is not None:
+                    pass
+                elif item is None:
+                    self._write_buffers()
+                elif item == 'flush':
+                    self._write_buffers()
+                else:
+                    self._write_row(*item)
+            except Exception as e:
+                self._exception = e
+            finally:
+                self._queue.task_done()
+            if item is None:
+                return
+
+    def _raise_background_exception(self):
+        if self._exception is not None:
+            exception = self._exception
+            self._exception = None
+            raise exception
+
+    def _write_row(self, row, values):
+        for path, value in values.items():
+            self._buffer_value(row, path, value)
+        self._rows_written = row + 1
+
+    def _buffer_value(self, row, path, value):
+        if isinstance(value, dict):
+            self._require_group(path, 'dict')
+            for k, v in value.items():
+                self._buffer_value(row, path + '/' + k, v)
+            return
+        if isinstance(value, list):
+            self._require_group(path, 'list')
+            for i_item, v in enumerate(value):
+                if v is not None:
+                    self._buffer_value(row, path + '/' + '%.5d' % i_item, v)
+            return
+
+        value = np.asarray(value)
+        try:
+            series = self._series[path]
+        except KeyError:
+            series = [self._create_dataset(path, value), []]
+            self._series[path] = series
+        dataset, buffer = series
+        if dataset.shape[1:] != value.shape:
+            raise ValueError('Time series %s has shape %s and cannot be appended data of shape %s' %
+                             (dataset.name, dataset.shape[1:], value.shape))
+        buffer.append((row, value))
+        if len(buffer) >= dataset.chunks[0]:
+            self._write_buffer(dataset, buffer)
+
+    def _write_buffers(self):
+        for dataset, buffer in self._series.values():
+            self._write_buffer(dataset, buffer)
+            # datasets missing in the latest rows are padded too
+            if dataset.shape[0] < self._rows_written:
+                dataset.resize(self._rows_written, axis=0)
+
+    @staticmethod
+    def _write_buffer(dataset, buffer):
+        if len(buffer) == 0:
+            return
+        first_row = buffer[0][0]
+        n_rows = buffer[-1][0] - first_row + 1
+        block = np.full((n_rows,) + dataset.shape[1:], dataset.fillvalue, dtype=dataset.dtype)
+        for row, value in buffer:
+            block[row - first_row] = value
+        if dataset.shape[0] < first_row + n_rows:
+            dataset.resize(first_row + n_rows, axis=0)
+        dataset[first_row:first_row + n_rows] = block
+        buffer.clear()
+
+    def _require_group(self, path, read_as):
+        if path in self._groups:
+            return
+        if path not in self.grp:
+            sub_grp = self.grp.create_group(path)
+            sub_grp['_read_as'] = read_as
+        self._groups.add(path)
+
+    def _create_dataset(self, path, value):
+        dtype = value.dtype
+        if dtype == np.bool_:
+            dtype = np.dtype(np.int8)
+        if self.compress_float and dtype == float64:
+            dtype = np.dtype(float32)
+        if dtype.kind == 'f':
+            fillvalue = np.nan
+        else:
+            fillvalue = 0
+
+        row_bytes = max(value.size * dtype.itemsize, 1)
+        chunk_rows = int(max(1, min(self.chunk_rows, self.chunk_bytes // row_bytes)))
+
+        return self.grp.create_dataset(path,
+                                       shape=(0,) + value.shape,
+                                       maxshape=(None,) + value.shape,
+                                       chunks=(chunk_rows,) + value.shape,
+                                       dtype=dtype,
+                                       fillvalue=fillvalue,
+                                       compression=self.compression)
@@ -13,7 +13,7 @@ import ctypes as ct
 import traceback
 
 
-def split_multibody(beam, tstep, mb_data_dict, ts):
+def split_multibody(beam, tstep, mb_data_dict, ts, views=None):
     """
     split_multibody
 
@@ -24,11 +24,15 @@ def split_multibody(beam, tstep, mb_data_dict, ts):
     	tstep (:class:`~sharpy.utils.datastructures.StructTimeStepInfo`): timestep information of the multibody system
         mb_data_dict (dict): Dictionary including the multibody information
         ts (int): time step number
+        views (MultibodyViews): Persistent bodies of ``beam``. If provided, the information is gathered into them
+            instead of generating new bodies
 
     Returns:
         MB_beam (list(:class:`~sharpy.structure.models.beam.Beam`)): each entry represents a body
         MB_tstep (list(:class:`~sharpy.utils.datastructures.StructTimeStepInfo`)): each entry represents a body
     """
+    if views is not None:
+        return views.split(beam, tstep, mb_data_dict, ts)
 
     MB_beam = []
     MB_tstep = []
@@ -60,7 +64,7 @@ def split_multibody(beam, tstep, mb_data_dict, ts):
 
     return MB_beam, MB_tstep
 
-def merge_multibody(MB_tstep, MB_beam, beam, tstep, mb_data_dict, dt):
+def merge_multibody(MB_tstep, MB_beam, beam, tstep, mb_data_dict, dt, views=None):
     """
     merge_multibody
 
@@ -75,11 +79,15 @@ def merge_multibody(MB_tstep, MB_beam, beam, tstep, mb_data_dict, dt):
     	tstep (:class:`~sharpy.utils.datastructures.StructTimeStepInfo`): timestep information of the multibody system
         mb_data_dict (dict): Dictionary including the multibody information
         dt(int): time step
+        views (MultibodyViews): Persistent bodies of ``beam``. If provided, the information is scattered into
+            ``tstep`` without intermediate copies
 
     Returns:
         beam (:class:`~sharpy.structure.models.beam.Beam`): structural information of the multibody system
     	tstep (:class:`~sharpy.utils.datastructures.StructTimeStepInfo`): timestep information of the multibody system
     """
+    if views is not None:
+        return views.merge(MB_tstep, MB_beam, beam, tstep, mb_data_dict, dt)
 
     update_mb_dB_before_merge(tstep, MB_tstep)
 
@@ -148,12 +156,187 @@ def update_mb_dB_before_merge(tstep, MB_tstep):
 
     for ibody in range(len(MB_tstep)):
 
-        tstep.mb_FoR_pos[ibody,:] = MB_tstep[ibody].for_pos.astype(dtype=ct.c_double, order='F', copy=True)
-        tstep.mb_FoR_vel[ibody,:] = MB_tstep[ibody].for_vel.astype(dtype=ct.c_double, order='F', copy=True)
-        tstep.mb_FoR_acc[ibody,:] = MB_tstep[ibody].for_acc.astype(dtype=ct.c_double, order='F', copy=True)
-        tstep.mb_quat[ibody,:] =  MB_tstep[ibody].quat.astype(dtype=ct.c_double, order='F', copy=True)
-        assert (MB_tstep[ibody].mb_dquatdt[ibody, :] == MB_tstep[ibody].dqddt[-4:]).all(), "Error in multibody storage"
-        tstep.mb_dquatdt[ibody, :] = MB_tstep[ibody].dqddt[-4:].astype(dtype=ct.c_double, order='F', copy=True)
+        tstep.mb_FoR_pos[ibody,:] = MB_tstep[ibody].for_pos
+        tstep.mb_FoR_vel[ibody,:] = MB_tstep[ibody].for_vel
+        tstep.mb_FoR_acc[ibody,:] = MB_tstep[ibody].for_acc
+        tstep.mb_quat[ibody,:] =  MB_tstep[ibody].quat
+        assert np.array_equal(MB_tstep[ibody].mb_dquatdt[ibody, :], MB_tstep[ibody].dqddt[-4:]), "Error in multibody storage"
+        tstep.mb_dquatdt[ibody, :] = MB_tstep[ibody].dqddt[-4:]
+
+
+class MultibodyViews(object):
+    """
+    Persistent bodies of a multibody structure
+
+    The :class:`~sharpy.structure.models.beam.Beam` and :class:`~sharpy.utils.datastructures.StructTimeStepInfo` of
+    each body are generated once, together with the indices of their elements, nodes and degrees of freedom in the
+    multibody structure. Then, :meth:`split` and :meth:`merge` gather and scatter the information of a time step
+    into and from the preallocated arrays of the bodies, instead of generating new bodies at every call.
+
+    The results are the same as those of :func:`split_multibody` and :func:`merge_multibody`, but the bodies returned
+    by :meth:`split` are overwritten by the following call.
+
+    Args:
+        beam (:class:`~sharpy.structure.models.beam.Beam`): structural information of the multibody system
+    """
+    def __init__(self, beam):
+        self.num_bodies = beam.num_bodies
+
+        self.MB_beam = []
+        self.MB_tstep = []
+        self.elems = []
+        self.nodes = []
+        self.num_dof = []
+        # first dof of each body in the multibody state (merge) and in ``StructTimeStepInfo.get_body`` (split)
+        self.first_dof = []
+        self.get_body_first_dof = []
+
+        first_dof = 0
+        for ibody in range(self.num_bodies):
+            ibody_beam = beam.get_body(ibody=ibody)
+            self.MB_beam.append(ibody_beam)
+            self.MB_tstep.append(beam.timestep_info[-1].get_body(beam, ibody_beam.num_dof, ibody=ibody))
+
+            self.elems.append(ibody_beam.global_elems_num)
+            self.nodes.append(ibody_beam.global_nodes_num)
+            self.num_dof.append(ibody_beam.num_dof.value)
+
+            self.first_dof.append(first_dof)
+            first_dof += ibody_beam.num_dof.value
+
+            get_body_first_dof = 0
+            for index_body in range(ibody - 1):
+                get_body_first_dof += np.sum(beam.vdof[get_elems_nodes_list(beam, index_body)[1]] > -1)*6
+            self.get_body_first_dof.append(get_body_first_dof)
+
+    def gather_tstep(self, ibody, tstep, out):
+        """
+        Gathers the information of the body ``ibody`` from ``tstep`` into ``out``, as
+        :meth:`~sharpy.utils.datastructures.StructTimeStepInfo.get_body` does.
+
+        Args:
+            ibody (int): body number
+            tstep (:class:`~sharpy.utils.datastructures.StructTimeStepInfo`): timestep information of the
+                multibody system
+            out (:class:`~sharpy.utils.datastructures.StructTimeStepInfo`): timestep information of the body
+        """
+        elems = self.elems[ibody]
+        nodes = self.nodes[ibody]
+        num_dof = self.num_dof[ibody]
+        first_dof = self.get_body_first_dof[ibody]
+
+        out.in_global_AFoR = True
+        out.quat = tstep.mb_quat[ibody, :].astype(dtype=ct.c_double, order='F', copy=True)
+        out.for_pos = tstep.mb_FoR_pos[ibody, :].astype(dtype=ct.c_double, order='F', copy=True)
+        out.for_vel = tstep.mb_FoR_vel[ibody, :]
+        out.for_acc = tstep.mb_FoR_acc[ibody, :]
+
+        for attr in ('pos', 'pos_dot', 'pos_ddot', 'steady_applied_forces', 'unsteady_applied_forces',
+                     'runtime_steady_forces', 'runtime_unsteady_forces', 'gravity_forces'):
+            np.take(getattr(tstep, attr), nodes, axis=0, out=getattr(out, attr), mode='clip')
+        for attr in ('psi', 'psi_local', 'psi_dot', 'psi_dot_local', 'psi_ddot'):
+            np.take(getattr(tstep, attr), elems, axis=0, out=getattr(out, attr), mode='clip')
+        out.total_gravity_forces[:] = tstep.total_gravity_forces
+        out.total_forces.fill(0.)
+
+        out.q[:num_dof] = tstep.q[first_dof:first_dof + num_dof]
+        out.q[num_dof:] = 0.
+        out.dqdt[:num_dof] = tstep.dqdt[first_dof:first_dof + num_dof]
+        out.dqddt[:num_dof] = tstep.dqddt[first_dof:first_dof + num_dof]
+        out.dqdt[-10:-4] = out.for_vel
+        out.dqddt[-10:-4] = out.for_acc
+        out.dqdt[-4:] = tstep.quat
+        out.dqddt[-4:] = tstep.mb_dquatdt[ibody, :]
+        out.mb_dquatdt.fill(0.)
+        out.mb_dquatdt[ibody, :] = tstep.mb_dquatdt[ibody, :]
+
+        out.forces_constraints_nodes.fill(0.)
+        out.forces_constraints_FoR.fill(0.)
+        out.postproc_cell.clear()
+        out.postproc_node.clear()
+        out.mb_dict = None
+
+    def split(self, beam, tstep, mb_data_dict, ts):
+        """
+        Splits the multibody structure at the time step ``tstep`` into the persistent bodies. See
+        :func:`split_multibody`.
+        """
+        quat0 = tstep.quat
+        for0_pos = tstep.for_pos
+        for0_vel = tstep.for_vel
+
+        ini_quat0 = beam.ini_info.quat
+        ini_for0_pos = beam.ini_info.for_pos
+        ini_for0_vel = beam.ini_info.for_vel
+
+        for ibody in range(self.num_bodies):
+            ibody_beam = self.MB_beam[ibody]
+            ibody_tstep = self.MB_tstep[ibody]
+            self.gather_tstep(ibody, beam.ini_info, ibody_beam.ini_info)
+            self.gather_tstep(ibody, beam.timestep_info[-1], ibody_beam.timestep_info)
+            self.gather_tstep(ibody, tstep, ibody_tstep)
+
+            ibody_beam.FoR_movement = mb_data_dict['body_%02d' % ibody]['FoR_movement']
+
+            ibody_beam.ini_info.compute_psi_local_AFoR(ini_for0_pos, ini_for0_vel, ini_quat0)
+            ibody_beam.ini_info.change_to_local_AFoR(ini_for0_pos, ini_for0_vel, ini_quat0)
+            if ts == 1:
+                ibody_tstep.compute_psi_local_AFoR(for0_pos, for0_vel, quat0)
+            ibody_tstep.change_to_local_AFoR(for0_pos, for0_vel, quat0)
+
+        return self.MB_beam, self.MB_tstep
+
+    def merge(self, MB_tstep, MB_beam, beam, tstep, mb_data_dict, dt):
+        """
+        Merges the bodies into the multibody structure at the time step ``tstep``. See :func:`merge_multibody`.
+        """
+        update_mb_dB_before_merge(tstep, MB_tstep)
+
+        # The body 0 is not modified before being referenced to the global A FoR
+        quat0 = MB_tstep[0].quat
+        for0_pos = MB_tstep[0].for_pos
+        for0_vel = MB_tstep[0].for_vel
+
+        for ibody in range(self.num_bodies):
+            MB_tstep[ibody].change_to_global_AFoR(for0_pos, for0_vel, quat0)
+
+        for ibody in range(self.num_bodies):
+            elems = self.elems[ibody]
+            nodes = self.nodes[ibody]
+
+            tstep.pos[nodes, :] = MB_tstep[ibody].pos
+            tstep.pos_dot[nodes, :] = MB_tstep[ibody].pos_dot
+            tstep.pos_ddot[nodes, :] = MB_tstep[ibody].pos_ddot
+            tstep.psi[elems, :, :] = MB_tstep[ibody].psi
+            tstep.psi_local[elems, :, :] = MB_tstep[ibody].psi_local
+            tstep.psi_dot[elems, :, :] = MB_tstep[ibody].psi_dot
+            tstep.psi_dot_local[elems, :, :] = MB_tstep[ibody].psi_dot_local
+            tstep.psi_ddot[elems, :, :] = MB_tstep[ibody].psi_ddot
+            tstep.gravity_forces[nodes, :] = MB_tstep[ibody].gravity_forces
+            tstep.steady_applied_forces[nodes, :] = MB_tstep[ibody].steady_applied_forces
+            tstep.unsteady_applied_forces[nodes, :] = MB_tstep[ibody].unsteady_applied_forces
+            tstep.runtime_steady_forces[nodes, :] = MB_tstep[ibody].runtime_steady_forces
+            tstep.runtime_unsteady_forces[nodes, :] = MB_tstep[ibody].runtime_unsteady_forces
+            tstep.forces_constraints_nodes[nodes, :] = MB_tstep[ibody].forces_constraints_nodes
+            tstep.forces_constraints_FoR[ibody, :] = MB_tstep[ibody].forces_constraints_FoR[ibody, :]
+
+            first_dof = self.first_dof[ibody]
+            num_dof = self.num_dof[ibody]
+            tstep.q[first_dof:first_dof + num_dof] = MB_tstep[ibody].q[:-10]
+            tstep.dqdt[first_dof:first_dof + num_dof] = MB_tstep[ibody].dqdt[:-10]
+            tstep.dqddt[first_dof:first_dof + num_dof] = MB_tstep[ibody].dqddt[:-10]
+
+            tstep.mb_dquatdt[ibody, :] = MB_tstep[ibody].dqddt[-4:]
+
+        tstep.q[-10:] = MB_tstep[0].q[-10:]
+        tstep.dqdt[-10:] = MB_tstep[0].dqdt[-10:]
+        tstep.dqddt[-10:] = MB_tstep[0].dqddt[-10:]
+
+        # new arrays, as in merge_multibody, since the previous ones may still be referenced
+        tstep.for_pos = MB_tstep[0].for_pos.astype(dtype=ct.c_double, order='F', copy=True)
+        tstep.for_vel = MB_tstep[0].for_vel.astype(dtype=ct.c_double, order='F', copy=True)
+        tstep.for_acc = MB_tstep[0].for_acc.astype(dtype=ct.c_double, order='F', copy=True)
+        tstep.quat = MB_tstep[0].quat.astype(dtype=ct.c_double, order='F', copy=True)
 
 
 def disp_and_accel2state(MB_beam, MB_tstep, Lambda, Lambda_dot, sys_size, num_LM_eq):
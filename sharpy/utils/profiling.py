@@ -0,0 +1,322 @@
+"""Pipeline profiler
+
+Opt-in timers and counters of the SHARPy ``flow``, enabled with the ``profiler`` setting of
+:class:`~sharpy.presharpy.presharpy.PreSharpy`.
+
+The classes registered through :mod:`~sharpy.utils.solver_interface`, :mod:`~sharpy.utils.generator_interface` and
+:mod:`~sharpy.utils.controller_interface` are timed automatically (``<id>.initialise`` and ``<id>.run``,
+``<id>.generate`` or ``<id>.control``). The solvers can add timers for their own stages with :func:`timer`, count
+events with :func:`count` and delimit their time steps with :func:`begin_step` and :func:`end_step`.
+
+Timers are nested, such that each timing is identified by its path (the names of the timers that contain it
+separated by ``;``). At the end of the run, :func:`finish` writes to the ``profiling`` folder in the output
+directory:
+
+    * ``<case>.profile_steps.csv`` and/or ``<case>.profile_steps.h5``: time spent at each time step in the timers
+      started within it, relative to the timer that contains the time loop, and the counters.
+
+    * ``<case>.profile.folded``: self time of every path in microseconds in the folded stacks format used by flame
+      graph tools.
+
+    * ``<case>.profile.txt``: summary tree of the total and self times, number of calls and fraction of the run time
+      of every path, which is also printed on screen.
+
+When the profiler is not enabled, timers and counters do nothing.
+"""
+import functools
+import os
+import time
+
+import numpy as np
+
+import sharpy.utils.cout_utils as cout
+
+
+class Profiler(object):
+    """
+    Collects the timings and counters of the simulation.
+
+    Attributes:
+        enabled (bool): Timers and counters are only recorded when ``True``
+        times (dict): Total time of each path (``tuple`` of timer names)
+        calls (dict): Number of calls of each path
+        counters (dict): Value of each counter
+        steps (list): ``(ts, dict)`` timings and counters of each time step
+    """
+    def __init__(self):
+        self.enabled = False
+        self.output_folder = None
+        self.case_name = None
+        self.step_formats = []
+        self.reset()
+
+    def reset(self):
+        self.stack = []
+        self.times = dict()
+        self.calls = dict()
+        self.counters = dict()
+        self.steps = []
+        self.start_time = None
+
+        self._step_stack = None
+        self._step_start = None
+        self._step_times = None
+        self._step_counters = None
+
+    def start(self, output_folder, case_name, step_formats=('csv',)):
+        """
+        Resets and enables the profiler.
+
+        Args:
+            output_folder (str): Folder where the results are written
+            case_name (str): Case name, used as prefix of the output files
+            step_formats (list): Formats of the time step table (``csv`` and/or ``h5``)
+        """
+        self.reset()
+        self.output_folder = output_folder
+        self.case_name = case_name
+        self.step_formats = list(step_formats)
+        self.enabled = True
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        """
+        Disables the profiler without writing the results.
+        """
+        self.enabled = False
+
+    def timer(self, name):
+        """
+        Returns a context manager that times its block as ``name`` within the current path.
+        """
+        if not self.enabled:
+            return _null_timer
+        return _Timer(self, name)
+
+    def count(self, name, value=1):
+        """
+        Adds ``value`` to the counter ``name``.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def begin_step(self):
+        """
+        Marks the beginning of a time step. Its timings are relative to the current path.
+        """
+        if not self.enabled:
+            return
+        self._step_stack = tuple(self.stack)
+        self._step_start = time.perf_counter()
+        self._step_times = self.times.copy()
+        self._step_counters = self.counters.copy()
+
+    def end_step(self, ts):
+        """
+        Stores the timings and counters of the time step ``ts`` started with :meth:`begin_step`.
+        """
+        if not self.enabled or self._step_start is None:
+            return
+        step = {'step_time': time.perf_counter() - self._step_start}
+        n_stack = len(self._step_stack)
+        for path, value in self.times.items():
+            if path[:n_stack] != self._step_stack or len(path) == n_stack:
+                continue
+            delta = value - self._step_times.get(path, 0.)
+            if delta:
+                step[';'.join(path[n_stack:])] = delta
+        for name, value in self.counters.items():
+            delta = value - self._step_counters.get(name, 0)
+            if delta:
+                step[name] = delta
+        self.steps.append((ts, step))
+        self._step_start = None
+
+    def self_times(self):
+        """
+        Returns the time spent in each path excluding the time of the timers nested in it.
+        """
+        self_times = self.times.copy()
+        for path, value in self.times.items():
+            if len(path) > 1:
+                self_times[path[:-1]] = self_times.get(path[:-1], 0.) - value
+        return self_times
+
+    def step_table(self):
+        """
+        Returns the time step table.
+
+        Returns:
+            tuple: list of column names and ``np.ndarray`` with a row per time step. The first column is the time
+            step number.
+        """
+        names = set()
+        for ts, step in self.steps:
+            names.update(step.keys())
+        names.discard('step_time')
+        columns = ['ts', 'step_time'] + sorted(names)
+        table = np.zeros((len(self.steps), len(columns)))
+        for i_step, (ts, step) in enumerate(self.steps):
+            table[i_step, 0] = ts
+            for i_col in range(1, len(columns)):
+                table[i_step, i_col] = step.get(columns[i_col], 0.)
+        return columns, table
+
+    def report(self):
+        """
+        Returns the flame-style summary tree of the timings and the values of the counters as a string.
+        """
+        total_time = time.perf_counter() - self.start_time
+        self_times = self.self_times()
+        bar_length = 10
+
+        children = dict()
+        for path in self.times:
+            children.setdefault(path[:-1], []).append(path)
+
+        lines = ['Profile of %s - run time %f s' % (self.case_name, total_time),
+                 '%9s %9s %7s %6s %-*s %s' % ('total [s]', 'self [s]', 'calls', '%', bar_length + 2, '', 'name')]
+
+        def add_lines(parent):
+            for path in sorted(children.get(parent, []), key=lambda p: -self.times[p]):
+                fraction = self.times[path]/total_time if total_time else 0.
+                n_bar = int(round(min(fraction, 1.)*bar_length))
+                lines.append('%9.3f %9.3f %7d %5.1f%% |%s| %s%s' % (self.times[path],
+                                                                    self_times[path],
+                                                                    self.calls[path],
+                                                                    100*fraction,
+                                                                    ('#'*n_bar).ljust(bar_length),
+                                                                    '  '*(len(path) - 1),
+                                                                    path[-1]))
+                add_lines(path)
+
+        add_lines(())
+
+        if self.counters:
+            lines.append('')
+            lines.append('%9s %s' % ('count', 'counter'))
+            for name, value in self.counters.items():
+                lines.append('%9d %s' % (value, name))
+
+        return '\n'.join(lines)
+
+    def finish(self):
+        """
+        Writes the results, prints the summary report and disables the profiler.
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        if not os.path.isdir(self.output_folder):
+            os.makedirs(self.output_folder)
+        route = self.output_folder + '/' + self.case_name
+
+        report = self.report()
+        with open(route + '.profile.txt', 'w') as outfile:
+            outfile.write(report + '\n')
+        cout.cout_wrap(report, 1)
+
+        with open(route + '.profile.folded', 'w') as outfile:
+            for path, value in self.self_times().items():
+                outfile.write('%s %d\n' % (';'.join(path), max(int(round(value*1e6)), 0)))
+
+        if self.steps:
+            columns, table = self.step_table()
+            if 'csv' in self.step_formats:
+                np.savetxt(route + '.profile_steps.csv', table, delimiter=',', header=','.join(columns),
+                           comments='')
+            if 'h5' in self.step_formats:
+                import h5py
+                with h5py.File(route + '.profile_steps.h5', 'w') as h5file:
+                    for i_col, name in enumerate(columns):
+                        h5file.create_dataset(name, data=table[:, i_col])
+
+        cout.cout_wrap('Profiling results written to %s' % self.output_folder, 1)
+
+
+class _Timer(object):
+    __slots__ = ('profiler', 'name', 'path', 'start_time')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.stack.append(self.name)
+        self.path = tuple(self.profiler.stack)
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start_time
+        self.profiler.stack.pop()
+        self.profiler.times[self.path] = self.profiler.times.get(self.path, 0.) + elapsed
+        self.profiler.calls[self.path] = self.profiler.calls.get(self.path, 0) + 1
+        return False
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_null_timer = _NullTimer()
+profiler = Profiler()
+
+
+def timer(name):
+    """
+    Context manager that times its block as ``name`` when the profiler is enabled.
+
+    Examples:
+
+        >>> with profiling.timer('aero_solve'):
+        >>>     self.data = self.aero_solver.run()
+    """
+    return profiler.timer(name)
+
+
+def count(name, value=1):
+    """
+    Adds ``value`` to the counter ``name`` when the profiler is enabled.
+    """
+    profiler.count(name, value)
+
+
+def begin_step():
+    profiler.begin_step()
+
+
+def end_step(ts):
+    profiler.end_step(ts)
+
+
+def register(cls, class_id, method_names):
+    """
+    Times the methods ``method_names`` of ``cls`` as ``<class_id>.<method_name>`` when the profiler is enabled.
+
+    Used by the decorators of the solver, generator and controller interfaces. Methods inherited from another
+    registered class are timed with the ``class_id`` of ``cls``.
+    """
+    for method_name in method_names:
+        method = getattr(cls, method_name, None)
+        if method is None or isinstance(cls.__dict__.get(method_name), (staticmethod, classmethod)):
+            continue
+        method = getattr(method, '__wrapped__', method) if getattr(method, '_profiled', False) else method
+        setattr(cls, method_name, _timed_method(method, '%s.%s' % (class_id, method_name)))
+    return cls
+
+
+def _timed_method(method, name):
+    @functools.wraps(method)
+    def timed_method(*args, **kwargs):
+        if not profiler.enabled:
+            return method(*args, **kwargs)
+        with _Timer(profiler, name):
+            return method(*args, **kwargs)
+
+    timed_method._profiled = True
+    return timed_method
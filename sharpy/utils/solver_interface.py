@@ -1,5 +1,6 @@
 from abc import ABCMeta, abstractmethod
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 import os
 import sharpy.utils.settings as settings
 import inspect
@@ -19,6 +20,7 @@ def solver(arg):
     except AttributeError:
         raise AttributeError('Class defined as solver has no solver_id attribute')
     dict_of_solvers[arg.solver_id] = arg
+    profiling.register(arg, arg.solver_id, ['initialise', 'run'])
 
     # a = arg()
     # settings.SettingsTable().print(a)
@@ -0,0 +1,117 @@
+import h5py as h5
+import numpy as np
+import shutil
+import tempfile
+import unittest
+
+import sharpy.aero.models.aerogrid as aerogrid
+import sharpy.generators.dynamiccontrolsurface  # registers the control surface generator
+import sharpy.structure.models.beam as beam
+import sharpy.utils.algebra as algebra
+import sharpy.utils.generate_cases as gc
+import sharpy.utils.h5utils as h5utils
+
+
+class TestGenerateZeta(unittest.TestCase):
+    """
+    Compares the bound lattice generated with the strip tables with the one generated strip by strip with
+    :func:`~sharpy.aero.models.aerogrid.generate_strip`
+    """
+
+    m = 6
+    dt = 0.05
+
+    def setUp(self):
+        np.random.seed(5)
+        self.route = tempfile.mkdtemp()
+
+        # straight wing along y with a surface at each side of the root node
+        num_node = 9
+        wing = gc.StructuralInformation()
+        node_pos = np.zeros((num_node, 3))
+        node_pos[:, 1] = np.linspace(-2., 2., num_node)
+        wing.generate_uniform_sym_beam(node_pos, 1., 1e-2, 1e6, 1e6, 1e4, 1e4, num_node_elem=3,
+                                       y_BFoR='x_AFoR', num_lumped_mass=0)
+        wing.boundary_conditions[4] = 1
+        wing.boundary_conditions[0] = -1
+        wing.boundary_conditions[-1] = -1
+        wing.generate_fem_file(self.route, 'wing')
+        with h5.File(self.route + '/wing.fem.h5', 'r') as fem_file_handle:
+            fem_dict = h5utils.load_h5_in_dict(fem_file_handle)
+
+        self.structure = beam.Beam()
+        self.structure.generate(fem_dict, {'orientation': np.array([1., 0., 0., 0.]),
+                                           'for_pos': np.zeros((3,)),
+                                           'unsteady': False})
+
+        num_elem = wing.num_elem
+        airfoil = np.zeros((20, 2))
+        airfoil[:, 0] = np.linspace(0., 1., 20)
+        airfoil[:, 1] = 0.1*airfoil[:, 0]*(1. - airfoil[:, 0])
+        control_surface = -np.ones((num_elem, 3), dtype=int)
+        control_surface[0, :] = 0
+        control_surface[1, :] = 1
+        control_surface[3, :] = 2
+        aero_dict = {'aero_node': np.ones((num_node,), dtype=bool),
+                     'chord': np.random.rand(num_elem, 3) + 0.5,
+                     'twist': 0.1*np.random.rand(num_elem, 3),
+                     'sweep': 0.3*np.random.rand(num_elem, 3),
+                     'first_twist': np.array([True, False]),
+                     'surface_m': np.array([self.m, self.m]),
+                     'surface_distribution': np.array([0, 0, 1, 1]),
+                     'm_distribution': b'uniform',
+                     'elastic_axis': 0.25 + 0.1*np.random.rand(num_elem, 3),
+                     'airfoil_distribution': np.zeros((num_elem, 3), dtype=int),
+                     'airfoils': {'0': airfoil},
+                     'control_surface': control_surface,
+                     # static, dynamic and fully articulated with a hinge
+                     'control_surface_type': np.array([0, 1, 0]),
+                     'control_surface_deflection': np.array([0.1, 0., -0.2]),
+                     'control_surface_chord': np.array([2, 3, self.m]),
+                     'control_surface_hinge_coords': np.array([0., 0., 0.3])}
+
+        deflection_file = self.route + '/deflection.txt'
+        np.savetxt(deflection_file, 0.2*np.random.rand(5))
+        aero_settings = {'mstar': 2,
+                         'freestream_dir': np.array([1., 0., 0.]),
+                         'aligned_grid': True,
+                         'control_surface_deflection': ['', 'DynamicControlSurface', ''],
+                         'control_surface_deflection_generator_settings': {'1': {'dt': self.dt,
+                                                                                 'deflection_file': deflection_file}}}
+
+        self.aero = aerogrid.Aerogrid()
+        self.aero.generate(aero_dict, self.structure, aero_settings, 0)
+
+        # deformed structure with a rotated FoR
+        self.tstep = self.structure.timestep_info[-1].copy()
+        self.tstep.pos += 0.1*np.random.rand(*self.tstep.pos.shape)
+        self.tstep.psi += 0.1*np.random.rand(*self.tstep.psi.shape)
+        self.tstep.pos_dot[:] = np.random.rand(*self.tstep.pos_dot.shape)
+        self.tstep.psi_dot[:] = np.random.rand(*self.tstep.psi_dot.shape)
+        self.tstep.quat[:] = algebra.euler2quat(np.array([0.1, 0.05, -0.2]))
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def test_strip_tables(self):
+        for it in range(3):
+            with self.subTest(it=it):
+                aero_tstep = self.aero.timestep_info[0].copy()
+                self.aero.generate_zeta_timestep_info(self.tstep, aero_tstep, self.structure,
+                                                      self.aero.aero_settings, it=it, dt=self.dt)
+
+                legacy_tstep = self.aero.timestep_info[0].copy()
+                self.aero.generate_zeta_timestep_info_strips(self.tstep, legacy_tstep, self.structure,
+                                                             self.aero.aero_settings, it=it, dt=self.dt)
+
+                for i_surf in range(self.aero.n_surf):
+                    np.testing.assert_allclose(aero_tstep.zeta[i_surf], legacy_tstep.zeta[i_surf],
+                                               rtol=1e-12, atol=1e-12)
+                    np.testing.assert_allclose(aero_tstep.zeta_dot[i_surf], legacy_tstep.zeta_dot[i_surf],
+                                               rtol=1e-12, atol=1e-12)
+                # the deflection rate is included
+                self.assertTrue(np.any(legacy_tstep.zeta_dot[0] != 0.))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import numpy as np
+import unittest
+
+import sharpy.aero.utils.mapping as mapping
+import sharpy.utils.algebra as algebra
+
+
+def loop_force_mapping(aero_forces, struct2aero_mapping, zeta, pos_def, psi_def, conn, cag):
+    """
+    Element, node and panel loop of the original ``aero2struct_force_mapping``
+    """
+    n_node, _ = pos_def.shape
+    n_elem, _, _ = psi_def.shape
+    struct_forces = np.zeros((n_node, 6))
+
+    nodes = []
+    for i_elem in range(n_elem):
+        for i_local_node in range(3):
+            i_global_node = conn[i_elem, i_local_node]
+            if i_global_node in nodes:
+                continue
+
+            nodes.append(i_global_node)
+            for node_mapping in struct2aero_mapping[i_global_node]:
+                i_surf = node_mapping['i_surf']
+                i_n = node_mapping['i_n']
+                _, n_m, _ = aero_forces[i_surf].shape
+
+                crv = psi_def[i_elem, i_local_node, :]
+                cab = algebra.crv2rotation(crv)
+                cbg = np.dot(cab.T, cag)
+
+                for i_m in range(n_m):
+                    chi_g = zeta[i_surf][:, i_m, i_n] - np.dot(cag.T, pos_def[i_global_node, :])
+                    struct_forces[i_global_node, 0:3] += np.dot(cbg, aero_forces[i_surf][0:3, i_m, i_n])
+                    struct_forces[i_global_node, 3:6] += np.dot(cbg, aero_forces[i_surf][3:6, i_m, i_n])
+                    struct_forces[i_global_node, 3:6] += np.dot(cbg, algebra.cross3(chi_g,
+                                                                                    aero_forces[i_surf][0:3, i_m, i_n]))
+
+    return struct_forces
+
+
+class TestForceMapping(unittest.TestCase):
+    """
+    Compares the batched aerodynamic to structural force mapping with the original loop implementation
+    """
+
+    def setUp(self):
+        np.random.seed(5)
+        # two beams of two elements sharing the root node 0, plus a node without elements
+        self.conn = np.array([[0, 2, 1],
+                              [2, 4, 3],
+                              [0, 6, 5],
+                              [6, 8, 7]])
+        self.n_node = 10
+        self.pos_def = np.random.rand(self.n_node, 3)
+        self.psi_def = 0.3*(np.random.rand(self.conn.shape[0], 3, 3) - 0.5)
+        self.cag = algebra.crv2rotation(np.random.rand(3) - 0.5).T
+
+        # surface 0 on the first beam and surface 1 on the second, both of them at the root node, and a surface 2
+        # on the outer part of the first beam
+        self.struct2aero_mapping = [[] for _ in range(self.n_node)]
+        for i_surf, nodes in enumerate(([0, 1, 2, 3, 4], [0, 5, 6, 7, 8], [2, 3, 4])):
+            for i_n, i_node in enumerate(nodes):
+                self.struct2aero_mapping[i_node].append({'i_surf': i_surf, 'i_n': i_n})
+        # a node that is not in the connectivities is not loaded
+        self.struct2aero_mapping[9].append({'i_surf': 2, 'i_n': 0})
+
+        self.zeta = []
+        for n_m, n_n in ((4, 5), (3, 5), (2, 3)):
+            self.zeta.append(np.random.rand(3, n_m + 1, n_n))
+
+    def random_forces(self):
+        return [np.random.rand(6, *zeta.shape[1:]) - 0.5 for zeta in self.zeta]
+
+    def test_force_mapping(self):
+        mapping_index = mapping.ForceMappingIndex(self.struct2aero_mapping, self.conn, self.n_node)
+        for i_case in range(3):
+            aero_forces = self.random_forces()
+            reference = loop_force_mapping(aero_forces, self.struct2aero_mapping, self.zeta, self.pos_def,
+                                           self.psi_def, self.conn, self.cag)
+            self.assertTrue(np.all(reference[9, :] == 0.))
+
+            for index in (None, mapping_index):
+                with self.subTest(case=i_case, mapping_index=index is not None):
+                    struct_forces = mapping.aero2struct_force_mapping(aero_forces, self.struct2aero_mapping,
+                                                                      self.zeta, self.pos_def, self.psi_def, None,
+                                                                      self.conn, cag=self.cag,
+                                                                      mapping_index=index)
+                    np.testing.assert_allclose(struct_forces, reference, rtol=1e-12, atol=1e-13)
+
+    def test_multiple(self):
+        aero_forces_list = [self.random_forces() for _ in range(3)]
+        struct_forces_list = mapping.aero2struct_force_mapping_multiple(aero_forces_list, self.struct2aero_mapping,
+                                                                        self.zeta, self.pos_def, self.psi_def,
+                                                                        self.conn, cag=self.cag)
+        self.assertEqual(len(struct_forces_list), 3)
+        for aero_forces, struct_forces in zip(aero_forces_list, struct_forces_list):
+            np.testing.assert_allclose(struct_forces,
+                                       loop_force_mapping(aero_forces, self.struct2aero_mapping, self.zeta,
+                                                          self.pos_def, self.psi_def, self.conn, self.cag),
+                                       rtol=1e-12, atol=1e-13)
+
+    def test_mapping_index(self):
+        mapping_index = mapping.ForceMappingIndex(self.struct2aero_mapping, self.conn, self.n_node)
+        # rotations from the first element in which each node appears
+        np.testing.assert_array_equal(mapping_index.node_elem, [0, 0, 0, 1, 1, 2, 2, 3, 3, -1])
+        np.testing.assert_array_equal(mapping_index.node_local, [0, 2, 1, 2, 1, 2, 1, 2, 1, 0])
+        np.testing.assert_array_equal(mapping_index.surf_span_index[2], [0, 1, 2])
+        np.testing.assert_array_equal(mapping_index.surf_node_index[2], [2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
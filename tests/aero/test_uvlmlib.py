@@ -0,0 +1,218 @@
+import numpy as np
+import types
+import unittest
+import unittest.mock as mock
+
+import sharpy.utils.algebra as algebra
+import sharpy.utils.ctypes_utils as ct_utils
+
+try:
+    import sharpy.aero.utils.uvlmlib as uvlmlib
+except OSError:
+    # the calls to the library are mocked, it does not need to be compiled for these tests
+    with mock.patch.object(ct_utils, 'import_ctypes_lib'):
+        import sharpy.aero.utils.uvlmlib as uvlmlib
+
+
+def pointer_array(pointer, n=6):
+    return np.ctypeslib.as_array(pointer, shape=(n,)).copy()
+
+
+class TestUvlmSession(unittest.TestCase):
+    """
+    Checks the options, flight conditions and rigid body velocity passed to the UVLM library by a session
+    reused in successive time steps
+    """
+
+    def setUp(self):
+        np.random.seed(7)
+        self.options = {'dt': 0.1,
+                        'num_cores': 2,
+                        'convection_scheme': 3,
+                        'iterative_solver': False,
+                        'iterative_tol': 1e-4,
+                        'iterative_precond': True,
+                        'cfl1': False,
+                        'vortex_radius': 1e-5,
+                        'vortex_radius_wake_ind': 1e-4,
+                        'interp_coords': 1,
+                        'filter_method': 2,
+                        'interp_method': 3,
+                        'yaw_slerp': 0.2,
+                        'quasi_steady': True,
+                        'rho': 1.225,
+                        'centre_rot': np.random.rand(3),
+                        'horseshoe': True,
+                        'rollup_dt': 0.05,
+                        'n_rollup': 3,
+                        'rollup_tolerance': 1e-3,
+                        'rollup_aic_refresh': 2,
+                        'rbm_vel_g': np.random.rand(6),
+                        'centre_rot_g': np.random.rand(3)}
+
+        self.uvlm_lib = mock.MagicMock()
+        self.calls = []
+        self.uvlm_lib.run_UVLM.side_effect = self.record_uvlm
+        self.uvlm_lib.calculate_unsteady_forces.side_effect = self.record_unsteady_forces
+        self.uvlm_lib.run_VLM.side_effect = self.record_vlm
+        patcher = mock.patch.object(uvlmlib, 'UvlmLib', self.uvlm_lib)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record_options(self, p_options, p_flightconditions, fields):
+        # the structures are modified in place by the session, the values are copied at the time of the call
+        options = p_options._obj
+        flightconditions = p_flightconditions._obj
+        call = {field: getattr(options, field) for field in fields}
+        call.update({'uinf': flightconditions.uinf,
+                     'uinf_direction': np.array(flightconditions.uinf_direction),
+                     'rho': flightconditions.rho,
+                     'options': options,
+                     'flightconditions': flightconditions})
+        self.calls.append(call)
+        return call
+
+    def record_uvlm(self, p_uvmopts, p_flightconditions, p_dimensions, p_dimensions_star, p_i_iter, *args):
+        call = self.record_options(p_uvmopts, p_flightconditions,
+                                   ('dt', 'NumCores', 'NumSurfaces', 'convection_scheme', 'iterative_tol',
+                                    'iterative_precond', 'convect_wake', 'cfl1', 'vortex_radius',
+                                    'vortex_radius_wake_ind', 'interp_coords', 'filter_method', 'interp_method',
+                                    'yaw_slerp', 'quasi_steady'))
+        call['i_iter'] = p_i_iter._obj.value
+        call['rbm_vel'] = pointer_array(args[5])
+        call['centre_rot'] = pointer_array(args[6], 3)
+
+    def record_unsteady_forces(self, p_uvmopts, p_flightconditions, *args):
+        call = self.record_options(p_uvmopts, p_flightconditions,
+                                   ('dt', 'NumCores', 'NumSurfaces', 'convect_wake', 'cfl1', 'interp_coords'))
+        call['rbm_vel'] = pointer_array(args[4])
+
+    def record_vlm(self, p_vmopts, p_flightconditions, *args):
+        call = self.record_options(p_vmopts, p_flightconditions,
+                                   ('Steady', 'horseshoe', 'dt', 'n_rollup', 'rollup_tolerance',
+                                    'rollup_aic_refresh', 'NumCores', 'NumSurfaces', 'iterative_precond', 'cfl1',
+                                    'vortex_radius'))
+        call['rbm_vel_g'] = pointer_array(args[9])
+        call['centre_rot_g'] = pointer_array(args[10], 3)
+
+    def time_step(self, n_surf=2):
+        u_ext = [np.random.rand(3, 4, 5) for i_surf in range(n_surf)]
+        ts_info = mock.MagicMock(n_surf=n_surf, u_ext=u_ext, dynamic_forces=[np.ones((6, 3, 4))]*n_surf)
+        struct_ts_info = types.SimpleNamespace(for_vel=np.random.rand(6),
+                                               quat=algebra.euler2quat(np.random.rand(3)))
+        struct_ts_info.cga = lambda: algebra.quat2rotation(struct_ts_info.quat)
+        return ts_info, struct_ts_info
+
+    def assert_flight_conditions(self, call, ts_info):
+        uinf = ts_info.u_ext[0][:, 0, 0]
+        self.assertAlmostEqual(call['uinf'], np.linalg.norm(uinf))
+        np.testing.assert_allclose(call['uinf_direction'], uinf/np.linalg.norm(uinf))
+        self.assertEqual(call['rho'], self.options['rho'])
+
+    def assert_rbm_vel(self, call, struct_ts_info):
+        cga = struct_ts_info.cga()
+        np.testing.assert_allclose(call['rbm_vel'], np.concatenate((cga.dot(struct_ts_info.for_vel[:3]),
+                                                                    cga.dot(struct_ts_info.for_vel[3:]))))
+
+    def test_uvlm_solver(self):
+        session = uvlmlib.UvlmSession(self.options)
+        time_steps = [self.time_step(2), self.time_step(3)]
+
+        uvlmlib.uvlm_solver(4, *time_steps[0], self.options, session=session)
+        uvlmlib.uvlm_solver(5, *time_steps[1], self.options, convect_wake=False, dt=0.05, session=session)
+        self.assertEqual(self.uvlm_lib.run_UVLM.call_count, 2)
+
+        for call, (ts_info, struct_ts_info), i_iter, dt, convect_wake, n_surf in zip(self.calls, time_steps,
+                                                                                       (4, 5), (0.1, 0.05),
+                                                                                       (True, False), (2, 3)):
+            with self.subTest(i_iter=i_iter):
+                # fields updated every time step
+                self.assertEqual(call['i_iter'], i_iter)
+                self.assertAlmostEqual(call['dt'], dt)
+                self.assertEqual(call['convect_wake'], convect_wake)
+                self.assertEqual(call['NumSurfaces'], n_surf)
+                self.assert_flight_conditions(call, ts_info)
+                self.assert_rbm_vel(call, struct_ts_info)
+
+                # fields set from the settings when the session is created
+                self.assertEqual(call['NumCores'], 2)
+                self.assertEqual(call['convection_scheme'], 3)
+                self.assertAlmostEqual(call['iterative_tol'], 1e-4)
+                self.assertTrue(call['iterative_precond'])
+                self.assertFalse(call['cfl1'])
+                self.assertAlmostEqual(call['vortex_radius'], 1e-5)
+                self.assertAlmostEqual(call['vortex_radius_wake_ind'], 1e-4)
+                self.assertEqual((call['interp_coords'], call['filter_method'], call['interp_method']), (1, 2, 3))
+                self.assertAlmostEqual(call['yaw_slerp'], 0.2)
+                self.assertTrue(call['quasi_steady'])
+                np.testing.assert_array_equal(call['centre_rot'], self.options['centre_rot'])
+
+                ts_info.generate_ctypes_pointers.assert_called_once_with()
+                ts_info.remove_ctypes_pointers.assert_called_once_with()
+
+        # the same structures are passed in every call
+        self.assertIs(self.calls[0]['options'], self.calls[1]['options'])
+        self.assertIs(self.calls[0]['flightconditions'], self.calls[1]['flightconditions'])
+
+    def test_update_settings(self):
+        session = uvlmlib.UvlmSession(self.options)
+        ts_info, struct_ts_info = self.time_step()
+        session.uvlm_solver(0, ts_info, struct_ts_info)
+
+        # modified settings are only read after update_settings
+        self.options['num_cores'] = 6
+        self.options['dt'] = 0.2
+        self.options['centre_rot'] = np.random.rand(3)
+        session.uvlm_solver(1, ts_info, struct_ts_info)
+        self.assertEqual(self.calls[-1]['NumCores'], 2)
+        # except the time step and the arrays, which are read in every call
+        self.assertAlmostEqual(self.calls[-1]['dt'], 0.2)
+        np.testing.assert_array_equal(self.calls[-1]['centre_rot'], self.options['centre_rot'])
+
+        session.update_settings()
+        session.uvlm_solver(2, ts_info, struct_ts_info)
+        self.assertEqual(self.calls[-1]['NumCores'], 6)
+
+    def test_unsteady_forces(self):
+        session = uvlmlib.UvlmSession(self.options)
+        for dt in (None, 0.02):
+            ts_info, struct_ts_info = self.time_step()
+            uvlmlib.uvlm_calculate_unsteady_forces(ts_info, struct_ts_info, self.options, convect_wake=False,
+                                                   dt=dt, session=session)
+            call = self.calls[-1]
+            self.assertAlmostEqual(call['dt'], self.options['dt'] if dt is None else dt)
+            self.assertEqual(call['NumCores'], 2)
+            self.assertEqual(call['NumSurfaces'], 2)
+            self.assertFalse(call['convect_wake'])
+            # the rest of fields keep the default values
+            self.assertTrue(call['cfl1'])
+            self.assertEqual(call['interp_coords'], uvlmlib.UVMopts().interp_coords)
+            self.assert_flight_conditions(call, ts_info)
+            self.assert_rbm_vel(call, struct_ts_info)
+            for dynamic_forces in ts_info.dynamic_forces:
+                np.testing.assert_array_equal(dynamic_forces, 0.)
+
+    def test_vlm_solver(self):
+        session = uvlmlib.UvlmSession(self.options, steady=True)
+        self.assertFalse(hasattr(session, 'run_UVLM'))
+        for n_surf in (2, 1):
+            ts_info, _ = self.time_step(n_surf)
+            uvlmlib.vlm_solver(ts_info, self.options, session=session)
+            call = self.calls[-1]
+            self.assertTrue(call['Steady'])
+            self.assertTrue(call['horseshoe'])
+            self.assertAlmostEqual(call['dt'], 0.05)
+            self.assertEqual((call['n_rollup'], call['rollup_aic_refresh']), (3, 2))
+            self.assertAlmostEqual(call['rollup_tolerance'], 1e-3)
+            self.assertEqual(call['NumCores'], 2)
+            self.assertEqual(call['NumSurfaces'], n_surf)
+            self.assertTrue(call['iterative_precond'])
+            self.assertFalse(call['cfl1'])
+            self.assert_flight_conditions(call, ts_info)
+            np.testing.assert_array_equal(call['rbm_vel_g'], self.options['rbm_vel_g'])
+            np.testing.assert_array_equal(call['centre_rot_g'], self.options['centre_rot_g'])
+        self.assertEqual(self.uvlm_lib.run_VLM.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
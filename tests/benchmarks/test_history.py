@@ -0,0 +1,239 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock as mock
+from contextlib import redirect_stdout
+
+import benchmarks
+import benchmarks.__main__ as benchmarks_main
+import benchmarks.benchmark_interface as benchmark_interface
+import benchmarks.history as history
+
+
+class CountBenchmark(benchmark_interface.BaseBenchmark):
+    benchmark_id = 'Count'
+    params = {'n': [1, 2, 3], 'method': ['a', 'b']}
+    repeat = 2
+
+    def setup(self, n, method):
+        self.n = n
+
+    def run(self):
+        return {'Count;loop': float(sum(range(self.n)))}
+
+
+class FailingBenchmark(benchmark_interface.BaseBenchmark):
+    benchmark_id = 'Failing'
+    params = {'n': [1]}
+
+    def run(self):
+        raise TypeError('only 0-dimensional arrays can be converted to Python scalars')
+
+
+class FailingSetupBenchmark(benchmark_interface.BaseBenchmark):
+    benchmark_id = 'FailingSetup'
+    params = {'n': [1]}
+    teardown_calls = 0
+
+    def setup(self, n):
+        raise FileNotFoundError('model.h5')
+
+    def run(self):
+        pass
+
+    def teardown(self):
+        FailingSetupBenchmark.teardown_calls += 1
+
+
+def record(time, node='node', commit='abc', params=None, **kwargs):
+    machine = {'node': node}
+    return history.new_record('Count', {'n': 1} if params is None else params, [time, 2*time], 1, commit=commit,
+                              dirty=False, machine=machine, **kwargs)
+
+
+class TestBenchmarkInterface(unittest.TestCase):
+    """
+    Tests the parameters of the benchmark cases
+    """
+
+    def test_param_combinations(self):
+        combinations = CountBenchmark.param_combinations()
+        self.assertEqual(len(combinations), 6)
+        self.assertEqual(combinations[0], {'method': 'a', 'n': 1})
+        self.assertEqual(combinations[1], {'method': 'a', 'n': 2})
+        self.assertEqual(combinations[-1], {'method': 'b', 'n': 3})
+        self.assertEqual(len(set(history.case_key({'benchmark': 'Count', 'params': params})
+                                 for params in combinations)), 6)
+
+        # first value of each parameter
+        self.assertEqual(CountBenchmark.param_combinations(quick=True), [{'method': 'a', 'n': 1}])
+        self.assertEqual(FailingBenchmark.param_combinations(quick=True), [{'n': 1}])
+        self.assertEqual(benchmark_interface.BaseBenchmark.param_combinations(), [{}])
+
+
+class TestHistory(unittest.TestCase):
+    """
+    Tests the selection of the reference records and the detection of regressions
+    """
+
+    def test_compare(self):
+        reference = record(1., profile={'a': 1., 'b': 2., 'c': 0.})
+        new = record(1.05, profile={'a': 1.5, 'b': 2., 'c': 1., 'd': 1.})
+
+        ratio, regression, profile_regressions = history.compare(new, reference, tolerance=0.1)
+        self.assertAlmostEqual(ratio, 1.05)
+        self.assertFalse(regression)
+        # stages without reference are not compared
+        self.assertEqual(profile_regressions, {'a': 1.5})
+
+        ratio, regression, _ = history.compare(new, reference, tolerance=0.01)
+        self.assertTrue(regression)
+
+        # the median of the times
+        ratio, regression, _ = history.compare(record(1.2), reference, tolerance=0.1, statistic='median')
+        self.assertAlmostEqual(ratio, 1.2)
+        self.assertTrue(regression)
+
+        ratio, regression, profile_regressions = history.compare(record(0.5), reference)
+        self.assertAlmostEqual(ratio, 0.5)
+        self.assertFalse(regression)
+        self.assertEqual(profile_regressions, dict())
+
+    def test_latest(self):
+        records = [record(1.), record(1.1, node='other'), record(1.2, params={'n': 2}), record(1.3),
+                   record(0., error='TypeError: failed'), record(1.4), record(2.)]
+        records[-1]['regression'] = True
+
+        key = history.case_key(records[0])
+        key_2 = history.case_key(records[2])
+
+        cases = history.latest(records, node='node')
+        self.assertEqual(set(cases.keys()), {key, key_2})
+        # failed cases and regressions are skipped
+        self.assertEqual([case_record['min'] for case_record in cases[key]], [1.4])
+        self.assertEqual([case_record['min'] for case_record in cases[key_2]], [1.2])
+
+        cases = history.latest(records, node='node', last=3)
+        self.assertEqual([case_record['min'] for case_record in cases[key]], [1., 1.3, 1.4])
+
+        cases = history.latest(records, last=10)
+        self.assertEqual([case_record['min'] for case_record in cases[key]], [1., 1.1, 1.3, 1.4])
+
+        self.assertEqual(history.latest(records, node='unknown'), dict())
+
+    def test_references(self):
+        records = [record(1.0, commit='base'), record(1.3, commit='c1'), record(0.9, commit='c2'),
+                   record(1.2, commit='c3'), record(1.1, commit='c4'), record(1.6, commit='c5')]
+        key = history.case_key(records[0])
+
+        # median of the last records
+        self.assertEqual(history.references(records, node='node', last=5)[key]['commit'], 'c3')
+        self.assertEqual(history.references(records, node='node', last=4)[key]['commit'], 'c4')
+        self.assertEqual(history.references(records, node='node', last=1)[key]['commit'], 'c5')
+
+        # regressions are not references unless accepted
+        records.append(record(3., commit='c6'))
+        records[-1]['regression'] = True
+        self.assertEqual(history.references(records, node='node', last=1)[key]['commit'], 'c5')
+
+        # pinned baseline
+        self.assertEqual(history.references(records, node='node', baseline='ba')[key]['commit'], 'base')
+        self.assertEqual(history.references(records, node='node', baseline='unknown'), dict())
+
+    def test_gradual_slowdown(self):
+        # the latest record is always within the tolerance, but not the median of the last ones
+        records = []
+        regressions = []
+        for i_run in range(8):
+            new = record(1.04**i_run)
+            reference = history.references(records, last=5).get(history.case_key(new))
+            if reference is not None and history.compare(new, reference, tolerance=0.1)[1]:
+                new['regression'] = True
+                regressions.append(i_run)
+            records.append(new)
+        self.assertEqual(regressions[0], 4)
+        self.assertEqual(regressions, list(range(4, 8)))
+
+
+class TestMain(unittest.TestCase):
+    """
+    Runs the benchmarks with the history in a temporary folder
+    """
+
+    def setUp(self):
+        self.route = tempfile.mkdtemp()
+        self.filename = os.path.join(self.route, 'history.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def main(self, benchmark_classes, *args):
+        with mock.patch.object(benchmarks, 'load_benchmarks'), \
+                mock.patch.object(benchmark_interface, 'benchmark_list', return_value=benchmark_classes), \
+                redirect_stdout(io.StringIO()) as output:
+            exit_code = benchmarks_main.main(['--history', self.filename, '--repeat', '1'] + list(args))
+        return exit_code, output.getvalue()
+
+    def test_failed_case(self):
+        exit_code, output = self.main([FailingBenchmark, CountBenchmark], '--quick')
+        self.assertEqual(exit_code, 1)
+        self.assertIn('FAILED TypeError', output)
+        self.assertIn('1 of 2 cases failed', output)
+
+        # the cases after the failure are run and the failure is recorded
+        records = history.load(self.filename)
+        self.assertEqual([case_record['benchmark'] for case_record in records], ['Failing', 'Count'])
+        self.assertIn('TypeError', records[0]['error'])
+        self.assertNotIn('min', records[0])
+        self.assertEqual(records[1]['profile'], {'Count;loop': 0.})
+        self.assertEqual(set(history.latest(records).keys()), {history.case_key(records[1])})
+
+    def test_failed_setup(self):
+        FailingSetupBenchmark.teardown_calls = 0
+        exit_code, output = self.main([FailingSetupBenchmark, CountBenchmark])
+        self.assertEqual(exit_code, 1)
+        self.assertIn('FAILED FileNotFoundError', output)
+        # the partial setup is cleaned up
+        self.assertEqual(FailingSetupBenchmark.teardown_calls, 1)
+        self.assertEqual(len(history.load(self.filename)), 7)
+
+    def test_regression(self):
+        # time of each run of the case
+        def run(time):
+            with mock.patch.object(benchmarks_main, 'run_case', return_value=([time], None)):
+                return self.main([CountBenchmark], '--quick', *args)
+
+        args = ()
+        for time in (1., 1.05, 0.95):
+            self.assertEqual(run(time)[0], 0)
+        self.assertFalse(any(case_record['regression'] for case_record in history.load(self.filename)))
+
+        # slower than the median of the previous runs
+        exit_code, output = run(1.12)
+        self.assertEqual(exit_code, 1)
+        self.assertIn('REGRESSION', output)
+        self.assertTrue(history.load(self.filename)[-1]['regression'])
+
+        # the regression is not the new reference
+        self.assertEqual(run(1.12)[0], 1)
+
+        # unless accepted
+        args = ('--accept',)
+        exit_code, output = run(1.12)
+        self.assertEqual(exit_code, 0)
+        self.assertIn('accepted', output)
+        self.assertFalse(history.load(self.filename)[-1]['regression'])
+        args = ('--last', '1')
+        self.assertEqual(run(1.12)[0], 0)
+
+        # pinned baseline
+        args = ('--baseline', 'unknown')
+        exit_code, output = run(2.)
+        self.assertEqual(exit_code, 0)
+        self.assertNotIn('%', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
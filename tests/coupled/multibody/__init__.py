@@ -1,3 +1,4 @@
 import tests.coupled.multibody.double_pendulum
 import tests.coupled.multibody.fix_node_velocity_wrtA
 import tests.coupled.multibody.fix_node_velocity_wrtG
+import tests.coupled.multibody.linear_solver
@@ -365,6 +365,37 @@ class TestDoublePendulum(unittest.TestCase):
         beam1.generate_h5_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
         gc.generate_multibody_file(LC, MB,SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
 
+        # Same case with the sparse linear solver
+        global name_sparse
+        name_sparse = 'dpg_sparse'
+        SimInfo.solvers['SHARPy']['case'] = name_sparse
+
+        SimInfo.solvers['NonLinearDynamicMultibody']['linear_solver'] = 'sparse_lu'
+
+        gc.clean_test_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+        SimInfo.generate_solver_file()
+        SimInfo.generate_dyn_file(numtimesteps)
+        beam1.generate_h5_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+        gc.generate_multibody_file(LC, MB,SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+
+        SimInfo.solvers['NonLinearDynamicMultibody']['linear_solver'] = 'dense'
+
+        # Same case reusing the iteration matrix
+        global name_modified_newton
+        name_modified_newton = 'dpg_modified_newton'
+        SimInfo.solvers['SHARPy']['case'] = name_modified_newton
+
+        SimInfo.solvers['NonLinearDynamicMultibody']['time_integrator_settings'] = {'newmark_damp': 0.15,
+                                                                                    'dt': dt,
+                                                                                    'jacobian_update': 'modified_newton',
+                                                                                    'jacobian_max_age': 4}
+
+        gc.clean_test_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+        SimInfo.generate_solver_file()
+        SimInfo.generate_dyn_file(numtimesteps)
+        beam1.generate_h5_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+        gc.generate_multibody_file(LC, MB,SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+
     def run_and_assert(self, name):
         import sharpy.sharpy_main
 
@@ -404,10 +435,101 @@ class TestDoublePendulum(unittest.TestCase):
         self.assertAlmostEqual(nb_pos_tip_data[-1, 2], ga_pos_tip_data[-1, 2], 4)
         self.assertAlmostEqual(nb_pos_tip_data[-1, 3], ga_pos_tip_data[-1, 3], 4)
 
+    def test_doublependulum_sparse(self):
+        import scipy.sparse
+        import sharpy.sharpy_main
+        import sharpy.utils.multibody as mb
+        import sharpy.utils.solver_interface as solver_interface
+
+        dense_solver_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + '/' + name_spherical + '.sharpy')
+        sharpy.sharpy_main.main(['', dense_solver_path])
+
+        sparse_solver_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + '/' + name_sparse + '.sharpy')
+        data = sharpy.sharpy_main.main(['', sparse_solver_path])
+
+        # read output and compare
+        dense_output_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__))) + '/output/' + name_spherical + '/WriteVariablesTime/'
+        dense_pos_tip_data = np.loadtxt(("%sstruct_pos_node%d.dat" % (dense_output_path, nnodes1*2-1)), )
+
+        sparse_output_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__))) + '/output/' + name_sparse + '/WriteVariablesTime/'
+        sparse_pos_tip_data = np.loadtxt(("%sstruct_pos_node%d.dat" % (sparse_output_path, nnodes1*2-1)), )
+
+        np.testing.assert_allclose(sparse_pos_tip_data, dense_pos_tip_data, rtol=1e-6, atol=1e-8)
+
+        # dense and sparse systems of equations of the last time step
+        settings = data.settings['DynamicCoupled']['structural_solver_settings'].copy()
+        settings['write_lm'] = False
+        solver = solver_interface.initialise_solver('NonLinearDynamicMultibody')
+        solver.initialise(data, settings)
+
+        tstep = data.structure.timestep_info[-1]
+        MBdict = tstep.mb_dict if tstep.mb_dict is not None else data.structure.ini_mb_dict
+        MB_beam, MB_tstep = mb.split_multibody(data.structure, tstep, MBdict, data.ts)
+        Lambda = np.random.rand(solver.num_LM_eq)
+        Lambda_dot = np.random.rand(solver.num_LM_eq)
+
+        systems = dict()
+        for linear_solver in ['dense', 'sparse_lu']:
+            solver.settings['linear_solver'] = linear_solver
+            systems[linear_solver] = solver.assembly_MB_eq_system(MB_beam, MB_tstep, data.ts, settings['dt'],
+                                                                  Lambda, Lambda_dot, MBdict)
+
+        for dense_matrix, sparse_matrix in zip(systems['dense'], systems['sparse_lu']):
+            if scipy.sparse.issparse(sparse_matrix):
+                sparse_matrix = sparse_matrix.toarray()
+            np.testing.assert_allclose(sparse_matrix, dense_matrix,
+                                       rtol=1e-10, atol=1e-12*np.max(np.abs(dense_matrix)))
+
+        dense_Asys, dense_Q = solver.time_integrator.build_matrix(*systems['dense'])
+        sparse_Asys, sparse_Q = solver.time_integrator.build_matrix(*systems['sparse_lu'])
+        dense_Dq = solver.factorise(dense_Asys)(-dense_Q)
+        sparse_Dq = solver.factorise(sparse_Asys)(-sparse_Q)
+        np.testing.assert_allclose(sparse_Dq, dense_Dq, rtol=1e-6, atol=1e-9*np.max(np.abs(dense_Dq)))
+
+    def test_doublependulum_modified_newton(self):
+        import unittest.mock as mock
+        import sharpy.sharpy_main
+        import sharpy.solvers.timeintegrators as timeintegrators
+        from sharpy.solvers.nonlineardynamicmultibody import NonLinearDynamicMultibody
+
+        newton_solver_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + '/' + name_spherical + '.sharpy')
+        sharpy.sharpy_main.main(['', newton_solver_path])
+
+        # record the decisions of the refresh policy and the factorisations
+        updates = []
+        update_jacobian = timeintegrators._BaseTimeIntegrator.update_jacobian
+
+        def record_update(integrator, reduction=None):
+            updates.append((integrator.jacobian_age, reduction, update_jacobian(integrator, reduction)))
+            return updates[-1][-1]
+
+        modified_newton_solver_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + '/' + name_modified_newton + '.sharpy')
+        with mock.patch.object(timeintegrators._BaseTimeIntegrator, 'update_jacobian', autospec=True,
+                               side_effect=record_update), \
+                mock.patch.object(NonLinearDynamicMultibody, 'factorise', autospec=True,
+                                  side_effect=NonLinearDynamicMultibody.factorise) as factorise:
+            sharpy.sharpy_main.main(['', modified_newton_solver_path])
+
+        # read output and compare
+        newton_output_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__))) + '/output/' + name_spherical + '/WriteVariablesTime/'
+        newton_pos_tip_data = np.loadtxt(("%sstruct_pos_node%d.dat" % (newton_output_path, nnodes1*2-1)), )
+
+        modified_newton_output_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__))) + '/output/' + name_modified_newton + '/WriteVariablesTime/'
+        modified_newton_pos_tip_data = np.loadtxt(("%sstruct_pos_node%d.dat" % (modified_newton_output_path, nnodes1*2-1)), )
+
+        np.testing.assert_allclose(modified_newton_pos_tip_data, newton_pos_tip_data, rtol=1e-5, atol=1e-6)
+
+        # the iteration matrix is only factorised when the policy refreshes it
+        refreshes = [update for update in updates if update[-1]]
+        self.assertEqual(factorise.call_count, len(refreshes))
+        self.assertLess(factorise.call_count, len(updates))
+        for age, reduction, refresh in updates:
+            self.assertEqual(refresh, age is None or age >= 4 or (reduction is not None and reduction > 0.5))
+
     def tearDown(self):
         solver_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
         solver_path += '/'
-        for name in [name_hinge, name_spherical, name_ga, name_nb_zero_dis]:
+        for name in [name_hinge, name_spherical, name_ga, name_nb_zero_dis, name_sparse, name_modified_newton]:
             files_to_delete = [name + '.aero.h5',
                                name + '.dyn.h5',
                                name + '.fem.h5',
@@ -3,6 +3,7 @@ import unittest
 import os
 import shutil
 from scipy import fft
+import control
 import sharpy.generators.floatingforces as ff
 
 
@@ -102,6 +103,97 @@ class TestFloatingForces(unittest.TestCase):
                 self.assertEqual(wt_matrix_num[idof, jdof], undo_sharpy_matrix[idof, jdof])
    
  
+    def test_response_freq_dep_matrix(self):
+        np.random.seed(7)
+        dt = 0.1
+        omega_H = np.linspace(0., 10., 50)
+        H = np.random.rand(50, 6, 6)
+        q = np.random.rand(301, 6)
+
+        # Direct computation in the frequency domain with the whole history
+        it = 300
+        n = it + 1
+        omega_fft = np.linspace(0, 1/(2*dt), n//2)
+        fourier_q = np.fft.fft(q, axis=0)
+        fourier_f = np.zeros_like(fourier_q)
+        for iomega in range(n//2):
+            H_omega = np.array([[np.interp(omega_fft[iomega], omega_H, H[:, i, j]) for j in range(6)] for i in range(6)])
+            fourier_f[iomega, :] = np.dot(H_omega, fourier_q[iomega, :])
+            if iomega > 0:
+                fourier_f[-iomega, :] = np.dot(H_omega, fourier_q[-iomega, :])
+        f_fft = np.real(np.fft.ifft(fourier_f, axis=0)[it, :])
+
+        f = ff.response_freq_dep_matrix(H, omega_H, q, it, dt)
+        np.testing.assert_allclose(f, f_fft, rtol=1e-10)
+
+        # Constant cost response with the impulse response computed once
+        h = ff.impulse_response_freq_dep_matrix(H, omega_H, n, dt)
+        np.testing.assert_allclose(ff.response_impulse_response(h, q, it), f_fft, rtol=1e-10)
+        np.testing.assert_allclose(ff.response_freq_dep_matrix(H, omega_H, q, it, dt, h=h), f_fft, rtol=1e-10)
+
+    def test_truncated_impulse_response(self):
+        np.random.seed(8)
+        dt = 0.1
+        omega_H = np.linspace(0., 10., 200)
+        # Smooth transfer function, whose impulse response decays in a few time steps
+        H = np.exp(-omega_H**2)[:, None, None]*(np.random.rand(6, 6) + np.eye(6))
+        n = 601
+        # The platform starts at rest
+        q = np.random.rand(n, 6)
+        q[:50, :] = 0.
+
+        h = ff.impulse_response_freq_dep_matrix(H, omega_H, n, dt)
+        h_trunc = ff.impulse_response_freq_dep_matrix(H, omega_H, n, dt, tol=1e-3)
+        self.assertLess(h_trunc.shape[0], 30)
+        np.testing.assert_array_equal(h_trunc, h[:h_trunc.shape[0], :, :])
+        np.testing.assert_array_equal(ff.impulse_response_freq_dep_matrix(H, omega_H, n, dt, kernel_length=20),
+                                      h[:20, :, :])
+
+        for it in (100, 350, n - 1):
+            f = ff.response_freq_dep_matrix(H, omega_H, q, it, dt, h=h)
+            np.testing.assert_allclose(ff.response_impulse_response(h_trunc, q, it), f, rtol=5e-3)
+        # The full history at the last time step
+        np.testing.assert_allclose(ff.response_impulse_response(h_trunc, q, n - 1),
+                                   ff.response_freq_dep_matrix(H, omega_H, q, n - 1, dt), rtol=5e-3)
+
+    def test_discretise_first_order_hold(self):
+        dt = 0.1
+        ntime_steps = 101
+        time = np.arange(ntime_steps)*dt
+
+        np.random.seed(4)
+        # Radiation damping as a SISO rational function and as a stable MIMO state space system
+        siso = control.tf2ss(control.TransferFunction([0.5, 2., 1.], [1., 3., 4., 2.]))
+        A = np.random.rand(4, 4) - 3.*np.eye(4)
+        mimo = control.StateSpace(A, np.random.rand(4, 2), np.random.rand(2, 4), np.random.rand(2, 2))
+
+        for system in (siso, mimo):
+            u = np.random.rand(ntime_steps, system.ninputs)
+            _, y_ref, x_ref = control.forced_response(system, T=time, U=u.T, X0=np.zeros(system.nstates),
+                                                      return_x=True)
+            y_ref = np.atleast_2d(y_ref)
+
+            Ad, Bd = ff.discretise_first_order_hold(system.A, system.B, dt)
+            self.assertEqual(Ad.shape, (system.nstates, system.nstates))
+            self.assertEqual(Bd.shape, (system.nstates, 2*system.ninputs))
+
+            # State update of FloatingForces.generate, from the initial x0 = None
+            x0 = None
+            for it in range(1, ntime_steps):
+                if x0 is None:
+                    x0 = np.zeros((Ad.shape[0]))
+                x = np.dot(Ad, x0) + np.dot(Bd, u[it - 1:it + 1, :].reshape(-1))
+                y = np.dot(system.C, x) + np.dot(system.D, u[it, :])
+                np.testing.assert_allclose(x, x_ref[:, it], rtol=1e-10, atol=1e-12)
+                np.testing.assert_allclose(y, y_ref[:, it], rtol=1e-10, atol=1e-12)
+
+                # Two sample simulation from the previous state
+                _, y_step, x_step = control.forced_response(system, T=[0, dt], U=u[it - 1:it + 1, :].T, X0=x0,
+                                                            return_x=True)
+                np.testing.assert_allclose(x, x_step[:, 1], rtol=1e-10, atol=1e-12)
+                np.testing.assert_allclose(y, np.atleast_2d(y_step)[:, 1], rtol=1e-10, atol=1e-12)
+                x0 = x
+
     def test_time_wave_forces(self):
         Tp = 14.656 #10.
         Hs = 5.49 #6.
@@ -0,0 +1,432 @@
+import ctypes as ct
+import h5py as h5
+import numpy as np
+import shutil
+import tempfile
+import unittest
+
+import sharpy.utils.algebra as ag
+import sharpy.utils.generate_cases as gc
+import sharpy.utils.h5utils as h5utils
+import sharpy.utils.multibody as mb
+import sharpy.structure.models.beam as beam
+import sharpy.structure.utils.lagrangeconstraints as lagrangeconstraints
+
+
+def random_quat():
+    quat = np.random.rand(4) - 0.5
+    return quat/np.linalg.norm(quat)
+
+
+# Frozen copy of the full width assembly of hinge_node_FoR.dynamicmat before the COO assembly, as a reference of the
+# legacy matrices
+def legacy_equal_lin_vel_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q, rel_posB = np.zeros((3))):
+    num_LM_eq_specific = 3
+    Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+
+    # Simplify notation
+    node_cga = MB_tstep[node_body].cga()
+    node_FoR_va = MB_tstep[node_body].for_vel[0:3]
+    node_FoR_wa = MB_tstep[node_body].for_vel[3:6]
+
+    ielem, inode_in_elem = MB_beam[node_body].node_master_elem[node_number]
+    psi = MB_tstep[node_body].psi[ielem, inode_in_elem, :]
+    node_cab = ag.crv2rotation(psi)
+    node_Ra = MB_tstep[node_body].pos[node_number,:] + np.dot(node_cab, rel_posB)
+
+    node_dot_Ra = MB_tstep[node_body].pos_dot[node_number,:]
+    FoR_cga = MB_tstep[FoR_body].cga()
+    FoR_va = MB_tstep[FoR_body].for_vel[0:3]
+
+    Bnh[:, FoR_dof:FoR_dof+3] = FoR_cga
+    Bnh[:, node_dof:node_dof+3] = -1.0*node_cga
+    if MB_beam[node_body].FoR_movement == 'free':
+        Bnh[:, node_FoR_dof:node_FoR_dof+3] = -1.0*node_cga
+        Bnh[:, node_FoR_dof+3:node_FoR_dof+6] = np.dot(node_cga,ag.skew(node_Ra))
+
+    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
+    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+
+    LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
+    LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*(np.dot(FoR_cga, FoR_va) +
+                                                          -1.0*np.dot(node_cga,
+                                                                      node_dot_Ra +
+                                                                      node_FoR_va +
+                                                                      -1.0*np.dot(ag.skew(node_Ra), node_FoR_wa)))
+
+    LM_C[FoR_dof:FoR_dof+3, FoR_dof+6:FoR_dof+10] += scalingFactor*ag.der_CquatT_by_v(MB_tstep[FoR_body].quat, Lambda_dot[ieq:ieq+num_LM_eq_specific])
+
+    if MB_beam[node_body].FoR_movement == 'free':
+        LM_C[node_dof:node_dof+3,node_FoR_dof+6:node_FoR_dof+10] -= scalingFactor*ag.der_CquatT_by_v(MB_tstep[node_body].quat, Lambda_dot[ieq:ieq+num_LM_eq_specific])
+
+        LM_C[node_FoR_dof:node_FoR_dof+3,node_FoR_dof+6:node_FoR_dof+10] -= scalingFactor*ag.der_CquatT_by_v(MB_tstep[node_body].quat,Lambda_dot[ieq:ieq+num_LM_eq_specific])
+
+        LM_C[node_FoR_dof+3:node_FoR_dof+6,node_FoR_dof+6:node_FoR_dof+10] += scalingFactor*np.dot(ag.skew(node_Ra).T,
+                                                                                     ag.der_CquatT_by_v(MB_tstep[node_body].quat,
+                                                                                                             Lambda_dot[ieq:ieq+num_LM_eq_specific]))
+
+        LM_K[node_FoR_dof+3:node_FoR_dof+6,node_dof:node_dof+3] += scalingFactor*ag.skew(np.dot(node_cga.T,Lambda_dot[ieq:ieq+num_LM_eq_specific]))
+
+    if penaltyFactor:
+        q = np.zeros((sys_size))
+        q[FoR_dof:FoR_dof+3] = FoR_va
+        q[node_dof:node_dof+3] = node_dot_Ra
+        if MB_beam[node_body].FoR_movement == 'free':
+            q[node_FoR_dof:node_FoR_dof+3] = node_FoR_va
+            q[node_FoR_dof+3:node_FoR_dof+6] = node_FoR_wa
+
+        LM_Q[:sys_size] += penaltyFactor*np.dot(np.dot(Bnh.T, Bnh), q)
+
+        LM_C[:sys_size, :sys_size] += penaltyFactor*np.dot(Bnh.T, Bnh)
+
+        # Derivatives wrt the FoR quaterion
+        LM_C[FoR_dof:FoR_dof+3, FoR_dof+6:FoR_dof+10] -= penaltyFactor*ag.der_CquatT_by_v(MB_tstep[FoR_body].quat,
+                                                                                                 np.dot(node_cga, node_dot_Ra + node_FoR_va +
+                                                                                                         np.dot(ag.skew(node_Ra), node_FoR_wa)))
+
+        LM_C[node_dof:node_dof+3, FoR_dof+6:FoR_dof+10] -= penaltyFactor*np.dot(node_cga.T, ag.der_CquatT_by_v(MB_tstep[FoR_body].quat,
+                                                                                                               FoR_va))
+
+        if MB_beam[node_body].FoR_movement == 'free':
+            LM_C[node_FoR_dof:node_FoR_dof+3, FoR_dof+6:FoR_dof+10] -= penaltyFactor*np.dot(node_cga.T, ag.der_CquatT_by_v(MB_tstep[FoR_body].quat,
+                                                                                                               FoR_va))
+
+            mat = ag.multiply_matrices(ag.skew(node_Ra).T, node_cga.T)
+            LM_C[node_FoR_dof+3:node_FoR_dof+6, FoR_dof+6:FoR_dof+10] += penaltyFactor*np.dot(mat, ag.der_CquatT_by_v(MB_tstep[FoR_body].quat,
+                                                                                                               FoR_va))
+
+        # Derivatives wrt the node quaternion
+        if MB_beam[node_body].FoR_movement == 'free':
+            vec = -node_dot_Ra - node_FoR_va + np.dot(ag.skew(node_Ra), node_FoR_wa)
+            LM_C[FoR_dof:FoR_dof+3, node_FoR_dof+6:node_FoR_dof+10] += penaltyFactor*np.dot(FoR_cga.T, ag.der_Cquat_by_v(MB_tstep[node_body].quat, vec))
+
+            derivative = -ag.der_CquatT_by_v(MB_tstep[node_body].quat, np.dot(FoR_cga, FoR_va))
+            LM_C[node_dof:node_dof+3, node_FoR_dof+6:node_FoR_dof+10] += penaltyFactor*derivative
+            LM_C[node_FoR_dof:node_FoR_dof+3, node_FoR_dof+6:node_FoR_dof+10] += penaltyFactor*derivative
+            LM_C[node_FoR_dof+3:node_FoR_dof+6, node_FoR_dof+6:node_FoR_dof+10] -= penaltyFactor*np.dot(ag.skew(node_Ra), derivative)
+
+        # Derivatives wrt the node Ra
+        LM_K[FoR_dof:FoR_dof+3, node_dof:node_dof+3] -= penaltyFactor*ag.multiply_matrices(FoR_cga.T, node_cga, ag.skew(node_FoR_wa))
+        LM_K[node_dof:node_dof+3, node_dof:node_dof+3] += penaltyFactor*ag.skew(node_FoR_wa)
+        if MB_beam[node_body].FoR_movement == 'free':
+            LM_K[node_FoR_dof:node_FoR_dof+3, node_dof:node_dof+3] += penaltyFactor*ag.skew(node_FoR_wa)
+            vec = ag.multiply_matrices(node_cga.T, FoR_cga, FoR_va) - node_dot_Ra - node_FoR_va
+            LM_K[node_FoR_dof+3:node_FoR_dof+6, node_dof:node_dof+3] += penaltyFactor*ag.skew(vec)
+            LM_K[node_FoR_dof+3:node_FoR_dof+6, node_dof:node_dof+3] -= penaltyFactor*ag.der_skewp_skewp_v(node_Ra, node_FoR_wa)
+
+    ieq += 3
+    return ieq
+
+
+def legacy_def_rot_axis_FoR_wrt_node_xyz(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, rot_axisB, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q, zero_comp):
+    ielem, inode_in_elem = MB_beam[node_body].node_master_elem[node_number]
+
+    num_LM_eq_specific = 2
+    Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+
+    # Simplify notation
+    cab = ag.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:])
+    node_cga = MB_tstep[node_body].cga()
+    FoR_cga = MB_tstep[FoR_body].cga()
+    FoR_wa = MB_tstep[FoR_body].for_vel[3:6]
+    psi = MB_tstep[node_body].psi[ielem,inode_in_elem,:]
+    psi_dot = MB_tstep[node_body].psi_dot[ielem,inode_in_elem,:]
+
+    # Components to be zero
+    Z = np.zeros((2,3))
+    Z[:, zero_comp] = np.eye(2)
+
+    Bnh[:, FoR_dof+3:FoR_dof+6] += ag.multiply_matrices(Z, cab.T, node_cga.T, FoR_cga)
+    Bnh[:, node_dof+3:node_dof+6] -= ag.multiply_matrices(Z, ag.crv2tan(psi))
+    Bnh[:, node_FoR_dof+3:node_FoR_dof+6] -= ag.multiply_matrices(Z, cab.T)
+
+    # Constrain angular velocities
+    LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq+num_LM_eq_specific])
+    LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*ag.multiply_matrices(Z, cab.T, node_cga.T, FoR_cga, FoR_wa)
+    LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] -= scalingFactor*ag.multiply_matrices(Z, ag.crv2tan(psi), psi_dot)
+    LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] -= scalingFactor*ag.multiply_matrices(Z, cab.T, MB_tstep[node_body].for_vel[3:6])
+
+    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
+    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+
+    vec = ag.multiply_matrices(node_cga, cab, Z.T, Lambda_dot[ieq:ieq+num_LM_eq_specific])
+    LM_C[FoR_dof+3:FoR_dof+6, FoR_dof+6:FoR_dof+10] += scalingFactor*ag.der_CquatT_by_v(MB_tstep[FoR_body].quat, vec)
+
+    if MB_beam[node_body].FoR_movement == 'free':
+        vec = ag.multiply_matrices(cab, Z.T, Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        LM_C[FoR_dof+3:FoR_dof+6, node_FoR_dof+6:node_FoR_dof+10] += scalingFactor*ag.multiply_matrices(FoR_cga.T, ag.der_Cquat_by_v(MB_tstep[node_body].quat, vec))
+
+    LM_K[FoR_dof+3:FoR_dof+6, node_dof+3:node_dof+6] += scalingFactor*ag.multiply_matrices(FoR_cga.T, node_cga, ag.der_Ccrv_by_v(MB_tstep[node_body].psi[ielem,inode_in_elem,:],
+                                                                                                                                  np.dot(Z.T, Lambda_dot[ieq:ieq+num_LM_eq_specific])))
+
+    LM_K[node_dof+3:node_dof+6, node_dof+3:node_dof+6] -= scalingFactor*ag.der_TanT_by_xv(psi, ag.multiply_matrices(Z.T, Lambda_dot[ieq:ieq+num_LM_eq_specific]))
+    LM_K[node_FoR_dof+3:node_FoR_dof+6, node_dof+3:node_dof+6] -= scalingFactor*ag.der_Ccrv_by_v(psi, ag.multiply_matrices(Z.T, Lambda_dot[ieq:ieq+num_LM_eq_specific]))
+
+    if penaltyFactor:
+        q = np.zeros((sys_size,))
+        q[FoR_dof+3:FoR_dof+6] = FoR_wa
+
+        LM_Q[:sys_size] += penaltyFactor*np.dot(Bnh.T, np.dot(Bnh, q))
+
+        LM_C[:sys_size, :sys_size] += penaltyFactor*np.dot(Bnh.T, Bnh)
+
+        ZTZ = np.dot(Z.T, Z)
+
+        # Derivatives with the quaternion of the FoR
+        vec = ag.multiply_matrices(node_cga,
+                                   cab,
+                                   ZTZ,
+                                   cab.T,
+                                   node_cga.T,
+                                   FoR_cga,
+                                   FoR_wa)
+        LM_C[FoR_dof+3:FoR_dof+6, FoR_dof+6:FoR_dof+10] += penaltyFactor*ag.der_CquatT_by_v(MB_tstep[FoR_body].quat, vec)
+
+        mat = ag.multiply_matrices(FoR_cga.T,
+                                   node_cga,
+                                   cab,
+                                   ZTZ,
+                                   cab.T,
+                                   node_cga.T)
+        LM_C[FoR_dof+3:FoR_dof+6, FoR_dof+6:FoR_dof+10] += penaltyFactor*np.dot(mat, ag.der_Cquat_by_v(MB_tstep[FoR_body].quat, FoR_wa))
+
+        if MB_beam[node_body].FoR_movement == 'free':
+            # Derivatives with the quaternion of the FoR of the node
+            vec = ag.multiply_matrices(cab,
+                                       ZTZ,
+                                       cab.T,
+                                       node_cga.T,
+                                       FoR_cga,
+                                       FoR_wa)
+            LM_C[FoR_dof+3:FoR_dof+6, node_FoR_dof+6:node_FoR_dof+10] += penaltyFactor*np.dot(FoR_cga.T,
+                                                                                          ag.der_Cquat_by_v(MB_tstep[node_body].quat, vec))
+
+            mat = ag.multiply_matrices(FoR_cga.T,
+                                       node_cga,
+                                       cab,
+                                       ZTZ,
+                                       cab.T)
+            vec = np.dot(FoR_cga, FoR_wa)
+            LM_C[FoR_dof+3:FoR_dof+6, node_FoR_dof+6:node_FoR_dof+10] += penaltyFactor*np.dot(mat, ag.der_CquatT_by_v(MB_tstep[node_body].quat, vec))
+
+        # Derivatives with the CRV
+        mat = np.dot(FoR_cga.T, node_cga)
+        vec = ag.multiply_matrices(ZTZ,
+                                   cab.T,
+                                   node_cga.T,
+                                   FoR_cga,
+                                   FoR_wa)
+        LM_K[FoR_dof+3:FoR_dof+6, node_dof+3:node_dof+6] += penaltyFactor*np.dot(mat, ag.der_Ccrv_by_v(MB_tstep[node_body].psi[ielem,inode_in_elem,:], vec))
+
+        mat = ag.multiply_matrices(FoR_cga.T,
+                                   node_cga,
+                                   cab,
+                                   ZTZ)
+        vec = ag.multiply_matrices(node_cga.T,
+                                   FoR_cga,
+                                   FoR_wa)
+        LM_K[FoR_dof+3:FoR_dof+6, node_dof+3:node_dof+6] += penaltyFactor*np.dot(mat, ag.der_CcrvT_by_v(MB_tstep[node_body].psi[ielem,inode_in_elem,:], vec))
+
+    ieq += 2
+    return ieq
+
+
+def legacy_hinge_node_FoR_dynamicmat(lc, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, sys_size, Lambda_dot):
+    node_dof = lagrangeconstraints.define_node_dof(MB_beam, lc.node_body, lc.node_number)
+    node_FoR_dof = lagrangeconstraints.define_FoR_dof(MB_beam, lc.node_body)
+    FoR_dof = lagrangeconstraints.define_FoR_dof(MB_beam, lc.FoR_body)
+    ieq = lc._ieq
+
+    ieq = legacy_equal_lin_vel_node_FoR(MB_tstep, MB_beam, lc.FoR_body, lc.node_body, lc.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, lc.scalingFactor, lc.penaltyFactor, ieq, LM_K, LM_C, LM_Q)
+    ieq = legacy_def_rot_axis_FoR_wrt_node_xyz(MB_tstep, MB_beam, lc.FoR_body, lc.node_body, lc.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, lc.rot_axisB, lc.scalingFactor, lc.penaltyFactor, ieq, LM_K, LM_C, LM_Q, lc.zero_comp)
+
+
+class TestLagrangeMatrix(unittest.TestCase):
+    """
+    Compares the sparse matrices of the Lagrange Multipliers equations assembled from COO triplets with the
+    contributions of the constraints added to dense matrices
+    """
+
+    body_movement = ('free', 'prescribed', 'free')
+
+    # constraints between a node and the FoR of another body
+    node_entries = {
+        'hinge_node_FoR': {'rot_axisB': np.array([0., 1., 0.])},
+        'hinge_node_FoR_constant_vel': {'rot_vect': np.array([0., 0., 2.]), 'rel_posB': np.array([0.1, 0., 0.])},
+        'hinge_node_FoR_pitch': {'rotor_vel': 1.5, 'pitch_vel': 0.2, 'rel_posB': np.array([0.1, 0., 0.])},
+        'spherical_node_FoR': {},
+        'fully_constrained_node_FoR': {'rel_posB': np.array([0.1, 0.2, 0.])},
+    }
+    FoR_entries = {
+        'free': {},
+        'spherical_FoR': {'body_FoR': 1},
+        'hinge_FoR': {'body_FoR': 2, 'rot_axis_AFoR': np.array([0., 0., 1.])},
+        'hinge_FoR_wrtG': {'body_FoR': 2, 'rot_axis_AFoR': np.array([0., 0., 1.])},
+        'constant_rot_vel_FoR': {'FoR_body': 2, 'rot_vel': np.array([0.1, 0.2, 0.3])},
+        'constant_vel_FoR': {'FoR_body': 2, 'vel': np.arange(6.)},
+        'zero_lin_vel_sine_rot_vel_FoR': {'FoR_body': 2, 'vel_amp': 0.5, 'omega': 2., 'xyz': 'y'},
+        'lin_vel_node_wrtA': {'velocity': np.array([0.1, 0.2, 0.3]), 'body_number': 2, 'node_number': 3},
+        'lin_vel_node_wrtG': {'velocity': np.array([0.1, 0.2, 0.3]), 'body_number': 2, 'node_number': 3},
+    }
+
+    def setUp(self):
+        np.random.seed(13)
+        self.route = tempfile.mkdtemp()
+
+        bodies = []
+        for ibody, num_node in enumerate((5, 7, 9)):
+            body = gc.StructuralInformation()
+            node_pos = np.zeros((num_node, 3))
+            node_pos[:, 0] = np.linspace(0., 1., num_node) + ibody
+            body.generate_uniform_sym_beam(node_pos, 1., 1e-2, 1e6, 1e6, 1e4, 1e4, num_node_elem=3,
+                                           y_BFoR='y_AFoR', num_lumped_mass=0)
+            body.body_number = np.zeros((body.num_elem,), dtype=int)
+            body.boundary_conditions[0] = 1
+            body.boundary_conditions[-1] = -1
+            bodies.append(body)
+        bodies[0].assembly_structures(*bodies[1:])
+        bodies[0].generate_fem_file(self.route, 'multibody')
+        with h5.File(self.route + '/multibody.fem.h5', 'r') as fem_file_handle:
+            fem_dict = h5utils.load_h5_in_dict(fem_file_handle)
+
+        mb_dict = {'num_bodies': len(self.body_movement), 'num_constraints': 0}
+        for ibody, movement in enumerate(self.body_movement):
+            mb_dict['body_%02d' % ibody] = {'FoR_movement': movement,
+                                            'FoR_position': np.random.rand(6),
+                                            'FoR_velocity': np.random.rand(6),
+                                            'FoR_acceleration': np.random.rand(6),
+                                            'quat': random_quat()}
+
+        structure = beam.Beam()
+        structure.ini_mb_dict = mb_dict
+        structure.generate(fem_dict, {'orientation': np.array([1., 0., 0., 0.]),
+                                      'for_pos': np.zeros((3,)),
+                                      'unsteady': False})
+        tstep = structure.timestep_info[-1].copy()
+        for attr in ('pos', 'pos_dot', 'psi', 'psi_dot', 'for_vel', 'mb_FoR_pos', 'mb_FoR_vel'):
+            getattr(tstep, attr)[:] = np.random.rand(*getattr(tstep, attr).shape)
+        for ibody in range(structure.num_bodies):
+            tstep.mb_quat[ibody, :] = random_quat()
+        self.MB_beam, self.MB_tstep = mb.split_multibody(structure, tstep, mb_dict, 3)
+        self.sys_size = sum([body.num_dof.value + (10 if body.FoR_movement == 'free' else 0)
+                             for body in self.MB_beam])
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def constraints(self, exclude=()):
+        """
+        Each constraint alone and all of them together, with the "node" in a free and in a prescribed body
+        """
+        entries = []
+        for node_body in (0, 1):
+            for lc_id, entry in self.node_entries.items():
+                entries.append(dict(entry, behaviour=lc_id, node_in_body=3, body=node_body, body_FoR=2))
+        for lc_id, entry in self.FoR_entries.items():
+            entries.append(dict(entry, behaviour=lc_id))
+        entries = [entry for entry in entries if entry['behaviour'] not in exclude]
+
+        cases = [(entry['behaviour'] + '_%d' % entry.get('body', 2), [entry]) for entry in entries]
+        cases.append(('all', entries))
+        for name, case_entries in cases:
+            lc_list = []
+            ieq = 0
+            for entry in case_entries:
+                lc_list.append(lagrangeconstraints.lc_from_string(entry['behaviour'])())
+                ieq = lc_list[-1].initialise(entry, ieq, print_info=False)
+            yield name, lc_list
+
+    def generate(self, lc_list, dynamic_or_static, output_format, Lambda=None, Lambda_dot=None):
+        num_LM_eq = lagrangeconstraints.define_num_LM_eq(lc_list)
+        if Lambda is None:
+            Lambda = np.random.rand(num_LM_eq)
+            Lambda_dot = np.random.rand(num_LM_eq)
+        return lagrangeconstraints.generate_lagrange_matrix(lc_list, self.MB_beam, self.MB_tstep, 3, num_LM_eq,
+                                                            self.sys_size, 0.1, Lambda, Lambda_dot,
+                                                            dynamic_or_static, output_format=output_format)
+
+    def test_sparse_dense(self):
+        # the static equations of lin_vel_node_wrtG add the 6 components of for_pos to 3 equations
+        for dynamic_or_static, exclude in (('dynamic', ()), ('static', ('lin_vel_node_wrtG',))):
+            for name, lc_list in self.constraints(exclude):
+                with self.subTest(constraint=name, dynamic_or_static=dynamic_or_static):
+                    num_LM_eq = lagrangeconstraints.define_num_LM_eq(lc_list)
+                    size = self.sys_size + num_LM_eq
+                    Lambda = np.random.rand(num_LM_eq)
+                    Lambda_dot = np.random.rand(num_LM_eq)
+
+                    # contributions added to dense matrices
+                    LM_C = np.zeros((size, size), order='F')
+                    LM_K = np.zeros((size, size), order='F')
+                    LM_Q = np.zeros((size,))
+                    for lc in lc_list:
+                        getattr(lc, dynamic_or_static + 'mat')(LM_C=LM_C, LM_K=LM_K, LM_Q=LM_Q,
+                                                               MB_beam=self.MB_beam, MB_tstep=self.MB_tstep,
+                                                               ts=3, num_LM_eq=num_LM_eq, sys_size=self.sys_size,
+                                                               dt=0.1, Lambda=Lambda, Lambda_dot=Lambda_dot)
+
+                    sparse_C, sparse_K, sparse_Q = self.generate(lc_list, dynamic_or_static, 'sparse',
+                                                                 Lambda, Lambda_dot)
+                    dense_C, dense_K, dense_Q = self.generate(lc_list, dynamic_or_static, 'dense',
+                                                              Lambda, Lambda_dot)
+
+                    np.testing.assert_allclose(sparse_C.toarray(), LM_C, rtol=1e-12, atol=1e-14)
+                    np.testing.assert_allclose(sparse_K.toarray(), LM_K, rtol=1e-12, atol=1e-14)
+                    np.testing.assert_allclose(dense_C, sparse_C.toarray(), rtol=1e-14, atol=1e-14)
+                    np.testing.assert_allclose(dense_K, sparse_K.toarray(), rtol=1e-14, atol=1e-14)
+                    np.testing.assert_allclose(sparse_Q, LM_Q, rtol=1e-12, atol=1e-14)
+                    np.testing.assert_array_equal(dense_Q, sparse_Q)
+
+    def test_legacy_hinge_node_FoR(self):
+        # the new assembly against the frozen copy of the legacy one
+        for node_body in (0, 1):
+            for penaltyFactor in (0., 0.5):
+                with self.subTest(node_body=node_body, penaltyFactor=penaltyFactor):
+                    entry = dict(self.node_entries['hinge_node_FoR'], behaviour='hinge_node_FoR', node_in_body=3,
+                                 body=node_body, body_FoR=2, scalingFactor=2., penaltyFactor=penaltyFactor)
+                    lc_list = [lagrangeconstraints.lc_from_string('hinge_node_FoR')()]
+                    num_LM_eq = lc_list[0].initialise(entry, 0, print_info=False)
+                    size = self.sys_size + num_LM_eq
+                    Lambda = np.random.rand(num_LM_eq)
+                    Lambda_dot = np.random.rand(num_LM_eq)
+
+                    LM_C = np.zeros((size, size), order='F')
+                    LM_K = np.zeros((size, size), order='F')
+                    LM_Q = np.zeros((size,))
+                    legacy_hinge_node_FoR_dynamicmat(lc_list[0], LM_C, LM_K, LM_Q, self.MB_beam, self.MB_tstep,
+                                                     self.sys_size, Lambda_dot)
+
+                    for output_format in ('sparse', 'dense'):
+                        matrix_C, matrix_K, matrix_Q = self.generate(lc_list, 'dynamic', output_format,
+                                                                     Lambda, Lambda_dot)
+                        if output_format == 'sparse':
+                            matrix_C = matrix_C.toarray()
+                            matrix_K = matrix_K.toarray()
+                        np.testing.assert_allclose(matrix_C, LM_C, rtol=1e-12, atol=1e-14)
+                        np.testing.assert_allclose(matrix_K, LM_K, rtol=1e-12, atol=1e-14)
+                        np.testing.assert_allclose(matrix_Q, LM_Q, rtol=1e-12, atol=1e-14)
+
+    def test_pattern(self):
+        for name, lc_list in self.constraints():
+            with self.subTest(constraint=name):
+                num_LM_eq = lagrangeconstraints.define_num_LM_eq(lc_list)
+                zero_C, zero_K, _ = self.generate(lc_list, 'dynamic', 'sparse',
+                                                  np.zeros(num_LM_eq), np.zeros(num_LM_eq))
+                LM_C, LM_K, _ = self.generate(lc_list, 'dynamic', 'sparse')
+
+                # the same sparsity pattern with zero and nonzero multipliers
+                for zero_matrix, matrix in ((zero_C, LM_C), (zero_K, LM_K)):
+                    np.testing.assert_array_equal(zero_matrix.indptr, matrix.indptr)
+                    np.testing.assert_array_equal(zero_matrix.indices, matrix.indices)
+
+                # only the blocks of the constraints are stored
+                self.assertLess(LM_C.nnz, 0.2*LM_C.shape[0]**2)
+
+    def test_output_format(self):
+        lc_list = dict(self.constraints())['spherical_FoR_2']
+        with self.assertRaises(ValueError):
+            self.generate(lc_list, 'dynamic', 'csr')
+
+
+if __name__ == '__main__':
+    unittest.main()
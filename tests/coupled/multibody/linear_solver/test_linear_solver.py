@@ -0,0 +1,246 @@
+import numpy as np
+import pickle
+import scipy.sparse as sparse
+import scipy.sparse.linalg as sparse_linalg
+import unittest
+import unittest.mock as mock
+
+import sharpy.solvers.timeintegrators as timeintegrators
+from sharpy.solvers.nonlineardynamicmultibody import NonLinearDynamicMultibody
+
+
+def multibody_matrices(body_sizes=(12, 16), num_LM_eq=4, coupling=None):
+    """
+    Random mass, damping and stiffness matrices with one block per body, forcing vectors and a constraint matrix
+    ``kBnh`` with a few entries per constraint equation
+
+    Returns:
+        tuple: ``scipy.sparse.csc_matrix`` ``M``, ``C`` and ``K`` and ``np.ndarray`` ``Q``, ``kBnh`` and ``LM_Q``
+    """
+    sys_size = sum(body_sizes)
+    matrices = []
+    for i_mat in range(3):
+        blocks = [sparse.random(size, size, density=0.3, format='csc') + size*sparse.identity(size, format='csc')
+                  for size in body_sizes]
+        matrices.append(sparse.block_diag(blocks, format='csc'))
+
+    # constraints between the last degrees of freedom of a body and the first ones of the next one
+    kBnh = np.zeros((num_LM_eq, sys_size))
+    first_dof = 0
+    for i_body in range(len(body_sizes) - 1):
+        last_dof = first_dof + body_sizes[i_body]
+        for i_eq in range(num_LM_eq):
+            kBnh[i_eq, last_dof - i_eq - 1] = 1. + np.random.rand()
+            kBnh[i_eq, last_dof + i_eq] = -1. - np.random.rand()
+        first_dof = last_dof
+
+    if coupling is not None:
+        # entry out of the blocks of the bodies
+        matrices[2] = matrices[2].tolil()
+        matrices[2][coupling] = 1.
+        matrices[2] = matrices[2].tocsc()
+
+    return matrices[0], matrices[1], matrices[2], np.random.rand(sys_size), kBnh, np.random.rand(num_LM_eq)
+
+
+class TestAssembleMatrix(unittest.TestCase):
+    """
+    Compares the system matrices of the time integrators assembled from sparse and dense matrices
+    """
+
+    def setUp(self):
+        np.random.seed(5)
+
+    def test_build_matrix(self):
+        for integrator_id in ('NewmarkBeta', 'GeneralisedAlpha'):
+            for num_LM_eq in (0, 4):
+                with self.subTest(integrator=integrator_id, num_LM_eq=num_LM_eq):
+                    M, C, K, Q, kBnh, LM_Q = multibody_matrices(num_LM_eq=num_LM_eq)
+                    integrator = getattr(timeintegrators, integrator_id)()
+                    integrator.initialise(None, {'dt': 0.01, 'sys_size': M.shape[0], 'num_LM_eq': num_LM_eq})
+
+                    Asys, Qsys = integrator.build_matrix(M, C, K, Q, sparse.csr_matrix(kBnh), LM_Q)
+                    Asys_dense, Qsys_dense = integrator.build_matrix(M.toarray(), C.toarray(), K.toarray(), Q,
+                                                                     kBnh, LM_Q)
+
+                    self.assertTrue(sparse.isspmatrix_csc(Asys))
+                    self.assertEqual(Asys.shape, (M.shape[0] + num_LM_eq, M.shape[0] + num_LM_eq))
+                    np.testing.assert_allclose(Asys.toarray(), Asys_dense, rtol=1e-14)
+                    np.testing.assert_array_equal(Qsys, Qsys_dense)
+                    np.testing.assert_array_equal(Qsys, integrator.build_vector(Q, LM_Q))
+
+
+class TestSparseLinearSolver(unittest.TestCase):
+    """
+    Compares the sparse LU solution of the multibody system of equations with the dense solution
+    """
+
+    def setUp(self):
+        np.random.seed(7)
+        self.integrator = timeintegrators.NewmarkBeta()
+
+    def solver(self, sys_size, num_LM_eq, rigid_bodies=False):
+        solver = NonLinearDynamicMultibody()
+        solver.settings = {'rigid_bodies': rigid_bodies}
+        solver.sys_size = sys_size
+        solver.num_LM_eq = num_LM_eq
+        self.integrator.initialise(None, {'dt': 0.01, 'sys_size': sys_size, 'num_LM_eq': num_LM_eq})
+        return solver
+
+    def system(self, **kwargs):
+        M, C, K, Q, kBnh, LM_Q = multibody_matrices(**kwargs)
+        Asys, Qsys = self.integrator.build_matrix(M, C, K, Q, sparse.csr_matrix(kBnh), LM_Q)
+        return Asys, Qsys
+
+    def test_factorise(self):
+        solver = self.solver(28, 4)
+        Asys, Qsys = self.system()
+        Asys_dense = Asys.toarray()
+
+        solve = solver.factorise(Asys)
+        np.testing.assert_allclose(solve(-Qsys), np.linalg.solve(Asys_dense, -Qsys), rtol=1e-10, atol=1e-14)
+        np.testing.assert_allclose(solve(-Qsys), solver.factorise(Asys_dense)(-Qsys), rtol=1e-10, atol=1e-14)
+
+        # the columns are reordered
+        self.assertEqual(sorted(solver.column_order), list(range(Asys.shape[0])))
+        self.assertFalse(np.array_equal(solver.column_order, np.arange(Asys.shape[0])))
+
+    def test_factorise_rigid_bodies(self):
+        solver = self.solver(28, 4, rigid_bodies=True)
+        solver.rigid_dofs = list(range(2, 12)) + list(range(18, 28))
+        Asys, Qsys = self.system()
+
+        x = solver.factorise(Asys)(-Qsys)
+        np.testing.assert_allclose(x, solver.factorise(Asys.toarray())(-Qsys), rtol=1e-10, atol=1e-14)
+        np.testing.assert_array_equal(x[[0, 1, 12, 13, 14, 15, 16, 17]], 0.)
+
+    def test_ordering_reuse(self):
+        solver = self.solver(28, 4)
+
+        with mock.patch.object(sparse_linalg, 'splu', wraps=sparse_linalg.splu) as splu:
+            # time steps with the same sparsity pattern and new values
+            Asys_ini, Qsys = self.system()
+            column_order = None
+            for i_step in range(3):
+                Asys = Asys_ini.copy()
+                Asys.data *= 1. + 0.1*np.random.rand(Asys.nnz)
+                lu, step_column_order = solver.sparse_lu(Asys)
+                if column_order is not None:
+                    self.assertIs(step_column_order, column_order)
+                column_order = step_column_order
+                np.testing.assert_allclose(solver.sparse_lu_solve(lu, column_order, -Qsys),
+                                           np.linalg.solve(Asys.toarray(), -Qsys), rtol=1e-10, atol=1e-14)
+            orderings = [call for call in splu.call_args_list if call.kwargs['permc_spec'] == 'COLAMD']
+            self.assertEqual(len(orderings), 1)
+            self.assertEqual(splu.call_count, 4)
+
+            # new sparsity pattern
+            Asys, Qsys = self.system(coupling=(3, 20))
+            lu, new_column_order = solver.sparse_lu(Asys)
+            orderings = [call for call in splu.call_args_list if call.kwargs['permc_spec'] == 'COLAMD']
+            self.assertEqual(len(orderings), 2)
+            np.testing.assert_array_equal(solver.lu_pattern[0], Asys.indptr)
+            np.testing.assert_array_equal(solver.lu_pattern[1], Asys.indices)
+            np.testing.assert_allclose(solver.sparse_lu_solve(lu, new_column_order, -Qsys),
+                                       np.linalg.solve(Asys.toarray(), -Qsys), rtol=1e-10, atol=1e-14)
+
+    def test_sparse_inverse_operator(self):
+        solver = self.solver(28, 4)
+        Asys, Qsys = self.system()
+        Asys_dense = Asys.toarray()
+        b = np.random.rand(Asys.shape[0])
+
+        for factorisation in ('sparse_lu', 'splu'):
+            with self.subTest(factorisation=factorisation):
+                if factorisation == 'sparse_lu':
+                    lu, column_order = solver.sparse_lu(Asys)
+                else:
+                    lu, column_order = sparse_linalg.splu(Asys), np.arange(Asys.shape[0])
+                inv_A = solver.sparse_inverse_operator(lu, column_order)
+                np.testing.assert_allclose(inv_A.matvec(b), np.linalg.solve(Asys_dense, b), rtol=1e-10)
+                np.testing.assert_allclose(inv_A.rmatvec(b), np.linalg.solve(Asys_dense.T, b), rtol=1e-10)
+
+    def test_sparse_cond_estimate(self):
+        solver = self.solver(28, 4)
+        Asys, Qsys = self.system()
+        Asys_dense = Asys.toarray()
+        cond = np.linalg.cond(Asys_dense, 1)
+
+        # lower bound of the condition number, without and with the factorisation of the solver
+        for estimate in (solver.sparse_cond_estimate(Asys),
+                         solver.sparse_cond_estimate(Asys, *solver.sparse_lu(Asys))):
+            self.assertLessEqual(estimate, cond*(1. + 1e-10))
+            self.assertGreater(estimate, 0.1*cond)
+
+        cond_num, cond_num_lm = solver.condition_numbers(Asys)
+        self.assertLessEqual(cond_num, np.linalg.cond(Asys_dense[:28, :28], 1)*(1. + 1e-10))
+        self.assertGreater(cond_num, 0.1*np.linalg.cond(Asys_dense[:28, :28], 1))
+        self.assertLessEqual(cond_num_lm, cond*(1. + 1e-10))
+        self.assertGreater(cond_num_lm, 0.1*cond)
+
+
+
+class TestJacobianUpdate(unittest.TestCase):
+    """
+    Tests the refresh policy of the iteration matrix of the time integrators
+    """
+
+    def integrator(self, integrator_id, **settings):
+        settings.update({'dt': 0.01, 'sys_size': 28, 'num_LM_eq': 4})
+        integrator = getattr(timeintegrators, integrator_id)()
+        integrator.initialise(None, settings)
+        return integrator
+
+    def test_every_iteration(self):
+        for integrator_id in ('NewmarkBeta', 'GeneralisedAlpha'):
+            with self.subTest(integrator=integrator_id):
+                integrator = self.integrator(integrator_id)
+                for reduction in [None, 0.01, 0.9] + [0.01]*30:
+                    self.assertTrue(integrator.update_jacobian(reduction))
+
+    def test_modified_newton(self):
+        for integrator_id in ('NewmarkBeta', 'GeneralisedAlpha'):
+            with self.subTest(integrator=integrator_id):
+                integrator = self.integrator(integrator_id, jacobian_update='modified_newton', jacobian_max_age=3,
+                                             jacobian_stall_ratio=0.4)
+
+                # refreshed in the first iteration and reused up to the maximum age
+                updates = [integrator.update_jacobian(reduction) for reduction in [None, 0.1, 0.1, 0.1, 0.1, 0.1]]
+                self.assertEqual(updates, [True, False, False, False, True, False])
+
+                # refreshed when the correction stalls
+                self.assertTrue(integrator.update_jacobian(0.5))
+                self.assertFalse(integrator.update_jacobian(0.4))
+                self.assertFalse(integrator.update_jacobian(None))
+
+                # refreshed after a reset, i.e. a new factorisation is required
+                integrator.reset_jacobian()
+                self.assertTrue(integrator.update_jacobian(0.1))
+                self.assertFalse(integrator.update_jacobian(0.1))
+
+                # the age persists across time steps
+                integrator.predictor(np.zeros(32), np.zeros(32), np.zeros(32))
+                self.assertFalse(integrator.update_jacobian(None))
+                self.assertFalse(integrator.update_jacobian(None))
+                self.assertTrue(integrator.update_jacobian(None))
+
+    def test_getstate(self):
+        solver = NonLinearDynamicMultibody()
+        solver.settings = {'rigid_bodies': False}
+        solver.sys_size = 28
+        solver.num_LM_eq = 4
+        Asys = np.eye(32) + np.diag(np.ones(31), 1)
+        solver.linear_solve = solver.factorise(Asys)
+        solver.mb_views = lambda: None
+
+        # the factorisation is kept by the solver and dropped when pickled
+        copied = pickle.loads(pickle.dumps(solver))
+        self.assertIsNone(copied.linear_solve)
+        self.assertIsNone(copied.mb_views)
+        self.assertEqual(copied.sys_size, 28)
+        self.assertIsNotNone(solver.linear_solve)
+        np.testing.assert_allclose(solver.linear_solve(np.ones(32)), np.linalg.solve(Asys, np.ones(32)))
+
+
+if __name__ == '__main__':
+    unittest.main()
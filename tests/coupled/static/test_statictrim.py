@@ -0,0 +1,112 @@
+import numpy as np
+import shutil
+import tempfile
+import types
+import unittest
+import unittest.mock as mock
+
+import sharpy.solvers.statictrim as statictrim
+import sharpy.utils.solver_interface as solver_interface
+
+
+class AnalyticTrimSolver(object):
+    """
+    Replaces the wrapped static solver with analytic resultants of the trim variables
+    """
+
+    def __init__(self):
+        self.alpha = 0.
+        self.thrust = 0.
+        self.deflection = 0.
+
+    def initialise(self, data, custom_settings=None, restart=False):
+        pass
+
+    def change_trim(self, alpha, thrust, thrust_nodes, tail_deflection, tail_cs_index):
+        self.alpha = alpha
+        self.thrust = thrust
+        self.deflection = tail_deflection
+
+    def run(self, **kwargs):
+        pass
+
+    def extract_resultants(self):
+        lift = 60.*np.sin(self.alpha) + 4.*self.deflection
+        drag = 0.5 + 20.*self.alpha**2
+        forces = np.array([self.thrust*np.cos(self.alpha) - drag, 0., lift - 5.])
+        moments = np.array([0., 3. - 10.*self.alpha - 25.*self.deflection - 0.5*self.deflection**2, 0.])
+        return forces, moments
+
+
+class TestStaticTrim(unittest.TestCase):
+    """
+    Compares the trim values found with the secant and Broyden updates of the Jacobian, with and without parallel
+    finite differences
+    """
+
+    def setUp(self):
+        self.route = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def trim(self, **kwargs):
+        settings = {'solver': 'AnalyticTrimSolver',
+                    'print_info': False,
+                    'initial_alpha': 0.05,
+                    'initial_thrust': 1.,
+                    'fz_tolerance': 1e-8,
+                    'fx_tolerance': 1e-8,
+                    'm_tolerance': 1e-8,
+                    'relaxation_factor': 0.}
+        settings.update(kwargs)
+        data = types.SimpleNamespace(settings={'StaticTrim': settings},
+                                     output_folder=self.route,
+                                     structure=types.SimpleNamespace())
+
+        trim = statictrim.StaticTrim()
+        with mock.patch.object(solver_interface, 'initialise_solver', return_value=AnalyticTrimSolver()):
+            trim.initialise(data)
+        trim.run()
+
+        forces, moments = trim.solver.extract_resultants()
+        np.testing.assert_allclose([forces[2], moments[1], forces[0]], 0., atol=1e-8)
+        return np.array(trim.trimmed_values), trim.i_iter
+
+    def test_jacobian_update(self):
+        secant, _ = self.trim()
+        for jacobian_update in ('secant', 'broyden'):
+            for parallel_gradients in (False, True):
+                for relaxation_factor in (0., 0.3):
+                    with self.subTest(jacobian_update=jacobian_update, parallel_gradients=parallel_gradients,
+                                      relaxation_factor=relaxation_factor):
+                        trimmed_values, _ = self.trim(jacobian_update=jacobian_update,
+                                                      parallel_gradients=parallel_gradients,
+                                                      relaxation_factor=relaxation_factor)
+                        np.testing.assert_allclose(trimmed_values, secant, rtol=1e-6, atol=1e-8)
+
+    def test_parallel_gradients(self):
+        # the workers return the same perturbed resultants as the sequential evaluation
+        trim = statictrim.StaticTrim()
+        data = types.SimpleNamespace(settings={'StaticTrim': {'solver': 'AnalyticTrimSolver'}},
+                                     output_folder=self.route)
+        with mock.patch.object(solver_interface, 'initialise_solver', return_value=AnalyticTrimSolver()):
+            trim.initialise(data)
+        inputs = [0.05, 0.05, 1.]
+        outputs = trim.evaluate(*inputs)
+
+        sequential = trim.finite_difference_jacobian(inputs, outputs)
+        trim.settings['parallel_gradients'] = True
+        np.testing.assert_array_equal(trim.finite_difference_jacobian(inputs, outputs), sequential)
+
+    def test_singular_jacobian(self):
+        # a Broyden update that leaves a singular Jacobian is replaced by finite differences
+        with mock.patch.object(statictrim.StaticTrim, 'finite_difference_jacobian',
+                               autospec=True, side_effect=[np.zeros((3, 3)), np.eye(3)]) as jacobian:
+            with self.assertRaisesRegex(Exception, 'max iterations'):
+                self.trim(jacobian_update='broyden', max_iter=3)
+        self.assertEqual(jacobian.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
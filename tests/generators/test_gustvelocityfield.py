@@ -0,0 +1,119 @@
+import numpy as np
+import shutil
+import tempfile
+import unittest
+
+import sharpy.generators.gustvelocityfield as gustvelocityfield
+
+
+class TestGustVelocityField(unittest.TestCase):
+    """
+    Compares the gust velocity of all the lattice vertices evaluated at once with the evaluation at each vertex
+    """
+
+    u_inf = 10.
+    u_inf_direction = np.array([1., 0., 0.])
+
+    def setUp(self):
+        np.random.seed(3)
+        self.route = tempfile.mkdtemp()
+
+        # time history of the velocity for the time varying gusts
+        time_file = self.route + '/gust.txt'
+        time = np.linspace(0., 2., 21)
+        np.savetxt(time_file, np.column_stack((time, np.sin(time), 0.5*time, np.cos(3.*time))))
+
+        self.gust_parameters = {
+            '1-cos': {'gust_length': 5., 'gust_intensity': 0.8},
+            'DARPA': {'gust_length': 5., 'gust_intensity': 0.8, 'span': 6.},
+            'continuous_sin': {'gust_length': 5., 'gust_intensity': 0.8, 'gust_component': 1},
+            'time varying global': {'file': time_file},
+            'time varying': {'file': time_file, 'gust_component': [0, 2]},
+            'span sine': {'gust_intensity': 0.8, 'span': 6., 'periods_per_span': 2, 'span_with_gust': 4.,
+                          'perturbation_dir': np.array([0., 0.6, 0.8])},
+        }
+
+        # two surfaces across the start of the gust
+        lower = np.array([-8., -4., -1.])[:, None, None]
+        extent = np.array([10., 8., 2.])[:, None, None]
+        self.zeta = [lower + extent*np.random.rand(3, 4, 7),
+                     lower + extent*np.random.rand(3, 3, 5)]
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def generator(self, gust_shape, relative_motion=False):
+        generator = gustvelocityfield.GustVelocityField()
+        generator.initialise({'u_inf': self.u_inf,
+                              'u_inf_direction': self.u_inf_direction.copy(),
+                              'offset': 1.5,
+                              'relative_motion': relative_motion,
+                              'gust_shape': gust_shape,
+                              'gust_parameters': dict(self.gust_parameters[gust_shape])})
+        return generator
+
+    def generate_reference(self, generator, params, uext):
+        """
+        Velocity at each vertex as evaluated before the batched generation
+        """
+        zeta = params['zeta']
+        t = 0 if generator.settings['gust_shape'] == 'span sine' else params['t']
+        for_pos = params['for_pos'][0:3]
+        for i_surf in range(len(zeta)):
+            if params['override']:
+                uext[i_surf].fill(0.0)
+
+            for i in range(zeta[i_surf].shape[1]):
+                for j in range(zeta[i_surf].shape[2]):
+                    total_offset_val = generator.settings['offset']
+                    if generator.settings['relative_motion']:
+                        uext[i_surf][:, i, j] += generator.settings['u_inf']*generator.settings['u_inf_direction']
+                        total_offset_val -= generator.settings['u_inf']*t
+
+                    total_offset = total_offset_val*generator.settings['u_inf_direction'] + for_pos
+                    uext[i_surf][:, i, j] += generator.gust.gust_shape(zeta[i_surf][0, i, j] + total_offset[0],
+                                                                       zeta[i_surf][1, i, j] + total_offset[1],
+                                                                       zeta[i_surf][2, i, j] + total_offset[2],
+                                                                       t)
+
+    def test_gust_shape(self):
+        self.assertEqual(set(self.gust_parameters.keys()), set(gustvelocityfield.dict_of_gusts.keys()))
+        x = self.zeta[0][0]
+        y = self.zeta[0][1]
+        z = self.zeta[0][2]
+        for gust_shape in self.gust_parameters:
+            with self.subTest(gust_shape=gust_shape):
+                gust = self.generator(gust_shape).gust
+                vel = gust.gust_shape(x, y, z, 0.7)
+                self.assertEqual(vel.shape, (3,) + x.shape)
+                self.assertTrue(np.any(vel != 0.))
+                for i in range(x.shape[0]):
+                    for j in range(x.shape[1]):
+                        vel_point = gust.gust_shape(x[i, j], y[i, j], z[i, j], 0.7)
+                        self.assertEqual(vel_point.shape, (3,))
+                        np.testing.assert_array_equal(vel[:, i, j], vel_point)
+
+    def test_generate(self):
+        for gust_shape in self.gust_parameters:
+            for relative_motion in (False, True):
+                for override in (True, False):
+                    with self.subTest(gust_shape=gust_shape, relative_motion=relative_motion, override=override):
+                        generator = self.generator(gust_shape, relative_motion)
+                        params = {'zeta': self.zeta,
+                                  'override': override,
+                                  'ts': 3,
+                                  't': 0.3,
+                                  'dt': 0.1,
+                                  'for_pos': np.array([0.2, -0.1, 0.3, 0., 0., 0.])}
+                        uext_init = [np.random.rand(*self.zeta[i_surf].shape) for i_surf in range(len(self.zeta))]
+                        uext = [uext_init[i_surf].copy() for i_surf in range(len(self.zeta))]
+                        generator.generate(params, uext)
+
+                        uext_ref = [uext_init[i_surf].copy() for i_surf in range(len(self.zeta))]
+                        self.generate_reference(generator, params, uext_ref)
+                        for i_surf in range(len(self.zeta)):
+                            np.testing.assert_allclose(uext[i_surf], uext_ref[i_surf], rtol=1e-12, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
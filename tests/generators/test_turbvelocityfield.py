@@ -0,0 +1,284 @@
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+import scipy.interpolate as interpolate
+
+import sharpy.generators.turbvelocityfield as turbvelocityfield
+
+
+class TestTrilinearInterpolation(unittest.TestCase):
+    """
+    Compares the batched trilinear interpolation of ``TurbVelocityField`` with ``scipy``'s ``RegularGridInterpolator``
+    """
+
+    def setUp(self):
+        np.random.seed(0)
+        # non uniform spacing in each direction
+        self.grid = tuple(np.cumsum(np.random.uniform(0.5, 1.5, n)) - offset
+                          for n, offset in zip((7, 5, 6), (3., 0., 4.)))
+        self.fields = [np.random.rand(7, 5, 6) for i_dim in range(3)]
+
+    def random_points(self, n_points, extension=0.):
+        lower = np.array([self.grid[i_dim][0] for i_dim in range(3)])
+        upper = np.array([self.grid[i_dim][-1] for i_dim in range(3)])
+        extent = upper - lower
+        return (lower - extension*extent)[:, None] + \
+               ((1. + 2.*extension)*extent)[:, None]*np.random.rand(3, n_points)
+
+    def reference(self, points, fill_value=0.):
+        output = np.zeros((3, points.shape[1]))
+        for i_dim in range(3):
+            interpolator = interpolate.RegularGridInterpolator(self.grid, self.fields[i_dim],
+                                                               bounds_error=False, fill_value=fill_value)
+            output[i_dim] = interpolator(points.T)
+        return output
+
+    def test_inside(self):
+        points = self.random_points(200)
+        # grid points, including the upper bounds of the grid
+        grid_points = np.array([[self.grid[0][i], self.grid[1][j], self.grid[2][k]]
+                                for i in (0, 3, 6) for j in (0, 2, 4) for k in (0, 5)]).T
+        points = np.concatenate((points, grid_points), axis=1)
+
+        indices, weights, inside = turbvelocityfield.trilinear_weights(self.grid, points)
+        self.assertTrue(inside.all())
+        np.testing.assert_allclose(turbvelocityfield.trilinear_interpolation(self.fields, indices, weights, inside),
+                                   self.reference(points),
+                                   rtol=1e-12, atol=1e-12)
+
+    def test_outside(self):
+        points = self.random_points(500, extension=0.5)
+        indices, weights, inside = turbvelocityfield.trilinear_weights(self.grid, points)
+        self.assertTrue(inside.any())
+        self.assertFalse(inside.all())
+
+        for fill_value in (0., -2.5):
+            with self.subTest(fill_value=fill_value):
+                values = turbvelocityfield.trilinear_interpolation(self.fields, indices, weights, inside,
+                                                                   fill_value=fill_value)
+                np.testing.assert_allclose(values, self.reference(points, fill_value=fill_value),
+                                           rtol=1e-12, atol=1e-12)
+                np.testing.assert_array_equal(values[:, ~inside], fill_value)
+
+    def test_periodicity(self):
+        bbox = np.array([[self.grid[0][0], self.grid[0][-1]],
+                         [self.grid[1][-1], self.grid[1][0]],  # reversed, as y after the change of frame
+                         [self.grid[2][0], self.grid[2][-1]]])
+        periods = np.abs(bbox[:, 1] - bbox[:, 0])
+
+        points = self.random_points(100)
+        shifted = points.copy()
+        shifted[0] += periods[0]*np.random.randint(-3, 4, points.shape[1])
+        shifted[1] += periods[1]*np.random.randint(-3, 4, points.shape[1])
+        shifted[2] += 2.*periods[2]
+
+        for i_dim in range(2):
+            wrapped = turbvelocityfield.TurbVelocityField.periodicity(shifted[i_dim], bbox[i_dim])
+            np.testing.assert_allclose(wrapped, points[i_dim], rtol=1e-12, atol=1e-12)
+            # scalar coordinates are wrapped the same way
+            self.assertAlmostEqual(turbvelocityfield.TurbVelocityField.periodicity(shifted[i_dim, 0], bbox[i_dim]),
+                                   points[i_dim, 0], 12)
+        # collapsed dimensions are not modified
+        np.testing.assert_array_equal(turbvelocityfield.TurbVelocityField.periodicity(shifted[0], np.zeros((2,))),
+                                      shifted[0])
+
+        generator = turbvelocityfield.TurbVelocityField()
+        generator.bbox = bbox
+        generator.x_periodicity = True
+        generator.y_periodicity = True
+        wrapped = generator.apply_periodicity(shifted)
+        np.testing.assert_allclose(wrapped[0:2], points[0:2], rtol=1e-12, atol=1e-12)
+        # no periodicity in z
+        np.testing.assert_array_equal(wrapped[2], shifted[2])
+
+        indices, weights, inside = turbvelocityfield.trilinear_weights(self.grid, wrapped)
+        np.testing.assert_array_equal(inside, False)
+        wrapped[2] = points[2]
+        indices, weights, inside = turbvelocityfield.trilinear_weights(self.grid, wrapped)
+        np.testing.assert_allclose(turbvelocityfield.trilinear_interpolation(self.fields, indices, weights, inside),
+                                   self.reference(points),
+                                   rtol=1e-10, atol=1e-10)
+
+
+class TestPagedField(unittest.TestCase):
+    """
+    Compares the paged snapshots of ``TurbVelocityField``, with and without prefetch, with the fields in memory
+    """
+
+    dimensions = (6, 8, 12)  # z, y, x as in the XDMF file
+    n_grid = 5
+    dt = 0.5
+
+    def setUp(self):
+        np.random.seed(1)
+        self.route = tempfile.mkdtemp()
+        self.generators = []
+        self.fields = []
+        grids = ''
+        velocities = ['ux', 'uy', 'uz']
+        for i_grid in range(self.n_grid):
+            attributes = ''
+            fields = []
+            for i_dim in range(3):
+                # uz in single precision
+                dtype, precision = (np.float32, 4) if i_dim == 2 else (np.float64, 8)
+                field = np.random.rand(*self.dimensions[::-1]).astype(dtype)
+                file_name = '%s_%02u.bin' % (velocities[i_dim], i_grid)
+                field.ravel(order='F').tofile(self.route + '/' + file_name)
+                fields.append(field)
+                attributes += ('<Attribute Name="{:s}" AttributeType="Scalar" Center="Node">'
+                               '<DataItem Format="Binary" NumberType="Float" Precision="{:d}" Endian="Little" '
+                               'Dimensions="{:d} {:d} {:d}">{:s}</DataItem></Attribute>').format(
+                    velocities[i_dim], precision, *self.dimensions, file_name)
+            self.fields.append(fields)
+            grids += ('<Grid Name="T{:04d}" GridType="Uniform">'
+                      '<Topology Reference="/Xdmf/Domain/Topology[1]"/>'
+                      '<Geometry Reference="/Xdmf/Domain/Geometry[1]"/>{:s}</Grid>').format(i_grid, attributes)
+
+        self.xdmf = self.route + '/field.xdmf'
+        with open(self.xdmf, 'w') as outfile:
+            outfile.write('<?xml version="1.0" ?>\n'
+                          '<Xdmf Version="2.0">\n<Domain>\n'
+                          '<Topology TopologyType="3DCoRectMesh" Dimensions="{:d} {:d} {:d}"/>\n'
+                          '<Geometry GeometryType="ORIGIN_DXDYDZ">\n'
+                          '<DataItem Dimensions="3" NumberType="Float" Format="XML">0.0 0.0 0.0</DataItem>\n'
+                          '<DataItem Dimensions="3" NumberType="Float" Format="XML">0.5 0.75 1.0</DataItem>\n'
+                          '</Geometry>\n'
+                          '<Grid GridType="Collection" CollectionType="Temporal">\n'
+                          '<Time TimeType="HyperSlab">\n'
+                          '<!--Start, stride and count-->\n'
+                          '<DataItem Format="XML" NumberType="Float" Dimensions="3">0.0 {:f} {:d}</DataItem>\n'
+                          '</Time>\n{:s}\n</Grid>\n</Domain>\n</Xdmf>\n'.format(*self.dimensions, self.dt,
+                                                                                    self.n_grid, grids))
+
+    def tearDown(self):
+        # the pending prefetches read from the folder
+        for generator in self.generators:
+            generator.teardown()
+        shutil.rmtree(self.route)
+
+    def generator(self, **settings):
+        in_dict = {'turbulent_field': self.xdmf,
+                   'print_info': False,
+                   'frozen': False,
+                   'store_field': True}
+        in_dict.update(settings)
+        generator = turbvelocityfield.TurbVelocityField()
+        generator.initialise(in_dict)
+        self.generators.append(generator)
+        return generator
+
+    def lattice(self, generator):
+        # two surfaces in the middle of the field in x and y, with some points beyond its z bounds
+        bbox = np.sort(generator.bbox, axis=1)
+        extent = bbox[:, 1] - bbox[:, 0]
+        lower = bbox[:, 0] + [0.4, 0.3, -0.2]*extent
+        upper = bbox[:, 0] + [0.6, 0.7, 1.2]*extent
+        zeta = []
+        for shape in ((3, 5, 4), (3, 3, 7)):
+            zeta.append(lower[:, None, None] + (upper - lower)[:, None, None]*np.random.rand(*shape))
+        return zeta
+
+    def run_steps(self, generator, zeta, times):
+        u_ext = []
+        for t in times:
+            # the lattice moves through the field
+            for_pos = np.zeros((6,))
+            for_pos[0] = -0.2*t
+            step_u_ext = [np.zeros_like(zeta[isurf]) for isurf in range(len(zeta))]
+            generator.generate({'zeta': zeta, 'for_pos': for_pos, 't': t}, step_u_ext)
+            u_ext.append(step_u_ext)
+        return u_ext
+
+    def assert_same_velocities(self, u_ext, u_ext_ref):
+        for step_u_ext, step_u_ext_ref in zip(u_ext, u_ext_ref):
+            for isurf in range(len(step_u_ext)):
+                np.testing.assert_allclose(step_u_ext[isurf], step_u_ext_ref[isurf], rtol=1e-12, atol=1e-12)
+
+    def test_paged(self):
+        times = np.linspace(0., (self.n_grid - 1.5)*self.dt, 13)
+        for frozen in (False, True):
+            reference = self.generator(frozen=frozen)
+            zeta = self.lattice(reference)
+            u_ext_ref = self.run_steps(reference, zeta, times)
+            self.assertTrue(np.any([np.abs(u_ext_ref[-1][isurf]).max() > 0. for isurf in range(len(zeta))]))
+
+            for prefetch in (False, True):
+                with self.subTest(frozen=frozen, prefetch=prefetch):
+                    generator = self.generator(frozen=frozen, paged_field=True, prefetch=prefetch)
+                    self.assert_same_velocities(self.run_steps(generator, zeta, times), u_ext_ref)
+
+                    # only the sub-box around the lattice is in memory
+                    snapshot = generator._interpolator0
+                    self.assertIsInstance(snapshot, turbvelocityfield.FieldSnapshot)
+                    self.assertTrue(np.all(snapshot.box[1] - snapshot.box[0] <= snapshot.shape))
+                    self.assertLess(np.prod(snapshot.box[1] - snapshot.box[0]), np.prod(snapshot.shape))
+
+    def test_prefetch(self):
+        generator = self.generator(paged_field=True, prefetch=True)
+        zeta = self.lattice(generator)
+
+        # the first snapshots are read before any interpolation, so the prefetch of the next one waits for the first
+        # interpolation to know the sub-box to read
+        self.run_steps(generator, zeta, [0.])
+        i_grid, thread, prefetched = generator._prefetch
+        self.assertEqual(i_grid, 2)
+        self.assertIsNotNone(thread)
+        thread.join()
+        np.testing.assert_array_equal(prefetched[0].box[0], generator.paged_box()[0])
+        np.testing.assert_array_equal(prefetched[0].box[1], generator.paged_box()[1])
+        box = tuple(slice(prefetched[0].box[0][i_dim], prefetched[0].box[1][i_dim]) for i_dim in range(3))
+        for i_dim in range(3):
+            np.testing.assert_array_equal(prefetched[0].values[i_dim], self.fields[2][i_dim][box])
+
+        # the prefetched snapshot is used for the next one, and the following is prefetched with the same sub-box
+        self.run_steps(generator, zeta, [1.2*self.dt])
+        self.assertIs(generator._interpolator1, prefetched[0])
+        self.assertEqual(generator._prefetch[0], 3)
+        self.assertIsNotNone(generator._prefetch[1])
+
+        # the pending prefetch is waited for and dropped
+        thread = generator._prefetch[1]
+        generator.teardown()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(generator._prefetch)
+
+    def test_prefetch_error(self):
+        generator = self.generator(paged_field=True, prefetch=True)
+        zeta = self.lattice(generator)
+        self.run_steps(generator, zeta, [0.])
+        generator.join_prefetch()
+
+        # the error of the background reading is raised when the snapshot is used
+        os.remove(self.route + '/ux_02.bin')
+        generator.start_prefetch(2, generator.paged_box())
+        with self.assertRaises(FileNotFoundError):
+            self.run_steps(generator, zeta, [1.2*self.dt])
+        self.assertIsNone(generator._prefetch)
+
+    def test_snapshot_copy(self):
+        generator = self.generator(paged_field=True)
+        grid = (generator.grid_data['initial_x_grid'],
+                generator.grid_data['initial_y_grid'],
+                generator.grid_data['initial_z_grid'])
+        snapshot = generator.create_snapshot(0)
+        points = np.array([[grid[i_dim][1], grid[i_dim][2]] for i_dim in range(3)])
+        indices, weights, inside = turbvelocityfield.trilinear_weights(grid, points)
+        values = snapshot.interpolate(indices, weights, inside)
+
+        snapshot_copy = snapshot.copy()
+        self.assertIsNot(snapshot_copy, snapshot)
+        np.testing.assert_array_equal(snapshot_copy.interpolate(indices, weights, inside), values)
+
+        # the interpolated points of the copy do not change the sub-box of the original
+        points = np.array([[grid[i_dim][-2], grid[i_dim][-1]] for i_dim in range(3)])
+        indices, weights, inside = turbvelocityfield.trilinear_weights(grid, points)
+        snapshot_copy.interpolate(indices, weights, inside)
+        np.testing.assert_array_equal(snapshot.required[1], [3, 3, 3])
+        np.testing.assert_array_equal(snapshot_copy.required[1], snapshot.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+import itertools
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock as mock
+
+import sharpy.generators.turbvelocityfieldbts as turbvelocityfieldbts
+
+
+header_dtype = np.dtype([
+    ("id", np.int16),
+    ("nz", np.int32),
+    ("ny", np.int32),
+    ("tower_points", np.int32),
+    ("ntime_steps", np.int32),
+    ("dz", np.float32),
+    ("dy", np.float32),
+    ("dt", np.float32),
+    ("u_mean", np.float32),
+    ("HubHt", np.float32),
+    ("Zbottom", np.float32),
+    ("u_slope_scaling", np.float32),
+    ("u_offset_scaling", np.float32),
+    ("v_slope_scaling", np.float32),
+    ("v_offset_scaling", np.float32),
+    ("w_slope_scaling", np.float32),
+    ("w_offset_scaling", np.float32),
+    ("n_char_description", np.int32),
+])
+
+
+def write_bts(fname, samples, scaling, offset, dz=2., dy=1.5, dt=0.1, u_mean=10., zbottom=5.,
+              description=b'Synthetic TurbSim field for the tests'):
+    """
+    Writes a TurbSim binary file with the samples ``(ntime_steps, nz, ny, 3)`` as stored in the file
+    """
+    ntime_steps, nz, ny, _ = samples.shape
+    header = np.zeros((1,), dtype=header_dtype)
+    header['id'] = 7
+    header['nz'] = nz
+    header['ny'] = ny
+    header['ntime_steps'] = ntime_steps
+    header['dz'] = dz
+    header['dy'] = dy
+    header['dt'] = dt
+    header['u_mean'] = u_mean
+    header['HubHt'] = zbottom + 0.5*dz*(nz - 1)
+    header['Zbottom'] = zbottom
+    for i_vel, vel in enumerate('uvw'):
+        header[vel + '_slope_scaling'] = scaling[i_vel]
+        header[vel + '_offset_scaling'] = offset[i_vel]
+    header['n_char_description'] = len(description)
+    with open(fname, 'wb') as outfile:
+        header.tofile(outfile)
+        outfile.write(description)
+        samples.astype(np.int16).tofile(outfile)
+
+
+def read_bts_reference(samples, scaling, offset):
+    """
+    Velocity field of the samples with the original loops of the reader
+    """
+    ntime_steps, nz, ny, _ = samples.shape
+    vel_aux = samples.flatten()
+    vel = np.zeros((3, ntime_steps, ny, nz))
+    counter = -1
+    for ix in range(ntime_steps):
+        for iz in range(nz):
+            for iy in range(ny):
+                for ivel in range(3):
+                    counter += 1
+                    vel[ivel, -ix, iy, iz] = (vel_aux[counter] - offset[ivel])/scaling[ivel]
+    return vel
+
+
+def velocity_field(coords, gradient):
+    """
+    Velocity ``u_i = gradient_ij x_j + (i + 1) x y z`` at the coordinates ``[x, y, z]``
+    """
+    return np.array([sum(gradient[i_vel, i_dim]*coords[i_dim] for i_dim in range(3)) +
+                     (i_vel + 1)*coords[0]*coords[1]*coords[2] for i_vel in range(3)])
+
+
+def right_handed_orientations():
+    """
+    Orientations accepted by ``change_orientation``, i.e. the right handed systems of signed axes
+    """
+    orientations = []
+    for permutation in itertools.permutations(range(3)):
+        for sign in itertools.product((1, -1), repeat=3):
+            axes = np.zeros((3, 3), dtype=int)
+            axes[range(3), permutation] = sign
+            if np.isclose(np.linalg.det(axes), 1.):
+                orientations.append((''.join(('-' if sign[i] == -1 else '') + 'xyz'[permutation[i]]
+                                             for i in range(3)),
+                                     np.array(permutation), np.array(sign)))
+    return orientations
+
+
+class TestTurbVelocityFieldBts(unittest.TestCase):
+    """
+    Tests the TurbSim reader, the change of orientation and the cache of the processed field
+    """
+
+    ntime_steps = 6
+    nz = 4
+    ny = 5
+    scaling = np.array([100., 200., 400.], dtype=np.float32)
+    offset = np.array([-800., 50., 10.], dtype=np.float32)
+
+    def setUp(self):
+        np.random.seed(2)
+        self.route = tempfile.mkdtemp()
+        self.bts = self.route + '/field.bts'
+        self.samples = np.random.randint(-2000, 2000, (self.ntime_steps, self.nz, self.ny, 3)).astype(np.int16)
+        write_bts(self.bts, self.samples, self.scaling, self.offset)
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def generator(self, **settings):
+        in_dict = {'turbulent_field': self.bts,
+                   'print_info': False,
+                   'u_fed': np.array([10., 0., 0.])}
+        in_dict.update(settings)
+        generator = turbvelocityfieldbts.TurbVelocityFieldBts()
+        generator.initialise(in_dict)
+        return generator
+
+    def test_read_turbsim_bts(self):
+        for case_with_tower in (False, True):
+            with self.subTest(case_with_tower=case_with_tower):
+                x_grid, y_grid, z_grid, vel = turbvelocityfieldbts.TurbVelocityFieldBts.read_turbsim_bts(
+                    self.bts, case_with_tower)
+
+                self.assertEqual(vel.shape, (3, self.ntime_steps, self.ny, self.nz))
+                np.testing.assert_allclose(vel, read_bts_reference(self.samples, self.scaling, self.offset),
+                                           rtol=1e-12, atol=1e-12)
+                # first sample of the file
+                np.testing.assert_allclose(vel[:, 0, 0, 0], (self.samples[0, 0, 0, :] - self.offset)/self.scaling,
+                                           rtol=1e-12)
+
+                np.testing.assert_allclose(x_grid, np.linspace(-(self.ntime_steps - 1)*0.1*10., 0.,
+                                                               self.ntime_steps), rtol=1e-6)
+                np.testing.assert_allclose(y_grid, np.linspace(-3., 3., self.ny), rtol=1e-6)
+                if case_with_tower:
+                    np.testing.assert_allclose(z_grid, np.linspace(5., 11., self.nz), rtol=1e-6)
+                else:
+                    np.testing.assert_allclose(z_grid, np.linspace(-3., 3., self.nz), rtol=1e-6)
+
+    def test_change_orientation(self):
+        # grid of different size in each direction, with a velocity field given by its coordinates
+        grid = [np.linspace(-4., 0., 6), np.linspace(-1.5, 3., 5), np.linspace(2., 5., 4)]
+        gradient = np.random.rand(3, 3)
+        vel = velocity_field(np.meshgrid(*grid, indexing='ij'), gradient)
+
+        orientations = right_handed_orientations()
+        self.assertEqual(len(orientations), 24)
+        for orientation, position_in_old, sign in orientations:
+            with self.subTest(orientation=orientation):
+                new_x_grid, new_y_grid, new_z_grid, new_vel = \
+                    turbvelocityfieldbts.TurbVelocityFieldBts.change_orientation(*grid, vel, orientation)
+                new_grid = [new_x_grid, new_y_grid, new_z_grid]
+                for i_dim in range(3):
+                    expected_grid = grid[position_in_old[i_dim]]*sign[i_dim]
+                    if sign[i_dim] == -1:
+                        expected_grid = expected_grid[::-1]
+                    np.testing.assert_array_equal(new_grid[i_dim], expected_grid)
+
+                # the new field is the old one, with the components and coordinates in the new axes
+                new_coords = np.meshgrid(*new_grid, indexing='ij')
+                old_coords = [None]*3
+                for i_dim in range(3):
+                    old_coords[position_in_old[i_dim]] = sign[i_dim]*new_coords[i_dim]
+                old_vel = velocity_field(old_coords, gradient)
+                expected_vel = np.array([sign[i_vel]*old_vel[position_in_old[i_vel]] for i_vel in range(3)])
+                np.testing.assert_allclose(new_vel, expected_vel, rtol=1e-12, atol=1e-12)
+                if orientation == 'xyz':
+                    np.testing.assert_array_equal(new_vel, vel)
+
+    def test_cache(self):
+        cache_file = self.bts + '.npz'
+        generator = self.generator(new_orientation='-xzy', cache_field=True)
+        self.assertTrue(os.path.isfile(cache_file))
+        self.assertFalse(os.path.isfile(cache_file + '.tmp'))
+
+        # the field is not read again with the same file and settings
+        with mock.patch.object(turbvelocityfieldbts.TurbVelocityFieldBts, 'read_turbsim_bts',
+                               side_effect=AssertionError('the BTS file should not be read')):
+            cached = self.generator(new_orientation='-xzy', cache_field=True)
+        for name in ('x_grid', 'y_grid', 'z_grid', 'vel'):
+            np.testing.assert_array_equal(getattr(cached, name), getattr(generator, name))
+
+        # other settings are not taken from the cache
+        generator = self.generator(new_orientation='xyz', cache_field=True)
+        np.testing.assert_array_equal(generator.vel, read_bts_reference(self.samples, self.scaling, self.offset))
+
+        # same size and new modification time
+        stat = os.stat(self.bts)
+        samples = self.samples[::-1].copy()
+        write_bts(self.bts, samples, self.scaling, self.offset)
+        os.utime(self.bts, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(os.stat(self.bts).st_size, stat.st_size)
+        generator = self.generator(new_orientation='xyz', cache_field=True)
+        np.testing.assert_array_equal(generator.vel, read_bts_reference(samples, self.scaling, self.offset))
+
+        # new size and same modification time
+        stat = os.stat(self.bts)
+        samples = samples[:-1].copy()
+        write_bts(self.bts, samples, self.scaling, self.offset)
+        os.utime(self.bts, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        generator = self.generator(new_orientation='xyz', cache_field=True)
+        self.assertEqual(generator.vel.shape[1], self.ntime_steps - 1)
+        np.testing.assert_array_equal(generator.vel, read_bts_reference(samples, self.scaling, self.offset))
+
+        # custom sidecar file
+        custom_cache_file = self.route + '/custom.npz'
+        self.generator(cache_field=True, cache_file=custom_cache_file)
+        self.assertTrue(os.path.isfile(custom_cache_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
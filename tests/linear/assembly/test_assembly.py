@@ -1065,6 +1065,36 @@ class Test_assembly(unittest.TestCase):
                 'Prop. from trailing edge not correct'
 
 
+    def test_aics(self):
+
+        self.start_writer()
+        MS = self.MS
+        AIC_list, AIC_star_list = assembly.AICs(MS.Surfs, MS.Surfs_star, target='collocation', Project=True)
+
+        # reference: panel by panel
+        Surf_out = MS.Surfs[0]
+        for Surf_in, aic in zip([MS.Surfs[0], MS.Surfs_star[0]], [AIC_list[0][0], AIC_star_list[0][0]]):
+            for cc_out in range(Surf_out.maps.K):
+                mm_out = Surf_out.maps.ind_2d_pan_scal[0][cc_out]
+                nn_out = Surf_out.maps.ind_2d_pan_scal[1][cc_out]
+                aic3 = Surf_in.get_aic3(Surf_out.zetac[:, mm_out, nn_out])
+                aic_ref = np.dot(Surf_out.normals[:, mm_out, nn_out], aic3)
+                assert np.max(np.abs(aic[cc_out, :] - aic_ref)) < 1e-12, \
+                    'Vectorised AIC not consistent with panel by panel AIC'
+
+        # parallel and cached assembly
+        assembly.clear_aic_cache()
+        for aic_settings in [{'num_workers': 2, 'executor': 'thread'},
+                             {'use_cache': True},
+                             {'use_cache': True}]:
+            AIC_list_here, AIC_star_list_here = assembly.AICs(MS.Surfs, MS.Surfs_star, **aic_settings)
+            for aic_row, aic_row_here in zip(AIC_list + AIC_star_list, AIC_list_here + AIC_star_list_here):
+                for aic, aic_here in zip(aic_row, aic_row_here):
+                    assert np.max(np.abs(aic - aic_here)) < 1e-15, \
+                        'AIC assembly with %s not consistent' % str(aic_settings)
+        assert len(assembly._aic_cache) == 1, 'AIC cache not reused'
+        assembly.clear_aic_cache()
+
     def start_writer(self):
         # Over write writer with print_file False to avoid I/O errors
         global cout_wrap
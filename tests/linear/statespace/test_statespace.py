@@ -116,6 +116,16 @@ class Test_dlti(unittest.TestCase):
         er = np.max(np.abs(Y - Y1))
         assert er < 1e-10, 'Test on freqresp failed'
 
+        for method in ['schur', 'sparse_lu']:
+            for system in [SS, SSsp]:
+                Ymethod = system.freqresp(kv, method=method)
+                er = np.max(np.abs(Y - Ymethod))
+                assert er < 1e-10, 'Test on freqresp with method %s failed' % method
+
+        Yproc = SSsp.freqresp(kv, method='sparse_lu', num_processes=2)
+        er = np.max(np.abs(Y - Yproc))
+        assert er < 1e-10, 'Test on freqresp over multiple processes failed'
+
     def test_couple(self):
         dt = .2
         Nx1, Nu1, Ny1 = 3, 4, 2
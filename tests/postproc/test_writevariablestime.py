@@ -0,0 +1,129 @@
+import h5py
+import numpy as np
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+import sharpy.postproc.writevariablestime as writevariablestime
+
+
+class TestWriteVariablesTime(unittest.TestCase):
+    """
+    Writes synthetic time steps with several flush strides and compares the text and ``variables.h5`` outputs
+    """
+
+    n_tsteps = 7
+    num_node = 5
+
+    def setUp(self):
+        np.random.seed(3)
+        self.route = tempfile.mkdtemp()
+
+        self.tsteps = []
+        self.aero_tsteps = []
+        for its in range(self.n_tsteps):
+            self.tsteps.append(types.SimpleNamespace(for_vel=np.random.rand(6),
+                                                     for_pos=np.random.rand(6),
+                                                     pos=np.random.rand(self.num_node, 3),
+                                                     psi=np.random.rand(2, 3, 3)))
+            self.aero_tsteps.append(types.SimpleNamespace(gamma=[np.random.rand(2, 3), np.random.rand(3, 2)],
+                                                          zeta=[np.random.rand(3, 3, 4), np.random.rand(3, 4, 3)]))
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def run_steps(self, **kwargs):
+        output_folder = self.route + '/%02d' % len(os.listdir(self.route))
+        settings = {'FoR_variables': ['for_vel'],
+                    'structure_variables': ['pos', 'psi'],
+                    'structure_nodes': [0, 3],
+                    'aero_nodes_variables': ['zeta'],
+                    'aero_nodes_isurf': [0, 1],
+                    'aero_nodes_im': [1, 2],
+                    'aero_nodes_in': [2, 0],
+                    'h5_output': True}
+        settings.update(kwargs)
+        data = types.SimpleNamespace(settings={'WriteVariablesTime': settings},
+                                     output_folder=output_folder,
+                                     structure=types.SimpleNamespace(timestep_info=[],
+                                                                     node_master_elem=np.array([[0, 0],
+                                                                                                [0, 2],
+                                                                                                [0, 1],
+                                                                                                [1, 2],
+                                                                                                [1, 1]])),
+                                     aero=types.SimpleNamespace(timestep_info=[]))
+
+        postproc = writevariablestime.WriteVariablesTime()
+        postproc.initialise(data)
+        for its in range(self.n_tsteps):
+            data.ts = its
+            data.structure.timestep_info.append(self.tsteps[its])
+            data.aero.timestep_info.append(self.aero_tsteps[its])
+            postproc.run(online=True)
+        postproc.teardown()
+        return output_folder + '/WriteVariablesTime/'
+
+    def read_files(self, folder):
+        files = dict()
+        for filename in os.listdir(folder):
+            if filename.endswith('.dat'):
+                with open(folder + filename, 'rb') as fid:
+                    files[filename] = fid.read()
+        return files
+
+    def test_text_output(self):
+        reference = self.read_files(self.run_steps(flush_stride=1))
+        self.assertEqual(len(reference), 7)
+
+        # the rows of the legacy writer
+        rows = reference['FoR_00_for_vel.dat'].decode().splitlines()
+        self.assertEqual(len(rows), self.n_tsteps)
+        self.assertEqual(rows[2], '2 ' + ' '.join(['%e' % value for value in self.tsteps[2].for_vel]))
+        rows = reference['struct_psi_node3.dat'].decode().splitlines()
+        self.assertEqual(rows[4], '4 ' + ' '.join(['%e' % value for value in self.tsteps[4].psi[1, 2, :]]) + ' ')
+
+        for flush_stride in (3, 100):
+            with self.subTest(flush_stride=flush_stride):
+                self.assertEqual(self.read_files(self.run_steps(flush_stride=flush_stride)), reference)
+
+    def test_buffered_steps(self):
+        # only the complete strides are in the files until teardown
+        postproc = writevariablestime.WriteVariablesTime()
+        data = types.SimpleNamespace(settings={'WriteVariablesTime': {'FoR_variables': ['for_vel'],
+                                                                      'flush_stride': 3}},
+                                     output_folder=self.route,
+                                     structure=types.SimpleNamespace(timestep_info=[]))
+        postproc.initialise(data)
+        filename = self.route + '/WriteVariablesTime/FoR_00_for_vel.dat'
+        for its in range(5):
+            data.ts = its
+            data.structure.timestep_info.append(self.tsteps[its])
+            postproc.run(online=True)
+        with open(filename) as fid:
+            self.assertEqual(len(fid.readlines()), 3)
+        postproc.teardown()
+        with open(filename) as fid:
+            self.assertEqual(len(fid.readlines()), 5)
+
+    def test_h5_output(self):
+        for flush_stride in (1, 3):
+            with self.subTest(flush_stride=flush_stride):
+                folder = self.run_steps(flush_stride=flush_stride, text_output=False)
+                self.assertEqual(self.read_files(folder), dict())
+                with h5py.File(folder + 'variables.h5', 'r') as h5file:
+                    np.testing.assert_array_equal(h5file['ts'][()], np.arange(self.n_tsteps))
+                    # the FoR variables are written as rows
+                    np.testing.assert_array_equal(h5file['FoR_00_for_vel'][()],
+                                                  [tstep.for_vel[None, :] for tstep in self.tsteps])
+                    np.testing.assert_array_equal(h5file['struct_pos_node3'][()],
+                                                  [tstep.pos[3, :] for tstep in self.tsteps])
+                    np.testing.assert_array_equal(h5file['struct_psi_node3'][()],
+                                                  [tstep.psi[1, 2, :] for tstep in self.tsteps])
+                    np.testing.assert_array_equal(h5file['aero_zeta_node_isurf1_im2_in0'][()],
+                                                  [tstep.zeta[1][:, 2, 0] for tstep in self.aero_tsteps])
+
+
+if __name__ == '__main__':
+    unittest.main()
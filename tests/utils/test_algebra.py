@@ -142,6 +142,21 @@ class TestAlgebra(unittest.TestCase):
         assert np.linalg.norm(Cgb - Cgb_exp) < 1e-15, \
             'combined rotation not as expected!'
 
+        ### vectorised crv2rotation
+        crv_vec = np.pi * (2. * np.random.rand(20, 3) - 1)
+        crv_vec[0, :] = 0.
+        crv_vec[1, :] = 1e-16
+        Cab_vec = algebra.crv2rotation_vec(crv_vec)
+        for i_crv in range(crv_vec.shape[0]):
+            assert np.linalg.norm(Cab_vec[i_crv] - algebra.crv2rotation(crv_vec[i_crv])) < 1e-14, \
+                'crv2rotation_vec not consistent with crv2rotation'
+
+        crv_vec[1, :] = 1e-9
+        tan_vec = algebra.crv2tan_vec(crv_vec)
+        for i_crv in range(crv_vec.shape[0]):
+            assert np.linalg.norm(tan_vec[i_crv] - algebra.crv2tan(crv_vec[i_crv])) < 1e-14, \
+                'crv2tan_vec not consistent with crv2tan'
+
     def test_rotation_matrices_derivatives(self):
         """
         Checks derivatives of rotation matrix derivatives with respect to
@@ -0,0 +1,139 @@
+import ctypes as ct
+import os
+import shutil
+import unittest
+import numpy as np
+import sharpy.utils.checkpoint as checkpoint
+import sharpy.utils.datastructures as datastructures
+
+
+class Model:
+    pass
+
+
+class TestIncrementalCheckpoint(unittest.TestCase):
+    """
+    Tests the incremental checkpoint files
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+    def setUp(self):
+        self.output_folder = self.route_test_dir + '/output/'
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+
+    def test_checkpoint(self):
+        num_node = 5
+        data = Model()
+        data.ts = 0
+        data.structure = Model()
+        data.structure.stiffness = np.random.rand(100, 100)
+        data.structure.timestep_info = [datastructures.StructTimeStepInfo(num_node, 2, 3,
+                                                                         ct.c_int(6*(num_node - 1)))]
+        solvers = {'solver': Model()}
+        solvers['solver'].data = data
+
+        filename = self.output_folder + 'case.ckpt'
+        writer = checkpoint.CheckpointWriter(filename, data)
+        checkpoint_size = []
+        for i_step in range(1, 10):
+            data.ts = i_step
+            data.structure.timestep_info.append(data.structure.timestep_info[-1].copy())
+            data.structure.timestep_info[-1].pos[:] = i_step
+            file_size = os.path.getsize(filename)
+            writer.write(data, solvers)
+            checkpoint_size.append(os.path.getsize(filename) - file_size)
+
+        # model data is only written once and the cost does not grow with the number of time steps
+        self.assertLess(checkpoint_size[-1], checkpoint_size[0])
+        self.assertLess(checkpoint_size[-1], 1.1*checkpoint_size[1])
+
+        self.assertTrue(checkpoint.is_checkpoint(filename))
+        loaded_data, loaded_solvers = checkpoint.load_checkpoint(filename)
+        self.assertIs(loaded_solvers['solver'].data, loaded_data)
+        self.assertEqual(loaded_data.ts, 9)
+        np.testing.assert_array_equal(loaded_data.structure.stiffness, data.structure.stiffness)
+
+        timestep_info = loaded_data.structure.timestep_info
+        self.assertEqual(len(timestep_info), 10)
+        # time steps are loaded when accessed
+        self.assertFalse(timestep_info.is_loaded(4))
+        np.testing.assert_array_equal(timestep_info[4].pos, 4)
+        self.assertTrue(timestep_info.is_loaded(4))
+
+        # restarted simulations append to the same file
+        writer = checkpoint.CheckpointWriter(filename, loaded_data)
+        loaded_data.ts = 10
+        timestep_info.append(timestep_info[-1].copy())
+        timestep_info[-1].pos[:] = 10
+        writer.write(loaded_data, loaded_solvers)
+
+        loaded_data, loaded_solvers = checkpoint.load_checkpoint(filename)
+        self.assertEqual(len(loaded_data.structure.timestep_info), 11)
+        np.testing.assert_array_equal(loaded_data.structure.timestep_info[2].pos, 2)
+        np.testing.assert_array_equal(loaded_data.structure.timestep_info[10].pos, 10)
+
+    def test_modified_after_checkpoint(self):
+        # the postprocessors that run after PickleData modify the time step that has just been checkpointed
+        num_node = 5
+        data = Model()
+        data.ts = 0
+        data.structure = Model()
+        data.structure.timestep_info = [datastructures.StructTimeStepInfo(num_node, 2, 3,
+                                                                         ct.c_int(6*(num_node - 1)))]
+
+        filename = self.output_folder + 'case.ckpt'
+        writer = checkpoint.CheckpointWriter(filename, data)
+        for i_step in range(1, 6):
+            data.ts = i_step
+            data.structure.timestep_info.append(data.structure.timestep_info[-1].copy())
+            # checkpoints every two time steps
+            if i_step % 2 == 0:
+                writer.write(data)
+            data.structure.timestep_info[-1].postproc_cell['loads'] = np.ones((num_node, 6))*i_step
+        writer.write(data)
+
+        loaded_data, loaded_solvers = checkpoint.load_checkpoint(filename)
+        timestep_info = loaded_data.structure.timestep_info
+        for i_step in range(1, 6):
+            np.testing.assert_array_equal(timestep_info[i_step].postproc_cell['loads'], i_step)
+
+    def test_timestep_history(self):
+        num_node = 5
+        data = Model()
+        data.ts = 0
+        data.structure = Model()
+        data.structure.timestep_info = datastructures.TimeStepHistory(
+            [datastructures.StructTimeStepInfo(num_node, 2, 3, ct.c_int(6*(num_node - 1)))],
+            retention=3)
+
+        filename = self.output_folder + 'case.ckpt'
+        writer = checkpoint.CheckpointWriter(filename, data)
+        for i_step in range(1, 8):
+            data.ts = i_step
+            data.structure.timestep_info.append(data.structure.timestep_info[-1].copy())
+            data.structure.timestep_info[-1].pos[:] = i_step
+            writer.write(data)
+
+        loaded_data, loaded_solvers = checkpoint.load_checkpoint(filename)
+        timestep_info = loaded_data.structure.timestep_info
+        self.assertIsInstance(timestep_info, datastructures.TimeStepHistory)
+        self.assertEqual(timestep_info.retention, 3)
+        self.assertEqual(len(timestep_info), 8)
+        self.assertIsNotNone(timestep_info[0])
+        self.assertIsNone(timestep_info[3])
+        for i_step in range(5, 8):
+            np.testing.assert_array_equal(timestep_info[i_step].pos, i_step)
+
+        # the history keeps evicting time steps after the restart
+        timestep_info.append(timestep_info[-1].copy())
+        self.assertIsNone(timestep_info[4])
+
+    def tearDown(self):
+        if os.path.isdir(self.output_folder):
+            shutil.rmtree(self.output_folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
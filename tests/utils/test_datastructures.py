@@ -0,0 +1,148 @@
+import ctypes as ct
+import os
+import shutil
+import numpy as np
+import unittest
+import sharpy.utils.datastructures as datastructures
+
+
+class TestTimeStepCopy(unittest.TestCase):
+    """
+    Tests the in place copy of the time step information classes
+    """
+
+    def test_struct_copy_inplace(self):
+        num_node = 5
+        num_elem = 2
+        tstep = datastructures.StructTimeStepInfo(num_node, num_elem, 3, ct.c_int(6*(num_node - 1)))
+        tstep.pos[:] = np.random.rand(num_node, 3)
+        tstep.psi[:] = np.random.rand(num_elem, 3, 3)
+        tstep.q[:] = np.random.rand(len(tstep.q))
+        tstep.postproc_node['aero_steady_forces'] = np.random.rand(num_node, 6)
+
+        buffer = tstep.copy()
+        buffer_pos = buffer.pos
+        buffer_forces = buffer.postproc_node['aero_steady_forces']
+
+        tstep.pos[:] = np.random.rand(num_node, 3)
+        tstep.q[:] = np.random.rand(len(tstep.q))
+        tstep.postproc_node['aero_steady_forces'][:] = 1.
+        tstep.postproc_cell['new_variable'] = [np.ones((2,))]
+
+        copied = tstep.copy(out=buffer)
+        self.assertIs(copied, buffer)
+        # memory is reused
+        self.assertIs(copied.pos, buffer_pos)
+        self.assertIs(copied.postproc_node['aero_steady_forces'], buffer_forces)
+        # but not shared with the source
+        self.assertIsNot(copied.pos, tstep.pos)
+        self.assertIsNot(copied.postproc_cell['new_variable'][0], tstep.postproc_cell['new_variable'][0])
+
+        for attr in datastructures.StructTimeStepInfo._array_attributes:
+            np.testing.assert_array_equal(getattr(copied, attr), getattr(tstep, attr))
+        np.testing.assert_array_equal(copied.postproc_node['aero_steady_forces'], 1.)
+
+    def test_aero_copy_inplace(self):
+        dimensions = np.array([[3, 4], [2, 4]], dtype=int)
+        dimensions_star = np.array([[10, 4], [10, 4]], dtype=int)
+        tstep = datastructures.AeroTimeStepInfo(dimensions, dimensions_star)
+        for i_surf in range(tstep.n_surf):
+            tstep.zeta[i_surf][:] = np.random.rand(*tstep.zeta[i_surf].shape)
+            tstep.gamma_star[i_surf][:] = np.random.rand(*tstep.gamma_star[i_surf].shape)
+
+        buffer = tstep.copy()
+        buffer_zeta = buffer.zeta[1]
+
+        for i_surf in range(tstep.n_surf):
+            tstep.zeta[i_surf][:] = np.random.rand(*tstep.zeta[i_surf].shape)
+            tstep.gamma_star[i_surf][:] = np.random.rand(*tstep.gamma_star[i_surf].shape)
+
+        copied = tstep.copy(out=buffer)
+        self.assertIs(copied.zeta[1], buffer_zeta)
+        for attr in datastructures.AeroTimeStepInfo._array_attributes:
+            source = getattr(tstep, attr)
+            target = getattr(copied, attr)
+            if isinstance(source, list):
+                for i_surf in range(tstep.n_surf):
+                    np.testing.assert_array_equal(target[i_surf], source[i_surf])
+            else:
+                np.testing.assert_array_equal(target, source)
+
+    def test_aero_packed_storage(self):
+        dimensions = np.array([[3, 4], [2, 5]], dtype=int)
+        dimensions_star = np.array([[10, 4], [10, 5]], dtype=int)
+        tstep = datastructures.AeroTimeStepInfo(dimensions, dimensions_star, packed=True)
+
+        for name in datastructures.AeroTimeStepInfo._packed_attributes:
+            offsets = tstep.packed_offsets[name]
+            for i_surf in range(tstep.n_surf):
+                array = getattr(tstep, name)[i_surf]
+                array[:] = np.random.rand(*array.shape)
+                np.testing.assert_array_equal(tstep.packed_storage[name][offsets[i_surf]:offsets[i_surf + 1]],
+                                              array.reshape(-1))
+
+        # pointer tables are kept between calls
+        tstep.generate_ctypes_pointers()
+        p_gamma = tstep.ct_p_gamma
+        tstep.remove_ctypes_pointers()
+        tstep.generate_ctypes_pointers()
+        self.assertIs(tstep.ct_p_gamma, p_gamma)
+
+        # replaced arrays are copied back into the packed storage
+        tstep.gamma[1] = np.ones_like(tstep.gamma[1])
+        tstep.generate_ctypes_pointers()
+        self.assertIs(tstep.ct_p_gamma, p_gamma)
+        self.assertTrue(np.shares_memory(tstep.gamma[1], tstep.packed_storage['gamma']))
+        np.testing.assert_array_equal(tstep.packed_storage['gamma'][tstep.packed_offsets['gamma'][1]:], 1.)
+
+        copied = tstep.copy()
+        self.assertTrue(copied.packed)
+        for i_surf in range(tstep.n_surf):
+            self.assertTrue(np.shares_memory(copied.zeta[i_surf], copied.packed_storage['zeta']))
+            np.testing.assert_array_equal(copied.zeta[i_surf], tstep.zeta[i_surf])
+
+
+class TestTimeStepHistory(unittest.TestCase):
+    """
+    Tests the bounded time step history
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+    def setUp(self):
+        self.output_folder = self.route_test_dir + '/output/'
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+
+    def test_retention_and_spill(self):
+        num_node = 3
+        spill_filename = self.output_folder + 'history.h5'
+        ini_step = datastructures.StructTimeStepInfo(num_node, 1, 3, ct.c_int(6*(num_node - 1)))
+        history = datastructures.TimeStepHistory([ini_step], retention=3, spill_filename=spill_filename)
+
+        n_steps = 10
+        for i_step in range(1, n_steps):
+            tstep = history[-1].copy()
+            tstep.pos[:] = i_step
+            history.append(tstep)
+
+        self.assertEqual(len(history), n_steps)
+        # initial step and retention window are kept in memory
+        self.assertIsNotNone(history[0])
+        for i_step in range(1, n_steps - 3):
+            self.assertIsNone(history[i_step])
+        for i_step in range(n_steps - 3, n_steps):
+            np.testing.assert_array_equal(history[i_step].pos, i_step)
+
+        # evicted steps are available in the spill file
+        spilled = history.load(4)
+        np.testing.assert_array_equal(spilled.pos, 4)
+        history.close()
+
+    def tearDown(self):
+        if os.path.isdir(self.output_folder):
+            shutil.rmtree(self.output_folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import ctypes as ct
+import os
+import shutil
+import unittest
+import h5py
+import numpy as np
+import sharpy.utils.datastructures as datastructures
+import sharpy.utils.h5utils as h5utils
+
+
+class TestTimeSeriesWriter(unittest.TestCase):
+    """
+    Tests the writing of time steps as extendable datasets
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+    def setUp(self):
+        self.output_folder = self.route_test_dir + '/output/'
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+
+    def write_steps(self, n_steps, background):
+        num_node = 4
+        filename = self.output_folder + 'time_series.h5'
+        tstep = datastructures.StructTimeStepInfo(num_node, 2, 3, ct.c_int(6*(num_node - 1)))
+        with h5py.File(filename, 'w') as hdfile:
+            writer = h5utils.TimeSeriesWriter(hdfile, compression='gzip', background=background)
+            for i_step in range(n_steps):
+                tstep.pos[:] = i_step
+                if i_step >= 2:
+                    tstep.postproc_node['variable'] = i_step*np.ones((num_node, 6))
+                values = h5utils.time_series_values(tstep)
+                values['ts'] = i_step
+                writer.append({'structure/time_series': values})
+            writer.close()
+
+        return h5utils.readh5(filename).structure.time_series
+
+    def test_append(self):
+        n_steps = 5
+        for background in [False, True]:
+            with self.subTest(background=background):
+                series = self.write_steps(n_steps, background)
+
+                np.testing.assert_array_equal(series['ts'], np.arange(n_steps))
+                self.assertEqual(series['pos'].shape, (n_steps, 4, 3))
+                for i_step in range(n_steps):
+                    np.testing.assert_array_equal(series['pos'][i_step], i_step)
+                # variables appearing later are padded
+                self.assertTrue(np.isnan(series['postproc_node']['variable'][:2]).all())
+                np.testing.assert_array_equal(series['postproc_node']['variable'][4], 4.)
+
+    def tearDown(self):
+        if os.path.isdir(self.output_folder):
+            shutil.rmtree(self.output_folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import h5py as h5
+import numpy as np
+import shutil
+import tempfile
+import unittest
+
+import sharpy.utils.algebra as algebra
+import sharpy.utils.generate_cases as gc
+import sharpy.utils.h5utils as h5utils
+import sharpy.utils.multibody as mb
+import sharpy.structure.models.beam as beam
+
+
+def random_quat():
+    quat = np.random.rand(4) - 0.5
+    return quat/np.linalg.norm(quat)
+
+
+class TestMultibodyViews(unittest.TestCase):
+    """
+    Compares the split and merge of a multibody structure into persistent bodies with
+    :func:`~sharpy.utils.multibody.split_multibody` and :func:`~sharpy.utils.multibody.merge_multibody`
+    """
+
+    body_movement = ('free', 'prescribed', 'free')
+
+    def setUp(self):
+        np.random.seed(11)
+        self.route = tempfile.mkdtemp()
+
+        # three bodies of different number of nodes, the first one clamped
+        bodies = []
+        for ibody, num_node in enumerate((5, 7, 9)):
+            body = gc.StructuralInformation()
+            node_pos = np.zeros((num_node, 3))
+            node_pos[:, 0] = np.linspace(0., 1., num_node) + ibody
+            body.generate_uniform_sym_beam(node_pos, 1., 1e-2, 1e6, 1e6, 1e4, 1e4, num_node_elem=3,
+                                           y_BFoR='y_AFoR', num_lumped_mass=0)
+            body.body_number = np.zeros((body.num_elem,), dtype=int)
+            body.boundary_conditions[0] = 1
+            body.boundary_conditions[-1] = -1
+            bodies.append(body)
+        bodies[0].assembly_structures(*bodies[1:])
+        bodies[0].generate_fem_file(self.route, 'multibody')
+        with h5.File(self.route + '/multibody.fem.h5', 'r') as fem_file_handle:
+            fem_dict = h5utils.load_h5_in_dict(fem_file_handle)
+
+        mb_dict = {'num_bodies': len(self.body_movement), 'num_constraints': 0}
+        for ibody, movement in enumerate(self.body_movement):
+            mb_dict['body_%02d' % ibody] = {'FoR_movement': movement,
+                                            'FoR_position': np.random.rand(6),
+                                            'FoR_velocity': np.random.rand(6),
+                                            'FoR_acceleration': np.random.rand(6),
+                                            'quat': random_quat()}
+        self.mb_dict = mb_dict
+
+        self.beam = beam.Beam()
+        self.beam.ini_mb_dict = mb_dict
+        self.beam.generate(fem_dict, {'orientation': np.array([1., 0., 0., 0.]),
+                                      'for_pos': np.zeros((3,)),
+                                      'unsteady': False})
+        self.assertEqual(self.beam.num_bodies, 3)
+
+        # previous and current time steps with random states
+        self.randomise(self.beam.timestep_info[-1])
+        self.tstep = self.beam.timestep_info[-1].copy()
+        self.randomise(self.tstep)
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+    def randomise(self, tstep):
+        for attr in ('pos', 'pos_dot', 'pos_ddot', 'psi', 'psi_dot', 'psi_ddot', 'steady_applied_forces',
+                     'unsteady_applied_forces', 'runtime_steady_forces', 'runtime_unsteady_forces',
+                     'gravity_forces', 'q', 'dqdt', 'dqddt', 'for_pos', 'for_vel', 'for_acc', 'mb_FoR_pos',
+                     'mb_FoR_vel', 'mb_FoR_acc', 'mb_dquatdt'):
+            getattr(tstep, attr)[:] = np.random.rand(*getattr(tstep, attr).shape)
+        tstep.quat[:] = random_quat()
+        for ibody in range(self.beam.num_bodies):
+            tstep.mb_quat[ibody, :] = random_quat()
+
+    def solve(self, MB_tstep):
+        """
+        Same modification of the bodies as a structural iteration would do
+        """
+        for ibody, tstep in enumerate(MB_tstep):
+            increment = np.arange(1, 2 + ibody)
+            tstep.pos += 0.01*increment.sum()
+            tstep.pos_dot -= 0.02
+            tstep.psi *= 0.9
+            tstep.psi_dot += 0.1
+            tstep.psi_ddot += 0.2
+            tstep.q += 0.3*np.sin(np.arange(len(tstep.q)))
+            tstep.dqdt += 0.1
+            tstep.dqddt -= 0.1
+            tstep.mb_dquatdt[ibody, :] = tstep.dqddt[-4:]
+            tstep.for_pos += 0.05
+            tstep.for_vel += 0.01
+            tstep.for_acc *= 2.
+            tstep.quat = algebra.quaternion_product(tstep.quat, algebra.rotation2quat(algebra.rotation3d_z(0.1)))
+            tstep.forces_constraints_nodes[:] = ibody + 1.
+            tstep.forces_constraints_FoR[ibody, :] = -ibody - 1.
+
+    def assert_tstep_equal(self, tstep, ref_tstep):
+        for attr in tstep._array_attributes:
+            value = getattr(tstep, attr)
+            ref_value = getattr(ref_tstep, attr)
+            if ref_value is None:
+                self.assertIsNone(value, msg=attr)
+            else:
+                np.testing.assert_array_equal(value, ref_value, err_msg=attr)
+        self.assertEqual(tstep.in_global_AFoR, ref_tstep.in_global_AFoR)
+
+    def test_split(self):
+        views = mb.MultibodyViews(self.beam)
+        for ts in (1, 2):
+            with self.subTest(ts=ts):
+                MB_beam, MB_tstep = mb.split_multibody(self.beam, self.tstep, self.mb_dict, ts, views=views)
+                ref_MB_beam, ref_MB_tstep = mb.split_multibody(self.beam, self.tstep, self.mb_dict, ts)
+
+                self.assertEqual(len(MB_beam), 3)
+                for ibody in range(3):
+                    self.assertIs(MB_beam[ibody], views.MB_beam[ibody])
+                    self.assertIs(MB_tstep[ibody], views.MB_tstep[ibody])
+                    self.assertEqual(MB_beam[ibody].FoR_movement, self.body_movement[ibody])
+                    self.assertEqual(MB_beam[ibody].num_dof.value, ref_MB_beam[ibody].num_dof.value)
+                    self.assert_tstep_equal(MB_tstep[ibody], ref_MB_tstep[ibody])
+                    self.assert_tstep_equal(MB_beam[ibody].ini_info, ref_MB_beam[ibody].ini_info)
+                    self.assert_tstep_equal(MB_beam[ibody].timestep_info, ref_MB_beam[ibody].timestep_info)
+
+    def test_split_solve_merge(self):
+        views = mb.MultibodyViews(self.beam)
+        tstep = self.tstep.copy()
+        ref_tstep = self.tstep.copy()
+        for ts in (1, 2, 3):
+            with self.subTest(ts=ts):
+                MB_beam, MB_tstep = mb.split_multibody(self.beam, tstep, self.mb_dict, ts, views=views)
+                self.solve(MB_tstep)
+                # arrays of the time step before merging
+                for_pos = tstep.for_pos
+                quat = tstep.quat
+                old_for_pos = for_pos.copy()
+                old_quat = quat.copy()
+                mb.merge_multibody(MB_tstep, MB_beam, self.beam, tstep, self.mb_dict, 0.1, views=views)
+
+                ref_MB_beam, ref_MB_tstep = mb.split_multibody(self.beam, ref_tstep, self.mb_dict, ts)
+                self.solve(ref_MB_tstep)
+                mb.merge_multibody(ref_MB_tstep, ref_MB_beam, self.beam, ref_tstep, self.mb_dict, 0.1)
+
+                self.assert_tstep_equal(tstep, ref_tstep)
+                self.assertFalse(np.array_equal(tstep.for_pos, self.tstep.for_pos))
+
+                # the frame of reference of the time step is replaced, not overwritten
+                self.assertIsNot(tstep.for_pos, for_pos)
+                self.assertIsNot(tstep.quat, quat)
+                np.testing.assert_array_equal(for_pos, old_for_pos)
+                np.testing.assert_array_equal(quat, old_quat)
+
+                # the merged time step does not share memory with the bodies
+                for ibody in range(3):
+                    for attr in tstep._array_attributes:
+                        if getattr(MB_tstep[ibody], attr) is not None:
+                            self.assertFalse(np.shares_memory(getattr(tstep, attr),
+                                                              getattr(MB_tstep[ibody], attr)), msg=attr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import unittest
+import numpy as np
+import sharpy.utils.profiling as profiling
+
+
+class Solver(object):
+    solver_id = 'Solver'
+
+    def initialise(self, data):
+        self.data = data
+
+    def run(self, n_steps):
+        for ts in range(n_steps):
+            profiling.begin_step()
+            with profiling.timer('stage_a'):
+                self.step()
+            with profiling.timer('stage_b'):
+                profiling.count('iterations', 2)
+            profiling.end_step(ts)
+        return self.data
+
+    def step(self):
+        pass
+
+
+class ChildSolver(Solver):
+    solver_id = 'ChildSolver'
+
+
+class TestProfiler(unittest.TestCase):
+    """
+    Tests the pipeline profiler
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+    def setUp(self):
+        self.output_folder = self.route_test_dir + '/output/profiling/'
+        profiling.register(Solver, Solver.solver_id, ['initialise', 'run'])
+        profiling.register(ChildSolver, ChildSolver.solver_id, ['initialise', 'run'])
+
+    def test_disabled(self):
+        profiling.profiler.stop()
+        profiling.profiler.reset()
+        solver = Solver()
+        solver.initialise(1)
+        self.assertEqual(solver.run(3), 1)
+        self.assertEqual(profiling.profiler.times, dict())
+        self.assertEqual(profiling.profiler.steps, [])
+
+    def test_profiler(self):
+        profiling.profiler.start(self.output_folder, 'case', ['csv', 'h5'])
+        solver = ChildSolver()
+        solver.initialise(1)
+        solver.run(3)
+        with profiling.timer('other'):
+            other_solver = Solver()
+            other_solver.initialise(2)
+            other_solver.run(1)
+
+        times = profiling.profiler.times
+        calls = profiling.profiler.calls
+        # inherited methods are timed with the id of the registered class
+        self.assertIn(('ChildSolver.initialise',), times)
+        self.assertEqual(calls[('ChildSolver.run', 'stage_a')], 3)
+        self.assertEqual(calls[('other', 'Solver.run', 'stage_b')], 1)
+        self.assertEqual(profiling.profiler.counters['iterations'], 8)
+
+        self_times = profiling.profiler.self_times()
+        path = ('ChildSolver.run',)
+        self.assertAlmostEqual(self_times[path] + times[path + ('stage_a',)] + times[path + ('stage_b',)],
+                               times[path])
+
+        columns, table = profiling.profiler.step_table()
+        self.assertEqual(columns[:2], ['ts', 'step_time'])
+        self.assertIn('stage_a', columns)
+        self.assertIn('iterations', columns)
+        np.testing.assert_array_equal(table[:, 0], [0, 1, 2, 0])
+        np.testing.assert_array_equal(table[:, columns.index('iterations')], 2)
+
+        profiling.profiler.finish()
+        self.assertFalse(profiling.profiler.enabled)
+        for extension in ['.profile.txt', '.profile.folded', '.profile_steps.csv', '.profile_steps.h5']:
+            self.assertTrue(os.path.isfile(self.output_folder + 'case' + extension))
+        csv_table = np.loadtxt(self.output_folder + 'case.profile_steps.csv', delimiter=',', skiprows=1)
+        np.testing.assert_array_almost_equal(csv_table, table)
+        with open(self.output_folder + 'case.profile.folded') as folded:
+            self.assertIn('ChildSolver.run;stage_a', folded.read())
+
+    def tearDown(self):
+        profiling.profiler.stop()
+        if os.path.isdir(self.route_test_dir + '/output/'):
+            shutil.rmtree(self.route_test_dir + '/output/')
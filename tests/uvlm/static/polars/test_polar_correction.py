@@ -0,0 +1,279 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import types
+import unittest
+import numpy as np
+
+import sharpy.utils.algebra as algebra
+from sharpy.aero.utils.airfoilpolars import Polar
+from sharpy.aero.utils.utils import magnitude_and_direction_of_relative_velocity, local_stability_axes, span_chord
+from sharpy.generators.polaraeroforces import PolarCorrection
+
+
+def naca0018_polar():
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+    polar_data = np.loadtxt(route_test_dir + '/xf-naca0018-il-50000.txt', skiprows=12)
+    polar = Polar()
+    polar.initialise(np.column_stack((polar_data[:, 0]*np.pi/180, polar_data[:, 1], polar_data[:, 2],
+                                      polar_data[:, 4])))
+    return polar
+
+
+def cambered_polar():
+    aoa = np.linspace(-12., 16., 57)*np.pi/180
+    aoa_cl0 = -2.*np.pi/180
+    # linear lift up to stall
+    cl = 2*np.pi*(aoa - aoa_cl0) - 4.*np.maximum(aoa - 10*np.pi/180, 0.) - 4.*np.minimum(aoa + 8*np.pi/180, 0.)
+    cd = 0.01 + 0.5*(aoa - aoa_cl0)**2
+    cm = -0.05 + 0.1*aoa
+    polar = Polar()
+    polar.initialise(np.column_stack((aoa, cl, cd, cm)))
+    return polar
+
+
+class TestPolar(unittest.TestCase):
+    """
+    Compares the vectorised polar lookups with the scalar ones
+    """
+
+    def setUp(self):
+        self.polars = {'naca0018': naca0018_polar(), 'cambered': cambered_polar()}
+
+    def test_get_coefs_vec(self):
+        for name, polar in self.polars.items():
+            with self.subTest(polar=name):
+                aoa = np.concatenate((np.linspace(polar.table[0, 0], polar.table[-1, 0], 101), polar.table[:, 0]))
+                coefs = polar.get_coefs_vec(aoa)
+                self.assertEqual(coefs.shape, (len(aoa), 3))
+                for i_aoa in range(len(aoa)):
+                    np.testing.assert_allclose(coefs[i_aoa, :], polar.get_coefs(aoa[i_aoa]), rtol=1e-14, atol=1e-14)
+
+    def test_get_cdcm_from_cl_vec(self):
+        for name, polar in self.polars.items():
+            with self.subTest(polar=name):
+                cl_min = np.min(polar.table[:, 1])
+                cl_max = np.max(polar.table[:, 1])
+                # out of range, zero, positive and negative cl, including the values of the table
+                cl = np.concatenate((np.linspace(cl_min - 0.3, cl_max + 0.3, 97),
+                                     [0., -0., cl_min, cl_max],
+                                     polar.table[np.abs(polar.table[:, 0] - polar.aoa_cl0_deg) < 0.1, 1]))
+                out_of_range = (cl < cl_min) | (cl > cl_max)
+                self.assertTrue(out_of_range.any())
+                self.assertTrue((cl[~out_of_range] > 0.).any())
+                self.assertTrue((cl[~out_of_range] < 0.).any())
+
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    cd, cm = polar.get_cdcm_from_cl_vec(cl)
+                # the out of range values are reported as in the scalar version
+                self.assertEqual(output.getvalue().count('out of range'), np.count_nonzero(out_of_range))
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for i_cl in range(len(cl)):
+                        cd_ref, cm_ref = polar.get_cdcm_from_cl(cl[i_cl])
+                        self.assertAlmostEqual(cd[i_cl], cd_ref, 14)
+                        self.assertAlmostEqual(cm[i_cl], cm_ref, 14)
+                np.testing.assert_array_equal(cd[out_of_range], 0.)
+                np.testing.assert_array_equal(cm[out_of_range], 0.)
+
+    def test_interp_segment(self):
+        polar = self.polars['cambered']
+        for i_lo in (0, 10, 30, polar.table.shape[0] - 2):
+            segment = polar.table[i_lo:i_lo + 2, :]
+            cl = np.concatenate((np.linspace(segment[0, 1] - 0.1, segment[1, 1] + 0.1, 31), segment[:, 1]))
+            i_lo_vec = np.full(cl.shape, i_lo)
+            cd, cm = polar._interp_segment(cl, i_lo_vec, i_lo_vec + 1)
+            np.testing.assert_allclose(cd, np.interp(cl, segment[:, 1], segment[:, 2]), rtol=1e-14, atol=1e-14)
+            np.testing.assert_allclose(cm, np.interp(cl, segment[:, 1], segment[:, 3]), rtol=1e-14, atol=1e-14)
+
+
+class TestPolarCorrection(unittest.TestCase):
+    """
+    Compares the vectorised ``PolarCorrection`` with the correction of each node
+    """
+
+    rho = 1.225
+
+    def setUp(self):
+        np.random.seed(5)
+        self.output_folder = tempfile.mkdtemp()
+
+        # Right and left wings sharing the root node 0 and a skipped tail (surface 2). Node 9 is not aerodynamic
+        self.n_node = 10
+        self.n_elem = 5
+        self.surface_nodes = [[0, 1, 2, 3], [0, 4, 5, 6], [7, 8]]
+        struct2aero_mapping = [[] for inode in range(self.n_node)]
+        for i_surf, nodes in enumerate(self.surface_nodes):
+            for i_n, inode in enumerate(nodes):
+                struct2aero_mapping[inode].append({'i_surf': i_surf, 'i_n': i_n})
+        aero_node = np.array([len(mapping) > 0 for mapping in struct2aero_mapping])
+        node_master_elem = np.column_stack((np.arange(self.n_node) // 2, np.arange(self.n_node) % 3))
+
+        self.structure = types.SimpleNamespace(num_node=self.n_node,
+                                               num_elem=self.n_elem,
+                                               node_master_elem=node_master_elem)
+        self.aero = types.SimpleNamespace(
+            aero_dict={'aero_node': aero_node,
+                       'airfoil_distribution': np.random.randint(0, 2, (self.n_elem, 3))},
+            struct2aero_mapping=struct2aero_mapping,
+            aero_dimensions=np.array([[2, len(nodes) - 1] for nodes in self.surface_nodes]),
+            polars=[naca0018_polar(), cambered_polar()])
+
+        # Lattice of the wings, spanning y with the chord along x
+        zeta = []
+        for i_surf, nodes in enumerate(self.surface_nodes):
+            direction = -1. if i_surf == 1 else 1.
+            y = direction*np.linspace(0., 3., len(nodes))
+            x = np.linspace(-0.3, 0.7, 3) + (5. if i_surf == 2 else 0.)
+            surf_zeta = np.zeros((3, 3, len(nodes)))
+            surf_zeta[0] = x[:, None] + 0.2*np.abs(y)[None, :]
+            surf_zeta[1] = y[None, :]
+            surf_zeta += 0.01*np.random.rand(3, 3, len(nodes))
+            zeta.append(surf_zeta)
+        self.aero_kstep = types.SimpleNamespace(
+            zeta=zeta,
+            u_ext=[np.array([10., 0., 0.5])[:, None, None] + 0.3*np.random.rand(*zeta[i_surf].shape)
+                   for i_surf in range(len(zeta))])
+
+        pos = np.zeros((self.n_node, 3))
+        for nodes in self.surface_nodes:
+            pos[nodes, :] = self.aero_kstep.zeta[self.surface_nodes.index(nodes)][:, 1, :].T
+        self.structural_kstep = types.SimpleNamespace(
+            quat=algebra.euler2quat(np.array([0.02, 0.05, -0.01])),
+            pos=pos,
+            pos_dot=0.1*np.random.rand(self.n_node, 3),
+            psi=0.1*np.random.rand(self.n_elem, 3, 3),
+            for_vel=np.concatenate((np.array([0.5, 0., 0.1]), 0.02*np.random.rand(3))))
+
+        # forces normal to the wing give lift coefficients of a few tenths
+        self.struct_forces = np.zeros((self.n_node, 6))
+        self.struct_forces[:, 0] = np.random.uniform(-0.5, 1., self.n_node)
+        self.struct_forces[:, 1] = np.random.uniform(-1., 1., self.n_node)
+        self.struct_forces[:, 2] = np.random.uniform(-10., 25., self.n_node)
+        self.struct_forces[:, 3:] = np.random.uniform(-2., 2., (self.n_node, 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.output_folder)
+
+    def generator(self, **in_dict):
+        in_dict.setdefault('aoa_cl0', [0., -2.*np.pi/180])
+        generator = PolarCorrection()
+        generator.initialise(in_dict,
+                             aero=self.aero,
+                             structure=self.structure,
+                             rho=self.rho,
+                             output_folder=self.output_folder)
+        return generator
+
+    def generate_reference(self, generator, struct_forces):
+        """
+        Forces corrected node by node as before the vectorisation of ``PolarCorrection``
+        """
+        aero_kstep = self.aero_kstep
+        structural_kstep = self.structural_kstep
+        aerogrid = self.aero
+        aero_dict = aerogrid.aero_dict
+        correct_lift = generator.settings['correct_lift']
+        moment_from_polar = generator.settings['moment_from_polar']
+        new_struct_forces = np.zeros_like(struct_forces)
+
+        cga = algebra.quat2rotation(structural_kstep.quat)
+        pos_g = np.array([cga.dot(structural_kstep.pos[inode]) for inode in range(self.n_node)])
+
+        for inode in range(self.n_node):
+            new_struct_forces[inode, :] = struct_forces[inode, :].copy()
+            if not aero_dict['aero_node'][inode]:
+                continue
+            ielem, inode_in_elem = self.structure.node_master_elem[inode]
+            iairfoil = aero_dict['airfoil_distribution'][ielem, inode_in_elem]
+            isurf = aerogrid.struct2aero_mapping[inode][0]['i_surf']
+            if isurf in generator.settings['skip_surfaces']:
+                continue
+            i_n = aerogrid.struct2aero_mapping[inode][0]['i_n']
+            polar = aerogrid.polars[iairfoil]
+            cab = algebra.crv2rotation(structural_kstep.psi[ielem, inode_in_elem, :])
+            cgb = np.dot(cga, cab)
+
+            dir_span, span, dir_chord, chord = span_chord(i_n, aero_kstep.zeta[isurf])
+            area = span*chord
+            if generator.flag_shared_node_by_surfaces[inode]:
+                for mapping in aerogrid.struct2aero_mapping[inode][1:]:
+                    _, span_shared, _, chord_shared = span_chord(mapping['i_n'], aero_kstep.zeta[mapping['i_surf']])
+                    area += span_shared*chord_shared
+
+            urel, dir_urel = magnitude_and_direction_of_relative_velocity(structural_kstep.pos[inode, :],
+                                                                          structural_kstep.pos_dot[inode, :],
+                                                                          structural_kstep.for_vel[:],
+                                                                          cga,
+                                                                          aero_kstep.u_ext[isurf][:, :, i_n],
+                                                                          generator.settings['add_rotation'],
+                                                                          generator.settings['rot_vel_g'],
+                                                                          generator.settings['centre_rot_g'])
+            coef = 0.5*self.rho*np.linalg.norm(urel)**2*area
+            c_bs = local_stability_axes(cgb.T.dot(dir_urel), cgb.T.dot(dir_chord))
+            forces_s = c_bs.T.dot(struct_forces[inode, :3])
+            moment_s = c_bs.T.dot(struct_forces[inode, 3:])
+            cl = forces_s[2]/coef
+
+            if generator.settings['cd_from_cl']:
+                cd, cm = polar.get_cdcm_from_cl(cl)
+            else:
+                aoa = cl/2/np.pi + generator.list_aoa_cl0[iairfoil]
+                cl_polar, cd, cm = polar.get_coefs(aoa)
+                if correct_lift:
+                    cl = cl_polar
+
+            forces_s[0] += cd*coef
+            forces_s[2] = cl*coef
+            new_struct_forces[inode, 0:3] = c_bs.dot(forces_s)
+
+            panel_shift = 0.25*(aero_kstep.zeta[isurf][:, 1, i_n] - aero_kstep.zeta[isurf][:, 0, i_n])
+            ref_point = aero_kstep.zeta[isurf][:, 0, i_n] + 0.25*chord*dir_chord - panel_shift
+            moment_s[1] += cm*coef*chord
+            arm = cgb.T.dot(ref_point - pos_g[inode])
+            moment_polar_drag = algebra.cross3(c_bs.T.dot(arm), cd*dir_urel*coef)
+            moment_s += moment_polar_drag
+            if moment_from_polar:
+                moment_s[1] += cm*coef*chord
+                moment_s += moment_polar_drag
+            if correct_lift and moment_from_polar:
+                moment_s = np.zeros(3)
+                moment_s[1] = cm*coef*chord
+                moment_s += moment_polar_drag
+                moment_s += algebra.cross3(c_bs.T.dot(arm), forces_s[2]*np.array([0, 0, 1]))
+            new_struct_forces[inode, 3:6] = c_bs.dot(moment_s)
+
+        return new_struct_forces
+
+    def test_generate(self):
+        cases = [{'cd_from_cl': True},
+                 {'cd_from_cl': True, 'moment_from_polar': True, 'skip_surfaces': [2]},
+                 {'skip_surfaces': [2]},
+                 {'correct_lift': True, 'skip_surfaces': [2]},
+                 {'correct_lift': True, 'moment_from_polar': True, 'skip_surfaces': [2]},
+                 {'add_rotation': True, 'rot_vel_g': [0., 0., 0.3], 'centre_rot_g': [0.1, 0.2, 0.],
+                  'skip_surfaces': [2]}]
+        struct_forces = self.struct_forces.copy()
+        # a lift coefficient out of the range of the polars at the tip of the left wing
+        struct_forces[6, 2] = 400.
+        for in_dict in cases:
+            with self.subTest(**in_dict):
+                generator = self.generator(**in_dict)
+                forces = struct_forces if in_dict.get('cd_from_cl', False) else self.struct_forces
+                with contextlib.redirect_stdout(io.StringIO()):
+                    new_struct_forces = generator.generate(aero_kstep=self.aero_kstep,
+                                                           structural_kstep=self.structural_kstep,
+                                                           struct_forces=forces,
+                                                           ts=0)
+                    reference = self.generate_reference(generator, forces)
+                np.testing.assert_allclose(new_struct_forces, reference, rtol=1e-10, atol=1e-10)
+                # the forces of the non aerodynamic node and of the skipped surfaces are not corrected
+                uncorrected = [9] + ([7, 8] if 2 in in_dict.get('skip_surfaces', []) else [])
+                np.testing.assert_array_equal(new_struct_forces[uncorrected, :], forces[uncorrected, :])
+                self.assertTrue(np.all(np.any(new_struct_forces[0:6, :] != forces[0:6, :], axis=1)))
+
+if __name__ == '__main__':
+    unittest.main()